@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+from webapp.services.datei_audit import DateiOperationAudit  # noqa: E402
+
+# Nur Server-Prozesse puffern Datei-Ansichten; Befehle und Tests schreiben direkt.
+DateiOperationAudit.start_buffering()
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -113,6 +115,9 @@ MIDDLEWARE = [
     'simple_history.middleware.HistoryRequestMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'webapp.middleware.PaperlessMetricsMiddleware',
+    'webapp.middleware.PaperlessLatencyBudgetMiddleware',
+    'webapp.middleware.DateiOperationLogMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -138,12 +143,63 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql fuer den Betrieb mit mehreren gunicorn-Workern, sonst SQLite.
+DB_ENGINE = os.getenv("DB_ENGINE", "").strip().lower() or "sqlite"
+if DB_ENGINE not in {"sqlite", "postgres", "postgresql"}:
+    raise ImproperlyConfigured(
+        f"DB_ENGINE={DB_ENGINE!r} wird nicht unterstuetzt; erlaubt sind 'sqlite' und 'postgresql'."
+    )
+# Sekunden, die eine Verbindung ueber Requests hinweg offen bleibt (0 = je Request neu).
+DB_CONN_MAX_AGE = _env_int("DB_CONN_MAX_AGE", default=60)
+
+if DB_ENGINE in {"postgres", "postgresql"}:
+    # Verbindungspool (psycopg[pool]); schliesst persistente Verbindungen aus.
+    DB_POOL = _env_bool("DB_POOL", default=False)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME", "").strip() or "quintus",
+            'USER': os.getenv("DB_USER", "quintus"),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "localhost"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # Serverseitige Cursor fuer .iterator(); hinter pgbouncer (Transaction-Pooling) abschalten.
+            'DISABLE_SERVER_SIDE_CURSORS': _env_bool("DB_DISABLE_SERVER_SIDE_CURSORS", default=False),
+            'OPTIONS': (
+                {
+                    "pool": {
+                        "min_size": _env_int("DB_POOL_MIN_SIZE", default=2),
+                        "max_size": _env_int("DB_POOL_MAX_SIZE", default=10),
+                        "timeout": _env_int("DB_POOL_TIMEOUT_SECONDS", default=10),
+                    }
+                }
+                if DB_POOL
+                else {}
+            ),
+        }
+    }
+else:
+    # Wartezeit auf die Schreibsperre, bevor "database is locked" gemeldet wird.
+    SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", default=5000)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("DB_NAME", "").strip() or BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # WAL: Leser blockieren den Schreiber nicht; NORMAL synchronisiert nur an Checkpoints.
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    f"PRAGMA busy_timeout={max(SQLITE_BUSY_TIMEOUT_MS, 0)};"
+                ),
+                # Schreibsperre gleich bei BEGIN, damit busy_timeout greift statt Abbruch beim Sperr-Upgrade.
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -183,6 +239,11 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Listenansichten (Buchungen, Belege, Mieter): Zeilen je Seite, weitere per "Mehr laden"
+LIST_PAGE_SIZE = _env_int("LIST_PAGE_SIZE", default=100)
+# Dashboard: Schnappschuss im Cache, verworfen bei Datenaenderungen, spaetestens nach N Sekunden
+DASHBOARD_CACHE_SECONDS = _env_int("DASHBOARD_CACHE_SECONDS", default=300)
+
 # Upload-Dateien (Bilder, PDFs, Briefe etc.)
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -194,6 +255,34 @@ SERVE_MEDIA_IN_DEBUG = False
 # False = Soft-Dedup (Duplikat wird gespeichert und referenziert duplicate_of)
 # True = Hard-Dedup (Duplikat wird mit Validierungsfehler abgelehnt)
 DATEI_HARD_DEDUP = False
+# Content-addressed Storage fuer Datei-Uploads:
+# True = identische Inhalte liegen nur einmal unter uploads/_blobs/<sha256>, Datei-Zeilen teilen den Blob
+DATEI_CONTENT_ADDRESSED_STORAGE = _env_bool("DATEI_CONTENT_ADDRESSED_STORAGE", default=False)
+# Vorschaubilder fuer Bilder und erste PDF-Seite (uploads/_derived/.../thumb-<groesse>/)
+DATEI_THUMBNAIL_SIZES = _env_list("DATEI_THUMBNAIL_SIZES", default=["160", "480", "1200"])
+# Hintergrund-Threads fuer die Ableitung nach dem Upload (0 = direkt im Request)
+DATEI_THUMBNAIL_WORKERS = _env_int("DATEI_THUMBNAIL_WORKERS", default=2)
+# Sammel-Upload: parallele Threads fuer Pruefung, Storage-Write und SHA-256
+DATEI_BULK_UPLOAD_WORKERS = _env_int("DATEI_BULK_UPLOAD_WORKERS", default=4)
+# Browser-Cache fuer Datei-Downloads (Revalidierung ueber ETag = SHA-256)
+DATEI_CACHE_MAX_AGE_SECONDS = _env_int("DATEI_CACHE_MAX_AGE_SECONDS", default=300)
+# Auslieferung ueber den Webserver: "" = Django streamt, "nginx" = X-Accel-Redirect, "apache" = X-Sendfile
+DATEI_SENDFILE_MODE = os.getenv("DATEI_SENDFILE_MODE", "").strip().lower()
+DATEI_SENDFILE_NGINX_PREFIX = os.getenv("DATEI_SENDFILE_NGINX_PREFIX", "/protected-media/").strip()
+# Protokoll der Datei-Ansichten: im Server-Prozess gepuffert und gebuendelt geschrieben
+DATEI_OPERATION_LOG_BUFFER_SIZE = _env_int("DATEI_OPERATION_LOG_BUFFER_SIZE", default=200)
+DATEI_OPERATION_LOG_FLUSH_SECONDS = _env_int("DATEI_OPERATION_LOG_FLUSH_SECONDS", default=5)
+# Erfolgreiche Ansichten werden nach N Tagen zu Tageszaehlern verdichtet (files_prune_operation_log)
+DATEI_OPERATION_LOG_RETENTION_DAYS = _env_int("DATEI_OPERATION_LOG_RETENTION_DAYS", default=180)
+# Kaltablage fuer archivierte Dateien (files_tier_archived); Default ist ein lokales Verzeichnis,
+# ein S3-kompatibler Storage kann ueber DATEI_COLD_STORAGE_BACKEND (Dotted Path) gesetzt werden
+DATEI_COLD_STORAGE_BACKEND = os.getenv(
+    "DATEI_COLD_STORAGE_BACKEND",
+    "django.core.files.storage.FileSystemStorage",
+).strip()
+DATEI_COLD_STORAGE_ROOT = os.getenv("DATEI_COLD_STORAGE_ROOT", "").strip() or str(BASE_DIR / "media_cold")
+DATEI_COLD_STORAGE_AFTER_DAYS = _env_int("DATEI_COLD_STORAGE_AFTER_DAYS", default=90)
+DATEI_COLD_STORAGE_COMPRESS = _env_bool("DATEI_COLD_STORAGE_COMPRESS", default=True)
 
 # Statisches BK-Mieterportal (Liegenschaft/Jahr/Token-Link)
 BK_PORTAL_BASE_URL = os.getenv("BK_PORTAL_BASE_URL", "").strip().rstrip("/")
@@ -212,6 +301,15 @@ PAPERLESS_METER_READING_DOCUMENT_TYPE_ID = _env_int(
     "PAPERLESS_METER_READING_DOCUMENT_TYPE_ID",
     default=6,
 )
+# Maximale Kantenlänge der lokal gecachten Paperless-Vorschaubilder (uploads/_derived/paperless).
+PAPERLESS_THUMBNAIL_SIZE = _env_int("PAPERLESS_THUMBNAIL_SIZE", default=480)
+# Upload-Warteschlange (send_paperless_uploads): parallele Übertragungen und Versuche bis "fehlgeschlagen".
+PAPERLESS_OUTBOX_MAX_WORKERS = _env_int("PAPERLESS_OUTBOX_MAX_WORKERS", default=3)
+PAPERLESS_OUTBOX_MAX_ATTEMPTS = _env_int("PAPERLESS_OUTBOX_MAX_ATTEMPTS", default=8)
+PAPERLESS_CIRCUIT_FAILURE_THRESHOLD = _env_int("PAPERLESS_CIRCUIT_FAILURE_THRESHOLD", default=5)
+PAPERLESS_CIRCUIT_RESET_SECONDS = _env_int("PAPERLESS_CIRCUIT_RESET_SECONDS", default=60)
+PAPERLESS_PAGE_BUDGET_SECONDS = _env_int("PAPERLESS_PAGE_BUDGET_SECONDS", default=4)
+PAPERLESS_SEARCH_CACHE_SECONDS = _env_int("PAPERLESS_SEARCH_CACHE_SECONDS", default=60)
 
 # E-Mail
 # Standard: direkter SMTP-Versand über den Provider (ohne lokalen Postfix).
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+from webapp.services.datei_audit import DateiOperationAudit  # noqa: E402
+
+# Nur Server-Prozesse puffern Datei-Ansichten; Befehle und Tests schreiben direkt.
+DateiOperationAudit.start_buffering()
@@ -11,15 +11,20 @@ from .models import (
     BetriebskostenBeleg,
     BetriebskostenGruppe,
     Buchung,
+    DashboardMonatswert,
     Datei,
+    DateiOperationDailyStat,
     DateiOperationLog,
     DateiZuordnung,
     LeaseAgreement,
     Manager,
     Meter,
     MeterReading,
+    MietkontoSaldo,
     Owner,
     Ownership,
+    PaperlessRequestStat,
+    PaperlessUpload,
     Property,
     Tenant,
     Unit,
@@ -152,6 +157,19 @@ class BuchungAdmin(SimpleHistoryAdmin):
     list_filter = ("typ", "kategorie", "is_settlement_adjustment", "datum")
 
 
+@admin.register(MietkontoSaldo)
+class MietkontoSaldoAdmin(admin.ModelAdmin):
+    list_display = ("mietervertrag", "monat", "vortrag", "soll", "haben", "endsaldo", "aktualisiert_am")
+    list_filter = ("monat",)
+    readonly_fields = ("mietervertrag", "monat", "vortrag", "soll", "haben", "endsaldo", "aktualisiert_am")
+
+
+@admin.register(DashboardMonatswert)
+class DashboardMonatswertAdmin(admin.ModelAdmin):
+    list_display = ("monat", "miete_netto", "bk_einnahmen_netto", "bk_ausgaben_netto", "aktualisiert_am")
+    readonly_fields = ("monat", "miete_netto", "bk_einnahmen_netto", "bk_ausgaben_netto", "aktualisiert_am")
+
+
 @admin.register(BetriebskostenBeleg)
 class BetriebskostenBelegAdmin(admin.ModelAdmin):
     list_display = (
@@ -181,13 +199,14 @@ class DateiAdmin(admin.ModelAdmin):
         "original_name",
         "kategorie",
         "is_archived",
+        "storage_tier",
         "mime_type",
         "size_bytes",
         "archived_at",
         "duplicate_of",
         "created_at",
     )
-    list_filter = ("kategorie", "is_archived", "created_at", "archived_at")
+    list_filter = ("kategorie", "is_archived", "storage_tier", "created_at", "archived_at")
     search_fields = ("original_name", "beschreibung", "checksum_sha256")
     readonly_fields = (
         "original_name",
@@ -195,6 +214,8 @@ class DateiAdmin(admin.ModelAdmin):
         "size_bytes",
         "checksum_sha256",
         "duplicate_of",
+        "superseded_by",
+        "storage_tier",
         "created_at",
         "archived_at",
         "archived_by",
@@ -281,6 +302,54 @@ class DateiOperationLogAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(DateiOperationDailyStat)
+class DateiOperationDailyStatAdmin(admin.ModelAdmin):
+    list_display = ("day", "operation", "success", "count")
+    list_filter = ("operation", "success", "day")
+    readonly_fields = ("day", "operation", "success", "count", "updated_at")
+
+
+@admin.register(PaperlessUpload)
+class PaperlessUploadAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "original_name",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+        "task_id",
+    )
+    list_filter = ("status", "created_at")
+    search_fields = ("original_name", "title", "q_source_ref", "checksum_sha256", "task_id")
+    readonly_fields = (
+        "checksum_sha256",
+        "size_bytes",
+        "claim_token",
+        "claimed_at",
+        "last_error",
+        "task_id",
+        "created_at",
+        "updated_at",
+        "sent_at",
+    )
+
+
+@admin.register(PaperlessRequestStat)
+class PaperlessRequestStatAdmin(admin.ModelAdmin):
+    list_display = (
+        "bucket_start",
+        "endpoint",
+        "view_name",
+        "request_count",
+        "error_count",
+        "skipped_count",
+        "max_duration_ms",
+    )
+    list_filter = ("endpoint", "bucket_start")
+    search_fields = ("view_name",)
+
+
 @admin.register(ReminderRuleConfig)
 class ReminderRuleConfigAdmin(admin.ModelAdmin):
     list_display = ("code", "title", "lead_months", "is_active", "sort_order", "updated_at")
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class WebappConfig(AppConfig):
     name = 'webapp'
+
+    def ready(self):
+        # Signale für Mietkonto-Monatssalden, Suchindex und Dashboard-Kennzahlen registrieren.
+        from .services import dashboard_stats, lease_balance, search_index  # noqa: F401
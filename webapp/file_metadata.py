@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+import hashlib
+
+from django.core.files.base import File
+
+
+SNIFF_BYTES = 32
+
+
+@dataclass(frozen=True)
+class FileMetadata:
+    checksum_sha256: str
+    size_bytes: int
+    sniffed_mime_type: str = ""
+
+
+def sniff_mime_type(head: bytes) -> str:
+    """Erkennt gängige Formate anhand der ersten Bytes; leer, wenn unbekannt."""
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return ""
+
+
+class _MetadataAccumulator:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._hasher = hashlib.sha256()
+        self._size = 0
+        self._head = b""
+
+    def consume(self, chunk):
+        if not chunk:
+            return
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        self._hasher.update(chunk)
+        self._size += len(chunk)
+        if len(self._head) < SNIFF_BYTES:
+            self._head += chunk[: SNIFF_BYTES - len(self._head)]
+
+    def metadata(self) -> FileMetadata:
+        return FileMetadata(
+            checksum_sha256=self._hasher.hexdigest(),
+            size_bytes=self._size,
+            sniffed_mime_type=sniff_mime_type(self._head),
+        )
+
+
+class MetadataCollectingFile(File):
+    """Reicht eine Datei an den Storage durch und berechnet dabei SHA-256, Größe und MIME-Typ.
+
+    Bewusst ohne ``temporary_file_path``: der Storage soll die Bytes streamen,
+    damit sie genau einmal gelesen werden.
+    """
+
+    def __init__(self, source, name=None):
+        super().__init__(source, name=name or getattr(source, "name", None))
+        self._accumulator = _MetadataAccumulator()
+
+    def seek(self, offset, whence=0):
+        position = self.file.seek(offset, whence)
+        if offset == 0 and whence == 0:
+            self._accumulator.reset()
+        return position
+
+    def read(self, size=-1):
+        chunk = self.file.read(size)
+        self._accumulator.consume(chunk)
+        return chunk
+
+    def chunks(self, chunk_size=None):
+        source_chunks = getattr(self.file, "chunks", None)
+        if source_chunks is None:
+            # File.chunks() liest über self.read() und wird dort bereits erfasst.
+            yield from super().chunks(chunk_size)
+            return
+        self._accumulator.reset()
+        for chunk in source_chunks(chunk_size):
+            self._accumulator.consume(chunk)
+            yield chunk
+
+    def metadata(self) -> FileMetadata:
+        return self._accumulator.metadata()
+
+
+def read_file_metadata(file_obj) -> FileMetadata:
+    """Liest eine bereits gespeicherte oder noch nicht gespeicherte Datei einmal vollständig."""
+    accumulator = _MetadataAccumulator()
+    stream = getattr(file_obj, "file", file_obj)
+    current_position = None
+    if hasattr(stream, "tell"):
+        try:
+            current_position = stream.tell()
+        except (OSError, ValueError):
+            current_position = None
+    try:
+        if hasattr(file_obj, "chunks"):
+            for chunk in file_obj.chunks():
+                accumulator.consume(chunk)
+        else:
+            if hasattr(stream, "seek"):
+                stream.seek(0)
+            while True:
+                chunk = stream.read(64 * 1024)
+                if not chunk:
+                    break
+                accumulator.consume(chunk)
+    finally:
+        if current_position is not None and hasattr(stream, "seek"):
+            stream.seek(current_position)
+    return accumulator.metadata()
@@ -452,7 +452,40 @@ class BankImportForm(forms.Form):
     )
 
 
-class DateiUploadForm(forms.Form):
+class _DateiTargetFormMixin:
+    def _resolve_target(self, cleaned_data):
+        app_label = cleaned_data.get("target_app_label")
+        model_name = cleaned_data.get("target_model")
+        object_id = cleaned_data.get("target_object_id")
+        if not (app_label and model_name and object_id):
+            raise forms.ValidationError("Bitte ein gültiges Zielobjekt angeben.")
+        try:
+            return DateiService.resolve_target_object(
+                app_label=app_label,
+                model_name=model_name,
+                object_id=object_id,
+            )
+        except ValidationError as exc:
+            raise forms.ValidationError(exc.messages) from exc
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(item, initial) for item in data]
+        return [single_file_clean(data, initial)]
+
+
+class DateiUploadForm(_DateiTargetFormMixin, forms.Form):
     target_app_label = forms.CharField(widget=forms.HiddenInput())
     target_model = forms.CharField(widget=forms.HiddenInput())
     target_object_id = forms.IntegerField(widget=forms.HiddenInput())
@@ -483,23 +516,9 @@ class DateiUploadForm(forms.Form):
 
     def clean(self):
         cleaned_data = super().clean()
-        app_label = cleaned_data.get("target_app_label")
-        model_name = cleaned_data.get("target_model")
-        object_id = cleaned_data.get("target_object_id")
         upload = cleaned_data.get("file")
         provided_kategorie = cleaned_data.get("kategorie")
-
-        if app_label and model_name and object_id:
-            try:
-                self.target_object = DateiService.resolve_target_object(
-                    app_label=app_label,
-                    model_name=model_name,
-                    object_id=object_id,
-                )
-            except ValidationError as exc:
-                raise forms.ValidationError(exc.messages) from exc
-        else:
-            raise forms.ValidationError("Bitte ein gültiges Zielobjekt angeben.")
+        self.target_object = self._resolve_target(cleaned_data)
 
         if upload:
             try:
@@ -526,6 +545,45 @@ class DateiUploadForm(forms.Form):
         )
 
 
+class DateiBulkUploadForm(_DateiTargetFormMixin, forms.Form):
+    """Mehrere Dateien für ein Zielobjekt; Prüfung je Datei erfolgt in ``DateiBulkUpload``."""
+
+    target_app_label = forms.CharField(widget=forms.HiddenInput())
+    target_model = forms.CharField(widget=forms.HiddenInput())
+    target_object_id = forms.IntegerField(widget=forms.HiddenInput())
+    # Leere Dateien lehnt ``DateiBulkUpload`` je Datei ab, statt den ganzen Upload zu verwerfen.
+    files = MultipleFileField(
+        label="Dateien",
+        allow_empty_file=True,
+        widget=MultipleFileInput(
+            attrs={
+                "class": "form-control",
+                "accept": ".pdf,.jpg,.jpeg,.png,application/pdf,image/jpeg,image/png",
+            }
+        ),
+    )
+    kategorie = forms.ChoiceField(
+        required=False,
+        choices=Datei.Kategorie.choices,
+        widget=forms.HiddenInput(),
+    )
+    beschreibung = forms.CharField(
+        required=False,
+        label="Beschreibung",
+        widget=forms.Textarea(attrs={"class": "form-control", "rows": 3}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        kwargs.pop("user", None)
+        self.target_object = None
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        self.target_object = self._resolve_target(cleaned_data)
+        return cleaned_data
+
+
 class BuchungForm(forms.ModelForm):
     liegenschaft = forms.ModelChoiceField(
         queryset=Property.objects.all(),
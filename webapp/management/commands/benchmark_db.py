@@ -0,0 +1,187 @@
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from webapp.models import Buchung
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_OPERATIONS = 200
+OPERATIONS = ("buchung", "session", "liste")
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst den Durchsatz der konfigurierten Datenbank mit parallelen Schreib- und Lesezugriffen "
+        "(Buchung anlegen, Session speichern, Buchungsliste lesen) und räumt danach auf."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"Parallele Threads mit eigener Verbindung (Default: {DEFAULT_WORKERS}).",
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=DEFAULT_OPERATIONS,
+            help=f"Durchläufe je Thread, je Durchlauf jede Operation einmal (Default: {DEFAULT_OPERATIONS}).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(int(options["workers"] or DEFAULT_WORKERS), 1)
+        operations = max(int(options["operations"] or DEFAULT_OPERATIONS), 1)
+        marker = f"BENCHMARK {uuid.uuid4().hex[:12]}"
+        session_keys: list[str] = []
+
+        started = time.perf_counter()
+        try:
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-benchmark") as executor:
+                    results = list(
+                        executor.map(
+                            lambda _index: self._run_worker(marker, operations, session_keys),
+                            range(workers),
+                        )
+                    )
+            else:
+                results = [self._run_worker(marker, operations, session_keys, close_connection=False)]
+            elapsed = time.perf_counter() - started
+        finally:
+            self._cleanup(marker, session_keys)
+
+        summary = {
+            "database": self._describe_database(),
+            "workers": workers,
+            "operations_per_worker": operations,
+            "seconds": round(elapsed, 3),
+            "operations": {},
+        }
+        for name in OPERATIONS:
+            durations = [duration for result in results for duration in result["durations"][name]]
+            errors = sum(result["errors"][name] for result in results)
+            summary["operations"][name] = {
+                "count": len(durations),
+                "errors": errors,
+                "per_second": round(len(durations) / elapsed, 1) if elapsed else 0.0,
+                "p50_ms": self._percentile_ms(durations, 50),
+                "p95_ms": self._percentile_ms(durations, 95),
+            }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        database = summary["database"]
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Datenbank: {database['vendor']} ({', '.join(f'{key}={value}' for key, value in database['settings'].items())})"
+            )
+        )
+        self.stdout.write(f"{workers} Threads × {operations} Durchläufe in {summary['seconds']} s")
+        for name, row in summary["operations"].items():
+            self.stdout.write(
+                f"  - {name}: {row['per_second']}/s, p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms, "
+                f"{row['errors']} Fehler"
+            )
+
+    def _run_worker(
+        self,
+        marker: str,
+        operations: int,
+        session_keys: list[str],
+        *,
+        close_connection: bool = True,
+    ) -> dict:
+        durations: dict[str, list[float]] = {name: [] for name in OPERATIONS}
+        errors = {name: 0 for name in OPERATIONS}
+        today = timezone.localdate()
+        page_size = int(getattr(settings, "LIST_PAGE_SIZE", 100) or 100)
+
+        def write_buchung():
+            with transaction.atomic():
+                Buchung.objects.create(
+                    typ=Buchung.Typ.IST,
+                    kategorie=Buchung.Kategorie.SONST,
+                    buchungstext=marker,
+                    datum=today,
+                    netto=Decimal("10.00"),
+                    ust_prozent=Decimal("0.00"),
+                    brutto=Decimal("10.00"),
+                )
+
+        def write_session():
+            session = SessionStore()
+            session["benchmark"] = marker
+            session.save()
+            session_keys.append(session.session_key)
+
+        def read_list():
+            list(
+                Buchung.objects.select_related("mietervertrag__unit__property", "einheit__property").order_by(
+                    "-datum", "-id"
+                )[:page_size]
+            )
+
+        steps = {"buchung": write_buchung, "session": write_session, "liste": read_list}
+        try:
+            for _index in range(operations):
+                for name in OPERATIONS:
+                    step_started = time.perf_counter()
+                    try:
+                        steps[name]()
+                    except OperationalError:
+                        # z. B. "database is locked" nach Ablauf von busy_timeout
+                        errors[name] += 1
+                        continue
+                    durations[name].append(time.perf_counter() - step_started)
+        finally:
+            if close_connection:
+                connection.close()
+        return {"durations": durations, "errors": errors}
+
+    @staticmethod
+    def _cleanup(marker: str, session_keys: list[str]) -> None:
+        Buchung.objects.filter(buchungstext=marker).delete()
+        Buchung.history.filter(buchungstext=marker).delete()
+        if session_keys:
+            Session.objects.filter(session_key__in=session_keys).delete()
+
+    @staticmethod
+    def _describe_database() -> dict:
+        db_settings = connection.settings_dict
+        described = {"CONN_MAX_AGE": db_settings.get("CONN_MAX_AGE")}
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                for pragma in ("journal_mode", "synchronous", "busy_timeout"):
+                    cursor.execute(f"PRAGMA {pragma}")
+                    described[pragma] = cursor.fetchone()[0]
+        else:
+            described["pool"] = bool(db_settings.get("OPTIONS", {}).get("pool"))
+            described["server_side_cursors"] = not db_settings.get("DISABLE_SERVER_SIDE_CURSORS")
+        return {"vendor": connection.vendor, "settings": described}
+
+    @staticmethod
+    def _percentile_ms(durations: list[float], percentile: int) -> float:
+        if not durations:
+            return 0.0
+        if len(durations) == 1:
+            return round(durations[0] * 1000, 2)
+        return round(statistics.quantiles(durations, n=100)[percentile - 1] * 1000, 2)
@@ -4,10 +4,15 @@ from django.core.management.base import BaseCommand
 from django.db.models import Count
 
 from webapp.models import Datei, DateiZuordnung
+from webapp.services.file_integrity import DEFAULT_BATCH_SIZE, DateiIntegrityScan
+from webapp.services.storage_tiers import DateiStorageTiers
 
 
 class Command(BaseCommand):
-    help = "Prüft Dateien auf fehlende Binaries, hängende Zuordnungen und Checksum-Duplikate."
+    help = (
+        "Prüft Dateien auf fehlende Binaries, hängende Zuordnungen und Checksum-Duplikate. "
+        "Mit --verify-checksums werden alle Dateien neu gehasht (parallel, fortsetzbar)."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -21,8 +26,56 @@ class Command(BaseCommand):
             default=200,
             help="Maximale Anzahl Detaileinträge pro Kategorie (Default: 200).",
         )
+        parser.add_argument(
+            "--verify-checksums",
+            action="store_true",
+            help="Vollständiger Integritätslauf: liest jede Datei und vergleicht SHA-256 und Größe.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Parallele Lese-Threads für --verify-checksums (Default: 4).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Dateien pro Checkpoint-Schritt (Default: {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="",
+            help="Checkpoint-Datei; ein vorhandener Checkpoint wird fortgesetzt und nach Abschluss gelöscht.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignoriert einen vorhandenen Checkpoint und beginnt von vorne.",
+        )
+        parser.add_argument(
+            "--max-mb-per-second",
+            type=float,
+            default=0,
+            help="Lese-Limit in MB/s über alle Threads (0 = unbegrenzt).",
+        )
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            default=0,
+            help="Zeitbudget; danach wird nach dem laufenden Batch angehalten (0 = unbegrenzt).",
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            help="Fortschritt nach jedem Batch auf stderr ausgeben (mit --json als JSON-Zeilen).",
+        )
 
     def handle(self, *args, **options):
+        if options["verify_checksums"]:
+            self._handle_integrity_scan(options)
+            return
+
         limit = max(int(options["limit"]), 1)
 
         missing_files = self._collect_missing_files(limit=limit)
@@ -74,11 +127,57 @@ class Command(BaseCommand):
                     f"  - SHA256 {item['checksum']} -> Datei-IDs {item['datei_ids']}"
                 )
 
+    def _handle_integrity_scan(self, options):
+        as_json = bool(options["json"])
+
+        def report_progress(event):
+            if as_json:
+                self.stderr.write(json.dumps(event, ensure_ascii=False))
+            else:
+                self.stderr.write(
+                    f"{event['scanned_dateien']}/{event['total_dateien']} Dateien geprüft, "
+                    f"{event['findings_count']} Befunde"
+                )
+
+        scan = DateiIntegrityScan(
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            max_bytes_per_second=max(float(options["max_mb_per_second"] or 0), 0) * 1024 * 1024,
+            max_seconds=options["max_seconds"],
+            checkpoint_path=options["checkpoint"],
+            restart=options["restart"],
+            progress=report_progress if options["progress"] else None,
+        )
+        summary = scan.run()
+
+        if as_json:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        if summary["complete"]:
+            state = "abgeschlossen"
+        elif options["checkpoint"]:
+            state = "unterbrochen (Checkpoint gespeichert)"
+        else:
+            state = "unterbrochen (ohne --checkpoint, der nächste Lauf beginnt von vorne)"
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Integritätsprüfung {state}: {summary['scanned_dateien']}/{summary['total_dateien']} Dateien, "
+                f"{summary['findings_count']} Befunde."
+            )
+        )
+        for finding in summary["findings"][: max(int(options["limit"]), 1)]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"  - {finding['status']}: {finding['name']} (Datei-IDs {finding['datei_ids']})"
+                )
+            )
+
     @staticmethod
     def _collect_missing_files(*, limit: int):
         count = 0
         items = []
-        queryset = Datei.objects.exclude(file="").only("id", "file", "original_name")
+        queryset = Datei.objects.exclude(file="").only("id", "file", "original_name", "storage_tier", "size_bytes")
         for datei in queryset.iterator():
             file_name = (datei.file.name or "").strip()
             if not file_name:
@@ -92,7 +191,7 @@ class Command(BaseCommand):
                         }
                     )
                 continue
-            if datei.file.storage.exists(file_name):
+            if DateiStorageTiers.exists(datei):
                 continue
             count += 1
             if len(items) < limit:
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from webapp.services.files import DateiService
+
+
+class Command(BaseCommand):
+    help = (
+        "Verknüpft archivierte BK- und VPI-Schreiben mit ihrer aktuellen PDF (superseded_by). "
+        "Standard ist Dry-Run; mit --apply wird geschrieben."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Schreibt die gefundenen Verweise.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Optionales Limit der zu prüfenden archivierten Schreiben (0 = kein Limit).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        summary = DateiService.backfill_superseded_by(
+            apply=bool(options["apply"]),
+            limit=int(options["limit"] or 0),
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        prefix = "Dry-Run: " if summary["mode"] == "dry-run" else ""
+        verb = "würden verknüpft" if summary["mode"] == "dry-run" else "verknüpft"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{summary['linked']} von {summary['candidates']} archivierten Schreiben {verb}, "
+                f"{summary['without_replacement']} ohne aktuelle Fassung."
+            )
+        )
@@ -0,0 +1,176 @@
+import csv
+import json
+import mimetypes
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import File
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.services.bulk_upload import BulkUploadItem, DateiBulkUpload
+from webapp.services.files import DateiService
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+class _LocalUploadFile(File):
+    """Lokale Datei mit ``content_type`` wie ein Browser-Upload."""
+
+    def __init__(self, path: str):
+        super().__init__(open(path, "rb"), name=os.path.basename(path))
+        self.content_type = mimetypes.guess_type(path)[0] or ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Lädt viele lokale Dateien gesammelt hoch und ordnet sie Objekten zu "
+        "(parallel geprüft und gehasht, Einfügen je Stapel in einer Transaktion)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Dateien oder Verzeichnisse (nicht rekursiv) für --target.",
+        )
+        parser.add_argument(
+            "--target",
+            default="",
+            help="Zielobjekt für alle Pfade, z. B. webapp.betriebskostenbeleg:42.",
+        )
+        parser.add_argument(
+            "--manifest",
+            default="",
+            help="CSV mit Spalten path,target[,kategorie,beschreibung]; relative Pfade gelten ab der CSV.",
+        )
+        parser.add_argument(
+            "--kategorie",
+            default="",
+            help="Kategorie für alle Dateien (Default: automatisch je Zielobjekt und Dateityp).",
+        )
+        parser.add_argument(
+            "--beschreibung",
+            default="",
+            help="Beschreibung für alle Dateien ohne eigene Beschreibung im Manifest.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Parallele Threads (Default: DATEI_BULK_UPLOAD_WORKERS).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Dateien je Transaktion (Default: {DEFAULT_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        entries = self._collect_entries(options)
+        if not entries:
+            raise CommandError("Keine Dateien angegeben (Pfade mit --target oder --manifest).")
+
+        chunk_size = max(int(options["chunk_size"] or DEFAULT_CHUNK_SIZE), 1)
+        targets: dict[str, object] = {}
+        results = []
+        for start in range(0, len(entries), chunk_size):
+            items = []
+            try:
+                for path, target_ref, kategorie, beschreibung in entries[start : start + chunk_size]:
+                    if target_ref not in targets:
+                        targets[target_ref] = self._resolve_target(target_ref)
+                    items.append(
+                        BulkUploadItem(
+                            uploaded_file=_LocalUploadFile(path),
+                            target_object=targets[target_ref],
+                            kategorie=kategorie or options["kategorie"] or None,
+                            beschreibung=beschreibung or options["beschreibung"],
+                        )
+                    )
+                results.extend(DateiBulkUpload.upload(items, workers=options["workers"]))
+            finally:
+                for item in items:
+                    item.uploaded_file.close()
+
+        summary = {
+            "files": len(results),
+            "created": sum(1 for result in results if result.status == DateiBulkUpload.STATUS_CREATED),
+            "duplicates": sum(1 for result in results if result.status == DateiBulkUpload.STATUS_DUPLICATE),
+            "rejected": sum(1 for result in results if result.status == DateiBulkUpload.STATUS_REJECTED),
+            "results": [result.as_dict() for result in results],
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        for result in results:
+            if result.status == DateiBulkUpload.STATUS_REJECTED:
+                self.stdout.write(self.style.ERROR(f"  - {result.name}: {result.error}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sammel-Upload abgeschlossen: {summary['created']} neu, "
+                f"{summary['duplicates']} als Duplikat markiert, {summary['rejected']} abgelehnt."
+            )
+        )
+
+    def _collect_entries(self, options) -> list[tuple[str, str, str, str]]:
+        entries: list[tuple[str, str, str, str]] = []
+        if options["paths"]:
+            if not options["target"]:
+                raise CommandError("Für Pfadangaben ist --target erforderlich.")
+            for path in options["paths"]:
+                if os.path.isdir(path):
+                    entries.extend(
+                        (os.path.join(path, name), options["target"], "", "")
+                        for name in sorted(os.listdir(path))
+                        if os.path.isfile(os.path.join(path, name))
+                    )
+                elif os.path.isfile(path):
+                    entries.append((path, options["target"], "", ""))
+                else:
+                    raise CommandError(f"Pfad nicht gefunden: {path}")
+
+        if options["manifest"]:
+            base_dir = os.path.dirname(os.path.abspath(options["manifest"]))
+            with open(options["manifest"], newline="", encoding="utf-8") as handle:
+                for line_number, row in enumerate(csv.DictReader(handle), start=2):
+                    path = str(row.get("path") or "").strip()
+                    target_ref = str(row.get("target") or "").strip()
+                    if not path or not target_ref:
+                        raise CommandError(f"Manifest Zeile {line_number}: path und target sind Pflicht.")
+                    if not os.path.isabs(path):
+                        path = os.path.join(base_dir, path)
+                    if not os.path.isfile(path):
+                        raise CommandError(f"Manifest Zeile {line_number}: Datei nicht gefunden: {path}")
+                    entries.append(
+                        (
+                            path,
+                            target_ref,
+                            str(row.get("kategorie") or "").strip(),
+                            str(row.get("beschreibung") or "").strip(),
+                        )
+                    )
+        return entries
+
+    @staticmethod
+    def _resolve_target(target_ref: str):
+        model_ref, _separator, object_id = target_ref.partition(":")
+        app_label, _dot, model_name = model_ref.partition(".")
+        if not (app_label and model_name and object_id.strip().isdigit()):
+            raise CommandError(f"Ungültiges Ziel '{target_ref}', erwartet z. B. webapp.betriebskostenbeleg:42.")
+        try:
+            return DateiService.resolve_target_object(
+                app_label=app_label,
+                model_name=model_name,
+                object_id=int(object_id),
+            )
+        except ValidationError as exc:
+            raise CommandError(f"Ziel '{target_ref}': {' '.join(exc.messages)}") from exc
@@ -1,9 +1,11 @@
 import json
 
+from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from webapp.models import Datei, DateiOperationLog, DateiZuordnung
+from webapp.services.blob_storage import DateiBlobStorage
 from webapp.services.files import DateiService
 
 
@@ -19,6 +21,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Archiviert gefundene Orphans. Ohne Flag nur Analyse (Dry-Run).",
         )
+        parser.add_argument(
+            "--delete-unreferenced-blobs",
+            action="store_true",
+            help="Löscht Blobs unter uploads/_blobs, auf die keine Datei mehr verweist.",
+        )
         parser.add_argument(
             "--json",
             action="store_true",
@@ -74,11 +81,21 @@ class Command(BaseCommand):
             .values("id", "original_name", "file", "is_archived")[:limit]
         )
 
+        unreferenced_blobs = DateiBlobStorage.unreferenced_blob_names(default_storage)
+        deleted_blobs = []
+        if options["delete_unreferenced_blobs"]:
+            for blob_name in unreferenced_blobs:
+                default_storage.delete(blob_name)
+                deleted_blobs.append(blob_name)
+
         summary = {
             "mode": "archive" if archive_mode else "dry-run",
             "orphans_count": len(orphan_ids),
             "archived_count": len(archived_ids),
             "orphans": details,
+            "unreferenced_blobs_count": len(unreferenced_blobs),
+            "deleted_blobs_count": len(deleted_blobs),
+            "unreferenced_blobs": unreferenced_blobs[:limit],
         }
 
         if options["json"]:
@@ -104,3 +121,11 @@ class Command(BaseCommand):
                 f"  - Datei #{item['id']} ({item['original_name'] or item['file']}) "
                 f"{'[archiviert]' if item['is_archived'] else ''}"
             )
+
+        if unreferenced_blobs:
+            action = "gelöscht" if deleted_blobs else "gefunden (mit --delete-unreferenced-blobs löschen)"
+            self.stdout.write(
+                self.style.WARNING(f"Nicht referenzierte Blobs: {len(unreferenced_blobs)} {action}.")
+            )
+            for blob_name in summary["unreferenced_blobs"]:
+                self.stdout.write(f"  - {blob_name}")
@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from webapp.models import Datei
+from webapp.services.blob_storage import DateiBlobStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Führt Dateien mit gleicher SHA-256 Checksumme auf einen gemeinsamen Blob "
+        "unter uploads/_blobs zusammen und entfernt die überzähligen Kopien. "
+        "Dateien in der Kaltablage bleiben unverändert."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Führt die Zusammenlegung durch. Ohne Flag nur Analyse (Dry-Run).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=200,
+            help="Maximale Anzahl Detaileinträge (Default: 200).",
+        )
+
+    def handle(self, *args, **options):
+        apply_mode = bool(options["apply"])
+        limit = max(int(options["limit"]), 1)
+
+        duplicate_checksums = list(
+            Datei.objects.filter(storage_tier=Datei.StorageTier.HOT)
+            .exclude(checksum_sha256="")
+            .values("checksum_sha256")
+            .annotate(file_count=Count("id"))
+            .filter(file_count__gt=1)
+            .order_by("checksum_sha256")
+            .values_list("checksum_sha256", flat=True)
+        )
+
+        groups = []
+        for checksum in duplicate_checksums:
+            dateien = list(Datei.objects.filter(checksum_sha256=checksum).order_by("id"))
+            groups.append(DateiBlobStorage.collapse_duplicate_group(dateien, apply=apply_mode))
+
+        summary = {
+            "mode": "apply" if apply_mode else "dry-run",
+            "duplicate_groups_count": len(groups),
+            "removed_files_count": sum(len(group["removed_files"]) for group in groups),
+            "skipped_files_count": sum(len(group["skipped_files"]) for group in groups),
+            "reclaimed_bytes": sum(int(group["reclaimed_bytes"]) for group in groups),
+            "groups": groups[:limit],
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        prefix = "Duplikat-Zusammenlegung" if apply_mode else "Duplikat-Zusammenlegung Dry-Run"
+        self.stdout.write(
+            self.style.NOTICE(
+                f"{prefix}: {summary['duplicate_groups_count']} Gruppen, "
+                f"{summary['removed_files_count']} Kopien, "
+                f"{summary['reclaimed_bytes']} Bytes."
+            )
+        )
+        if not apply_mode:
+            self.stdout.write("Mit --apply werden die Kopien zusammengelegt.")
+        if summary["skipped_files_count"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{summary['skipped_files_count']} Dateien übersprungen (Inhalt weicht von der Checksumme ab, "
+                    "Datei fehlt oder liegt in der Kaltablage)."
+                )
+            )
@@ -1,17 +1,18 @@
 import json
-from io import BytesIO
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
 from django.db.models import Q
 
 from webapp.models import Datei
-from webapp.storage_paths import build_deterministic_derived_upload_path
+from webapp.services.datei_thumbnails import DateiThumbnailService, derive_thumbnails
 
 
 class Command(BaseCommand):
     help = (
-        "Erzeugt Vorschaubilder für Bild-Dateien in uploads/_derived. "
+        "Erzeugt fehlende Vorschaubilder für Bilder und PDFs in uploads/_derived. "
         "Idempotent und sicher für Cron-Wiederholungen."
     )
 
@@ -30,8 +31,15 @@ class Command(BaseCommand):
         parser.add_argument(
             "--size",
             type=int,
-            default=480,
-            help="Maximale Kantenlänge des Vorschaubilds in Pixel (Default: 480).",
+            action="append",
+            default=None,
+            help="Nur diese Kantenlänge erzeugen (mehrfach möglich; Default: DATEI_THUMBNAIL_SIZES).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(os.cpu_count() or 1, 4),
+            help="Anzahl paralleler Prozesse (1 = ohne Prozess-Pool).",
         )
         parser.add_argument(
             "--json",
@@ -42,10 +50,11 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         force = bool(options["force"])
         limit = int(options["limit"] or 0)
-        size = max(int(options["size"]), 64)
+        sizes = sorted({max(int(size), 64) for size in options["size"] or []}) or DateiThumbnailService.sizes()
+        workers = max(int(options["workers"] or 1), 1)
 
         try:
-            from PIL import Image
+            import PIL  # noqa: F401
         except ImportError:
             message = {
                 "status": "skipped",
@@ -61,6 +70,7 @@ class Command(BaseCommand):
             Datei.objects.filter(is_archived=False)
             .filter(
                 Q(mime_type__startswith="image/")
+                | Q(mime_type="application/pdf")
                 | Q(kategorie__in=[Datei.Kategorie.BILD, Datei.Kategorie.ZAEHLERFOTO])
             )
             .exclude(file="")
@@ -69,51 +79,33 @@ class Command(BaseCommand):
         if limit > 0:
             queryset = queryset[:limit]
 
-        created = 0
-        skipped_existing = 0
-        skipped_missing = 0
-        failed = 0
-
+        # Geteilte Blobs nur einmal ableiten.
+        sources: dict[str, str] = {}
         for datei in queryset:
-            source_path = (datei.file.name or "").strip()
-            if not source_path or not datei.file.storage.exists(source_path):
-                skipped_missing += 1
-                continue
-
-            target_path = build_deterministic_derived_upload_path(
-                source_path,
-                "thumb",
-                extension=".jpg",
-            )
-            if not force and datei.file.storage.exists(target_path):
-                skipped_existing += 1
-                continue
-
-            try:
-                with datei.file.storage.open(source_path, "rb") as source_stream:
-                    image = Image.open(source_stream)
-                    image = image.convert("RGB")
-                    image.thumbnail((size, size))
-
-                    buffer = BytesIO()
-                    image.save(buffer, format="JPEG", quality=85, optimize=True)
-                    buffer.seek(0)
-
-                    datei.file.storage.save(
-                        target_path,
-                        ContentFile(buffer.read()),
-                    )
-                    created += 1
-            except Exception:
-                failed += 1
+            mime_type = DateiThumbnailService.source_mime_type(datei)
+            if mime_type and datei.file.name not in sources:
+                sources[datei.file.name] = mime_type
+
+        jobs = [(source_name, mime_type, sizes, force) for source_name, mime_type in sources.items()]
+        if workers > 1 and len(jobs) > 1:
+            # fork übernimmt die geladenen Django-Settings; die Worker greifen nur auf den Storage zu.
+            start_methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in start_methods else None)
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as executor:
+                results = list(executor.map(derive_thumbnails, *zip(*jobs)))
+        else:
+            results = [derive_thumbnails(*job) for job in jobs]
 
         summary = {
             "status": "ok",
-            "created": created,
-            "skipped_existing": skipped_existing,
-            "skipped_missing_source": skipped_missing,
-            "failed": failed,
-            "size": size,
+            "sources": len(jobs),
+            "created": sum(int(result["created"]) for result in results),
+            "skipped_existing": sum(int(result["skipped_existing"]) for result in results),
+            "skipped_missing_source": sum(1 for result in results if result["status"] == "missing"),
+            "unsupported": sum(1 for result in results if result["status"] == "unsupported"),
+            "failed": sum(1 for result in results if result["status"] == "failed"),
+            "sizes": sizes,
+            "workers": workers,
             "force": force,
         }
 
@@ -124,7 +116,8 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.NOTICE(
                 "Thumbnail-Generierung abgeschlossen: "
-                f"{created} erstellt, {skipped_existing} übersprungen (existiert), "
-                f"{skipped_missing} ohne Quelldatei, {failed} Fehler."
+                f"{summary['created']} erstellt, {summary['skipped_existing']} übersprungen (existiert), "
+                f"{summary['skipped_missing_source']} ohne Quelldatei, "
+                f"{summary['unsupported']} ohne Renderer, {summary['failed']} Fehler."
             )
         )
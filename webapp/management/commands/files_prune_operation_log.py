@@ -0,0 +1,72 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from webapp.services.datei_audit import DEFAULT_RETENTION_DAYS, DateiOperationAudit
+
+
+class Command(BaseCommand):
+    help = (
+        "Verdichtet alte Einträge im Datei-Protokoll zu Tageszählern und löscht sie. "
+        "Standard ist Dry-Run; mit --apply wird geschrieben."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help=(
+                "Erfolgreiche Ansichten älter als N Tage verdichten "
+                "(Default: DATEI_OPERATION_LOG_RETENTION_DAYS)."
+            ),
+        )
+        parser.add_argument(
+            "--security-days",
+            type=int,
+            default=0,
+            help=(
+                "Uploads, Löschungen und Fehlschläge älter als N Tage ebenfalls verdichten "
+                "(0 = nie, Default)."
+            ),
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Schreibt die Tageszähler und löscht die verdichteten Einträge.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = getattr(settings, "DATEI_OPERATION_LOG_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+        summary = DateiOperationAudit.prune(
+            older_than_days=days,
+            security_older_than_days=options["security_days"],
+            apply=bool(options["apply"]),
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        if summary["mode"] == "dry-run":
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Dry-Run: {summary['rows']} Einträge würden verdichtet und gelöscht "
+                    f"(Ansichten vor {summary['view_cutoff']})."
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary['deleted_rows']} Einträge gelöscht, "
+                f"{summary['rolled_up_days']} Tage in den Tageszählern aktualisiert."
+            )
+        )
@@ -0,0 +1,69 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from webapp.services.storage_tiers import DateiStorageTiers
+
+
+class Command(BaseCommand):
+    help = (
+        "Verschiebt lange archivierte Dateien in die Kaltablage (DATEI_COLD_STORAGE_*). "
+        "Standard ist Dry-Run; mit --apply wird verschoben."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Nur Dateien, die länger als N Tage archiviert sind (Default: DATEI_COLD_STORAGE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Optionales Limit der zu verschiebenden Blobs (0 = kein Limit).",
+        )
+        parser.add_argument(
+            "--no-compress",
+            action="store_true",
+            help="Ohne gzip ablegen, auch wenn DATEI_COLD_STORAGE_COMPRESS aktiv ist.",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Kopiert, prüft die Kopie per SHA-256 und löscht danach das Original.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        summary = DateiStorageTiers.tier_archived(
+            older_than_days=options["days"],
+            apply=bool(options["apply"]),
+            limit=int(options["limit"] or 0),
+            compress=False if options["no_compress"] else None,
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        if summary["mode"] == "dry-run":
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Dry-Run: {summary['candidates']} Blobs würden in die Kaltablage verschoben "
+                    f"(archiviert seit mehr als {summary['older_than_days']} Tagen)."
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary['moved']} Blobs verschoben ({summary['hot_bytes']} Bytes aktiv, "
+                f"{summary['cold_bytes']} Bytes kalt), {summary['missing']} fehlend, "
+                f"{summary['failed']} Fehler, {summary['skipped_restored']} zwischenzeitlich wiederhergestellt."
+            )
+        )
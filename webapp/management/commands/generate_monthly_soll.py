@@ -1,16 +1,34 @@
+import json
 from calendar import monthrange
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
+from simple_history.utils import bulk_create_with_history
 
 from webapp.models import Buchung, LeaseAgreement, Unit
+from webapp.services.dashboard_stats import DashboardStatistik
+from webapp.services.lease_balance import MietkontoSaldoService
+from webapp.services.search_index import VolltextIndex
+
+
+DEFAULT_BATCH_SIZE = 500
+HISTORY_CHANGE_REASON = "SOLL-Stellung (generate_monthly_soll)"
+SOLL_CATEGORIES = (
+    Buchung.Kategorie.HMZ,
+    Buchung.Kategorie.BK,
+    Buchung.Kategorie.HK,
+)
 
 
 class Command(BaseCommand):
-    help = "Erzeugt monatliche SOLL-Buchungen für aktive Mietverträge."
+    help = (
+        "Erzeugt monatliche SOLL-Buchungen für aktive Mietverträge, "
+        "wahlweise für einen Monat oder einen Zeitraum (--from/--to)."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -18,79 +36,192 @@ class Command(BaseCommand):
             type=str,
             help="Monat im Format YYYY-MM (z. B. 2026-02).",
         )
+        parser.add_argument(
+            "--from",
+            dest="from_month",
+            type=str,
+            help="Erster Monat eines Zeitraums im Format YYYY-MM.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_month",
+            type=str,
+            help="Letzter Monat eines Zeitraums im Format YYYY-MM (Default: aktueller Monat).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Buchungen je INSERT (Default: {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
 
     def handle(self, *args, **options):
-        month_start = self._parse_month(options.get("month"))
-        month_end = self._month_end(month_start)
+        first_month, last_month = self._parse_range(options)
+        months = self._months_between(first_month, last_month)
+        range_end = self._month_end(last_month)
+        batch_size = max(int(options["batch_size"] or DEFAULT_BATCH_SIZE), 1)
 
         leases = list(
             LeaseAgreement.objects.select_related("unit")
-            .filter(status=LeaseAgreement.Status.AKTIV, entry_date__lte=month_end)
-            .filter(Q(exit_date__isnull=True) | Q(exit_date__gte=month_start))
+            .filter(status=LeaseAgreement.Status.AKTIV, entry_date__lte=range_end)
+            .filter(Q(exit_date__isnull=True) | Q(exit_date__gte=first_month))
+        )
+        components = {lease.pk: self._components(lease) for lease in leases}
+
+        # Anti-Join: alle bestehenden SOLL-Schlüssel des Zeitraums in einer Abfrage,
+        # erzeugt werden nur die fehlenden (Vertrag, Monat, Kategorie).
+        existing = set(
+            Buchung.objects.filter(
+                typ=Buchung.Typ.SOLL,
+                mietervertrag_id__in=[lease.pk for lease in leases],
+                kategorie__in=SOLL_CATEGORIES,
+                datum__gte=first_month,
+                datum__lte=range_end,
+            ).values_list("mietervertrag_id", "datum", "kategorie")
         )
-        lease_ids = [lease.pk for lease in leases]
 
+        candidates = 0
         to_create = []
-        soll_categories = [
-            Buchung.Kategorie.HMZ,
-            Buchung.Kategorie.BK,
-            Buchung.Kategorie.HK,
-        ]
-        for lease in leases:
-            for category, netto, tax_rate in self._soll_components_for_lease(lease):
-                if netto is None or netto <= 0:
+        validated = set()
+        for month_start in months:
+            month_end = self._month_end(month_start)
+            for lease in leases:
+                if lease.entry_date > month_end or (lease.exit_date and lease.exit_date < month_start):
                     continue
-
-                ust_prozent = (tax_rate * Decimal("100")).quantize(
-                    Decimal("0.01"),
-                    rounding=ROUND_HALF_UP,
-                )
-                brutto = (netto * (Decimal("1.00") + tax_rate)).quantize(
-                    Decimal("0.01"),
-                    rounding=ROUND_HALF_UP,
-                )
-                to_create.append(
-                    Buchung(
-                        mietervertrag=lease,
-                        einheit=lease.unit,
+                for category, netto, ust_prozent, brutto in components[lease.pk]:
+                    candidates += 1
+                    if (lease.pk, month_start, category) in existing:
+                        continue
+                    buchung = Buchung(
+                        mietervertrag_id=lease.pk,
+                        einheit_id=lease.unit_id,
                         typ=Buchung.Typ.SOLL,
                         kategorie=category,
-                        buchungstext=f"SOLL {category.label} {month_start.strftime('%m.%Y')}",
+                        buchungstext=self._buchungstext(category, month_start),
                         datum=month_start,
                         netto=netto,
                         ust_prozent=ust_prozent,
                         brutto=brutto,
                     )
-                )
+                    # Die Beträge sind je Vertrag und Kategorie für alle Monate gleich,
+                    # daher genügt eine Prüfung der ersten neuen Buchung.
+                    if (lease.pk, category) not in validated:
+                        buchung.full_clean(validate_unique=False, validate_constraints=False)
+                        validated.add((lease.pk, category))
+                    to_create.append(buchung)
 
-        for buchung in to_create:
-            buchung.full_clean(validate_unique=False, validate_constraints=False)
+        created = []
+        for start in range(0, len(to_create), batch_size):
+            created.extend(self._insert_batch(to_create[start : start + batch_size]))
 
-        base_queryset = Buchung.objects.filter(
-            typ=Buchung.Typ.SOLL,
-            datum=month_start,
-            mietervertrag_id__in=lease_ids,
-            kategorie__in=soll_categories,
-        )
-        existing_before = base_queryset.count()
-        created_count = 0
-        skipped_conflicts = 0
+        if created:
+            MietkontoSaldoService.refresh_for_bookings(created)
+            VolltextIndex.refresh(Buchung, [buchung.pk for buchung in created])
+            DashboardStatistik.invalidate_on_commit()
 
-        if to_create:
-            Buchung.objects.bulk_create(to_create, ignore_conflicts=True)
-            existing_after = base_queryset.count()
-            created_count = max(existing_after - existing_before, 0)
-            skipped_conflicts = max(len(to_create) - created_count, 0)
+        summary = {
+            "from": first_month.strftime("%Y-%m"),
+            "to": last_month.strftime("%Y-%m"),
+            "months": len(months),
+            "leases": len(leases),
+            "created": len(created),
+            "skipped": candidates - len(created),
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
 
+        period = first_month.strftime("%m.%Y")
+        if last_month != first_month:
+            period = f"{period}–{last_month.strftime('%m.%Y')}"
         self.stdout.write(
             self.style.SUCCESS(
                 (
-                    f"{created_count} SOLL-Buchungen für {month_start.strftime('%m.%Y')} erstellt. "
-                    f"{skipped_conflicts} aufgrund bestehender Einträge/Konflikte übersprungen."
+                    f"{summary['created']} SOLL-Buchungen für {period} erstellt. "
+                    f"{summary['skipped']} aufgrund bestehender Einträge/Konflikte übersprungen."
                 )
             )
         )
 
+    def _insert_batch(self, batch):
+        """Fügt einen Stapel samt Historie ein; bei parallel entstandenen Einträgen ohne diese."""
+        try:
+            with transaction.atomic():
+                return bulk_create_with_history(
+                    batch,
+                    Buchung,
+                    batch_size=len(batch),
+                    default_change_reason=HISTORY_CHANGE_REASON,
+                )
+        except IntegrityError:
+            pass
+        existing = set(
+            Buchung.objects.filter(
+                typ=Buchung.Typ.SOLL,
+                mietervertrag_id__in={buchung.mietervertrag_id for buchung in batch},
+                kategorie__in=SOLL_CATEGORIES,
+                datum__in={buchung.datum for buchung in batch},
+            ).values_list("mietervertrag_id", "datum", "kategorie")
+        )
+        remaining = [
+            buchung
+            for buchung in batch
+            if (buchung.mietervertrag_id, buchung.datum, buchung.kategorie) not in existing
+        ]
+        if not remaining:
+            return []
+        with transaction.atomic():
+            return bulk_create_with_history(
+                remaining,
+                Buchung,
+                batch_size=len(remaining),
+                default_change_reason=HISTORY_CHANGE_REASON,
+            )
+
+    def _components(self, lease):
+        """``(kategorie, netto, ust_prozent, brutto)`` je SOLL-Bestandteil mit Betrag."""
+        components = []
+        for category, netto, tax_rate in self._soll_components_for_lease(lease):
+            if netto is None or netto <= 0:
+                continue
+
+            ust_prozent = (tax_rate * Decimal("100")).quantize(
+                Decimal("0.01"),
+                rounding=ROUND_HALF_UP,
+            )
+            brutto = (netto * (Decimal("1.00") + tax_rate)).quantize(
+                Decimal("0.01"),
+                rounding=ROUND_HALF_UP,
+            )
+            components.append((category, netto, ust_prozent, brutto))
+        return components
+
+    @staticmethod
+    def _buchungstext(category, month_start):
+        return f"SOLL {Buchung.Kategorie(category).label} {month_start.strftime('%m.%Y')}"
+
+    def _parse_range(self, options):
+        month_value = options.get("month")
+        from_value = options.get("from_month")
+        to_value = options.get("to_month")
+        if month_value and (from_value or to_value):
+            raise CommandError("--month und --from/--to schließen sich aus.")
+        if to_value and not from_value:
+            raise CommandError("--to benötigt --from.")
+        if not from_value:
+            month_start = self._parse_month(month_value)
+            return month_start, month_start
+        first_month = self._parse_month(from_value)
+        last_month = self._parse_month(to_value)
+        if last_month < first_month:
+            raise CommandError("--to liegt vor --from.")
+        return first_month, last_month
+
     def _parse_month(self, month_value):
         if not month_value:
             today = timezone.localdate()
@@ -101,6 +232,15 @@ class Command(BaseCommand):
         except (ValueError, TypeError):
             raise CommandError("Ungültiges Format. Erwartet: YYYY-MM")
 
+    @staticmethod
+    def _months_between(first_month, last_month):
+        months = []
+        month = first_month
+        while month <= last_month:
+            months.append(month)
+            month = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+        return months
+
     @staticmethod
     def _month_end(month_start):
         last_day = monthrange(month_start.year, month_start.month)[1]
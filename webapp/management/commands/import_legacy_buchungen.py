@@ -1,16 +1,63 @@
 from __future__ import annotations
 
 import re
+from collections import Counter
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
-from webapp.models import BetriebskostenBeleg, Buchung, LeaseAgreement, Property, Unit
+from webapp.models import (
+    BetriebskostenBeleg,
+    Buchung,
+    LeaseAgreement,
+    Property,
+    Unit,
+    default_betriebskosten_gruppe_pk,
+)
+from webapp.services.dashboard_stats import DashboardStatistik
+from webapp.services.lease_balance import MietkontoSaldoService
+from webapp.services.search_index import VolltextIndex
+
+
+DEFAULT_BATCH_SIZE = 500
+KEY_CHUNK_SIZE = 5000
+READ_CHUNK_CHARS = 1024 * 1024
+# Obergrenze für ein einzelnes, noch unvollständiges Tupel bzw. den Kopf einer Anweisung.
+MAX_PENDING_CHARS = 16 * 1024 * 1024
+HEAD_TAIL_CHARS = 64 * 1024
+LEGACY_SOURCE = "legacy_mysql_buchungen"
+LEGACY_INCOME_CATEGORIES = (Buchung.Kategorie.HMZ, Buchung.Kategorie.BK, Buchung.Kategorie.HK)
+BUCHUNG_KEY_FIELDS = (
+    "typ",
+    "kategorie",
+    "buchungstext",
+    "datum",
+    "netto",
+    "ust_prozent",
+    "brutto",
+    "einheit_id",
+    "mietervertrag_id",
+)
+
+INSERT_HEAD_PATTERN = re.compile(
+    r"INSERT\s+INTO\s+`(?P<table>[^`]+)`\s*(?:\([^)]*\))?\s*VALUES\s*",
+    re.IGNORECASE,
+)
+# Possessive Quantoren: Zeichenketten ('' und \x) werden deterministisch von links gelesen,
+# ein abgeschnittener Puffer passt daher nie fälschlich als vollständiges Tupel.
+SQL_STRING = r"'(?:[^'\\]|\\.|'')*+'"
+TUPLE_PATTERN = re.compile(
+    rf"\s*\((?P<values>(?:{SQL_STRING}|[^()'])*+)\)\s*(?P<end>[,;])",
+    re.DOTALL,
+)
+FIELD_PATTERN = re.compile(r"'(?P<quoted>(?:[^'\\]|\\.|'')*+)'|(?P<bare>[^,'\s][^,']*)", re.DOTALL)
+ESCAPE_PATTERN = re.compile(r"\\(.)|''", re.DOTALL)
 
 
 @dataclass(frozen=True)
@@ -42,227 +89,271 @@ class Command(BaseCommand):
             action="store_true",
             help="Nur auswerten, nichts in die DB schreiben.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Zeilen je Abgleich und INSERT (Default: {DEFAULT_BATCH_SIZE}).",
+        )
 
     def handle(self, *args, **options):
         sql_file = Path(options["sql_file"]).expanduser()
         dry_run = bool(options["dry_run"])
+        batch_size = max(int(options["batch_size"] or DEFAULT_BATCH_SIZE), 1)
 
         if not sql_file.exists():
             raise CommandError(f"SQL-Datei nicht gefunden: {sql_file}")
         if not sql_file.is_file():
             raise CommandError(f"Kein gültiger Dateipfad: {sql_file}")
 
-        sql_text = sql_file.read_text(encoding="utf-8", errors="replace")
-        legacy_properties = self._parse_legacy_properties(sql_text)
-        legacy_units = self._parse_legacy_units(sql_text, legacy_properties)
-        legacy_buchungen = self._parse_legacy_buchungen(sql_text)
+        # Erster Durchlauf: nur die kleinen Stammdatentabellen; Buchungen folgen gestreamt.
+        legacy_properties, legacy_units = self._read_legacy_master_data(sql_file)
 
         current_property_lookup = self._build_current_property_lookup()
         unit_lookup = self._build_current_unit_lookup()
         lease_lookup = self._build_lease_lookup()
 
-        buchung_payloads: list[dict[str, object]] = []
-        beleg_payloads: list[dict[str, object]] = []
-
-        unit_map_warnings = 0
-        lease_map_warnings = 0
-        soll_conflict_warnings = 0
-        expense_property_warnings = 0
-        income_category_warnings = 0
-        vat_mismatch_rows_detected = 0
+        # Natürliche Schlüssel des Bestands einmalig als Hash-Sets statt exists() je Zeile.
+        existing_buchung_keys = set(
+            Buchung.objects.filter(
+                typ__in=[Buchung.Typ.SOLL, Buchung.Typ.IST],
+                kategorie__in=LEGACY_INCOME_CATEGORIES,
+            )
+            .values_list(*BUCHUNG_KEY_FIELDS)
+            .iterator(chunk_size=KEY_CHUNK_SIZE)
+        )
+        existing_soll_slots = set(
+            Buchung.objects.filter(typ=Buchung.Typ.SOLL, mietervertrag__isnull=False)
+            .values_list("mietervertrag_id", "datum", "kategorie")
+            .iterator(chunk_size=KEY_CHUNK_SIZE)
+        )
+        existing_beleg_refs = set(
+            BetriebskostenBeleg.objects.filter(import_quelle=LEGACY_SOURCE)
+            .exclude(import_referenz="")
+            .order_by()
+            .values_list("import_referenz", flat=True)
+        )
 
+        self._default_group_id = None
+        counts: Counter[str] = Counter()
         seen_soll_unique: set[tuple[int, date, str]] = set()
+        touched_leases: dict[int, date] = {}
+        touched_dates: set[date] = set()
+        buchung_payloads: list[dict[str, object]] = []
+        beleg_payloads: list[dict[str, object]] = []
 
-        for row in legacy_buchungen:
-            normalized_text = self._normalize_booking_text(row.rechnungtext)
-            netto = row.nettobetrag.quantize(Decimal("0.01"))
-            brutto = row.bruttobetrag.quantize(Decimal("0.01"))
-            ust_prozent = row.ust.quantize(Decimal("0.01"))
+        def flush_buchungen():
+            self._flush_buchungen(
+                buchung_payloads,
+                existing_keys=existing_buchung_keys,
+                existing_soll_slots=existing_soll_slots,
+                dry_run=dry_run,
+                counts=counts,
+                touched_leases=touched_leases,
+                touched_dates=touched_dates,
+            )
+            buchung_payloads.clear()
+
+        def flush_belege():
+            self._flush_belege(
+                beleg_payloads,
+                existing_refs=existing_beleg_refs,
+                dry_run=dry_run,
+                counts=counts,
+                touched_dates=touched_dates,
+            )
+            beleg_payloads.clear()
+
+        with nullcontext() if dry_run else transaction.atomic():
+            for row in self._iter_legacy_buchungen(sql_file):
+                counts["parsed_rows"] += 1
+                normalized_text = self._normalize_booking_text(row.rechnungtext)
+                netto = row.nettobetrag.quantize(Decimal("0.01"))
+                brutto = row.bruttobetrag.quantize(Decimal("0.01"))
+                ust_prozent = row.ust.quantize(Decimal("0.01"))
+
+                if self._has_vat_mismatch(netto=netto, brutto=brutto, ust_prozent=ust_prozent):
+                    counts["vat_mismatch_rows_detected"] += 1
+
+                if row.ausgabe == 0:
+                    mapped_category = self._map_legacy_income_category(row.bk)
+                    if mapped_category is None:
+                        counts["income_category_warnings"] += 1
+                        continue
 
-            if self._has_vat_mismatch(netto=netto, brutto=brutto, ust_prozent=ust_prozent):
-                vat_mismatch_rows_detected += 1
+                    mapped_unit_id = self._map_legacy_unit_id(
+                        legacy_einheit_id=row.einheit_id,
+                        legacy_units=legacy_units,
+                        unit_lookup=unit_lookup,
+                    )
+                    if row.einheit_id is not None and mapped_unit_id is None:
+                        counts["unit_map_warnings"] += 1
 
-            if row.ausgabe == 0:
-                mapped_category = self._map_legacy_income_category(row.bk)
-                if mapped_category is None:
-                    income_category_warnings += 1
+                    mapped_lease_id = self._map_lease_id(
+                        mapped_unit_id=mapped_unit_id,
+                        booking_date=row.datum,
+                        lease_lookup=lease_lookup,
+                    )
+                    if mapped_unit_id is not None and mapped_lease_id is None:
+                        counts["lease_map_warnings"] += 1
+
+                    effective_lease_id = mapped_lease_id
+                    if effective_lease_id is not None:
+                        soll_key = (effective_lease_id, row.datum, mapped_category)
+                        if soll_key in seen_soll_unique:
+                            # UniqueConstraint auf SOLL: (mietervertrag, datum, kategorie, typ=soll)
+                            # Bei Konflikt lösen wir die Zuordnung vom Mietvertrag, damit Import idempotent bleibt.
+                            effective_lease_id = None
+                            counts["soll_conflict_warnings"] += 1
+                        else:
+                            seen_soll_unique.add(soll_key)
+
+                    for typ in (Buchung.Typ.SOLL, Buchung.Typ.IST):
+                        buchung_payloads.append(
+                            {
+                                "typ": typ,
+                                "kategorie": mapped_category,
+                                "buchungstext": normalized_text,
+                                "datum": row.datum,
+                                "netto": netto,
+                                "ust_prozent": ust_prozent,
+                                "brutto": brutto,
+                                "einheit_id": mapped_unit_id,
+                                "mietervertrag_id": effective_lease_id,
+                            }
+                        )
+                    if len(buchung_payloads) >= batch_size:
+                        flush_buchungen()
                     continue
 
-                mapped_unit_id = self._map_legacy_unit_id(
-                    legacy_einheit_id=row.einheit_id,
-                    legacy_units=legacy_units,
-                    unit_lookup=unit_lookup,
-                )
-                if row.einheit_id is not None and mapped_unit_id is None:
-                    unit_map_warnings += 1
-
-                mapped_lease_id = self._map_lease_id(
-                    mapped_unit_id=mapped_unit_id,
-                    booking_date=row.datum,
-                    lease_lookup=lease_lookup,
-                )
-                if mapped_unit_id is not None and mapped_lease_id is None:
-                    lease_map_warnings += 1
-
-                effective_lease_id = mapped_lease_id
-                if effective_lease_id is not None:
-                    soll_key = (effective_lease_id, row.datum, mapped_category)
-                    if soll_key in seen_soll_unique:
-                        # UniqueConstraint auf SOLL: (mietervertrag, datum, kategorie, typ=soll)
-                        # Bei Konflikt lösen wir die Zuordnung vom Mietvertrag, damit Import idempotent bleibt.
-                        effective_lease_id = None
-                        soll_conflict_warnings += 1
-                    else:
-                        seen_soll_unique.add(soll_key)
-
-                soll_payload = {
-                    "typ": Buchung.Typ.SOLL,
-                    "kategorie": mapped_category,
-                    "buchungstext": normalized_text,
-                    "datum": row.datum,
-                    "netto": netto,
-                    "ust_prozent": ust_prozent,
-                    "brutto": brutto,
-                    "einheit_id": mapped_unit_id,
-                    "mietervertrag_id": effective_lease_id,
-                }
-                ist_payload = {
-                    "typ": Buchung.Typ.IST,
-                    "kategorie": mapped_category,
-                    "buchungstext": normalized_text,
-                    "datum": row.datum,
-                    "netto": netto,
-                    "ust_prozent": ust_prozent,
-                    "brutto": brutto,
-                    "einheit_id": mapped_unit_id,
-                    "mietervertrag_id": effective_lease_id,
-                }
-                buchung_payloads.append(soll_payload)
-                buchung_payloads.append(ist_payload)
-                continue
+                if row.ausgabe == 1:
+                    mapped_property_id = self._map_legacy_property_id(
+                        legacy_liegenschaft_id=row.liegenschaft_id,
+                        legacy_properties=legacy_properties,
+                        current_property_lookup=current_property_lookup,
+                    )
+                    if mapped_property_id is None:
+                        counts["expense_property_warnings"] += 1
+                        continue
 
-            if row.ausgabe == 1:
-                mapped_property_id = self._map_legacy_property_id(
-                    legacy_liegenschaft_id=row.liegenschaft_id,
-                    legacy_properties=legacy_properties,
-                    current_property_lookup=current_property_lookup,
-                )
-                if mapped_property_id is None:
-                    expense_property_warnings += 1
+                    beleg_payloads.append(
+                        {
+                            "import_quelle": LEGACY_SOURCE,
+                            "import_referenz": f"ifkg-buchungen-{row.legacy_id}",
+                            "liegenschaft_id": mapped_property_id,
+                            "bk_art": self._map_legacy_expense_bk_art(row.bk),
+                            "datum": row.datum,
+                            "netto": netto,
+                            "ust_prozent": ust_prozent,
+                            "brutto": brutto,
+                            "lieferant_name": "",
+                            "iban": "",
+                            "buchungstext": normalized_text,
+                        }
+                    )
+                    if len(beleg_payloads) >= batch_size:
+                        flush_belege()
                     continue
 
-                beleg_payloads.append(
-                    {
-                        "import_quelle": "legacy_mysql_buchungen",
-                        "import_referenz": f"ifkg-buchungen-{row.legacy_id}",
-                        "liegenschaft_id": mapped_property_id,
-                        "bk_art": self._map_legacy_expense_bk_art(row.bk),
-                        "datum": row.datum,
-                        "netto": netto,
-                        "ust_prozent": ust_prozent,
-                        "brutto": brutto,
-                        "lieferant_name": "",
-                        "iban": "",
-                        "buchungstext": normalized_text,
-                    }
-                )
-                continue
+                raise CommandError(f"Ungültiger ausgabe-Wert in legacy row #{row.legacy_id}: {row.ausgabe}")
 
-            raise CommandError(f"Ungültiger ausgabe-Wert in legacy row #{row.legacy_id}: {row.ausgabe}")
-
-        parsed_rows = len(legacy_buchungen)
-
-        inserted_buchung_rows = 0
-        skipped_existing_buchung_rows = 0
-        inserted_beleg_rows = 0
-        skipped_existing_beleg_rows = 0
-
-        if dry_run:
-            for payload in buchung_payloads:
-                if Buchung.objects.filter(**payload).exists():
-                    skipped_existing_buchung_rows += 1
-                else:
-                    inserted_buchung_rows += 1
-
-            for payload in beleg_payloads:
-                if BetriebskostenBeleg.objects.filter(
-                    import_quelle=payload["import_quelle"],
-                    import_referenz=payload["import_referenz"],
-                ).exists():
-                    skipped_existing_beleg_rows += 1
-                else:
-                    inserted_beleg_rows += 1
-        else:
-            with transaction.atomic():
-                new_buchungen = []
-                buchung_count_before = Buchung.objects.count()
-                for payload in buchung_payloads:
-                    if Buchung.objects.filter(**payload).exists():
-                        skipped_existing_buchung_rows += 1
-                        continue
-                    new_buchungen.append(Buchung(**payload))
-                if new_buchungen:
-                    # bulk_create umgeht post_save-Signale (simple_history) und reduziert Schreiblast.
-                    Buchung.objects.bulk_create(new_buchungen, ignore_conflicts=True, batch_size=500)
-                buchung_count_after = Buchung.objects.count()
-                inserted_buchung_rows = max(buchung_count_after - buchung_count_before, 0)
-                skipped_existing_buchung_rows = len(buchung_payloads) - inserted_buchung_rows
-
-                legacy_source = "legacy_mysql_buchungen"
-                beleg_count_before = BetriebskostenBeleg.objects.filter(
-                    import_quelle=legacy_source
-                ).count()
-                new_belege = []
-                for payload in beleg_payloads:
-                    if BetriebskostenBeleg.objects.filter(
-                        import_quelle=payload["import_quelle"],
-                        import_referenz=payload["import_referenz"],
-                    ).exists():
-                        skipped_existing_beleg_rows += 1
-                        continue
-                    new_belege.append(
-                        BetriebskostenBeleg(
-                            liegenschaft_id=payload["liegenschaft_id"],
-                            bk_art=payload["bk_art"],
-                            datum=payload["datum"],
-                            netto=payload["netto"],
-                            ust_prozent=payload["ust_prozent"],
-                            brutto=payload["brutto"],
-                            lieferant_name=payload["lieferant_name"],
-                            iban=payload["iban"],
-                            buchungstext=payload["buchungstext"],
-                            import_quelle=payload["import_quelle"],
-                            import_referenz=payload["import_referenz"],
-                        )
-                    )
-                if new_belege:
-                    BetriebskostenBeleg.objects.bulk_create(
-                        new_belege,
-                        ignore_conflicts=True,
-                        batch_size=500,
-                    )
-                beleg_count_after = BetriebskostenBeleg.objects.filter(
-                    import_quelle=legacy_source
-                ).count()
-                inserted_beleg_rows = max(beleg_count_after - beleg_count_before, 0)
-                skipped_existing_beleg_rows = len(beleg_payloads) - inserted_beleg_rows
+            if not counts["parsed_rows"]:
+                raise CommandError("Keine INSERT-Daten für Tabelle `buchungen` gefunden.")
+            flush_buchungen()
+            flush_belege()
+
+            if touched_leases:
+                MietkontoSaldoService.refresh_slots(touched_leases.items())
+            if touched_dates:
+                DashboardStatistik.refresh_for_dates(touched_dates)
 
-        inserted_rows = inserted_buchung_rows + inserted_beleg_rows
-        skipped_existing_rows = skipped_existing_buchung_rows + skipped_existing_beleg_rows
+        inserted_rows = counts["inserted_buchung_rows"] + counts["inserted_beleg_rows"]
+        skipped_existing_rows = counts["skipped_existing_buchung_rows"] + counts["skipped_existing_beleg_rows"]
 
-        self.stdout.write(f"parsed_rows: {parsed_rows}")
+        self.stdout.write(f"parsed_rows: {counts['parsed_rows']}")
         self.stdout.write(f"inserted_rows: {inserted_rows}")
         self.stdout.write(f"skipped_existing_rows: {skipped_existing_rows}")
-        self.stdout.write(f"inserted_buchung_rows: {inserted_buchung_rows}")
-        self.stdout.write(f"skipped_existing_buchung_rows: {skipped_existing_buchung_rows}")
-        self.stdout.write(f"inserted_beleg_rows: {inserted_beleg_rows}")
-        self.stdout.write(f"skipped_existing_beleg_rows: {skipped_existing_beleg_rows}")
-        self.stdout.write(f"unit_map_warnings: {unit_map_warnings}")
-        self.stdout.write(f"lease_map_warnings: {lease_map_warnings}")
-        self.stdout.write(f"soll_conflict_warnings: {soll_conflict_warnings}")
-        self.stdout.write(f"expense_property_warnings: {expense_property_warnings}")
-        self.stdout.write(f"income_category_warnings: {income_category_warnings}")
-        self.stdout.write(f"vat_mismatch_rows_detected: {vat_mismatch_rows_detected}")
+        for key in (
+            "inserted_buchung_rows",
+            "skipped_existing_buchung_rows",
+            "inserted_beleg_rows",
+            "skipped_existing_beleg_rows",
+            "unit_map_warnings",
+            "lease_map_warnings",
+            "soll_conflict_warnings",
+            "expense_property_warnings",
+            "income_category_warnings",
+            "vat_mismatch_rows_detected",
+        ):
+            self.stdout.write(f"{key}: {counts[key]}")
+
+    @staticmethod
+    def _flush_buchungen(
+        payloads: list[dict[str, object]],
+        *,
+        existing_keys: set[tuple],
+        existing_soll_slots: set[tuple[int, date, str]],
+        dry_run: bool,
+        counts: Counter,
+        touched_leases: dict[int, date],
+        touched_dates: set[date],
+    ) -> None:
+        new_payloads = []
+        for payload in payloads:
+            # Abgleich nur gegen den Bestand vor dem Import: gleichlautende Legacy-Zeilen
+            # bleiben wie bisher je eigene Buchung.
+            if tuple(payload[field] for field in BUCHUNG_KEY_FIELDS) in existing_keys:
+                counts["skipped_existing_buchung_rows"] += 1
+                continue
+            if payload["typ"] == Buchung.Typ.SOLL and payload["mietervertrag_id"] is not None:
+                if (payload["mietervertrag_id"], payload["datum"], payload["kategorie"]) in existing_soll_slots:
+                    counts["skipped_existing_buchung_rows"] += 1
+                    continue
+            new_payloads.append(payload)
+        counts["inserted_buchung_rows"] += len(new_payloads)
+        if dry_run or not new_payloads:
+            return
+        # bulk_create umgeht post_save-Signale (simple_history) und reduziert Schreiblast.
+        created = Buchung.objects.bulk_create(
+            [Buchung(**payload) for payload in new_payloads],
+            batch_size=len(new_payloads),
+        )
+        VolltextIndex.refresh(Buchung, [buchung.pk for buchung in created])
+        for buchung in created:
+            touched_dates.add(buchung.datum)
+            if buchung.mietervertrag_id is not None:
+                earliest = touched_leases.get(buchung.mietervertrag_id)
+                if earliest is None or buchung.datum < earliest:
+                    touched_leases[buchung.mietervertrag_id] = buchung.datum
+
+    def _flush_belege(
+        self,
+        payloads: list[dict[str, object]],
+        *,
+        existing_refs: set[str],
+        dry_run: bool,
+        counts: Counter,
+        touched_dates: set[date],
+    ) -> None:
+        new_payloads = []
+        for payload in payloads:
+            if payload["import_referenz"] in existing_refs:
+                counts["skipped_existing_beleg_rows"] += 1
+                continue
+            existing_refs.add(payload["import_referenz"])
+            new_payloads.append(payload)
+        counts["inserted_beleg_rows"] += len(new_payloads)
+        if dry_run or not new_payloads:
+            return
+        if self._default_group_id is None:
+            # Der Feld-Default fragt die Gruppe sonst je Beleg ab.
+            self._default_group_id = default_betriebskosten_gruppe_pk()
+        created = BetriebskostenBeleg.objects.bulk_create(
+            [BetriebskostenBeleg(ausgabengruppe_id=self._default_group_id, **payload) for payload in new_payloads],
+            batch_size=len(new_payloads),
+        )
+        VolltextIndex.refresh(BetriebskostenBeleg, [beleg.pk for beleg in created])
+        touched_dates.update(beleg.datum for beleg in created)
 
     @staticmethod
     def _normalize_booking_text(text: str) -> str:
@@ -370,148 +461,131 @@ class Command(BaseCommand):
             return candidates[0]
         return None
 
-    def _parse_legacy_properties(self, sql_text: str) -> dict[int, str]:
-        rows = self._parse_insert_rows(sql_text=sql_text, table_name="liegenschaften")
+    def _read_legacy_master_data(
+        self,
+        sql_file: Path,
+    ) -> tuple[dict[int, str], dict[int, tuple[str, str]]]:
         properties: dict[int, str] = {}
-        for values in rows:
-            if len(values) < 2:
-                continue
-            legacy_id = self._as_int(values[0], "liegenschaften.id")
-            property_name = (values[1] or "").strip()
-            properties[legacy_id] = property_name
-        return properties
+        raw_units: dict[int, tuple[str, int | None]] = {}
+        found_tables: set[str] = set()
+        for table_name, values in self._iter_insert_rows(sql_file, {"liegenschaften", "einheiten"}):
+            found_tables.add(table_name)
+            if table_name == "liegenschaften":
+                if len(values) < 2:
+                    continue
+                legacy_id = self._as_int(values[0], "liegenschaften.id")
+                properties[legacy_id] = (values[1] or "").strip()
+            else:
+                if len(values) < 8:
+                    continue
+                legacy_unit_id = self._as_int(values[0], "einheiten.id")
+                legacy_top = (values[3] or "").strip()
+                raw_units[legacy_unit_id] = (
+                    legacy_top,
+                    self._as_nullable_int(values[7], "einheiten.liegenschaft_id"),
+                )
+        for table_name in ("liegenschaften", "einheiten"):
+            if table_name not in found_tables:
+                raise CommandError(f"Keine INSERT-Daten für Tabelle `{table_name}` gefunden.")
 
-    def _parse_legacy_units(
-        self,
-        sql_text: str,
-        legacy_properties: dict[int, str],
-    ) -> dict[int, tuple[str, str]]:
-        rows = self._parse_insert_rows(sql_text=sql_text, table_name="einheiten")
         units: dict[int, tuple[str, str]] = {}
-        for values in rows:
-            if len(values) < 8:
-                continue
-            legacy_unit_id = self._as_int(values[0], "einheiten.id")
-            legacy_top = (values[3] or "").strip()
-            legacy_property_id = self._as_nullable_int(values[7], "einheiten.liegenschaft_id")
-            legacy_property_name = legacy_properties.get(legacy_property_id, "") if legacy_property_id else ""
+        for legacy_unit_id, (legacy_top, legacy_property_id) in raw_units.items():
+            legacy_property_name = properties.get(legacy_property_id, "") if legacy_property_id else ""
             units[legacy_unit_id] = (legacy_property_name.strip(), legacy_top)
-        return units
+        return properties, units
 
-    def _parse_legacy_buchungen(self, sql_text: str) -> list[LegacyBuchungRow]:
-        rows = self._parse_insert_rows(sql_text=sql_text, table_name="buchungen")
-        parsed_rows: list[LegacyBuchungRow] = []
-        for values in rows:
+    def _iter_legacy_buchungen(self, sql_file: Path) -> Iterator[LegacyBuchungRow]:
+        for _table_name, values in self._iter_insert_rows(sql_file, {"buchungen"}):
             if len(values) < 12:
                 continue
-            parsed_rows.append(
-                LegacyBuchungRow(
-                    legacy_id=self._as_int(values[0], "buchungen.id"),
-                    rechnungtext=values[1] or "",
-                    bruttobetrag=self._as_decimal(values[2], "buchungen.bruttobetrag"),
-                    nettobetrag=self._as_decimal(values[3], "buchungen.nettobetrag"),
-                    ust=self._as_decimal(values[5], "buchungen.ust"),
-                    bk=(values[6] or "").strip(),
-                    ausgabe=self._as_int(values[7], "buchungen.ausgabe"),
-                    datum=self._as_date(values[8], "buchungen.datum"),
-                    einheit_id=self._as_nullable_int(values[10], "buchungen.einheit_id"),
-                    liegenschaft_id=self._as_nullable_int(values[11], "buchungen.liegenschaft_id"),
-                )
+            yield LegacyBuchungRow(
+                legacy_id=self._as_int(values[0], "buchungen.id"),
+                rechnungtext=values[1] or "",
+                bruttobetrag=self._as_decimal(values[2], "buchungen.bruttobetrag"),
+                nettobetrag=self._as_decimal(values[3], "buchungen.nettobetrag"),
+                ust=self._as_decimal(values[5], "buchungen.ust"),
+                bk=(values[6] or "").strip(),
+                ausgabe=self._as_int(values[7], "buchungen.ausgabe"),
+                datum=self._as_date(values[8], "buchungen.datum"),
+                einheit_id=self._as_nullable_int(values[10], "buchungen.einheit_id"),
+                liegenschaft_id=self._as_nullable_int(values[11], "buchungen.liegenschaft_id"),
             )
-        return parsed_rows
-
-    def _parse_insert_rows(self, *, sql_text: str, table_name: str) -> list[list[str | None]]:
-        rows: list[list[str | None]] = []
-        pattern = re.compile(
-            rf"INSERT INTO `{re.escape(table_name)}`\s*\([^)]*\)\s*VALUES\s*(.*?);",
-            re.IGNORECASE | re.DOTALL,
-        )
-        for match in pattern.finditer(sql_text):
-            value_block = match.group(1)
-            for tuple_text in self._split_value_tuples(value_block):
-                rows.append(self._parse_tuple(tuple_text))
-        if not rows:
-            raise CommandError(f"Keine INSERT-Daten für Tabelle `{table_name}` gefunden.")
-        return rows
-
-    @staticmethod
-    def _split_value_tuples(value_block: str) -> Iterable[str]:
-        tuples: list[str] = []
-        idx = 0
-        length = len(value_block)
-        while idx < length:
-            while idx < length and value_block[idx] != "(":
-                idx += 1
-            if idx >= length:
-                break
-            depth = 0
-            in_string = False
-            escaped = False
-            start = idx
-            while idx < length:
-                ch = value_block[idx]
-                if in_string:
-                    if escaped:
-                        escaped = False
-                    elif ch == "\\":
-                        escaped = True
-                    elif ch == "'":
-                        in_string = False
-                else:
-                    if ch == "'":
-                        in_string = True
-                    elif ch == "(":
-                        depth += 1
-                    elif ch == ")":
-                        depth -= 1
-                        if depth == 0:
-                            tuples.append(value_block[start : idx + 1])
-                            idx += 1
-                            break
-                idx += 1
-        return tuples
 
-    @staticmethod
-    def _parse_tuple(tuple_text: str) -> list[str | None]:
-        if not tuple_text.startswith("(") or not tuple_text.endswith(")"):
-            raise CommandError(f"Ungültiger SQL-Tupelwert: {tuple_text[:50]}")
+    @classmethod
+    def _iter_insert_rows(
+        cls,
+        sql_file: Path,
+        table_names: set[str],
+    ) -> Iterator[tuple[str, list[str | None]]]:
+        """Liest den Dump blockweise und liefert ``(tabelle, werte)`` je VALUES-Tupel.
+
+        Im Speicher liegt nur der aktuelle Block plus ein angefangenes Tupel; Tupel
+        anderer Tabellen werden übersprungen, ohne ihre Werte zu zerlegen.
+        """
+        with sql_file.open(encoding="utf-8", errors="replace") as handle:
+            yield from cls._iter_insert_rows_from_chunks(
+                iter(lambda: handle.read(READ_CHUNK_CHARS), ""),
+                table_names,
+            )
 
-        content = tuple_text[1:-1]
-        values: list[str | None] = []
-        buffer: list[str] = []
-        in_string = False
-        escaped = False
-
-        def push_current():
-            raw = "".join(buffer).strip()
-            if not in_string and raw.upper() == "NULL":
-                values.append(None)
+    @classmethod
+    def _iter_insert_rows_from_chunks(
+        cls,
+        chunks: Iterable[str],
+        table_names: set[str],
+    ) -> Iterator[tuple[str, list[str | None]]]:
+        buffer = ""
+        current_table: str | None = None
+        chunk_iter = iter(chunks)
+        eof = False
+        while True:
+            pos = 0
+            while True:
+                if current_table is None:
+                    head = INSERT_HEAD_PATTERN.search(buffer, pos)
+                    if head is None:
+                        # Nur das Ende behalten, falls dort ein INSERT-Kopf beginnt.
+                        pos = max(pos, len(buffer) - HEAD_TAIL_CHARS)
+                        break
+                    current_table = head.group("table")
+                    pos = head.end()
+                    continue
+                match = TUPLE_PATTERN.match(buffer, pos)
+                if match is None:
+                    if eof and buffer[pos:].strip():
+                        raise CommandError(f"Ungültiger SQL-Tupelwert: {buffer[pos:pos + 50].strip()}")
+                    break
+                if current_table in table_names:
+                    yield current_table, cls._parse_tuple_values(match.group("values"))
+                pos = match.end()
+                if match.group("end") == ";":
+                    current_table = None
+            buffer = buffer[pos:]
+            if eof:
+                return
+            if len(buffer) > MAX_PENDING_CHARS:
+                raise CommandError(f"Ungültiger SQL-Tupelwert: {buffer[:50].strip()}")
+            chunk = next(chunk_iter, None)
+            if chunk is None:
+                eof = True
             else:
-                values.append(raw)
-
-        for ch in content:
-            if in_string:
-                if escaped:
-                    buffer.append(Command._decode_mysql_escape(ch))
-                    escaped = False
-                elif ch == "\\":
-                    escaped = True
-                elif ch == "'":
-                    in_string = False
-                else:
-                    buffer.append(ch)
-                continue
+                buffer += chunk
 
-            if ch == "'":
-                in_string = True
-                continue
-            if ch == ",":
-                push_current()
-                buffer = []
+    @classmethod
+    def _parse_tuple_values(cls, content: str) -> list[str | None]:
+        values: list[str | None] = []
+        for field in FIELD_PATTERN.finditer(content):
+            quoted = field.group("quoted")
+            if quoted is not None:
+                if "\\" in quoted or "''" in quoted:
+                    quoted = ESCAPE_PATTERN.sub(
+                        lambda escape: cls._decode_mysql_escape(escape.group(1)) if escape.group(1) else "'",
+                        quoted,
+                    )
+                values.append(quoted)
                 continue
-            buffer.append(ch)
-
-        push_current()
+            raw = field.group("bare").strip()
+            values.append(None if raw.upper() == "NULL" else raw)
         return values
 
     @staticmethod
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import date
+
 from django.core.management.base import BaseCommand
 from django.db.models import Q
 
@@ -41,7 +43,7 @@ class Command(BaseCommand):
         ).select_related("mietervertrag__unit__property", "einheit__property")
 
         if year:
-            queryset = queryset.filter(datum__year=year)
+            queryset = queryset.filter(datum__gte=date(year, 1, 1), datum__lt=date(year + 1, 1, 1))
         if property_id:
             queryset = queryset.filter(
                 Q(mietervertrag__unit__property_id=property_id)
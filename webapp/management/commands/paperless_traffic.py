@@ -0,0 +1,82 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from webapp.services.paperless_metrics import PaperlessMetrics
+
+
+class Command(BaseCommand):
+    help = "Fasst die ausgehenden Paperless-Anfragen der letzten Stunden je Endpunkt und View zusammen."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Zeitraum in Stunden (Default: 24).",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Anzahl der Views mit den meisten Anfragen (Default: 10).",
+        )
+        parser.add_argument(
+            "--prune-days",
+            type=int,
+            default=0,
+            help="Löscht vorher Statistiken, die älter als N Tage sind (0 = nicht löschen).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        pruned = 0
+        if int(options["prune_days"] or 0) > 0:
+            pruned = PaperlessMetrics.prune(older_than_days=options["prune_days"])
+
+        hours = max(int(options["hours"] or 24), 1)
+        since = timezone.now() - timedelta(hours=hours)
+        summary = PaperlessMetrics.summarize(since=since)
+        top = max(int(options["top"] or 10), 1)
+        payload = {
+            "hours": hours,
+            "pruned_rows": pruned,
+            "total_requests": sum(int(row["requests"]) for row in summary["endpoints"]),
+            "endpoints": summary["endpoints"],
+            "views": summary["views"][:top],
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(payload, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Paperless-Anfragen der letzten {hours} Stunden: {payload['total_requests']}"
+            )
+        )
+        if not payload["endpoints"]:
+            self.stdout.write("Keine Paperless-Anfragen aufgezeichnet.")
+            return
+
+        self.stdout.write("Endpunkte:")
+        for row in payload["endpoints"]:
+            self.stdout.write(
+                f"  - {row['endpoint']}: {row['requests']} Anfragen, "
+                f"{row['errors']} Fehler, {row['skipped']} übersprungen, "
+                f"Ø {row['avg_duration_ms']} ms, max {row['max_duration_ms']} ms, "
+                f"p95 ≤ {row['p95_le_seconds'] or '-'} s"
+            )
+        self.stdout.write("Auslöser:")
+        for row in payload["views"]:
+            self.stdout.write(
+                f"  - {row['view_name']}: {row['requests']} Anfragen, "
+                f"{row['errors']} Fehler, {row['skipped']} übersprungen, "
+                f"{row['total_duration_ms']} ms gesamt"
+            )
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from webapp.services.dashboard_stats import DashboardStatistik
+
+
+class Command(BaseCommand):
+    help = (
+        "Baut die Netto-Monatssummen für die Dashboard-Diagramme neu auf und verwirft den Dashboard-Cache. "
+        "Nötig nach Änderungen an Buchungen oder Belegen an der Anwendung vorbei (z. B. direkt per SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        summary = DashboardStatistik.rebuild()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(self.style.SUCCESS(f"{summary['months']} Dashboard-Monatswerte neu aufgebaut."))
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from webapp.services.lease_balance import MietkontoSaldoService
+
+
+class Command(BaseCommand):
+    help = (
+        "Baut die Mietkonto-Monatssalden (Vortrag, Soll, Haben, Endsaldo) aus den Buchungen neu auf. "
+        "Nötig nach Änderungen an Buchungen an der Anwendung vorbei (z. B. direkt per SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lease",
+            type=int,
+            action="append",
+            default=[],
+            help="Nur diesen Mietvertrag (ID, mehrfach möglich).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        summary = MietkontoSaldoService.rebuild(lease_ids=options["lease"] or None)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary['months']} Monatssalden für {summary['leases']} Mietverträge neu aufgebaut."
+            )
+        )
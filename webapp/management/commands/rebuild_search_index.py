@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from webapp.services.search_index import VolltextIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Baut den Suchindex für Buchungen und Betriebskostenbelege neu auf. "
+        "Nötig nach Änderungen an der Anwendung vorbei (z. B. direkt per SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        summary = VolltextIndex.rebuild()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+        if not VolltextIndex.available():
+            self.stdout.write(self.style.WARNING("Kein Suchindex vorhanden (Datenbank ohne Volltextsuche)."))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Suchindex neu aufgebaut: {summary['buchung']} Buchungen, "
+                f"{summary['betriebskostenbeleg']} Belege."
+            )
+        )
@@ -0,0 +1,77 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from webapp.services.paperless import PaperlessService
+from webapp.services.paperless_outbox import DEFAULT_BATCH_LIMIT, PaperlessOutboxService
+
+
+class Command(BaseCommand):
+    help = (
+        "Überträgt vorgemerkte Uploads aus der Paperless-Warteschlange. "
+        "Fehlgeschlagene Uploads werden mit exponentiellem Backoff erneut versucht. "
+        "Danach wird der Abschluss übertragener Uploads in Paperless geprüft."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=DEFAULT_BATCH_LIMIT,
+            help=f"Maximale Anzahl Uploads pro Durchlauf (Default: {DEFAULT_BATCH_LIMIT}).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Parallele Übertragungen (0 = PAPERLESS_OUTBOX_MAX_WORKERS).",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Setzt endgültig fehlgeschlagene Uploads vor dem Durchlauf wieder auf ausstehend.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Ausgabe als JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if not PaperlessService.is_configured():
+            summary = {
+                "status": "skipped",
+                "reason": "Paperless ist nicht konfiguriert.",
+            }
+            if options["json"]:
+                self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            else:
+                self.stdout.write(self.style.WARNING(summary["reason"]))
+            return
+
+        requeued = 0
+        if options["retry_failed"]:
+            requeued = PaperlessOutboxService.retry_failed()
+
+        workers = int(options["workers"] or 0)
+        limit = max(int(options["limit"] or DEFAULT_BATCH_LIMIT), 1)
+        summary = PaperlessOutboxService.dispatch_pending(
+            limit=limit,
+            max_workers=workers if workers > 0 else None,
+        )
+        consumed = PaperlessOutboxService.confirm_consumed(limit=limit)
+        summary = {"status": "ok", "requeued_failed": requeued, **summary, "consumed": consumed}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Paperless-Warteschlange verarbeitet: "
+                f"{summary['sent']} übertragen, "
+                f"{summary['retry_scheduled']} erneut eingeplant, "
+                f"{summary['failed']} endgültig fehlgeschlagen, "
+                f"{summary['consumed']} in Paperless verarbeitet."
+            )
+        )
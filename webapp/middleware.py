@@ -0,0 +1,48 @@
+from webapp.services.datei_audit import DateiOperationAudit
+from webapp.services.paperless_metrics import PaperlessMetrics
+from webapp.services.paperless_resilience import PaperlessLatencyBudget
+
+
+class PaperlessLatencyBudgetMiddleware:
+    """Begrenzt die gesamte Wartezeit auf Paperless pro Request (PAPERLESS_PAGE_BUDGET_SECONDS)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with PaperlessLatencyBudget.scope():
+            return self.get_response(request)
+
+
+class PaperlessMetricsMiddleware:
+    """Ordnet Paperless-Anfragen der auslösenden View zu und speichert sie einmal pro Request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with PaperlessMetrics.collect() as collector:
+            try:
+                return self.get_response(request)
+            finally:
+                collector.view_name = self._view_label(request)
+
+    @staticmethod
+    def _view_label(request) -> str:
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None and resolver_match.view_name:
+            return f"view:{resolver_match.view_name}"
+        return "view:unresolved"
+
+
+class DateiOperationLogMiddleware:
+    """Schreibt gepufferte Datei-Protokolleinträge am Request-Ende, sobald Puffer oder Intervall voll sind."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            DateiOperationAudit.flush_if_due()
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:08
+
+import django.utils.timezone
+import webapp.storage_paths
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0053_meterreading_source_uuid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaperlessUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, help_text='Lokale Kopie bis zur erfolgreichen Übertragung an Paperless.', upload_to=webapp.storage_paths.paperless_outbox_upload_to, verbose_name='Datei')),
+                ('original_name', models.CharField(max_length=255, verbose_name='Originalname')),
+                ('content_type', models.CharField(blank=True, max_length=127, verbose_name='MIME-Typ')),
+                ('size_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Dateigröße (Bytes)')),
+                ('checksum_sha256', models.CharField(db_index=True, help_text='Verhindert, dass identische Dateien mehrfach an Paperless gesendet werden.', max_length=64, verbose_name='SHA-256 Checksumme')),
+                ('title', models.CharField(blank=True, max_length=255, verbose_name='Titel')),
+                ('description', models.TextField(blank=True, verbose_name='Beschreibung')),
+                ('q_liegenschaft', models.CharField(blank=True, max_length=255, verbose_name='Liegenschaft')),
+                ('q_einheit', models.CharField(blank=True, max_length=255, verbose_name='Einheit')),
+                ('q_mieter', models.CharField(blank=True, max_length=255, verbose_name='Mieter')),
+                ('q_source_ref', models.CharField(blank=True, max_length=255, verbose_name='Quellreferenz')),
+                ('tags', models.JSONField(blank=True, default=list, verbose_name='Tags')),
+                ('document_type_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Dokumenttyp-ID')),
+                ('document_created', models.DateField(blank=True, null=True, verbose_name='Dokumentdatum')),
+                ('status', models.CharField(choices=[('pending', 'Ausstehend'), ('sending', 'Wird übertragen'), ('sent', 'Übertragen'), ('failed', 'Fehlgeschlagen')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Versuche')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Nächster Versuch')),
+                ('claim_token', models.CharField(blank=True, default='', max_length=32, verbose_name='Worker-Token')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='Übernommen am')),
+                ('last_error', models.TextField(blank=True, verbose_name='Letzter Fehler')),
+                ('task_id', models.CharField(blank=True, max_length=255, verbose_name='Paperless Task-ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Erstellt am')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Übertragen am')),
+            ],
+            options={
+                'verbose_name': 'Paperless-Upload',
+                'verbose_name_plural': 'Paperless-Uploads',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='paperlessup_status_next_idx'), models.Index(fields=['q_source_ref', 'created_at'], name='paperlessup_source_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0054_paperlessupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaperlessRequestStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField(verbose_name='Stunde')),
+                ('endpoint', models.CharField(choices=[('documents', 'Dokumente'), ('tags', 'Tags'), ('document_types', 'Dokumenttypen'), ('custom_fields', 'Benutzerdefinierte Felder'), ('download', 'Download'), ('upload', 'Upload'), ('other', 'Sonstige')], max_length=32, verbose_name='Endpunkt')),
+                ('view_name', models.CharField(max_length=200, verbose_name='Auslöser')),
+                ('request_count', models.PositiveIntegerField(default=0, verbose_name='Anfragen')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Fehler')),
+                ('skipped_count', models.PositiveIntegerField(default=0, help_text='Durch Circuit Breaker oder Seitenbudget nicht ausgeführte Anfragen.', verbose_name='Übersprungen')),
+                ('total_duration_ms', models.PositiveBigIntegerField(default=0, verbose_name='Gesamtdauer (ms)')),
+                ('max_duration_ms', models.PositiveIntegerField(default=0, verbose_name='Maximale Dauer (ms)')),
+                ('duration_histogram', models.JSONField(blank=True, default=dict, help_text='Anzahl Anfragen je Obergrenze in Sekunden (nicht kumulativ).', verbose_name='Dauer-Histogramm')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+            ],
+            options={
+                'verbose_name': 'Paperless-Anfragestatistik',
+                'verbose_name_plural': 'Paperless-Anfragestatistiken',
+                'ordering': ['-bucket_start', 'endpoint', 'view_name'],
+                'constraints': [models.UniqueConstraint(fields=('bucket_start', 'endpoint', 'view_name'), name='paperlessstat_bucket_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0055_paperlessrequeststat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dateioperationlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Zeitpunkt'),
+        ),
+        migrations.CreateModel(
+            name='DateiOperationDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Tag')),
+                ('operation', models.CharField(choices=[('upload', 'Upload'), ('view', 'Ansicht/Download'), ('delete', 'Löschen')], max_length=20, verbose_name='Operation')),
+                ('success', models.BooleanField(default=True, verbose_name='Erfolgreich')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Anzahl')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+            ],
+            options={
+                'verbose_name': 'Datei-Operationen je Tag',
+                'verbose_name_plural': 'Datei-Operationen je Tag',
+                'ordering': ['-day', 'operation', '-success'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'operation', 'success'), name='dateiopstat_day_op_uniq')],
+            },
+        ),
+    ]
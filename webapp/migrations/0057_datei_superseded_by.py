@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0056_dateioperationdailystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datei',
+            name='superseded_by',
+            field=models.ForeignKey(blank=True, help_text='Bei neu erzeugten Schreiben verweist die archivierte Fassung auf die aktuelle PDF.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='superseded_versions', to='webapp.datei', verbose_name='Ersetzt durch'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0057_datei_superseded_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datei',
+            name='storage_tier',
+            field=models.CharField(choices=[('hot', 'Aktiv (MEDIA_ROOT)'), ('cold', 'Kaltablage'), ('cold_gzip', 'Kaltablage (gzip)')], default='hot', help_text='Archivierte Dateien werden nach einer Frist in die Kaltablage verschoben.', max_length=16, verbose_name='Speicherort'),
+        ),
+    ]
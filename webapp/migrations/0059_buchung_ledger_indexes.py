@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0058_datei_storage_tier'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buchung',
+            index=models.Index(fields=['mietervertrag', 'typ', 'datum'], name='buchung_mv_typ_datum_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buchung',
+            index=models.Index(fields=['typ', 'kategorie', 'datum'], name='buchung_typ_kat_datum_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buchung',
+            index=models.Index(fields=['einheit', 'typ', 'datum'], name='buchung_einh_typ_datum_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:56
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def build_mietkonto_salden(apps, schema_editor):
+    Buchung = apps.get_model("webapp", "Buchung")
+    MietkontoSaldo = apps.get_model("webapp", "MietkontoSaldo")
+    money = DecimalField(max_digits=12, decimal_places=2)
+    rows = (
+        Buchung.objects.filter(mietervertrag__isnull=False)
+        .annotate(month_start=TruncMonth("datum"))
+        .values("mietervertrag_id", "month_start")
+        .annotate(
+            soll=Coalesce(Sum("brutto", filter=Q(typ="soll"), output_field=money), Value(Decimal("0.00"))),
+            haben=Coalesce(Sum("brutto", filter=Q(typ="ist"), output_field=money), Value(Decimal("0.00"))),
+        )
+        .order_by("mietervertrag_id", "month_start")
+    )
+    batch = []
+    lease_id = None
+    vortrag = Decimal("0.00")
+    for row in rows.iterator(chunk_size=500):
+        if row["mietervertrag_id"] != lease_id:
+            lease_id = row["mietervertrag_id"]
+            vortrag = Decimal("0.00")
+        soll = Decimal(row["soll"]).quantize(Decimal("0.01"))
+        haben = Decimal(row["haben"]).quantize(Decimal("0.01"))
+        endsaldo = (vortrag + haben - soll).quantize(Decimal("0.01"))
+        batch.append(
+            MietkontoSaldo(
+                mietervertrag_id=lease_id,
+                monat=row["month_start"],
+                vortrag=vortrag,
+                soll=soll,
+                haben=haben,
+                endsaldo=endsaldo,
+            )
+        )
+        vortrag = endsaldo
+        if len(batch) >= 500:
+            MietkontoSaldo.objects.bulk_create(batch)
+            batch.clear()
+    if batch:
+        MietkontoSaldo.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0059_buchung_ledger_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MietkontoSaldo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monat', models.DateField(verbose_name='Monat')),
+                ('vortrag', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Vortrag')),
+                ('soll', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Soll')),
+                ('haben', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Haben')),
+                ('endsaldo', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Endsaldo')),
+                ('aktualisiert_am', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+                ('mietervertrag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kontosalden', to='webapp.leaseagreement', verbose_name='Mietvertrag')),
+            ],
+            options={
+                'verbose_name': 'Mietkonto-Monatssaldo',
+                'verbose_name_plural': 'Mietkonto-Monatssalden',
+                'ordering': ['mietervertrag', 'monat'],
+                'constraints': [models.UniqueConstraint(fields=('mietervertrag', 'monat'), name='mietkontosaldo_mv_monat_uniq')],
+            },
+        ),
+        migrations.RunPython(build_mietkonto_salden, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+import unicodedata
+
+from django.db import migrations
+
+# Eigenständig gehalten: spätere Änderungen an webapp.services.search_index dürfen
+# diese Migration nicht verändern. Der Dienst führt den Index zur Laufzeit nach.
+BATCH_SIZE = 500
+GERMAN_FOLDING = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+TABLES = {
+    "Buchung": "webapp_buchung_fts",
+    "BetriebskostenBeleg": "webapp_betriebskostenbeleg_fts",
+}
+DOCUMENT_FIELDS = {
+    "Buchung": (
+        "buchungstext",
+        "mietervertrag__unit__property__name",
+        "mietervertrag__unit__name",
+        "mietervertrag__unit__door_number",
+        "einheit__property__name",
+        "einheit__name",
+        "einheit__door_number",
+        "kategorie",
+        "typ",
+    ),
+    "BetriebskostenBeleg": (
+        "buchungstext",
+        "import_referenz",
+        "liegenschaft__name",
+        "ausgabengruppe__name",
+        "bk_art",
+    ),
+}
+
+
+def _normalize(value):
+    folded = str(value or "").lower().translate(GERMAN_FOLDING)
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _create_tables(connection):
+    with connection.cursor() as cursor:
+        for table in TABLES.values():
+            if connection.vendor == "sqlite":
+                try:
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                        "USING fts5(inhalt, tokenize = 'unicode61 remove_diacritics 2')"
+                    )
+                except Exception:
+                    # SQLite ohne FTS5: Listen suchen weiter per icontains.
+                    return False
+            else:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (rowid bigint PRIMARY KEY, inhalt tsvector NOT NULL)"
+                )
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_inhalt_gin ON {table} USING gin (inhalt)")
+    return True
+
+
+def _documents(model, fields):
+    choice_labels = {}
+    for name in fields:
+        if "__" not in name:
+            choices = model._meta.get_field(name).choices
+            if choices:
+                choice_labels[name] = {str(value): str(label) for value, label in choices}
+    rows = model.objects.order_by("pk").values_list("pk", *fields)
+    for pk, *values in rows.iterator(chunk_size=BATCH_SIZE):
+        parts = []
+        for name, value in zip(fields, values):
+            if value in (None, ""):
+                continue
+            parts.append(str(value))
+            label = choice_labels.get(name, {}).get(str(value))
+            if label:
+                parts.append(label)
+        yield pk, _normalize(" ".join(parts))
+
+
+def create_volltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in {"sqlite", "postgresql"} or not _create_tables(connection):
+        return
+    value_sql = "%s" if connection.vendor == "sqlite" else "to_tsvector('simple', %s)"
+    with connection.cursor() as cursor:
+        for model_name, table in TABLES.items():
+            model = apps.get_model("webapp", model_name)
+            insert_sql = f"INSERT INTO {table} (rowid, inhalt) VALUES (%s, {value_sql})"
+            batch = []
+            for document in _documents(model, DOCUMENT_FIELDS[model_name]):
+                batch.append(document)
+                if len(batch) >= BATCH_SIZE:
+                    cursor.executemany(insert_sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(insert_sql, batch)
+
+
+def drop_volltext_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES.values():
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0060_mietkontosaldo'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_volltext_index, drop_volltext_index),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:09
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_dashboard_monatswerte(apps, schema_editor):
+    Buchung = apps.get_model("webapp", "Buchung")
+    BetriebskostenBeleg = apps.get_model("webapp", "BetriebskostenBeleg")
+    DashboardMonatswert = apps.get_model("webapp", "DashboardMonatswert")
+    money = DecimalField(max_digits=14, decimal_places=2)
+    sources = (
+        ("miete_netto", Buchung.objects.filter(typ="ist", kategorie="hmz")),
+        ("bk_einnahmen_netto", Buchung.objects.filter(typ="ist", kategorie__in=["bk", "hk"])),
+        ("bk_ausgaben_netto", BetriebskostenBeleg.objects.all()),
+    )
+    months = {}
+    for field_name, queryset in sources:
+        rows = (
+            queryset.annotate(month_start=TruncMonth("datum"))
+            .values("month_start")
+            .annotate(total=Sum("netto", output_field=money))
+            .order_by("month_start")
+        )
+        for row in rows:
+            months.setdefault(row["month_start"], {})[field_name] = row["total"] or Decimal("0.00")
+    DashboardMonatswert.objects.bulk_create(
+        [DashboardMonatswert(monat=month, **values) for month, values in sorted(months.items())]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0061_volltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardMonatswert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monat', models.DateField(unique=True, verbose_name='Monat')),
+                ('miete_netto', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Miete netto')),
+                ('bk_einnahmen_netto', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='BK/HK-Einnahmen netto')),
+                ('bk_ausgaben_netto', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='BK-Ausgaben netto')),
+                ('aktualisiert_am', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+            ],
+            options={
+                'verbose_name': 'Dashboard-Monatswert',
+                'verbose_name_plural': 'Dashboard-Monatswerte',
+                'ordering': ['monat'],
+            },
+        ),
+        migrations.RunPython(build_dashboard_monatswerte, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0062_dashboardmonatswert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paperlessupload',
+            name='consumed_at',
+            field=models.DateTimeField(blank=True, help_text='Zeitpunkt, zu dem der Paperless-Task als abgeschlossen erkannt wurde.', null=True, verbose_name='Verarbeitet am'),
+        ),
+        migrations.AddIndex(
+            model_name='paperlessupload',
+            index=models.Index(fields=['updated_at'], name='paperlessup_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+def create_dashboard_stand(apps, schema_editor):
+    DashboardStand = apps.get_model("webapp", "DashboardStand")
+    DashboardStand.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0063_paperlessupload_consumed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveBigIntegerField(default=1, verbose_name='Generation')),
+                ('aktualisiert_am', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+            ],
+            options={
+                'verbose_name': 'Dashboard-Stand',
+                'verbose_name_plural': 'Dashboard-Stände',
+            },
+        ),
+        migrations.RunPython(create_dashboard_stand, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,6 @@
 from builtins import property as builtin_property
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
-import hashlib
 import mimetypes
 import os
 import uuid
@@ -11,12 +10,14 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models import Prefetch
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from simple_history.models import HistoricalRecords
 
-from .storage_paths import datei_upload_to
+from .file_metadata import FileMetadata, MetadataCollectingFile, read_file_metadata
+from .storage_paths import datei_upload_to, paperless_outbox_upload_to
 
 # Validator für die Postleitzahl (4 bis 5 Ziffern)
 zip_validator = RegexValidator(
@@ -877,6 +878,11 @@ class Datei(models.Model):
         VERTRAG = "vertrag", _("Vertrag")
         SONSTIGES = "sonstiges", _("Sonstiges")
 
+    class StorageTier(models.TextChoices):
+        HOT = "hot", _("Aktiv (MEDIA_ROOT)")
+        COLD = "cold", _("Kaltablage")
+        COLD_GZIP = "cold_gzip", _("Kaltablage (gzip)")
+
     file = models.FileField(
         upload_to=datei_upload_to,
         verbose_name=_("Datei"),
@@ -918,6 +924,17 @@ class Datei(models.Model):
             "Bei Soft-Dedup wird hier auf die zuerst gespeicherte identische Datei verwiesen."
         ),
     )
+    superseded_by = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="superseded_versions",
+        verbose_name=_("Ersetzt durch"),
+        help_text=_(
+            "Bei neu erzeugten Schreiben verweist die archivierte Fassung auf die aktuelle PDF."
+        ),
+    )
     kategorie = models.CharField(
         max_length=20,
         choices=Kategorie.choices,
@@ -939,6 +956,13 @@ class Datei(models.Model):
         verbose_name=_("Archiviert"),
         help_text=_("Archivierte Dateien werden nicht mehr in Standardlisten angezeigt."),
     )
+    storage_tier = models.CharField(
+        max_length=16,
+        choices=StorageTier.choices,
+        default=StorageTier.HOT,
+        verbose_name=_("Speicherort"),
+        help_text=_("Archivierte Dateien werden nach einer Frist in die Kaltablage verschoben."),
+    )
     archived_at = models.DateTimeField(
         null=True,
         blank=True,
@@ -1001,56 +1025,87 @@ class Datei(models.Model):
         self._apply_dedup_policy()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded_fields = set(field_names)
+        if {"file", "checksum_sha256", "size_bytes", "mime_type"} <= loaded_fields and instance.checksum_sha256:
+            instance._remember_file_metadata(
+                FileMetadata(
+                    checksum_sha256=instance.checksum_sha256,
+                    size_bytes=instance.size_bytes,
+                    sniffed_mime_type=instance.mime_type,
+                )
+            )
+        return instance
+
     @property
     def is_duplicate(self) -> bool:
         return self.duplicate_of_id is not None
 
+    def store_file(self) -> None:
+        """Schreibt eine neu zugewiesene Datei in einem Durchlauf in den Storage.
+
+        Checksumme, Größe und erkannter MIME-Typ entstehen beim Schreiben und
+        werden am Objekt gemerkt, damit ``clean()`` und ``save()`` nicht erneut lesen.
+        """
+        if not self.file or getattr(self.file, "_committed", True):
+            return
+        upload_name = os.path.basename(self.file.name or "")
+        if not self.original_name:
+            self.original_name = upload_name
+        collecting_file = MetadataCollectingFile(self.file.file, name=upload_name)
+        self.file.save(upload_name, collecting_file, save=False)
+        self._remember_file_metadata(collecting_file.metadata())
+
+    def clean_for_bulk_insert(self) -> None:
+        """Wie ``full_clean()``, aber ohne Dedup-Abfrage; der Aufrufer setzt ``duplicate_of`` gesammelt."""
+        self._sync_file_metadata()
+        self.clean_fields()
+
+    def discard_stored_file(self) -> None:
+        """Entfernt eine per ``store_file()`` geschriebene Datei, wenn der Datensatz nicht gespeichert wurde."""
+        if self.pk is not None or not self.file or not getattr(self.file, "_committed", False):
+            return
+        if Datei.objects.filter(file=self.file.name).exists():
+            return
+        self.file.delete(save=False)
+
+    def relink_file(self, name: str) -> None:
+        """Verweist auf eine andere Storage-Datei mit identischem Inhalt; Metadaten bleiben gültig."""
+        metadata = self._current_file_metadata()
+        self.file.name = name
+        self._remember_file_metadata(metadata)
+
+    def file_metadata(self) -> FileMetadata:
+        return self._current_file_metadata()
+
+    def _remember_file_metadata(self, metadata: FileMetadata) -> None:
+        self._file_metadata = (self.file.name or "", metadata)
+
+    def _current_file_metadata(self) -> FileMetadata:
+        cached = getattr(self, "_file_metadata", None)
+        if cached is not None and cached[0] == (self.file.name or ""):
+            return cached[1]
+        if getattr(self.file, "_committed", False) and hasattr(self.file, "open"):
+            self.file.open("rb")
+        metadata = read_file_metadata(self.file)
+        self._remember_file_metadata(metadata)
+        return metadata
+
     def _sync_file_metadata(self):
         if not self.file:
             return
+        metadata = self._current_file_metadata()
         current_name = os.path.basename(self.file.name or "")
         if current_name:
             if not self.original_name:
                 self.original_name = current_name
             guessed_type = mimetypes.guess_type(self.original_name or current_name)[0]
-            self.mime_type = guessed_type or "application/octet-stream"
-        file_size = getattr(self.file, "size", None)
-        if file_size is not None:
-            self.size_bytes = int(file_size)
-        checksum = self._compute_sha256_checksum()
-        if checksum:
-            self.checksum_sha256 = checksum
-
-    def _compute_sha256_checksum(self) -> str:
-        if not self.file:
-            return ""
-        hasher = hashlib.sha256()
-        current_position = None
-        try:
-            if hasattr(self.file, "open"):
-                self.file.open("rb")
-            stream = getattr(self.file, "file", self.file)
-            if hasattr(stream, "tell"):
-                try:
-                    current_position = stream.tell()
-                except (OSError, ValueError):
-                    current_position = None
-            if hasattr(stream, "seek"):
-                stream.seek(0)
-            if hasattr(self.file, "chunks"):
-                for chunk in self.file.chunks():
-                    if chunk:
-                        hasher.update(chunk)
-            else:
-                while True:
-                    chunk = stream.read(8192)
-                    if not chunk:
-                        break
-                    hasher.update(chunk)
-        finally:
-            if current_position is not None and hasattr(stream, "seek"):
-                stream.seek(current_position)
-        return hasher.hexdigest()
+            self.mime_type = metadata.sniffed_mime_type or guessed_type or "application/octet-stream"
+        self.size_bytes = metadata.size_bytes
+        if metadata.checksum_sha256:
+            self.checksum_sha256 = metadata.checksum_sha256
 
     def _apply_dedup_policy(self):
         self.duplicate_of = None
@@ -1184,7 +1239,8 @@ class DateiOperationLog(models.Model):
         verbose_name=_("Details"),
     )
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name=_("Zeitpunkt"),
     )
 
@@ -1203,6 +1259,144 @@ class DateiOperationLog(models.Model):
         return f"{self.get_operation_display()} · {actor} · {self.created_at:%d.%m.%Y %H:%M}"
 
 
+class DateiOperationDailyStat(models.Model):
+    day = models.DateField(verbose_name=_("Tag"))
+    operation = models.CharField(
+        max_length=20,
+        choices=DateiOperationLog.Operation.choices,
+        verbose_name=_("Operation"),
+    )
+    success = models.BooleanField(default=True, verbose_name=_("Erfolgreich"))
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Anzahl"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Aktualisiert am"))
+
+    class Meta:
+        verbose_name = _("Datei-Operationen je Tag")
+        verbose_name_plural = _("Datei-Operationen je Tag")
+        ordering = ["-day", "operation", "-success"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "operation", "success"],
+                name="dateiopstat_day_op_uniq",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day:%d.%m.%Y} · {self.get_operation_display()} · {self.count}"
+
+
+class PaperlessUpload(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Ausstehend")
+        SENDING = "sending", _("Wird übertragen")
+        SENT = "sent", _("Übertragen")
+        FAILED = "failed", _("Fehlgeschlagen")
+
+    file = models.FileField(
+        upload_to=paperless_outbox_upload_to,
+        blank=True,
+        verbose_name=_("Datei"),
+        help_text=_("Lokale Kopie bis zur erfolgreichen Übertragung an Paperless."),
+    )
+    original_name = models.CharField(max_length=255, verbose_name=_("Originalname"))
+    content_type = models.CharField(max_length=127, blank=True, verbose_name=_("MIME-Typ"))
+    size_bytes = models.PositiveBigIntegerField(default=0, verbose_name=_("Dateigröße (Bytes)"))
+    checksum_sha256 = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name=_("SHA-256 Checksumme"),
+        help_text=_("Verhindert, dass identische Dateien mehrfach an Paperless gesendet werden."),
+    )
+    title = models.CharField(max_length=255, blank=True, verbose_name=_("Titel"))
+    description = models.TextField(blank=True, verbose_name=_("Beschreibung"))
+    q_liegenschaft = models.CharField(max_length=255, blank=True, verbose_name=_("Liegenschaft"))
+    q_einheit = models.CharField(max_length=255, blank=True, verbose_name=_("Einheit"))
+    q_mieter = models.CharField(max_length=255, blank=True, verbose_name=_("Mieter"))
+    q_source_ref = models.CharField(max_length=255, blank=True, verbose_name=_("Quellreferenz"))
+    tags = models.JSONField(default=list, blank=True, verbose_name=_("Tags"))
+    document_type_id = models.PositiveIntegerField(null=True, blank=True, verbose_name=_("Dokumenttyp-ID"))
+    document_created = models.DateField(null=True, blank=True, verbose_name=_("Dokumentdatum"))
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_("Status"),
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_("Versuche"))
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name=_("Nächster Versuch"))
+    claim_token = models.CharField(max_length=32, blank=True, default="", verbose_name=_("Worker-Token"))
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Übernommen am"))
+    last_error = models.TextField(blank=True, verbose_name=_("Letzter Fehler"))
+    task_id = models.CharField(max_length=255, blank=True, verbose_name=_("Paperless Task-ID"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Erstellt am"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Aktualisiert am"))
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Übertragen am"))
+    consumed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Verarbeitet am"),
+        help_text=_("Zeitpunkt, zu dem der Paperless-Task als abgeschlossen erkannt wurde."),
+    )
+
+    class Meta:
+        verbose_name = _("Paperless-Upload")
+        verbose_name_plural = _("Paperless-Uploads")
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="paperlessup_status_next_idx"),
+            models.Index(fields=["q_source_ref", "created_at"], name="paperlessup_source_idx"),
+            models.Index(fields=["updated_at"], name="paperlessup_updated_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.original_name} · {self.get_status_display()}"
+
+
+class PaperlessRequestStat(models.Model):
+    class Endpoint(models.TextChoices):
+        DOCUMENTS = "documents", _("Dokumente")
+        TAGS = "tags", _("Tags")
+        DOCUMENT_TYPES = "document_types", _("Dokumenttypen")
+        CUSTOM_FIELDS = "custom_fields", _("Benutzerdefinierte Felder")
+        DOWNLOAD = "download", _("Download")
+        UPLOAD = "upload", _("Upload")
+        OTHER = "other", _("Sonstige")
+
+    bucket_start = models.DateTimeField(verbose_name=_("Stunde"))
+    endpoint = models.CharField(max_length=32, choices=Endpoint.choices, verbose_name=_("Endpunkt"))
+    view_name = models.CharField(max_length=200, verbose_name=_("Auslöser"))
+    request_count = models.PositiveIntegerField(default=0, verbose_name=_("Anfragen"))
+    error_count = models.PositiveIntegerField(default=0, verbose_name=_("Fehler"))
+    skipped_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Übersprungen"),
+        help_text=_("Durch Circuit Breaker oder Seitenbudget nicht ausgeführte Anfragen."),
+    )
+    total_duration_ms = models.PositiveBigIntegerField(default=0, verbose_name=_("Gesamtdauer (ms)"))
+    max_duration_ms = models.PositiveIntegerField(default=0, verbose_name=_("Maximale Dauer (ms)"))
+    duration_histogram = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Dauer-Histogramm"),
+        help_text=_("Anzahl Anfragen je Obergrenze in Sekunden (nicht kumulativ)."),
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Aktualisiert am"))
+
+    class Meta:
+        verbose_name = _("Paperless-Anfragestatistik")
+        verbose_name_plural = _("Paperless-Anfragestatistiken")
+        ordering = ["-bucket_start", "endpoint", "view_name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bucket_start", "endpoint", "view_name"],
+                name="paperlessstat_bucket_uniq",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.bucket_start:%d.%m.%Y %H:00} · {self.endpoint} · {self.view_name}"
+
+
 class Buchung(models.Model):
     class Typ(models.TextChoices):
         SOLL = "soll", _("Forderung an Mieter")
@@ -1287,6 +1481,14 @@ class Buchung(models.Model):
                 name="uniq_buchung_soll_mietvertrag_datum_kategorie_typ",
             ),
         ]
+        indexes = [
+            # Kontoblatt, Offene Posten, BK-Anteile: je Mietvertrag, Typ und Zeitraum.
+            models.Index(fields=["mietervertrag", "typ", "datum"], name="buchung_mv_typ_datum_idx"),
+            # Dashboard und Auswertungen: Typ + Kategorie über einen Zeitraum.
+            models.Index(fields=["typ", "kategorie", "datum"], name="buchung_typ_kat_datum_idx"),
+            # Buchungen ohne Mietvertrag direkt an der Einheit.
+            models.Index(fields=["einheit", "typ", "datum"], name="buchung_einh_typ_datum_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.datum} · {self.mietervertrag} · {self.brutto}"
@@ -1314,6 +1516,88 @@ class Buchung(models.Model):
             )
 
 
+class MietkontoSaldo(models.Model):
+    """Monatsabschluss eines Mietkontos (Saldo = IST - SOLL, Bruttowerte).
+
+    Eine Zeile je Mietvertrag und Monat mit Buchungen; wird bei Änderungen an
+    ``Buchung`` ab dem betroffenen Monat fortgeschrieben.
+    """
+
+    mietervertrag = models.ForeignKey(
+        "LeaseAgreement",
+        on_delete=models.CASCADE,
+        related_name="kontosalden",
+        verbose_name=_("Mietvertrag"),
+    )
+    monat = models.DateField(verbose_name=_("Monat"))
+    vortrag = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), verbose_name=_("Vortrag"))
+    soll = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), verbose_name=_("Soll"))
+    haben = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), verbose_name=_("Haben"))
+    endsaldo = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), verbose_name=_("Endsaldo"))
+    aktualisiert_am = models.DateTimeField(auto_now=True, verbose_name=_("Aktualisiert am"))
+
+    class Meta:
+        verbose_name = _("Mietkonto-Monatssaldo")
+        verbose_name_plural = _("Mietkonto-Monatssalden")
+        ordering = ["mietervertrag", "monat"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["mietervertrag", "monat"],
+                name="mietkontosaldo_mv_monat_uniq",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.monat:%m.%Y} · {self.mietervertrag} · {self.endsaldo}"
+
+
+class DashboardMonatswert(models.Model):
+    """Netto-Monatssummen für die Dashboard-Diagramme (IST-Miete, BK/HK-Einnahmen, Belege).
+
+    Eine Zeile je Monat mit Daten; wird bei Änderungen an ``Buchung`` und
+    ``BetriebskostenBeleg`` für den betroffenen Monat neu summiert.
+    """
+
+    monat = models.DateField(unique=True, verbose_name=_("Monat"))
+    miete_netto = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00"), verbose_name=_("Miete netto")
+    )
+    bk_einnahmen_netto = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00"), verbose_name=_("BK/HK-Einnahmen netto")
+    )
+    bk_ausgaben_netto = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00"), verbose_name=_("BK-Ausgaben netto")
+    )
+    aktualisiert_am = models.DateTimeField(auto_now=True, verbose_name=_("Aktualisiert am"))
+
+    class Meta:
+        verbose_name = _("Dashboard-Monatswert")
+        verbose_name_plural = _("Dashboard-Monatswerte")
+        ordering = ["monat"]
+
+    def __str__(self) -> str:
+        return f"{self.monat:%m.%Y} · {self.miete_netto} / {self.bk_einnahmen_netto} / {self.bk_ausgaben_netto}"
+
+
+class DashboardStand(models.Model):
+    """Generation des Dashboard-Schnappschusses in der Datenbank.
+
+    Eine einzige Zeile, die alle Worker-Prozesse lesen; jede Änderung an den
+    Dashboard-Daten erhöht ``generation`` und verwirft damit die Schnappschüsse
+    auch in prozesslokalen Caches.
+    """
+
+    generation = models.PositiveBigIntegerField(default=1, verbose_name=_("Generation"))
+    aktualisiert_am = models.DateTimeField(auto_now=True, verbose_name=_("Aktualisiert am"))
+
+    class Meta:
+        verbose_name = _("Dashboard-Stand")
+        verbose_name_plural = _("Dashboard-Stände")
+
+    def __str__(self) -> str:
+        return f"Generation {self.generation}"
+
+
 class BetriebskostenGruppe(models.Model):
     SYSTEM_KEY_UNGROUPED = "ungrouped"
 
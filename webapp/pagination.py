@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import BadRequest, ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+
+
+DEFAULT_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    rows: list
+    next_cursor: str = ""
+
+    @property
+    def has_next(self) -> bool:
+        return bool(self.next_cursor)
+
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps([value.isoformat() if hasattr(value, "isoformat") else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise BadRequest("Ungültige Seitenposition.") from exc
+    if not isinstance(values, list):
+        raise BadRequest("Ungültige Seitenposition.")
+    return values
+
+
+class KeysetPaginationMixin:
+    """Blättern über einen stabilen Sortierschlüssel statt ``OFFSET`` für ``ListView``.
+
+    ``keyset_fields`` ist die vollständige Sortierung (letztes Feld eindeutig, z. B.
+    ``("-datum", "-id")``); die Felder dürfen nicht ``NULL`` sein. Die erste Seite wird
+    mit der Seite gerendert, weitere Zeilen liefert ``?fragment=rows&nach=<cursor>`` als
+    JSON mit dem HTML aus ``keyset_rows_template``. ``self.object_list`` bleibt der
+    ungeteilte Queryset für Summen und Exporte.
+    """
+
+    keyset_fields: tuple[str, ...] = ("-datum", "-id")
+    keyset_rows_template = ""
+    keyset_cursor_param = "nach"
+    keyset_fragment_param = "fragment"
+
+    def get_keyset_page_size(self) -> int:
+        raw_value = getattr(settings, "LIST_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+        try:
+            return max(int(raw_value), 1)
+        except (TypeError, ValueError):
+            return DEFAULT_PAGE_SIZE
+
+    def paginate_keyset(self, queryset) -> KeysetPage:
+        queryset = queryset.order_by(*self.keyset_fields)
+        cursor = (self.request.GET.get(self.keyset_cursor_param) or "").strip()
+        if cursor:
+            queryset = queryset.filter(self._keyset_after(queryset.model, decode_cursor(cursor)))
+        page_size = self.get_keyset_page_size()
+        rows = list(queryset[: page_size + 1])
+        next_cursor = ""
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor([self._keyset_value(rows[-1], field) for field in self._keyset_names()])
+        return KeysetPage(rows=self.prepare_keyset_rows(rows), next_cursor=next_cursor)
+
+    def prepare_keyset_rows(self, rows: list) -> list:
+        """Hook für Zeilen-Anreicherung (z. B. Anhänge), gilt für Seite und Fragment."""
+        return rows
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get(self.keyset_fragment_param) != "rows":
+            return super().get(request, *args, **kwargs)
+        self.object_list = self.get_queryset()
+        page = self.paginate_keyset(self.object_list)
+        html = render_to_string(
+            self.keyset_rows_template,
+            {self.get_context_object_name(self.object_list): page.rows},
+            request=request,
+        )
+        return JsonResponse({"html": html, "next_cursor": page.next_cursor, "count": len(page.rows)})
+
+    def get_context_data(self, **kwargs):
+        queryset = kwargs.pop("object_list", self.object_list)
+        page = self.paginate_keyset(queryset)
+        context = super().get_context_data(object_list=page.rows, **kwargs)
+        context["keyset_page"] = page
+        context["keyset_next_cursor"] = page.next_cursor
+        return context
+
+    def _keyset_names(self) -> list[str]:
+        return [field.lstrip("-") for field in self.keyset_fields]
+
+    def _keyset_after(self, model, values: list) -> Q:
+        names = self._keyset_names()
+        if len(values) != len(names):
+            raise BadRequest("Ungültige Seitenposition.")
+        parsed = []
+        for name, raw_value in zip(names, values):
+            try:
+                parsed.append(model._meta.get_field(name).to_python(raw_value))
+            except ValidationError as exc:
+                raise BadRequest("Ungültige Seitenposition.") from exc
+        condition = Q()
+        for index, field in enumerate(self.keyset_fields):
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{names[index]}__{lookup}": parsed[index]})
+            for previous in range(index):
+                step &= Q(**{names[previous]: parsed[previous]})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _keyset_value(row, name: str):
+        return getattr(row, "pk" if name == "id" else name)
@@ -19,6 +19,7 @@ from webapp.services.annual_statement_pdf_service import (
 from webapp.services.annual_statement_run_service import AnnualStatementRunService
 from webapp.services.annual_statement_storage_service import AnnualStatementStorageService
 from webapp.services.files import ALLOWED_MIME_BY_EXTENSION
+from webapp.services.storage_tiers import DateiStorageTiers
 
 
 @dataclass(frozen=True)
@@ -244,7 +245,7 @@ class AnnualStatementPortalExportService:
     @staticmethod
     def _read_file_bytes(datei: Datei) -> bytes:
         try:
-            with datei.file.open("rb") as stream:
+            with DateiStorageTiers.open(datei) as stream:
                 return stream.read()
         except OSError as exc:
             readable_name = datei.original_name or os.path.basename(datei.file.name or "") or f"Datei #{datei.pk}"
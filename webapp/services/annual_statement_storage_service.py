@@ -10,15 +10,16 @@ from webapp.services.files import DateiService
 
 class AnnualStatementStorageService:
     @staticmethod
-    def _archive_existing_pdf(letter: Abrechnungsschreiben) -> None:
+    def _archive_existing_pdf(letter: Abrechnungsschreiben) -> Datei | None:
         existing = letter.pdf_datei
         if existing is None:
-            return
+            return None
         letter.pdf_datei = None
         letter.generated_at = None
         letter.save(update_fields=["pdf_datei", "generated_at", "updated_at"])
         if not existing.is_archived:
             DateiService.archive(user=None, datei=existing)
+        return existing
 
     @classmethod
     def persist_letter_pdf(
@@ -28,7 +29,7 @@ class AnnualStatementStorageService:
         filename: str,
         pdf_bytes: bytes,
     ) -> Datei:
-        cls._archive_existing_pdf(letter)
+        previous = cls._archive_existing_pdf(letter)
 
         file_obj = ContentFile(pdf_bytes, name=filename)
         datei = Datei(
@@ -39,8 +40,7 @@ class AnnualStatementStorageService:
             uploaded_by=None,
         )
         datei.set_upload_context(content_object=letter.mietervertrag)
-        datei.full_clean()
-        datei.save()
+        DateiService.save_new_datei(datei)
 
         DateiZuordnung.objects.create(
             datei=datei,
@@ -48,6 +48,7 @@ class AnnualStatementStorageService:
             object_id=letter.mietervertrag_id,
             created_by=None,
         )
+        DateiService.mark_superseded(previous=previous, replacement=datei)
 
         letter.pdf_datei = datei
         letter.generated_at = timezone.now()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import File
+
+from webapp.file_metadata import MetadataCollectingFile, read_file_metadata
+from webapp.models import Datei
+from webapp.storage_paths import BLOB_STORAGE_PREFIX, build_blob_upload_path
+
+
+HOT = Datei.StorageTier.HOT
+
+
+class DateiBlobStorage:
+    """Content-addressed Ablage: identische Inhalte liegen einmal unter ``uploads/_blobs/<sha256>``.
+
+    Datei-Zeilen teilen sich den Storage-Namen; gelöscht wird ein Blob erst,
+    wenn keine Datei mehr darauf verweist. Alles hier betrifft nur den aktiven
+    Storage; Zeilen in der Kaltablage verwaltet ``DateiStorageTiers``.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(settings, "DATEI_CONTENT_ADDRESSED_STORAGE", False))
+
+    @staticmethod
+    def blob_name_for(datei: Datei) -> str:
+        metadata = datei.file_metadata()
+        _base, extension = os.path.splitext(datei.file.name or datei.original_name or "")
+        return build_blob_upload_path(metadata.checksum_sha256, extension)
+
+    @staticmethod
+    def reference_count(name: str, *, exclude_pk: int | None = None, tier: str = HOT) -> int:
+        """Anzahl Datei-Zeilen, die ``name`` in der Stufe ``tier`` referenzieren."""
+        queryset = Datei.objects.filter(file=name, storage_tier=tier)
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return queryset.count()
+
+    @classmethod
+    def promote(cls, datei: Datei) -> bool:
+        """Legt eine frisch gespeicherte Datei unter ihrem Blob-Namen ab.
+
+        Existiert der Blob bereits, wird die neue Kopie verworfen.
+        """
+        if not datei.file:
+            return False
+        staged_name = datei.file.name
+        blob_name = cls.blob_name_for(datei)
+        if staged_name == blob_name:
+            return False
+        storage = datei.file.storage
+        if storage.exists(blob_name):
+            storage.delete(staged_name)
+        else:
+            cls._move(storage, staged_name, blob_name)
+        datei.relink_file(blob_name)
+        return True
+
+    @classmethod
+    def release(cls, datei: Datei) -> bool:
+        """Löscht die aktive Binärdatei, sofern keine andere aktive Datei-Zeile sie referenziert."""
+        if not datei.file or datei.storage_tier != HOT:
+            return False
+        if cls.reference_count(datei.file.name, exclude_pk=datei.pk) > 0:
+            return False
+        datei.file.delete(save=False)
+        return True
+
+    @classmethod
+    def list_blob_names(cls, storage) -> list[str]:
+        names: list[str] = []
+        pending = [BLOB_STORAGE_PREFIX.rstrip("/")]
+        while pending:
+            directory = pending.pop()
+            try:
+                subdirectories, files = storage.listdir(directory)
+            except (FileNotFoundError, NotImplementedError):
+                continue
+            pending.extend(posixpath.join(directory, subdirectory) for subdirectory in subdirectories)
+            names.extend(posixpath.join(directory, file_name) for file_name in files)
+        return sorted(names)
+
+    @classmethod
+    def unreferenced_blob_names(cls, storage) -> list[str]:
+        referenced = set(
+            Datei.objects.filter(file__startswith=BLOB_STORAGE_PREFIX, storage_tier=HOT).values_list(
+                "file", flat=True
+            )
+        )
+        return [name for name in cls.list_blob_names(storage) if name not in referenced]
+
+    @classmethod
+    def collapse_duplicate_group(cls, dateien: list[Datei], *, apply: bool) -> dict[str, object]:
+        """Führt alle aktiven Zeilen mit gleicher Checksumme auf einen gemeinsamen Blob zusammen.
+
+        Zeilen in der Kaltablage bleiben unverändert (ihr Name zeigt auf die kalte Kopie)
+        und werden als übersprungen gemeldet.
+        """
+        result = {
+            "checksum_sha256": dateien[0].checksum_sha256,
+            "datei_ids": [datei.pk for datei in dateien if datei.storage_tier == HOT],
+            "blob": "",
+            "removed_files": [],
+            "reclaimed_bytes": 0,
+            "skipped_files": sorted({datei.file.name for datei in dateien if datei.storage_tier != HOT}),
+        }
+        dateien = [datei for datei in dateien if datei.storage_tier == HOT]
+        if len(dateien) < 2:
+            return result
+        source = next(
+            (datei for datei in dateien if datei.file and datei.file.storage.exists(datei.file.name)),
+            None,
+        )
+        if source is None:
+            result["skipped_files"] += [datei.file.name for datei in dateien]
+            return result
+
+        storage = source.file.storage
+        blob_name = cls.blob_name_for(source)
+        result["blob"] = blob_name
+        old_names = sorted({datei.file.name for datei in dateien if datei.file.name != blob_name})
+        if not apply:
+            for old_name in old_names:
+                if storage.exists(old_name):
+                    result["removed_files"].append(old_name)
+                    result["reclaimed_bytes"] += storage.size(old_name)
+            if not storage.exists(blob_name) and result["removed_files"]:
+                result["reclaimed_bytes"] -= source.size_bytes
+            return result
+
+        checksum = result["checksum_sha256"]
+        if not storage.exists(blob_name):
+            with storage.open(source.file.name, "rb") as source_stream:
+                collecting_file = MetadataCollectingFile(source_stream, name=posixpath.basename(blob_name))
+                saved_name = storage.save(blob_name, collecting_file)
+            blob_metadata = collecting_file.metadata()
+            if blob_metadata.checksum_sha256 != checksum:
+                storage.delete(saved_name)
+                result["skipped_files"] += old_names
+                return result
+            # Der neue Blob belegt selbst Platz; eingespart wird nur der Rest.
+            result["reclaimed_bytes"] -= blob_metadata.size_bytes
+
+        for old_name in old_names:
+            old_exists = storage.exists(old_name)
+            old_size = 0
+            if old_exists:
+                with storage.open(old_name, "rb") as old_stream:
+                    old_metadata = read_file_metadata(File(old_stream))
+                if old_metadata.checksum_sha256 != checksum:
+                    result["skipped_files"].append(old_name)
+                    continue
+                old_size = old_metadata.size_bytes
+            Datei.objects.filter(pk__in=result["datei_ids"], file=old_name, storage_tier=HOT).update(file=blob_name)
+            if old_exists and cls.reference_count(old_name) == 0:
+                storage.delete(old_name)
+                result["removed_files"].append(old_name)
+                result["reclaimed_bytes"] += old_size
+        return result
+
+    @staticmethod
+    def _move(storage, source_name: str, target_name: str) -> None:
+        try:
+            source_path = storage.path(source_name)
+            target_path = storage.path(target_name)
+        except NotImplementedError:
+            source_path = target_path = ""
+        if source_path and target_path:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            os.replace(source_path, target_path)
+            return
+        with storage.open(source_name, "rb") as source_stream:
+            saved_name = storage.save(target_name, File(source_stream, name=posixpath.basename(target_name)))
+        storage.delete(source_name)
+        if saved_name != target_name:
+            # Paralleler Upload hat den Blob bereits angelegt.
+            storage.delete(saved_name)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import os
+from typing import Any
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+
+from webapp.models import Datei, DateiOperationLog, DateiZuordnung
+from webapp.services.blob_storage import DateiBlobStorage
+from webapp.services.datei_thumbnails import DateiThumbnailService
+from webapp.services.files import DateiService
+
+
+DEFAULT_WORKERS = 4
+INSERT_BATCH_SIZE = 200
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkUploadItem:
+    uploaded_file: Any
+    target_object: Any
+    kategorie: str | None = None
+    beschreibung: str = ""
+
+
+@dataclass(frozen=True)
+class BulkUploadResult:
+    name: str
+    status: str
+    datei_id: int | None = None
+    checksum_sha256: str = ""
+    duplicate_of_id: int | None = None
+    error: str = ""
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "datei_id": self.datei_id,
+            "checksum_sha256": self.checksum_sha256,
+            "duplicate_of_id": self.duplicate_of_id,
+            "error": self.error,
+        }
+
+
+class DateiBulkUpload:
+    """Lädt viele Dateien auf einmal hoch.
+
+    Prüfung, Storage-Write und SHA-256 laufen parallel in Threads; ``Datei``-,
+    ``DateiZuordnung``- und Protokollzeilen werden gesammelt in einer Transaktion
+    eingefügt. Ungültige Dateien werden einzeln abgelehnt, ohne den Rest aufzuhalten.
+    """
+
+    STATUS_CREATED = "created"
+    STATUS_DUPLICATE = "duplicate"
+    STATUS_REJECTED = "rejected"
+
+    @staticmethod
+    def worker_count() -> int:
+        raw_value = getattr(settings, "DATEI_BULK_UPLOAD_WORKERS", DEFAULT_WORKERS)
+        try:
+            return max(int(raw_value), 1)
+        except (TypeError, ValueError):
+            return DEFAULT_WORKERS
+
+    @classmethod
+    def upload(cls, items: list[BulkUploadItem], *, workers: int | None = None) -> list[BulkUploadResult]:
+        if not items:
+            return []
+        workers = cls.worker_count() if workers is None else max(int(workers), 1)
+        if workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(items)), thread_name_prefix="datei-bulk") as executor:
+                outcomes = list(executor.map(cls._prepare, items))
+        else:
+            outcomes = [cls._prepare(item) for item in items]
+
+        results: list[BulkUploadResult | None] = [None] * len(items)
+        prepared: list[tuple[int, Datei, BulkUploadItem]] = []
+        rejected_logs: list[DateiOperationLog] = []
+        for index, (item, outcome) in enumerate(zip(items, outcomes)):
+            if isinstance(outcome, BulkUploadResult):
+                results[index] = outcome
+                rejected_logs.append(cls._rejection_log(item, outcome.error))
+            else:
+                prepared.append((index, outcome, item))
+
+        try:
+            if DateiBlobStorage.enabled():
+                # Seriell, damit gleiche Inhalte im selben Stapel nicht um denselben Blob-Namen konkurrieren.
+                for _index, datei, _item in prepared:
+                    DateiBlobStorage.promote(datei)
+            accepted, duplicate_rejections = cls._assign_duplicates(prepared)
+            accepted_names = {datei.file.name for _index, datei, _item in accepted}
+            for index, datei, item, error in duplicate_rejections:
+                if datei.file.name not in accepted_names:
+                    datei.discard_stored_file()
+                results[index] = cls._rejected(item, error)
+                rejected_logs.append(cls._rejection_log(item, error))
+            cls._insert(accepted)
+        except Exception:
+            for _index, datei, _item in prepared:
+                datei.pk = None
+                datei.discard_stored_file()
+            raise
+        finally:
+            if rejected_logs:
+                DateiOperationLog.objects.bulk_create(rejected_logs, batch_size=INSERT_BATCH_SIZE)
+
+        for index, datei, _item in accepted:
+            results[index] = BulkUploadResult(
+                name=datei.original_name,
+                status=cls.STATUS_DUPLICATE if datei.duplicate_of_id else cls.STATUS_CREATED,
+                datei_id=datei.pk,
+                checksum_sha256=datei.checksum_sha256,
+                duplicate_of_id=datei.duplicate_of_id,
+            )
+        return results
+
+    @classmethod
+    def _prepare(cls, item: BulkUploadItem) -> Datei | BulkUploadResult:
+        """Prüft eine Datei und schreibt sie in den Storage; läuft im Worker-Thread ohne DB-Zugriff."""
+        datei = None
+        try:
+            DateiService.assert_can_upload(target_object=item.target_object)
+            kategorie = DateiService.resolve_upload_category(
+                provided_category=item.kategorie,
+                uploaded_file=item.uploaded_file,
+                target_object=item.target_object,
+            )
+            DateiService.validate_upload(uploaded_file=item.uploaded_file, kategorie=kategorie)
+            datei = Datei(
+                file=item.uploaded_file,
+                kategorie=kategorie,
+                beschreibung=(item.beschreibung or "").strip(),
+                uploaded_by=None,
+            )
+            datei.set_upload_context(content_object=item.target_object)
+            datei.store_file()
+            datei.clean_for_bulk_insert()
+            return datei
+        except (ValidationError, PermissionDenied, OSError) as exc:
+            if datei is not None:
+                datei.discard_stored_file()
+            return cls._rejected(item, cls._error_message(exc))
+
+    @classmethod
+    def _assign_duplicates(cls, prepared):
+        """Setzt ``duplicate_of`` mit einer Abfrage für den ganzen Stapel (Regel wie ``Datei.save()``)."""
+        checksums = {datei.checksum_sha256 for _index, datei, _item in prepared if datei.checksum_sha256}
+        existing_originals: dict[str, int] = {}
+        for pk, checksum, duplicate_of_id in (
+            Datei.objects.filter(checksum_sha256__in=checksums)
+            .order_by("id")
+            .values_list("pk", "checksum_sha256", "duplicate_of_id")
+        ):
+            existing_originals.setdefault(checksum, duplicate_of_id or pk)
+
+        hard_dedup = bool(getattr(settings, "DATEI_HARD_DEDUP", False))
+        accepted = []
+        rejections = []
+        seen_in_batch: set[str] = set()
+        for index, datei, item in prepared:
+            checksum = datei.checksum_sha256
+            datei.duplicate_of = None
+            if hard_dedup and (checksum in existing_originals or checksum in seen_in_batch):
+                rejections.append(
+                    (index, datei, item, "Diese Datei wurde bereits hochgeladen (gleiche SHA-256 Checksumme).")
+                )
+                continue
+            seen_in_batch.add(checksum)
+            if checksum in existing_originals:
+                datei.duplicate_of_id = existing_originals[checksum]
+            accepted.append((index, datei, item))
+        return accepted, rejections
+
+    @classmethod
+    def _insert(cls, accepted) -> None:
+        if not accepted:
+            return
+        # Duplikate innerhalb des Stapels brauchen den Primärschlüssel ihres Originals: zweiter Durchgang.
+        first_pass: list[Datei] = []
+        batch_duplicates: list[tuple[Datei, Datei]] = []
+        first_by_checksum: dict[str, Datei] = {}
+        for _index, datei, _item in accepted:
+            if datei.duplicate_of_id is not None or not datei.checksum_sha256:
+                first_pass.append(datei)
+                continue
+            first = first_by_checksum.setdefault(datei.checksum_sha256, datei)
+            if first is datei:
+                first_pass.append(datei)
+            else:
+                batch_duplicates.append((datei, first))
+
+        with transaction.atomic():
+            Datei.objects.bulk_create(first_pass, batch_size=INSERT_BATCH_SIZE)
+            for datei, first in batch_duplicates:
+                datei.duplicate_of_id = first.pk
+            Datei.objects.bulk_create([datei for datei, _first in batch_duplicates], batch_size=INSERT_BATCH_SIZE)
+
+            DateiZuordnung.objects.bulk_create(
+                [
+                    DateiZuordnung(
+                        datei=datei,
+                        content_type=ContentType.objects.get_for_model(item.target_object),
+                        object_id=item.target_object.pk,
+                        created_by=None,
+                    )
+                    for _index, datei, item in accepted
+                ],
+                batch_size=INSERT_BATCH_SIZE,
+            )
+            DateiOperationLog.objects.bulk_create(
+                [
+                    DateiService.build_operation_log(
+                        operation=DateiOperationLog.Operation.UPLOAD,
+                        datei=datei,
+                        content_object=item.target_object,
+                        detail="Upload erfolgreich (Sammel-Upload).",
+                    )
+                    for _index, datei, item in accepted
+                ],
+                batch_size=INSERT_BATCH_SIZE,
+            )
+            for _index, datei, _item in accepted:
+                DateiThumbnailService.schedule(datei)
+
+    @classmethod
+    def _rejected(cls, item: BulkUploadItem, error: str) -> BulkUploadResult:
+        return BulkUploadResult(
+            name=os.path.basename(getattr(item.uploaded_file, "name", "") or ""),
+            status=cls.STATUS_REJECTED,
+            error=error,
+        )
+
+    @staticmethod
+    def _rejection_log(item: BulkUploadItem, error: str) -> DateiOperationLog:
+        return DateiService.build_operation_log(
+            operation=DateiOperationLog.Operation.UPLOAD,
+            content_object=item.target_object,
+            success=False,
+            detail=error,
+        )
+
+    @staticmethod
+    def _error_message(exc: Exception) -> str:
+        if isinstance(exc, ValidationError):
+            return " ".join(exc.messages)
+        if isinstance(exc, OSError):
+            logger.exception("Bulk upload could not store a file.")
+            return "Datei konnte nicht gespeichert werden."
+        return str(exc)
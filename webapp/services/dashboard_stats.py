@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from webapp.models import (
+    BetriebskostenBeleg,
+    Buchung,
+    DashboardMonatswert,
+    DashboardStand,
+    LeaseAgreement,
+    Manager,
+    Owner,
+    Property,
+    ReminderRuleConfig,
+    Tenant,
+    Unit,
+)
+
+
+DEFAULT_CACHE_SECONDS = 300
+ZERO = Decimal("0.00")
+MONEY_FIELD = DecimalField(max_digits=14, decimal_places=2)
+BK_INCOME_CATEGORIES = (Buchung.Kategorie.BK, Buchung.Kategorie.HK)
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+
+class DashboardStatistik:
+    """Vorberechnete Dashboard-Kennzahlen.
+
+    Die Netto-Monatssummen für die Diagramme liegen in ``DashboardMonatswert`` und
+    werden je betroffenem Monat nachgeführt. Der übrige Seiteninhalt (Zähler,
+    Rückstände, Erinnerungen, Liegenschaften) wird als Schnappschuss mit Zeitstempel
+    im Cache gehalten; Änderungen an den zugrunde liegenden Daten erhöhen die
+    Generation in ``DashboardStand``, sonst läuft der Eintrag nach
+    ``DASHBOARD_CACHE_SECONDS`` ab. Die Generation liegt in der Datenbank, damit das
+    Verwerfen auch für die Caches anderer Worker-Prozesse gilt.
+    Monatssummen und Generation werden erst nach dem Commit der schreibenden
+    Transaktion nachgeführt, damit kein Leser einen unfertigen Stand zwischenspeichert.
+    """
+
+    @staticmethod
+    def ttl_seconds() -> int:
+        raw_value = getattr(settings, "DASHBOARD_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+        try:
+            return max(int(raw_value), 0)
+        except (TypeError, ValueError):
+            return DEFAULT_CACHE_SECONDS
+
+    @staticmethod
+    def generation() -> int:
+        return DashboardStand.objects.filter(pk=1).values_list("generation", flat=True).first() or 1
+
+    @staticmethod
+    def invalidate() -> None:
+        bump = {"generation": F("generation") + 1, "aktualisiert_am": timezone.now()}
+        if DashboardStand.objects.filter(pk=1).update(**bump):
+            return
+        _stand, created = DashboardStand.objects.get_or_create(pk=1, defaults={"generation": 2})
+        if not created:
+            DashboardStand.objects.filter(pk=1).update(**bump)
+
+    @classmethod
+    def invalidate_on_commit(cls) -> None:
+        transaction.on_commit(cls.invalidate)
+
+    @classmethod
+    def snapshot(cls, build: Callable[[], dict[str, Any]], *, today: date) -> dict[str, Any]:
+        """Liefert den Seiteninhalt aus dem Cache oder baut ihn mit ``build`` neu; ``stand`` ist der Zeitpunkt."""
+        ttl = cls.ttl_seconds()
+        cache_key = f"dashboard:snapshot:v{cls.generation()}:{today.isoformat()}"
+        if ttl > 0:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        payload = build()
+        payload["stand"] = timezone.now()
+        if ttl > 0:
+            cache.set(cache_key, payload, timeout=ttl)
+        return payload
+
+    @classmethod
+    def refresh_months(cls, months: Iterable[date | None]) -> int:
+        """Summiert die angegebenen Monate neu; Monate ohne Daten verlieren ihre Zeile."""
+        refreshed = 0
+        for month in sorted({_month_start(value) for value in months if value}):
+            month_filter = {"datum__gte": month, "datum__lt": _next_month(month)}
+            rent = Buchung.objects.filter(typ=Buchung.Typ.IST, kategorie=Buchung.Kategorie.HMZ, **month_filter).aggregate(
+                total=Sum("netto", output_field=MONEY_FIELD), rows=Count("id")
+            )
+            bk_income = Buchung.objects.filter(
+                typ=Buchung.Typ.IST, kategorie__in=BK_INCOME_CATEGORIES, **month_filter
+            ).aggregate(total=Sum("netto", output_field=MONEY_FIELD), rows=Count("id"))
+            bk_expense = BetriebskostenBeleg.objects.filter(**month_filter).aggregate(
+                total=Sum("netto", output_field=MONEY_FIELD), rows=Count("id")
+            )
+            if not (rent["rows"] or bk_income["rows"] or bk_expense["rows"]):
+                DashboardMonatswert.objects.filter(monat=month).delete()
+            else:
+                DashboardMonatswert.objects.update_or_create(
+                    monat=month,
+                    defaults={
+                        "miete_netto": rent["total"] or ZERO,
+                        "bk_einnahmen_netto": bk_income["total"] or ZERO,
+                        "bk_ausgaben_netto": bk_expense["total"] or ZERO,
+                    },
+                )
+            refreshed += 1
+        if refreshed:
+            cls.invalidate_on_commit()
+        return refreshed
+
+    @classmethod
+    def refresh_months_on_commit(cls, months: Iterable[date | None]) -> int:
+        """Plant die Neuberechnung nach dem Commit ein; ohne offene Transaktion sofort."""
+        pending = {_month_start(value) for value in months if value}
+        if pending:
+            transaction.on_commit(lambda: cls.refresh_months(pending))
+        return len(pending)
+
+    @classmethod
+    def refresh_for_dates(cls, dates: Iterable[date | None]) -> int:
+        """Nachführen nach ``bulk_create`` o. Ä., die keine Signale auslösen."""
+        return cls.refresh_months_on_commit(dates)
+
+    @classmethod
+    def rebuild(cls) -> dict[str, int]:
+        months: dict[date, dict[str, Decimal]] = {}
+
+        def collect(queryset, key: str) -> None:
+            rows = (
+                queryset.annotate(month_start=TruncMonth("datum"))
+                .values("month_start")
+                .annotate(total=Sum("netto", output_field=MONEY_FIELD))
+                .order_by("month_start")
+            )
+            for row in rows:
+                values = months.setdefault(
+                    row["month_start"],
+                    {"miete_netto": ZERO, "bk_einnahmen_netto": ZERO, "bk_ausgaben_netto": ZERO},
+                )
+                values[key] = row["total"] or ZERO
+
+        collect(Buchung.objects.filter(typ=Buchung.Typ.IST, kategorie=Buchung.Kategorie.HMZ), "miete_netto")
+        collect(
+            Buchung.objects.filter(typ=Buchung.Typ.IST, kategorie__in=BK_INCOME_CATEGORIES),
+            "bk_einnahmen_netto",
+        )
+        collect(BetriebskostenBeleg.objects.all(), "bk_ausgaben_netto")
+
+        with transaction.atomic():
+            DashboardMonatswert.objects.all().delete()
+            DashboardMonatswert.objects.bulk_create(
+                [DashboardMonatswert(monat=month, **values) for month, values in sorted(months.items())]
+            )
+        cls.invalidate_on_commit()
+        return {"months": len(months)}
+
+
+@receiver(pre_save, sender=Buchung, dispatch_uid="dashboard_buchung_pre_save")
+@receiver(pre_save, sender=BetriebskostenBeleg, dispatch_uid="dashboard_beleg_pre_save")
+def _remember_previous_month(sender, instance, raw=False, **kwargs):
+    instance._dashboard_previous_datum = None
+    if raw or instance.pk is None:
+        return
+    instance._dashboard_previous_datum = sender.objects.filter(pk=instance.pk).values_list("datum", flat=True).first()
+
+
+@receiver(post_save, sender=Buchung, dispatch_uid="dashboard_buchung_post_save")
+@receiver(post_save, sender=BetriebskostenBeleg, dispatch_uid="dashboard_beleg_post_save")
+def _refresh_month_after_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    DashboardStatistik.refresh_months_on_commit(
+        [instance.datum, getattr(instance, "_dashboard_previous_datum", None)]
+    )
+
+
+@receiver(post_delete, sender=Buchung, dispatch_uid="dashboard_buchung_post_delete")
+@receiver(post_delete, sender=BetriebskostenBeleg, dispatch_uid="dashboard_beleg_post_delete")
+def _refresh_month_after_delete(sender, instance, **kwargs):
+    DashboardStatistik.refresh_months_on_commit([instance.datum])
+
+
+def _invalidate_snapshot(sender, raw=False, **kwargs):
+    if not raw:
+        DashboardStatistik.invalidate_on_commit()
+
+
+for _model in (LeaseAgreement, Manager, Owner, Property, ReminderRuleConfig, Tenant, Unit):
+    post_save.connect(_invalidate_snapshot, sender=_model, dispatch_uid=f"dashboard_{_model._meta.model_name}_post_save")
+    post_delete.connect(
+        _invalidate_snapshot, sender=_model, dispatch_uid=f"dashboard_{_model._meta.model_name}_post_delete"
+    )
+m2m_changed.connect(
+    _invalidate_snapshot,
+    sender=LeaseAgreement.tenants.through,
+    dispatch_uid="dashboard_lease_tenants_m2m_changed",
+)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import atexit
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from webapp.models import Datei, DateiOperationDailyStat, DateiOperationLog, DateiZuordnung
+
+
+DEFAULT_BUFFER_SIZE = 200
+DEFAULT_FLUSH_SECONDS = 5
+DEFAULT_RETENTION_DAYS = 180
+PRUNE_BATCH_SIZE = 5000
+logger = logging.getLogger(__name__)
+
+
+class DateiOperationAudit:
+    """Schreibt DateiOperationLog-Einträge; erfolgreiche Ansichten gepuffert und gebündelt.
+
+    Gepuffert wird nur, wenn der Server-Prozess ``start_buffering`` aufgerufen hat
+    (core/wsgi.py, core/asgi.py). Uploads, Löschungen, Archivierungen und jeder
+    Fehlschlag werden immer sofort geschrieben.
+    """
+
+    _lock = threading.Lock()
+    _pending: list[tuple[DateiOperationLog, bool]] = []
+    _oldest_pending_at: float | None = None
+    _buffering = False
+    _atexit_registered = False
+    _flusher: threading.Thread | None = None
+    _flusher_stop = threading.Event()
+
+    @staticmethod
+    def buffer_size() -> int:
+        raw_value = getattr(settings, "DATEI_OPERATION_LOG_BUFFER_SIZE", DEFAULT_BUFFER_SIZE)
+        try:
+            return max(int(raw_value), 1)
+        except (TypeError, ValueError):
+            return DEFAULT_BUFFER_SIZE
+
+    @staticmethod
+    def flush_seconds() -> float:
+        raw_value = getattr(settings, "DATEI_OPERATION_LOG_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+        try:
+            return max(float(raw_value), 0.0)
+        except (TypeError, ValueError):
+            return float(DEFAULT_FLUSH_SECONDS)
+
+    @staticmethod
+    def is_security_relevant(entry: DateiOperationLog) -> bool:
+        return not entry.success or entry.operation != DateiOperationLog.Operation.VIEW
+
+    @classmethod
+    def is_buffering(cls) -> bool:
+        return cls._buffering
+
+    @classmethod
+    def start_buffering(cls, *, periodic: bool = True) -> None:
+        with cls._lock:
+            cls._buffering = True
+            if not cls._atexit_registered:
+                atexit.register(cls.flush)
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(after_in_child=cls._after_fork_in_child)
+                cls._atexit_registered = True
+            start_flusher = periodic and cls.flush_seconds() > 0 and cls._flusher is None
+            if start_flusher:
+                cls._flusher_stop.clear()
+                cls._flusher = threading.Thread(
+                    target=cls._run_periodic_flusher,
+                    name="datei-operation-log-flusher",
+                    daemon=True,
+                )
+        if start_flusher:
+            cls._flusher.start()
+
+    @classmethod
+    def stop_buffering(cls) -> None:
+        with cls._lock:
+            cls._buffering = False
+            flusher = cls._flusher
+            cls._flusher = None
+        cls._flusher_stop.set()
+        if flusher is not None:
+            flusher.join(timeout=5)
+        cls.flush()
+
+    @classmethod
+    def record(cls, entry: DateiOperationLog, *, resolve_content_object: bool = False) -> DateiOperationLog:
+        if not cls._buffering or cls.is_security_relevant(entry):
+            if resolve_content_object:
+                cls._resolve_content_objects([entry])
+            entry.save()
+            return entry
+
+        with cls._lock:
+            cls._pending.append((entry, resolve_content_object))
+            if cls._oldest_pending_at is None:
+                cls._oldest_pending_at = time.monotonic()
+            is_full = len(cls._pending) >= cls.buffer_size()
+        if is_full:
+            cls.flush()
+        return entry
+
+    @classmethod
+    def pending_count(cls) -> int:
+        with cls._lock:
+            return len(cls._pending)
+
+    @classmethod
+    def flush_if_due(cls) -> int:
+        with cls._lock:
+            oldest = cls._oldest_pending_at
+            is_due = bool(cls._pending) and (
+                len(cls._pending) >= cls.buffer_size()
+                or (oldest is not None and time.monotonic() - oldest >= cls.flush_seconds())
+            )
+        if not is_due:
+            return 0
+        return cls.flush()
+
+    @classmethod
+    def flush(cls) -> int:
+        with cls._lock:
+            pending = cls._pending
+            cls._pending = []
+            cls._oldest_pending_at = None
+        if not pending:
+            return 0
+
+        entries = [entry for entry, _resolve in pending]
+        try:
+            existing_datei_ids = set(
+                Datei.objects.filter(
+                    pk__in={entry.datei_id for entry in entries if entry.datei_id}
+                ).values_list("pk", flat=True)
+            )
+            for entry in entries:
+                if entry.datei_id and entry.datei_id not in existing_datei_ids:
+                    # Zwischenzeitlich gelöscht: Dateiname bleibt im Log erhalten.
+                    entry.datei = None
+            cls._resolve_content_objects([entry for entry, resolve in pending if resolve])
+            DateiOperationLog.objects.bulk_create(entries, batch_size=cls.buffer_size())
+        except Exception:
+            logger.exception("Datei operation log could not be flushed; %s entries dropped.", len(entries))
+            return 0
+        return len(entries)
+
+    @staticmethod
+    def _resolve_content_objects(entries: list[DateiOperationLog]) -> None:
+        """Setzt das primär zugeordnete Objekt je Datei mit einer Abfrage für alle Einträge."""
+        datei_ids = {entry.datei_id for entry in entries if entry.datei_id and entry.content_type_id is None}
+        if not datei_ids:
+            return
+        primary: dict[int, tuple[int, int]] = {}
+        for datei_id, content_type_id, object_id in (
+            DateiZuordnung.objects.filter(datei_id__in=datei_ids)
+            .order_by("datei_id", "id")
+            .values_list("datei_id", "content_type_id", "object_id")
+        ):
+            primary.setdefault(datei_id, (content_type_id, object_id))
+        for entry in entries:
+            target = primary.get(entry.datei_id)
+            if target is not None and entry.content_type_id is None:
+                entry.content_type_id, entry.object_id = target
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        # Threads überleben fork nicht (z. B. gunicorn --preload); Puffer gehört dem Elternprozess.
+        cls._lock = threading.Lock()
+        cls._pending = []
+        cls._oldest_pending_at = None
+        cls._flusher = None
+        if cls._buffering:
+            cls.start_buffering()
+
+    @classmethod
+    def _run_periodic_flusher(cls) -> None:
+        while not cls._flusher_stop.wait(cls.flush_seconds()):
+            try:
+                if cls.flush_if_due():
+                    close_old_connections()
+            except Exception:
+                logger.exception("Periodic datei operation log flush failed.")
+
+    @classmethod
+    def prune(
+        cls,
+        *,
+        older_than_days: int,
+        security_older_than_days: int = 0,
+        apply: bool = False,
+        now: datetime | None = None,
+    ) -> dict[str, object]:
+        """Verdichtet alte Einträge zu Tageszählern und löscht sie.
+
+        Erfolgreiche Ansichten werden nach ``older_than_days`` verdichtet, sicherheitsrelevante
+        Einträge erst nach ``security_older_than_days`` (0 = nie).
+        """
+        now = now or timezone.now()
+        view_cutoff = now - timedelta(days=max(int(older_than_days), 1))
+        candidates = DateiOperationLog.objects.filter(
+            operation=DateiOperationLog.Operation.VIEW,
+            success=True,
+            created_at__lt=view_cutoff,
+        )
+        security_cutoff = None
+        if int(security_older_than_days or 0) > 0:
+            security_cutoff = now - timedelta(days=int(security_older_than_days))
+            candidates = candidates | DateiOperationLog.objects.filter(created_at__lt=security_cutoff)
+
+        summary = {
+            "mode": "apply" if apply else "dry-run",
+            "view_cutoff": view_cutoff.isoformat(),
+            "security_cutoff": security_cutoff.isoformat() if security_cutoff else "",
+            "rows": candidates.count(),
+            "deleted_rows": 0,
+            "rolled_up_days": 0,
+        }
+        if not apply:
+            return summary
+
+        rolled_up_days = set()
+        while True:
+            batch_ids = list(candidates.order_by("id").values_list("id", flat=True)[:PRUNE_BATCH_SIZE])
+            if not batch_ids:
+                break
+            with transaction.atomic():
+                grouped = (
+                    DateiOperationLog.objects.filter(pk__in=batch_ids)
+                    .annotate(day=TruncDate("created_at"))
+                    .values("day", "operation", "success")
+                    .annotate(rows=Count("id"))
+                )
+                for group in grouped:
+                    stat, _created = DateiOperationDailyStat.objects.get_or_create(
+                        day=group["day"],
+                        operation=group["operation"],
+                        success=group["success"],
+                    )
+                    DateiOperationDailyStat.objects.filter(pk=stat.pk).update(count=F("count") + group["rows"])
+                    rolled_up_days.add(group["day"])
+                deleted, _details = DateiOperationLog.objects.filter(pk__in=batch_ids).delete()
+                summary["deleted_rows"] += deleted
+        summary["rolled_up_days"] = len(rolled_up_days)
+        return summary
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from webapp.models import Datei
+from webapp.storage_paths import build_deterministic_derived_upload_path
+
+
+DEFAULT_THUMBNAIL_SIZES = (160, 480, 1200)
+DEFAULT_PREVIEW_SIZE = 480
+PDF_MIME_TYPE = "application/pdf"
+PDF_RENDER_TIMEOUT_SECONDS = 30
+logger = logging.getLogger(__name__)
+
+
+class DateiThumbnailService:
+    """Abgeleitete Vorschaubilder für Datei-Uploads (uploads/_derived/.../thumb-<größe>/).
+
+    Bilder werden mit Pillow verkleinert, bei PDFs wird die erste Seite über
+    ``pdftoppm`` (poppler-utils) gerendert. Fehlt eines davon, bleibt es beim Original.
+    """
+
+    _executor: ThreadPoolExecutor | None = None
+    _executor_lock = threading.Lock()
+
+    @staticmethod
+    def sizes() -> list[int]:
+        raw_sizes = getattr(settings, "DATEI_THUMBNAIL_SIZES", DEFAULT_THUMBNAIL_SIZES)
+        if isinstance(raw_sizes, str):
+            raw_sizes = raw_sizes.split(",")
+        sizes = set()
+        for raw_size in raw_sizes or ():
+            try:
+                sizes.add(max(int(str(raw_size).strip()), 64))
+            except (TypeError, ValueError):
+                continue
+        return sorted(sizes) or list(DEFAULT_THUMBNAIL_SIZES)
+
+    @staticmethod
+    def worker_count() -> int:
+        raw_value = getattr(settings, "DATEI_THUMBNAIL_WORKERS", 2)
+        try:
+            return max(int(raw_value), 0)
+        except (TypeError, ValueError):
+            return 2
+
+    @staticmethod
+    def derived_path(source_name: str, size: int) -> str:
+        return build_deterministic_derived_upload_path(
+            source_name,
+            f"thumb-{int(size)}",
+            extension=".jpg",
+        )
+
+    @classmethod
+    def select_size(cls, requested_size: int | None = None) -> int:
+        """Kleinste konfigurierte Größe, die die gewünschte Kantenlänge abdeckt."""
+        sizes = cls.sizes()
+        wanted = requested_size or DEFAULT_PREVIEW_SIZE
+        for size in sizes:
+            if size >= wanted:
+                return size
+        return sizes[-1]
+
+    @staticmethod
+    def is_pdf(datei: Datei) -> bool:
+        from .files import DateiService
+
+        if DateiService.effective_mime_type(datei=datei) == PDF_MIME_TYPE:
+            return True
+        return str(datei.original_name or datei.file.name or "").lower().endswith(".pdf")
+
+    @classmethod
+    def source_mime_type(cls, datei: Datei) -> str:
+        """MIME-Typ für die Ableitung; leer, wenn die Datei keine Vorschau bekommt."""
+        from .files import DateiService
+
+        if not datei.file:
+            return ""
+        if DateiService.is_image_file(datei=datei):
+            return DateiService.image_mime_type(datei=datei)
+        if cls.is_pdf(datei):
+            return PDF_MIME_TYPE
+        return ""
+
+    @classmethod
+    def existing_thumbnail(cls, datei: Datei, *, requested_size: int | None = None) -> str:
+        if not datei.file:
+            return ""
+        target_path = cls.derived_path(datei.file.name, cls.select_size(requested_size))
+        if datei.file.storage.exists(target_path):
+            return target_path
+        return ""
+
+    @classmethod
+    def schedule(cls, datei: Datei) -> bool:
+        """Plant die Ableitung nach dem Commit im Hintergrund-Worker ein."""
+        mime_type = cls.source_mime_type(datei)
+        if not mime_type:
+            return False
+        source_name = datei.file.name
+        transaction.on_commit(lambda: cls._submit(source_name, mime_type))
+        return True
+
+    @classmethod
+    def delete_derived(cls, source_name: str) -> int:
+        deleted = 0
+        for size in cls.sizes():
+            target_path = cls.derived_path(source_name, size)
+            if default_storage.exists(target_path):
+                default_storage.delete(target_path)
+                deleted += 1
+        return deleted
+
+    @classmethod
+    def _submit(cls, source_name: str, mime_type: str) -> None:
+        if cls.worker_count() == 0:
+            derive_thumbnails(source_name, mime_type)
+            return
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.worker_count(),
+                    thread_name_prefix="datei-thumbnails",
+                )
+            executor = cls._executor
+        executor.submit(derive_thumbnails, source_name, mime_type)
+
+    @staticmethod
+    def render_image(source_stream):
+        from PIL import Image, ImageOps
+
+        with Image.open(source_stream) as image:
+            image = ImageOps.exif_transpose(image)
+            return image.convert("RGB")
+
+    @staticmethod
+    def render_pdf_first_page(storage, source_name: str, size: int):
+        """Rendert die erste PDF-Seite; ``None``, wenn ``pdftoppm`` nicht verfügbar ist."""
+        from PIL import Image
+
+        executable = shutil.which("pdftoppm")
+        if not executable:
+            return None
+        with tempfile.TemporaryDirectory(prefix="quintus-thumb-") as work_dir:
+            try:
+                source_path = storage.path(source_name)
+            except NotImplementedError:
+                source_path = os.path.join(work_dir, "source.pdf")
+                with storage.open(source_name, "rb") as source_stream, open(source_path, "wb") as target:
+                    shutil.copyfileobj(source_stream, target)
+            output_root = os.path.join(work_dir, "page")
+            subprocess.run(
+                [
+                    executable,
+                    "-png",
+                    "-f", "1",
+                    "-l", "1",
+                    "-singlefile",
+                    "-scale-to", str(int(size)),
+                    source_path,
+                    output_root,
+                ],
+                check=True,
+                capture_output=True,
+                timeout=PDF_RENDER_TIMEOUT_SECONDS,
+            )
+            with Image.open(f"{output_root}.png") as page:
+                return page.convert("RGB")
+
+
+def derive_thumbnails(
+    source_name: str,
+    mime_type: str,
+    sizes: list[int] | None = None,
+    force: bool = False,
+) -> dict[str, object]:
+    """Erzeugt alle fehlenden Größen für eine gespeicherte Datei.
+
+    Modulebene, damit der Backfill-Befehl die Funktion an einen Prozess-Pool übergeben kann.
+    """
+    storage = default_storage
+    sizes = sorted(sizes or DateiThumbnailService.sizes(), reverse=True)
+    result = {"source": source_name, "status": "ok", "created": 0, "skipped_existing": 0}
+    pending = []
+    for size in sizes:
+        target_path = DateiThumbnailService.derived_path(source_name, size)
+        if storage.exists(target_path) and not force:
+            result["skipped_existing"] += 1
+            continue
+        pending.append((size, target_path))
+    if not pending:
+        return result
+    if not storage.exists(source_name):
+        result["status"] = "missing"
+        return result
+
+    try:
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        result["status"] = "unsupported"
+        return result
+
+    try:
+        if mime_type == PDF_MIME_TYPE:
+            image = DateiThumbnailService.render_pdf_first_page(storage, source_name, pending[0][0])
+        else:
+            with storage.open(source_name, "rb") as source_stream:
+                image = DateiThumbnailService.render_image(source_stream)
+        if image is None:
+            result["status"] = "unsupported"
+            return result
+
+        # Absteigend verkleinern: jede Größe entsteht aus der vorherigen.
+        for size, target_path in pending:
+            image.thumbnail((size, size))
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=85, optimize=True)
+            if storage.exists(target_path):
+                storage.delete(target_path)
+            storage.save(target_path, ContentFile(buffer.getvalue()))
+            result["created"] += 1
+    except Exception as exc:
+        logger.warning("Datei thumbnail could not be derived for %s: %s", source_name, exc)
+        result["status"] = "failed"
+        result["error"] = str(exc)
+    return result
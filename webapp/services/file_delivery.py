@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+
+DEFAULT_CACHE_MAX_AGE_SECONDS = 300
+RANGE_HEADER_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+SENDFILE_MODE_NGINX = "nginx"
+SENDFILE_MODE_APACHE = "apache"
+
+
+class _RangeReader:
+    """Liest höchstens ``length`` Bytes ab der aktuellen Position und schließt die Quelle."""
+
+    def __init__(self, source, length: int):
+        self._source = source
+        self._remaining = length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        chunk = self._source.read(size)
+        self._remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        self._source.close()
+
+
+class DateiDelivery:
+    """Auslieferung gespeicherter Dateien mit ETag, 304, Byte-Ranges und optionalem X-Sendfile.
+
+    ``DATEI_SENDFILE_MODE``: leer = Django streamt selbst, ``nginx`` = ``X-Accel-Redirect``,
+    ``apache`` = ``X-Sendfile``. Storages mit ``supports_sendfile = False`` (Kaltablage)
+    streamt Django immer selbst.
+    """
+
+    @staticmethod
+    def cache_max_age() -> int:
+        raw_value = getattr(settings, "DATEI_CACHE_MAX_AGE_SECONDS", DEFAULT_CACHE_MAX_AGE_SECONDS)
+        try:
+            return max(int(raw_value), 0)
+        except (TypeError, ValueError):
+            return DEFAULT_CACHE_MAX_AGE_SECONDS
+
+    @staticmethod
+    def sendfile_mode() -> str:
+        mode = str(getattr(settings, "DATEI_SENDFILE_MODE", "") or "").strip().lower()
+        if mode in {SENDFILE_MODE_NGINX, SENDFILE_MODE_APACHE}:
+            return mode
+        return ""
+
+    @staticmethod
+    def build_etag(checksum_sha256: str, variant: str = "") -> str:
+        checksum = str(checksum_sha256 or "").strip().lower()
+        if not checksum:
+            return ""
+        suffix = f"-{variant}" if variant else ""
+        return f'"{checksum}{suffix}"'
+
+    @classmethod
+    def serve(
+        cls,
+        request,
+        *,
+        storage,
+        name: str,
+        content_type: str,
+        etag: str = "",
+        as_attachment: bool = False,
+        filename: str = "",
+    ):
+        try:
+            last_modified = storage.get_modified_time(name)
+        except (NotImplementedError, OSError):
+            last_modified = None
+        last_modified_timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        conditional = get_conditional_response(
+            request,
+            etag=etag or None,
+            last_modified=last_modified_timestamp,
+        )
+        if conditional is not None:
+            return cls._finalize(conditional, etag=etag, last_modified_timestamp=last_modified_timestamp)
+
+        mode = cls.sendfile_mode() if getattr(storage, "supports_sendfile", True) else ""
+        if mode:
+            response = HttpResponse(content_type=content_type)
+            if mode == SENDFILE_MODE_NGINX:
+                prefix = str(getattr(settings, "DATEI_SENDFILE_NGINX_PREFIX", "/protected-media/") or "/")
+                response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name.lstrip("/"))
+            else:
+                response["X-Sendfile"] = storage.path(name)
+            cls._set_disposition(response, as_attachment=as_attachment, filename=filename)
+            return cls._finalize(response, etag=etag, last_modified_timestamp=last_modified_timestamp)
+
+        size = storage.size(name)
+        byte_range = cls._requested_range(
+            request,
+            size=size,
+            etag=etag,
+            last_modified_timestamp=last_modified_timestamp,
+        )
+        if byte_range == "unsatisfiable":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return cls._finalize(response, etag=etag, last_modified_timestamp=last_modified_timestamp)
+
+        source = storage.open(name, "rb")
+        if byte_range is None:
+            response = FileResponse(source, as_attachment=as_attachment, filename=filename)
+        else:
+            start, end = byte_range
+            source.seek(start)
+            length = end - start + 1
+            response = FileResponse(
+                _RangeReader(source, length),
+                status=206,
+                as_attachment=as_attachment,
+                filename=filename,
+            )
+            response["Content-Length"] = str(length)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Type"] = content_type
+        return cls._finalize(response, etag=etag, last_modified_timestamp=last_modified_timestamp)
+
+    @classmethod
+    def _finalize(cls, response, *, etag: str, last_modified_timestamp: int | None):
+        if etag:
+            response["ETag"] = etag
+        if last_modified_timestamp is not None:
+            response["Last-Modified"] = http_date(last_modified_timestamp)
+        response["Accept-Ranges"] = "bytes"
+        response["X-Content-Type-Options"] = "nosniff"
+        patch_cache_control(response, private=True, max_age=cls.cache_max_age())
+        return response
+
+    @staticmethod
+    def _set_disposition(response, *, as_attachment: bool, filename: str) -> None:
+        disposition = content_disposition_header(as_attachment, filename)
+        if disposition:
+            response["Content-Disposition"] = disposition
+
+    @staticmethod
+    def _requested_range(request, *, size: int, etag: str, last_modified_timestamp: int | None):
+        """``None`` = ganze Datei, ``(start, end)`` oder ``"unsatisfiable"``.
+
+        Mehrere Bereiche in einer Anfrage werden nicht unterstützt; dann geht die ganze Datei raus.
+        """
+        range_header = str(request.headers.get("Range") or "").strip()
+        match = RANGE_HEADER_RE.match(range_header)
+        if not match:
+            return None
+
+        if_range = str(request.headers.get("If-Range") or "").strip()
+        if if_range:
+            if if_range.startswith(('"', "W/")):
+                if not etag or if_range != etag:
+                    return None
+            else:
+                if_range_timestamp = parse_http_date_safe(if_range)
+                if last_modified_timestamp is None or if_range_timestamp != last_modified_timestamp:
+                    return None
+
+        raw_start, raw_end = match.groups()
+        if not raw_start and not raw_end:
+            return None
+        if size <= 0:
+            return "unsatisfiable"
+        if not raw_start:
+            suffix_length = int(raw_end)
+            if suffix_length <= 0:
+                return "unsatisfiable"
+            return max(size - suffix_length, 0), size - 1
+        start = int(raw_start)
+        end = int(raw_end) if raw_end else size - 1
+        if start >= size or end < start:
+            return "unsatisfiable"
+        return start, min(end, size - 1)
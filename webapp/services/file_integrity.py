@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from webapp.models import Datei
+from webapp.services.storage_tiers import DateiStorageTiers
+
+
+HASH_CHUNK_BYTES = 1024 * 1024
+DEFAULT_BATCH_SIZE = 200
+CHECKPOINT_VERSION = 1
+
+
+class _ByteRateLimiter:
+    """Gemeinsames Lesebudget aller Worker-Threads in Bytes pro Sekunde."""
+
+    def __init__(self, bytes_per_second: float):
+        self.bytes_per_second = float(bytes_per_second or 0)
+        self._lock = threading.Lock()
+        self._next_free_at = time.monotonic()
+
+    def consume(self, byte_count: int) -> None:
+        if self.bytes_per_second <= 0 or byte_count <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_free_at)
+            self._next_free_at = start + byte_count / self.bytes_per_second
+            wait_seconds = start - now
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+@dataclass(frozen=True)
+class IntegrityFinding:
+    status: str
+    name: str
+    datei_ids: tuple[int, ...]
+    expected_checksum: str = ""
+    actual_checksum: str = ""
+    expected_size: int = 0
+    actual_size: int = 0
+    detail: str = ""
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "status": self.status,
+            "name": self.name,
+            "datei_ids": list(self.datei_ids),
+            "expected_checksum": self.expected_checksum,
+            "actual_checksum": self.actual_checksum,
+            "expected_size": self.expected_size,
+            "actual_size": self.actual_size,
+            "detail": self.detail,
+        }
+
+
+class DateiIntegrityScan:
+    """Liest alle gespeicherten Dateien erneut und vergleicht SHA-256 und Größe mit der Datenbank.
+
+    Arbeitet in ID-Batches; nach jedem Batch wird der Fortschritt in die Checkpoint-Datei
+    geschrieben, damit ein abgebrochener oder zeitbegrenzter Lauf dort weitermacht.
+    """
+
+    STATUS_OK = "ok"
+    STATUS_MISSING = "missing"
+    STATUS_SIZE_MISMATCH = "size_mismatch"
+    STATUS_CHECKSUM_MISMATCH = "checksum_mismatch"
+    STATUS_UNREADABLE = "unreadable"
+    STATUS_NO_CHECKSUM = "no_checksum"
+
+    def __init__(
+        self,
+        *,
+        storage=None,
+        workers: int = 4,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_bytes_per_second: float = 0,
+        max_seconds: float = 0,
+        checkpoint_path: str = "",
+        restart: bool = False,
+        progress: Callable[[dict[str, object]], None] | None = None,
+    ):
+        self.storage = storage or default_storage
+        self.workers = max(int(workers), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.rate_limiter = _ByteRateLimiter(max_bytes_per_second)
+        self.max_seconds = max(float(max_seconds or 0), 0.0)
+        self.checkpoint_path = str(checkpoint_path or "")
+        self.restart = bool(restart)
+        self.progress = progress
+
+    def run(self) -> dict[str, object]:
+        state = self._load_checkpoint()
+        started = time.monotonic()
+        total = Datei.objects.exclude(file="").count()
+        remaining_queryset = Datei.objects.exclude(file="").filter(pk__gt=state["last_datei_id"])
+        stopped_early = False
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="files-audit") as executor:
+            while True:
+                if self.max_seconds and time.monotonic() - started >= self.max_seconds:
+                    stopped_early = remaining_queryset.filter(pk__gt=state["last_datei_id"]).exists()
+                    break
+                batch = list(
+                    remaining_queryset.filter(pk__gt=state["last_datei_id"])
+                    .order_by("id")
+                    .values_list("id", "file", "checksum_sha256", "size_bytes", "storage_tier")[: self.batch_size]
+                )
+                if not batch:
+                    break
+
+                # Mehrere Zeilen können denselben Blob teilen; gelesen wird jeder Name einmal je Stufe.
+                targets: dict[tuple[str, str], dict[str, object]] = {}
+                for datei_id, name, checksum, size_bytes, tier in batch:
+                    target = targets.setdefault(
+                        (name, tier),
+                        {"name": name, "tier": tier, "checksum": checksum, "size": size_bytes, "datei_ids": []},
+                    )
+                    target["datei_ids"].append(datei_id)
+
+                for finding in executor.map(self._verify, targets.values()):
+                    state["bytes_read"] += finding.actual_size if finding.status != self.STATUS_MISSING else 0
+                    state["counts"][finding.status] = state["counts"].get(finding.status, 0) + 1
+                    if finding.status != self.STATUS_OK:
+                        state["findings"].append(finding.as_dict())
+
+                state["last_datei_id"] = batch[-1][0]
+                state["scanned_dateien"] += len(batch)
+                self._save_checkpoint(state)
+                self._report_progress(state, total=total, elapsed=time.monotonic() - started)
+
+        complete = not stopped_early
+        summary = {
+            "complete": complete,
+            "total_dateien": total,
+            "scanned_dateien": state["scanned_dateien"],
+            "last_datei_id": state["last_datei_id"],
+            "bytes_read": state["bytes_read"],
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+            "started_at": state["started_at"],
+            "counts": state["counts"],
+            "findings_count": len(state["findings"]),
+            "findings": state["findings"],
+        }
+        if complete:
+            self._clear_checkpoint()
+        return summary
+
+    def _verify(self, target: dict[str, object]) -> IntegrityFinding:
+        name = str(target["name"])
+        expected_checksum = str(target["checksum"] or "").lower()
+        expected_size = int(target["size"] or 0)
+        datei_ids = tuple(target["datei_ids"])
+        base = {
+            "name": name,
+            "datei_ids": datei_ids,
+            "expected_checksum": expected_checksum,
+            "expected_size": expected_size,
+        }
+        storage, stored_name = DateiStorageTiers.read_source_for(
+            name,
+            str(target["tier"]),
+            size=expected_size,
+            hot_storage=self.storage,
+        )
+        hasher = hashlib.sha256()
+        actual_size = 0
+        try:
+            with storage.open(stored_name, "rb") as stream:
+                while True:
+                    chunk = stream.read(HASH_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    self.rate_limiter.consume(len(chunk))
+                    hasher.update(chunk)
+                    actual_size += len(chunk)
+        except FileNotFoundError:
+            return IntegrityFinding(status=self.STATUS_MISSING, **base)
+        except OSError as exc:
+            return IntegrityFinding(status=self.STATUS_UNREADABLE, actual_size=actual_size, detail=str(exc), **base)
+
+        actual_checksum = hasher.hexdigest()
+        if not expected_checksum:
+            status = self.STATUS_NO_CHECKSUM
+        elif actual_size != expected_size and expected_size:
+            status = self.STATUS_SIZE_MISMATCH
+        elif actual_checksum != expected_checksum:
+            status = self.STATUS_CHECKSUM_MISMATCH
+        else:
+            status = self.STATUS_OK
+        return IntegrityFinding(status=status, actual_checksum=actual_checksum, actual_size=actual_size, **base)
+
+    def _empty_state(self) -> dict[str, object]:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "started_at": timezone.now().isoformat(),
+            "last_datei_id": 0,
+            "scanned_dateien": 0,
+            "bytes_read": 0,
+            "counts": {},
+            "findings": [],
+        }
+
+    def _load_checkpoint(self) -> dict[str, object]:
+        if not self.checkpoint_path or self.restart or not os.path.exists(self.checkpoint_path):
+            return self._empty_state()
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return self._empty_state()
+        if state.get("version") != CHECKPOINT_VERSION:
+            return self._empty_state()
+        return state
+
+    def _save_checkpoint(self, state: dict[str, object]) -> None:
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as handle:
+            json.dump(state, handle, ensure_ascii=False)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self) -> None:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _report_progress(self, state: dict[str, object], *, total: int, elapsed: float) -> None:
+        if self.progress is None:
+            return
+        self.progress(
+            {
+                "event": "progress",
+                "scanned_dateien": state["scanned_dateien"],
+                "total_dateien": total,
+                "last_datei_id": state["last_datei_id"],
+                "bytes_read": state["bytes_read"],
+                "findings_count": len(state["findings"]),
+                "elapsed_seconds": round(elapsed, 3),
+            }
+        )
@@ -1,15 +1,20 @@
 import mimetypes
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
+from django.db.models import Count, Max, Q
 from django.utils import timezone
 
 from webapp.models import Datei, DateiOperationLog, DateiZuordnung
+from webapp.services.blob_storage import DateiBlobStorage
+from webapp.services.datei_audit import DateiOperationAudit
+from webapp.services.datei_thumbnails import DateiThumbnailService
+from webapp.services.storage_tiers import DateiStorageTiers
 
 
 ALLOWED_MIME_BY_EXTENSION = {
@@ -70,6 +75,26 @@ class DateiValidationResult:
     max_size_bytes: int
 
 
+@dataclass
+class AttachmentSummary:
+    """Verdichtete Anhangsinfo je Zielobjekt für Listenansichten."""
+
+    total: int = 0
+    by_category: dict[str, int] = field(default_factory=dict)
+    latest_datei_id: int | None = None
+    latest_image_id: int | None = None
+
+    @property
+    def has_contract(self) -> bool:
+        return self.by_category.get(Datei.Kategorie.VERTRAG, 0) > 0
+
+    @property
+    def image_count(self) -> int:
+        return self.by_category.get(Datei.Kategorie.BILD, 0) + self.by_category.get(
+            Datei.Kategorie.ZAEHLERFOTO, 0
+        )
+
+
 class DateiService:
     GENERATED_LETTER_DESCRIPTIONS = (
         "BK-Abrechnung ",
@@ -221,6 +246,67 @@ class DateiService:
             queryset = queryset.filter(datei__kategorie__in=categories)
         return list(queryset)
 
+    @classmethod
+    def attachment_summaries(
+        cls,
+        *,
+        model,
+        object_ids,
+        include_archived: bool = False,
+    ) -> dict[int, AttachmentSummary]:
+        """Anhangsübersicht für viele Objekte eines Typs in einer gruppierten Abfrage.
+
+        "Neueste" Datei bzw. neuestes Bild ist jeweils die höchste Datei-ID.
+        """
+        normalized_ids = {int(object_id) for object_id in object_ids if object_id is not None}
+        if not normalized_ids:
+            return {}
+
+        queryset = DateiZuordnung.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id__in=normalized_ids,
+        )
+        if not include_archived:
+            queryset = queryset.filter(datei__is_archived=False)
+        image_filter = Q(datei__mime_type__startswith="image/") | Q(
+            datei__kategorie__in=[Datei.Kategorie.BILD, Datei.Kategorie.ZAEHLERFOTO]
+        )
+        rows = (
+            queryset.values("object_id", "datei__kategorie")
+            .annotate(
+                total=Count("datei_id", distinct=True),
+                latest_datei_id=Max("datei_id"),
+                latest_image_id=Max("datei_id", filter=image_filter),
+            )
+            .order_by()
+        )
+
+        summaries: dict[int, AttachmentSummary] = {}
+        for row in rows:
+            summary = summaries.setdefault(int(row["object_id"]), AttachmentSummary())
+            summary.total += int(row["total"])
+            summary.by_category[row["datei__kategorie"]] = int(row["total"])
+            for attribute in ("latest_datei_id", "latest_image_id"):
+                value = row[attribute]
+                if value is not None and (getattr(summary, attribute) or 0) < value:
+                    setattr(summary, attribute, int(value))
+        return summaries
+
+    @classmethod
+    def attach_attachment_summaries(cls, objects, *, include_archived: bool = False):
+        """Setzt ``attachment_summary`` auf jedes Objekt (gleicher Modelltyp) und gibt die Liste zurück."""
+        objects = list(objects)
+        if not objects:
+            return objects
+        summaries = cls.attachment_summaries(
+            model=type(objects[0]),
+            object_ids=[obj.pk for obj in objects],
+            include_archived=include_archived,
+        )
+        for obj in objects:
+            obj.attachment_summary = summaries.get(obj.pk) or AttachmentSummary()
+        return objects
+
     @classmethod
     def resolve_target_object(
         cls,
@@ -374,8 +460,7 @@ class DateiService:
                 uploaded_by=None,
             )
             datei.set_upload_context(content_object=target_object)
-            datei.full_clean()
-            datei.save()
+            cls.save_new_datei(datei)
 
             DateiZuordnung.objects.create(
                 datei=datei,
@@ -394,9 +479,27 @@ class DateiService:
             )
             return datei
 
+    @classmethod
+    def save_new_datei(cls, datei: Datei) -> Datei:
+        """Speichert eine neue Datei; Storage-Write, Checksumme und MIME-Erkennung in einem Lesedurchlauf.
+
+        Mit ``DATEI_CONTENT_ADDRESSED_STORAGE`` landet der Inhalt als gemeinsamer Blob unter seiner Checksumme.
+        Vorschaubilder werden nach dem Commit im Hintergrund abgeleitet.
+        """
+        datei.store_file()
+        if DateiBlobStorage.enabled():
+            DateiBlobStorage.promote(datei)
+        try:
+            datei.full_clean()
+            datei.save()
+        except Exception:
+            datei.discard_stored_file()
+            raise
+        DateiThumbnailService.schedule(datei)
+        return datei
+
     @classmethod
     def prepare_download(cls, *, user, datei: Datei) -> Datei:
-        content_object = cls._primary_content_object(datei)
         try:
             cls.assert_can_download(user=user, datei=datei)
         except PermissionDenied as exc:
@@ -404,9 +507,9 @@ class DateiService:
                 operation=DateiOperationLog.Operation.VIEW,
                 actor=user,
                 datei=datei,
-                content_object=content_object,
                 success=False,
                 detail=str(exc),
+                resolve_content_object=True,
             )
             raise
 
@@ -414,21 +517,30 @@ class DateiService:
             operation=DateiOperationLog.Operation.VIEW,
             actor=user,
             datei=datei,
-            content_object=content_object,
             success=True,
             detail="Download freigegeben.",
+            resolve_content_object=True,
         )
         return datei
 
     @classmethod
     def replacement_for_archived_download(cls, *, datei: Datei) -> Datei | None:
-        if not datei.is_archived:
+        if not datei.is_archived or not datei.superseded_by_id:
             return None
+        return Datei.objects.filter(pk=datei.superseded_by_id, is_archived=False).first()
 
-        beschreibung = (datei.beschreibung or "").strip()
-        if not beschreibung.startswith(cls.GENERATED_LETTER_DESCRIPTIONS):
-            return None
+    @staticmethod
+    def mark_superseded(*, previous: Datei | None, replacement: Datei) -> int:
+        """Verweist die archivierte Fassung und alle älteren auf die neue PDF (ein PK-Sprung)."""
+        if previous is None or previous.pk == replacement.pk:
+            return 0
+        return Datei.objects.filter(Q(pk=previous.pk) | Q(superseded_by_id=previous.pk)).update(
+            superseded_by=replacement
+        )
 
+    @classmethod
+    def _legacy_replacement(cls, *, datei: Datei) -> Datei | None:
+        """Alte Zuordnung über Name, Kategorie und Beschreibung; nur noch für den Backfill."""
         primary_assignment = (
             datei.zuordnungen.order_by("id")
             .values("content_type_id", "object_id")
@@ -447,14 +559,46 @@ class DateiService:
                 datei__beschreibung=datei.beschreibung,
             )
             .exclude(datei_id=datei.pk)
+            .select_related("datei")
             .order_by("-datei__created_at", "-datei_id")
             .first()
         )
         if replacement_assignment is None:
             return None
-
         return replacement_assignment.datei
 
+    @classmethod
+    def backfill_superseded_by(cls, *, apply: bool = False, limit: int = 0) -> dict[str, object]:
+        """Setzt ``superseded_by`` für archivierte Schreiben aus der Zeit vor dem expliziten Verweis."""
+        description_filter = Q()
+        for prefix in cls.GENERATED_LETTER_DESCRIPTIONS:
+            description_filter |= Q(beschreibung__startswith=prefix)
+        candidates = (
+            Datei.objects.filter(description_filter, is_archived=True, superseded_by__isnull=True)
+            .order_by("id")
+        )
+        if limit > 0:
+            candidates = candidates[:limit]
+
+        summary = {
+            "mode": "apply" if apply else "dry-run",
+            "candidates": 0,
+            "linked": 0,
+            "without_replacement": 0,
+            "links": [],
+        }
+        for datei in candidates:
+            summary["candidates"] += 1
+            replacement = cls._legacy_replacement(datei=datei)
+            if replacement is None:
+                summary["without_replacement"] += 1
+                continue
+            summary["linked"] += 1
+            summary["links"].append({"datei_id": datei.pk, "superseded_by": replacement.pk})
+            if apply:
+                Datei.objects.filter(pk=datei.pk).update(superseded_by=replacement)
+        return summary
+
     @classmethod
     def archive(cls, *, user, datei: Datei) -> Datei:
         content_object = cls._primary_content_object(datei)
@@ -513,6 +657,7 @@ class DateiService:
         datei.archived_at = None
         datei.archived_by = None
         datei.save(update_fields=["is_archived", "archived_at", "archived_by"])
+        DateiStorageTiers.rehydrate(datei)
 
         file_name = datei.original_name or os.path.basename(datei.file.name or "")
         cls.log_operation(
@@ -551,8 +696,10 @@ class DateiService:
             detail=f"Datei gelöscht: {file_name}",
         )
 
-        if datei.file:
-            datei.file.delete(save=False)
+        source_name = datei.file.name
+        DateiStorageTiers.release_cold(datei)
+        if DateiBlobStorage.release(datei):
+            DateiThumbnailService.delete_derived(source_name)
         datei.delete()
 
     @classmethod
@@ -565,7 +712,34 @@ class DateiService:
         content_object: Any | None = None,
         success: bool = True,
         detail: str = "",
+        resolve_content_object: bool = False,
+    ) -> DateiOperationLog:
+        """Protokolliert eine Operation über ``DateiOperationAudit``.
+
+        Mit ``resolve_content_object`` wird das primär zugeordnete Objekt erst beim Schreiben ermittelt.
+        """
+        entry = cls.build_operation_log(
+            operation=operation,
+            datei=datei,
+            content_object=content_object,
+            success=success,
+            detail=detail,
+        )
+        return DateiOperationAudit.record(
+            entry,
+            resolve_content_object=resolve_content_object and entry.content_type_id is None,
+        )
+
+    @staticmethod
+    def build_operation_log(
+        *,
+        operation: str,
+        datei: Datei | None = None,
+        content_object: Any | None = None,
+        success: bool = True,
+        detail: str = "",
     ) -> DateiOperationLog:
+        """Baut einen ungespeicherten Protokolleintrag, z. B. für ``bulk_create``."""
         content_type = None
         object_id = None
         if content_object is not None and getattr(content_object, "pk", None) is not None:
@@ -576,7 +750,7 @@ class DateiService:
         if datei is not None:
             file_name = datei.original_name or os.path.basename(datei.file.name or "")
 
-        return DateiOperationLog.objects.create(
+        return DateiOperationLog(
             operation=operation,
             success=bool(success),
             actor=None,
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from webapp.models import Buchung, MietkontoSaldo
+
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+MONEY_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+class MietkontoSaldoService:
+    """Pflegt die Monatssalden je Mietvertrag (``MietkontoSaldo``).
+
+    Ändert sich eine Buchung, werden nur die Monate ab dem betroffenen Monat neu
+    aggregiert; der Vortrag kommt aus dem Vormonatssaldo. Ansichten lesen so eine
+    Saldozeile plus die Buchungen des angezeigten Monats statt des ganzen Kontos.
+    """
+
+    @classmethod
+    def refresh(cls, lease_id: int, *, from_month: date | None = None) -> int:
+        """Schreibt die Salden eines Vertrags ab ``from_month`` (Default: alles) neu."""
+        if not lease_id:
+            return 0
+        bookings = Buchung.objects.filter(mietervertrag_id=lease_id)
+        snapshots = MietkontoSaldo.objects.filter(mietervertrag_id=lease_id)
+        vortrag = ZERO
+        if from_month is not None:
+            from_month = _month_start(from_month)
+            bookings = bookings.filter(datum__gte=from_month)
+            previous = snapshots.filter(monat__lt=from_month).order_by("-monat").values_list("endsaldo", flat=True).first()
+            vortrag = Decimal(previous or ZERO).quantize(CENT)
+            snapshots = snapshots.filter(monat__gte=from_month)
+
+        month_rows = (
+            bookings.annotate(month_start=TruncMonth("datum"))
+            .values("month_start")
+            .annotate(
+                soll=Coalesce(Sum("brutto", filter=Q(typ=Buchung.Typ.SOLL), output_field=MONEY_FIELD), Value(ZERO)),
+                haben=Coalesce(Sum("brutto", filter=Q(typ=Buchung.Typ.IST), output_field=MONEY_FIELD), Value(ZERO)),
+            )
+            .order_by("month_start")
+        )
+        new_rows = []
+        for row in month_rows:
+            soll = Decimal(row["soll"]).quantize(CENT)
+            haben = Decimal(row["haben"]).quantize(CENT)
+            endsaldo = (vortrag + haben - soll).quantize(CENT)
+            new_rows.append(
+                MietkontoSaldo(
+                    mietervertrag_id=lease_id,
+                    monat=row["month_start"],
+                    vortrag=vortrag,
+                    soll=soll,
+                    haben=haben,
+                    endsaldo=endsaldo,
+                )
+            )
+            vortrag = endsaldo
+
+        with transaction.atomic():
+            snapshots.delete()
+            MietkontoSaldo.objects.bulk_create(new_rows)
+        return len(new_rows)
+
+    @classmethod
+    def refresh_slots(cls, slots: Iterable[tuple[int | None, date | None]]) -> None:
+        """Frischt je Vertrag ab dem frühesten betroffenen Monat auf; ``slots`` sind ``(vertrag_id, datum)``."""
+        earliest: dict[int, date] = {}
+        for lease_id, booking_date in slots:
+            if lease_id and booking_date:
+                month = _month_start(booking_date)
+                if lease_id not in earliest or month < earliest[lease_id]:
+                    earliest[lease_id] = month
+        for lease_id, month in earliest.items():
+            cls.refresh(lease_id, from_month=month)
+
+    @classmethod
+    def refresh_for_bookings(cls, bookings: Iterable[Buchung]) -> None:
+        """Nachführen nach ``bulk_create`` o. Ä., die keine Signale auslösen."""
+        cls.refresh_slots((buchung.mietervertrag_id, buchung.datum) for buchung in bookings)
+
+    @classmethod
+    def rebuild(cls, *, lease_ids: Iterable[int] | None = None) -> dict[str, int]:
+        if lease_ids is None:
+            lease_ids = (
+                Buchung.objects.filter(mietervertrag__isnull=False)
+                .values_list("mietervertrag_id", flat=True)
+                .distinct()
+                .order_by("mietervertrag_id")
+            )
+            # Verträge ohne Buchungen behalten sonst alte Salden.
+            MietkontoSaldo.objects.exclude(mietervertrag_id__in=lease_ids).delete()
+        summary = {"leases": 0, "months": 0}
+        for lease_id in list(lease_ids):
+            summary["leases"] += 1
+            summary["months"] += cls.refresh(lease_id)
+        return summary
+
+    @staticmethod
+    def month_value_subquery(field: str, *, month: date, lease_ref: str = "pk") -> Coalesce:
+        """``soll``/``haben``/… des Monatsabschlusses ``month`` als Subquery (0 ohne Buchungen im Monat)."""
+        snapshots = MietkontoSaldo.objects.filter(mietervertrag_id=OuterRef(lease_ref), monat=_month_start(month))
+        return Coalesce(
+            Subquery(snapshots.values(field)[:1], output_field=MONEY_FIELD),
+            Value(ZERO),
+            output_field=MONEY_FIELD,
+        )
+
+    @classmethod
+    def month_series(cls, leases, *, start: date, end: date) -> dict[int, list[dict[str, object]]]:
+        """Vortrag, Soll, Haben und Endsaldo je Vertrag für jeden Monat von ``start`` bis ``end``.
+
+        Liest nur die Salden im Zeitraum plus den letzten Abschluss davor; Monate ohne
+        Buchungen übernehmen den Vortrag. ``leases`` ist ein Queryset von Mietverträgen.
+        """
+        start = _month_start(start)
+        end = _month_start(end)
+        months = []
+        month = start
+        while month <= end:
+            months.append(month)
+            month = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+        carry = {
+            lease_id: Decimal(saldo).quantize(CENT)
+            for lease_id, saldo in leases.order_by()
+            .annotate(opening_saldo=cls.endsaldo_subquery(before=start))
+            .values_list("pk", "opening_saldo")
+        }
+        snapshots: dict[tuple[int, date], tuple[Decimal, Decimal, Decimal, Decimal]] = {
+            (lease_id, monat): (vortrag, soll, haben, endsaldo)
+            for lease_id, monat, vortrag, soll, haben, endsaldo in MietkontoSaldo.objects.filter(
+                mietervertrag__in=leases.order_by().values("pk"),
+                monat__gte=start,
+                monat__lte=end,
+            ).values_list("mietervertrag_id", "monat", "vortrag", "soll", "haben", "endsaldo")
+        }
+
+        series: dict[int, list[dict[str, object]]] = {}
+        for lease_id, saldo in carry.items():
+            rows = series.setdefault(lease_id, [])
+            for month in months:
+                vortrag, soll, haben, endsaldo = snapshots.get((lease_id, month), (saldo, ZERO, ZERO, saldo))
+                rows.append({"monat": month, "vortrag": vortrag, "soll": soll, "haben": haben, "endsaldo": endsaldo})
+                saldo = endsaldo
+        return series
+
+    @staticmethod
+    def endsaldo_subquery(*, before: date | None = None, lease_ref: str = "pk") -> Coalesce:
+        """Saldo je Vertrag als Subquery: letzter Monatsabschluss (vor ``before``)."""
+        snapshots = MietkontoSaldo.objects.filter(mietervertrag_id=OuterRef(lease_ref))
+        if before is not None:
+            snapshots = snapshots.filter(monat__lt=_month_start(before))
+        return Coalesce(
+            Subquery(snapshots.order_by("-monat").values("endsaldo")[:1], output_field=MONEY_FIELD),
+            Value(ZERO),
+            output_field=MONEY_FIELD,
+        )
+
+
+@receiver(pre_save, sender=Buchung, dispatch_uid="mietkonto_saldo_buchung_pre_save")
+def _remember_previous_ledger_slot(sender, instance: Buchung, raw=False, **kwargs):
+    instance._mietkonto_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._mietkonto_previous = (
+        Buchung.objects.filter(pk=instance.pk).values_list("mietervertrag_id", "datum").first()
+    )
+
+
+@receiver(post_save, sender=Buchung, dispatch_uid="mietkonto_saldo_buchung_post_save")
+def _refresh_after_save(sender, instance: Buchung, raw=False, **kwargs):
+    if raw:
+        return
+    slots = {(instance.mietervertrag_id, instance.datum)}
+    previous = getattr(instance, "_mietkonto_previous", None)
+    if previous is not None:
+        slots.add(previous)
+    MietkontoSaldoService.refresh_slots(slots)
+
+
+@receiver(post_delete, sender=Buchung, dispatch_uid="mietkonto_saldo_buchung_post_delete")
+def _refresh_after_delete(sender, instance: Buchung, **kwargs):
+    MietkontoSaldoService.refresh_slots([(instance.mietervertrag_id, instance.datum)])
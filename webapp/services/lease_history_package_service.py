@@ -29,6 +29,7 @@ from webapp.models import (
     VpiAdjustmentLetter,
 )
 from webapp.services.files import DateiService
+from webapp.services.storage_tiers import DateiStorageTiers
 
 
 @dataclass(frozen=True)
@@ -70,8 +71,7 @@ class LeaseHistoryPackageService:
                 uploaded_by=None,
             )
             datei.set_upload_context(content_object=self.lease)
-            datei.full_clean()
-            datei.save()
+            DateiService.save_new_datei(datei)
 
             DateiZuordnung.objects.create(
                 datei=datei,
@@ -651,7 +651,7 @@ class LeaseHistoryPackageService:
 
     @staticmethod
     def _read_file_bytes(datei: Datei) -> bytes:
-        with datei.file.open("rb") as stream:
+        with DateiStorageTiers.open(datei) as stream:
             return stream.read()
 
     @staticmethod
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from datetime import date, datetime
 import json
 import logging
 import mimetypes
 import os
+import time
 from uuid import uuid4
 from typing import Any
 from urllib.error import HTTPError, URLError
@@ -13,9 +15,14 @@ from urllib.request import Request, urlopen
 
 from django.conf import settings
 
+from .paperless_metrics import PaperlessMetrics
+from .paperless_resilience import PaperlessCircuitBreaker, PaperlessLatencyBudget
+from .paperless_search_cache import PaperlessSearchCache
+
 
 DEFAULT_TIMEOUT_SECONDS = 10
 LOOKUP_PAGE_SIZE = 200
+MIN_CALL_TIMEOUT_SECONDS = 0.25
 logger = logging.getLogger(__name__)
 
 
@@ -165,6 +172,50 @@ class PaperlessService:
                 "Bitte PAPERLESS_BASE_URL und PAPERLESS_API_TOKEN in der .env setzen."
             )
 
+        cache_params = {
+            "base_url": cls.base_url(),
+            "query": normalized_query,
+            "q_liegenschaft": normalized_q_liegenschaft,
+            "q_einheit": normalized_q_einheit,
+            "q_mieter": normalized_q_mieter,
+            "q_source_ref": normalized_q_source_ref,
+            "tags": normalized_tags,
+            "document_type": normalized_document_type_query,
+            "limit": normalized_limit,
+            "sort": normalized_sort,
+            "reverse": bool(reverse),
+        }
+        return PaperlessSearchCache.get_or_fetch(
+            cache_params,
+            lambda: cls._fetch_search_results(
+                query=normalized_query,
+                q_liegenschaft=normalized_q_liegenschaft,
+                q_einheit=normalized_q_einheit,
+                q_mieter=normalized_q_mieter,
+                q_source_ref=normalized_q_source_ref,
+                tags=normalized_tags,
+                document_type_query=normalized_document_type_query,
+                limit=normalized_limit,
+                sort=normalized_sort,
+                reverse=reverse,
+            ),
+        )
+
+    @classmethod
+    def _fetch_search_results(
+        cls,
+        *,
+        query: str,
+        q_liegenschaft: str,
+        q_einheit: str,
+        q_mieter: str,
+        q_source_ref: list[str],
+        tags: list[str],
+        document_type_query: str,
+        limit: int | None,
+        sort: str,
+        reverse: bool,
+    ) -> list[dict[str, Any]]:
         tag_lookup = cls._safe_fetch_lookup_map(endpoint="tags/")
         tag_id_by_name = {
             tag_name: tag_id
@@ -172,33 +223,33 @@ class PaperlessService:
         }
         selected_tag_ids = [
             str(tag_id_by_name[tag_name])
-            for tag_name in normalized_tags
+            for tag_name in tags
             if tag_name in tag_id_by_name
         ]
-        if normalized_tags and not selected_tag_ids:
+        if tags and not selected_tag_ids:
             return []
 
         page_size = LOOKUP_PAGE_SIZE
-        if normalized_limit is not None:
-            page_size = max(1, min(normalized_limit, LOOKUP_PAGE_SIZE))
+        if limit is not None:
+            page_size = max(1, min(limit, LOOKUP_PAGE_SIZE))
 
         query_params: dict[str, Any] = {"page_size": str(page_size)}
-        if normalized_query:
-            query_params["query"] = normalized_query
+        if query:
+            query_params["query"] = query
         custom_field_query = cls._build_custom_field_query(
-            q_liegenschaft=normalized_q_liegenschaft,
-            q_einheit=normalized_q_einheit,
-            q_mieter=normalized_q_mieter,
-            q_source_ref=normalized_q_source_ref,
+            q_liegenschaft=q_liegenschaft,
+            q_einheit=q_einheit,
+            q_mieter=q_mieter,
+            q_source_ref=q_source_ref,
         )
         if custom_field_query:
             query_params["custom_field_query"] = custom_field_query
         if selected_tag_ids:
             query_params["tags__id__all"] = selected_tag_ids
-        if normalized_document_type_query:
-            query_params["document_type__id__in"] = normalized_document_type_query
-        if normalized_sort:
-            query_params["sort"] = normalized_sort
+        if document_type_query:
+            query_params["document_type__id__in"] = document_type_query
+        if sort:
+            query_params["sort"] = sort
         if reverse:
             query_params["reverse"] = "1"
 
@@ -238,8 +289,8 @@ class PaperlessService:
                     custom_field_option_lookup=custom_field_option_lookup,
                 )
             )
-        if normalized_limit is not None:
-            return documents[:normalized_limit]
+        if limit is not None:
+            return documents[:limit]
         return documents
 
     @classmethod
@@ -255,6 +306,24 @@ class PaperlessService:
             )
         ]
 
+    @classmethod
+    def document_modified(cls, *, document_id: int) -> str:
+        """Aktueller ``modified``-Zeitstempel eines Dokuments, wie ihn auch die Suche liefert."""
+        if not cls.is_configured():
+            raise PaperlessSearchError(
+                "Paperless ist noch nicht konfiguriert. "
+                "Bitte PAPERLESS_BASE_URL und PAPERLESS_API_TOKEN in der .env setzen."
+            )
+        payload = cls._request_json(
+            cls._build_url(
+                endpoint=f"documents/{int(document_id)}/",
+                query_params={"fields": "id,modified"},
+            )
+        )
+        if not isinstance(payload, dict):
+            raise PaperlessSearchError("Ungültige Antwort von Paperless erhalten.")
+        return str(payload.get("modified") or "").strip()
+
     @classmethod
     def download_document(cls, *, document_id: int) -> tuple[bytes, str, str]:
         if not cls.is_configured():
@@ -272,8 +341,9 @@ class PaperlessService:
             },
             method="GET",
         )
+        call_timeout = cls._call_timeout(request_url)
         try:
-            with urlopen(request, timeout=cls.timeout_seconds()) as response:
+            with cls._guarded_urlopen(request, timeout=call_timeout) as response:
                 content = response.read()
                 content_type = response.headers.get_content_type() or "application/octet-stream"
                 filename = response.headers.get_filename() or f"paperless_{int(document_id)}"
@@ -406,8 +476,26 @@ class PaperlessService:
         task_id = cls._parse_upload_response(response_bytes)
         if not task_id:
             raise PaperlessSearchError("Paperless hat keine Task-ID für den Upload zurückgegeben.")
+        PaperlessSearchCache.invalidate()
         return task_id
 
+    @classmethod
+    def fetch_task(cls, task_id: str) -> dict[str, Any] | None:
+        """Liefert den Paperless-Task zu einer Upload-Task-ID oder ``None``, wenn er unbekannt ist."""
+        if not cls.is_configured():
+            raise PaperlessSearchError(
+                "Paperless ist noch nicht konfiguriert. "
+                "Bitte PAPERLESS_BASE_URL und PAPERLESS_API_TOKEN in der .env setzen."
+            )
+        payload = cls._request_json(
+            cls._build_url(endpoint="tasks/", query_params={"task_id": str(task_id or "").strip()})
+        )
+        if isinstance(payload, dict):
+            payload = payload.get("results", [])
+        if isinstance(payload, list) and payload and isinstance(payload[0], dict):
+            return payload[0]
+        return None
+
     @classmethod
     def _request_json(cls, request_url: str) -> Any:
         request = Request(
@@ -418,8 +506,9 @@ class PaperlessService:
             },
             method="GET",
         )
+        call_timeout = cls._call_timeout(request_url)
         try:
-            with urlopen(request, timeout=cls.timeout_seconds()) as response:
+            with cls._guarded_urlopen(request, timeout=call_timeout) as response:
                 return json.loads(response.read().decode("utf-8"))
         except HTTPError as exc:
             logger.warning("Paperless request failed with HTTP %s for %s", exc.code, request_url)
@@ -504,8 +593,9 @@ class PaperlessService:
             },
             method="POST",
         )
+        call_timeout = cls._call_timeout(request_url)
         try:
-            with urlopen(request, timeout=cls.timeout_seconds()) as response:
+            with cls._guarded_urlopen(request, timeout=call_timeout) as response:
                 return response.read()
         except HTTPError as exc:
             logger.warning("Paperless multipart request failed with HTTP %s for %s", exc.code, request_url)
@@ -534,6 +624,62 @@ class PaperlessService:
             logger.exception("Paperless multipart request failed unexpectedly for %s", request_url)
             raise PaperlessSearchError("Paperless-Upload konnte nicht ausgeführt werden.") from None
 
+    @classmethod
+    def _call_timeout(cls, request_url: str) -> float:
+        """Timeout für die nächste Anfrage; wirft, wenn Budget oder Circuit Breaker sie verbieten."""
+        timeout = float(cls.timeout_seconds())
+        remaining = PaperlessLatencyBudget.remaining_seconds()
+        if remaining is not None:
+            if remaining < MIN_CALL_TIMEOUT_SECONDS:
+                logger.warning("Paperless page budget exhausted; skipping request.")
+                PaperlessMetrics.record(
+                    request_url=request_url,
+                    duration_seconds=None,
+                    outcome=PaperlessMetrics.OUTCOME_SKIPPED,
+                )
+                raise PaperlessSearchError(
+                    "Paperless antwortet zu langsam. Weitere Anfragen für diese Seite wurden übersprungen."
+                )
+            timeout = min(timeout, remaining)
+        if not PaperlessCircuitBreaker.allow_request():
+            PaperlessMetrics.record(
+                request_url=request_url,
+                duration_seconds=None,
+                outcome=PaperlessMetrics.OUTCOME_SKIPPED,
+            )
+            raise PaperlessSearchError(
+                "Paperless ist derzeit nicht erreichbar. Anfragen werden vorübergehend ausgesetzt."
+            )
+        return timeout
+
+    @classmethod
+    @contextmanager
+    def _guarded_urlopen(cls, request: Request, *, timeout: float):
+        # Nur Netzwerkfehler und HTTP-5xx zählen für den Circuit Breaker; 4xx zeigt einen erreichbaren Server.
+        failed = False
+        outcome = PaperlessMetrics.OUTCOME_ERROR
+        started_at = time.perf_counter()
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                yield response
+            outcome = PaperlessMetrics.OUTCOME_OK
+        except HTTPError as exc:
+            failed = exc.code >= 500
+            raise
+        except OSError:
+            failed = True
+            raise
+        finally:
+            if failed:
+                PaperlessCircuitBreaker.record_failure()
+            else:
+                PaperlessCircuitBreaker.record_success()
+            PaperlessMetrics.record(
+                request_url=request.full_url,
+                duration_seconds=time.perf_counter() - started_at,
+                outcome=outcome,
+            )
+
     @classmethod
     def _parse_upload_response(cls, response_bytes: bytes) -> str:
         response_text = response_bytes.decode("utf-8", errors="replace").strip()
@@ -943,6 +1089,7 @@ class PaperlessService:
             "id": document_id,
             "title": title,
             "created": created,
+            "modified": str(raw_document.get("modified") or "").strip(),
             "document_type": document_type,
             "tags": tags,
             "q_liegenschaft": q_liegenschaft,
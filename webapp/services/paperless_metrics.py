@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+import logging
+import threading
+from urllib.parse import urlparse
+
+from django.db import transaction
+from django.db.models import IntegerField, Max, Sum
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from webapp.models import PaperlessRequestStat
+
+
+HISTOGRAM_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INF_BUCKET = "+Inf"
+HISTOGRAM_KEYS = (*(str(upper_bound) for upper_bound in HISTOGRAM_BUCKETS_SECONDS), INF_BUCKET)
+# Sammelzeile je Endpunkt und View für gelöschte Stunden (siehe PaperlessMetrics.prune).
+ROLLUP_BUCKET_START = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+BACKGROUND_VIEW_NAME = "background"
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _EndpointSample:
+    request_count: int = 0
+    error_count: int = 0
+    skipped_count: int = 0
+    total_duration_ms: int = 0
+    max_duration_ms: int = 0
+    histogram: dict[str, int] = field(default_factory=dict)
+
+
+class PaperlessMetricsCollector:
+    """Sammelt Paperless-Anfragen eines Requests bzw. Befehls und schreibt sie gebündelt."""
+
+    def __init__(self, view_name: str = BACKGROUND_VIEW_NAME):
+        self.view_name = view_name
+        self._lock = threading.Lock()
+        self._samples: dict[str, _EndpointSample] = defaultdict(_EndpointSample)
+
+    def add(self, *, endpoint: str, duration_seconds: float | None, outcome: str) -> None:
+        with self._lock:
+            sample = self._samples[endpoint]
+            if outcome == PaperlessMetrics.OUTCOME_SKIPPED:
+                sample.skipped_count += 1
+                return
+            sample.request_count += 1
+            if outcome == PaperlessMetrics.OUTCOME_ERROR:
+                sample.error_count += 1
+            duration_ms = max(int(round((duration_seconds or 0.0) * 1000)), 0)
+            sample.total_duration_ms += duration_ms
+            sample.max_duration_ms = max(sample.max_duration_ms, duration_ms)
+            bucket_key = PaperlessMetrics.histogram_bucket(duration_seconds or 0.0)
+            sample.histogram[bucket_key] = sample.histogram.get(bucket_key, 0) + 1
+
+    def flush(self, *, now: datetime | None = None) -> None:
+        with self._lock:
+            samples = dict(self._samples)
+            self._samples.clear()
+        if not samples:
+            return
+        bucket_start = PaperlessMetrics.bucket_start(now or timezone.now())
+        view_name = str(self.view_name or BACKGROUND_VIEW_NAME)[:200]
+        try:
+            with transaction.atomic():
+                for endpoint, sample in samples.items():
+                    stat, _created = PaperlessRequestStat.objects.select_for_update().get_or_create(
+                        bucket_start=bucket_start,
+                        endpoint=endpoint,
+                        view_name=view_name,
+                    )
+                    _merge_sample(stat, sample)
+        except Exception:
+            logger.exception("Paperless request metrics could not be stored.")
+
+
+def _merge_sample(stat: PaperlessRequestStat, sample: _EndpointSample) -> None:
+    stat.request_count += sample.request_count
+    stat.error_count += sample.error_count
+    stat.skipped_count += sample.skipped_count
+    stat.total_duration_ms += sample.total_duration_ms
+    stat.max_duration_ms = max(stat.max_duration_ms, sample.max_duration_ms)
+    histogram = dict(stat.duration_histogram or {})
+    for bucket_key, count in sample.histogram.items():
+        histogram[bucket_key] = int(histogram.get(bucket_key, 0)) + count
+    stat.duration_histogram = histogram
+    stat.save()
+
+
+_active_collector: ContextVar[PaperlessMetricsCollector | None] = ContextVar(
+    "paperless_metrics_collector",
+    default=None,
+)
+
+
+class PaperlessMetrics:
+    OUTCOME_OK = "ok"
+    OUTCOME_ERROR = "error"
+    OUTCOME_SKIPPED = "skipped"
+
+    @staticmethod
+    def endpoint_for_url(request_url: str) -> str:
+        path = urlparse(str(request_url or "")).path
+        if "/api/" in path:
+            path = path.split("/api/", 1)[1]
+        segments = [segment for segment in path.split("/") if segment]
+        if not segments:
+            return PaperlessRequestStat.Endpoint.OTHER
+        head = segments[0]
+        if head == "documents":
+            if "post_document" in segments:
+                return PaperlessRequestStat.Endpoint.UPLOAD
+            if "download" in segments or "preview" in segments or "thumb" in segments:
+                return PaperlessRequestStat.Endpoint.DOWNLOAD
+            return PaperlessRequestStat.Endpoint.DOCUMENTS
+        if head in {
+            PaperlessRequestStat.Endpoint.TAGS,
+            PaperlessRequestStat.Endpoint.DOCUMENT_TYPES,
+            PaperlessRequestStat.Endpoint.CUSTOM_FIELDS,
+        }:
+            return head
+        return PaperlessRequestStat.Endpoint.OTHER
+
+    @staticmethod
+    def histogram_bucket(duration_seconds: float) -> str:
+        for upper_bound in HISTOGRAM_BUCKETS_SECONDS:
+            if duration_seconds <= upper_bound:
+                return str(upper_bound)
+        return INF_BUCKET
+
+    @staticmethod
+    def bucket_start(value: datetime) -> datetime:
+        return value.replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def record(cls, *, request_url: str, duration_seconds: float | None, outcome: str) -> None:
+        endpoint = cls.endpoint_for_url(request_url)
+        collector = _active_collector.get()
+        if collector is not None:
+            collector.add(endpoint=endpoint, duration_seconds=duration_seconds, outcome=outcome)
+            return
+        standalone = PaperlessMetricsCollector()
+        standalone.add(endpoint=endpoint, duration_seconds=duration_seconds, outcome=outcome)
+        standalone.flush()
+
+    @classmethod
+    @contextmanager
+    def collect(cls, view_name: str = BACKGROUND_VIEW_NAME):
+        existing = _active_collector.get()
+        if existing is not None:
+            yield existing
+            return
+        collector = PaperlessMetricsCollector(view_name=view_name)
+        token = _active_collector.set(collector)
+        try:
+            yield collector
+        finally:
+            _active_collector.reset(token)
+            collector.flush()
+
+    @classmethod
+    def summarize(cls, *, since: datetime | None = None) -> dict[str, object]:
+        """Summen je Endpunkt und View, per SQL aggregiert.
+
+        Ohne ``since`` ist die Sammelzeile gelöschter Stunden enthalten (Gesamtzähler).
+        """
+        queryset = PaperlessRequestStat.objects.all()
+        if since is not None:
+            queryset = queryset.filter(bucket_start__gte=cls.bucket_start(since))
+
+        endpoints = []
+        for row in cls._aggregate(queryset, "endpoint"):
+            requests = int(row["requests"])
+            endpoints.append(
+                {
+                    "endpoint": row["endpoint"],
+                    "requests": requests,
+                    "errors": row["errors"],
+                    "skipped": row["skipped"],
+                    "total_duration_ms": row["total_duration_ms"],
+                    "max_duration_ms": row["max_duration_ms"],
+                    "histogram": row["histogram"],
+                    "avg_duration_ms": round(int(row["total_duration_ms"]) / requests) if requests else 0,
+                    "p95_le_seconds": cls._percentile_upper_bound(row["histogram"], 0.95),
+                }
+            )
+        views = [
+            {
+                "view_name": row["view_name"],
+                "requests": row["requests"],
+                "errors": row["errors"],
+                "skipped": row["skipped"],
+                "total_duration_ms": row["total_duration_ms"],
+            }
+            for row in cls._aggregate(queryset, "view_name", with_histogram=False)
+        ]
+
+        return {
+            "endpoints": sorted(endpoints, key=lambda row: (-int(row["requests"]), row["endpoint"])),
+            "views": sorted(views, key=lambda row: (-int(row["requests"]), row["view_name"])),
+        }
+
+    @staticmethod
+    def _aggregate(queryset, *group_fields: str, with_histogram: bool = True) -> list[dict[str, object]]:
+        annotations = {
+            "requests": Coalesce(Sum("request_count"), 0),
+            "errors": Coalesce(Sum("error_count"), 0),
+            "skipped": Coalesce(Sum("skipped_count"), 0),
+            "total_duration_ms": Coalesce(Sum("total_duration_ms"), 0),
+        }
+        if with_histogram:
+            annotations["max_duration_ms"] = Coalesce(Max("max_duration_ms"), 0)
+            for index, bucket_key in enumerate(HISTOGRAM_KEYS):
+                annotations[f"histogram_{index}"] = Coalesce(
+                    Sum(Cast(KeyTextTransform(bucket_key, "duration_histogram"), IntegerField())),
+                    0,
+                )
+        rows = list(queryset.order_by().values(*group_fields).annotate(**annotations))
+        if with_histogram:
+            for row in rows:
+                row["histogram"] = {
+                    bucket_key: count
+                    for index, bucket_key in enumerate(HISTOGRAM_KEYS)
+                    if (count := int(row.pop(f"histogram_{index}")))
+                }
+        return rows
+
+    @classmethod
+    def render_prometheus(cls) -> str:
+        summary = cls.summarize()
+        lines = [
+            "# HELP quintus_paperless_requests_total Ausgeführte Paperless-Anfragen je Endpunkt.",
+            "# TYPE quintus_paperless_requests_total counter",
+        ]
+        for row in summary["endpoints"]:
+            lines.append(f'quintus_paperless_requests_total{{endpoint="{row["endpoint"]}"}} {row["requests"]}')
+        lines.extend(
+            [
+                "# HELP quintus_paperless_request_errors_total Fehlgeschlagene Paperless-Anfragen je Endpunkt.",
+                "# TYPE quintus_paperless_request_errors_total counter",
+            ]
+        )
+        for row in summary["endpoints"]:
+            lines.append(f'quintus_paperless_request_errors_total{{endpoint="{row["endpoint"]}"}} {row["errors"]}')
+        lines.extend(
+            [
+                "# HELP quintus_paperless_requests_skipped_total Übersprungene Paperless-Anfragen je Endpunkt.",
+                "# TYPE quintus_paperless_requests_skipped_total counter",
+            ]
+        )
+        for row in summary["endpoints"]:
+            lines.append(f'quintus_paperless_requests_skipped_total{{endpoint="{row["endpoint"]}"}} {row["skipped"]}')
+        lines.extend(
+            [
+                "# HELP quintus_paperless_request_duration_seconds Dauer der Paperless-Anfragen.",
+                "# TYPE quintus_paperless_request_duration_seconds histogram",
+            ]
+        )
+        for row in summary["endpoints"]:
+            endpoint = row["endpoint"]
+            histogram = row["histogram"]
+            cumulative = 0
+            for upper_bound in HISTOGRAM_BUCKETS_SECONDS:
+                cumulative += int(histogram.get(str(upper_bound), 0))
+                lines.append(
+                    f'quintus_paperless_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{upper_bound}"}} {cumulative}'
+                )
+            cumulative += int(histogram.get(INF_BUCKET, 0))
+            lines.append(
+                f'quintus_paperless_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{INF_BUCKET}"}} {cumulative}'
+            )
+            lines.append(
+                f'quintus_paperless_request_duration_seconds_sum{{endpoint="{endpoint}"}} {int(row["total_duration_ms"]) / 1000:.3f}'
+            )
+            lines.append(f'quintus_paperless_request_duration_seconds_count{{endpoint="{endpoint}"}} {cumulative}')
+        lines.extend(
+            [
+                "# HELP quintus_paperless_view_requests_total Paperless-Anfragen je auslösender View.",
+                "# TYPE quintus_paperless_view_requests_total counter",
+            ]
+        )
+        for row in summary["views"]:
+            view_label = str(row["view_name"]).replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'quintus_paperless_view_requests_total{{view="{view_label}"}} {row["requests"]}')
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def prune(cls, *, older_than_days: int, now: datetime | None = None) -> int:
+        """Löscht alte Stunden und rechnet sie in die Sammelzeile je Endpunkt und View ein.
+
+        So bleiben die ``*_total``-Zähler für Prometheus monoton.
+        """
+        cutoff = (now or timezone.now()) - timedelta(days=max(int(older_than_days), 1))
+        expired = PaperlessRequestStat.objects.filter(bucket_start__lt=cutoff).exclude(
+            bucket_start=ROLLUP_BUCKET_START
+        )
+        with transaction.atomic():
+            for row in cls._aggregate(expired, "endpoint", "view_name"):
+                rollup, _created = PaperlessRequestStat.objects.select_for_update().get_or_create(
+                    bucket_start=ROLLUP_BUCKET_START,
+                    endpoint=row["endpoint"],
+                    view_name=row["view_name"],
+                )
+                _merge_sample(
+                    rollup,
+                    _EndpointSample(
+                        request_count=row["requests"],
+                        error_count=row["errors"],
+                        skipped_count=row["skipped"],
+                        total_duration_ms=row["total_duration_ms"],
+                        max_duration_ms=row["max_duration_ms"],
+                        histogram=row["histogram"],
+                    ),
+                )
+            deleted, _details = expired.delete()
+        return deleted
+
+    @staticmethod
+    def _percentile_upper_bound(histogram: dict[str, int], percentile: float) -> str:
+        total = sum(int(count) for count in histogram.values())
+        if total <= 0:
+            return ""
+        threshold = total * percentile
+        cumulative = 0
+        for upper_bound in HISTOGRAM_BUCKETS_SECONDS:
+            cumulative += int(histogram.get(str(upper_bound), 0))
+            if cumulative >= threshold:
+                return str(upper_bound)
+        return INF_BUCKET
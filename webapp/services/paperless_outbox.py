@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
+from datetime import date, datetime, timedelta
+import hashlib
+import logging
+import mimetypes
+import os
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from webapp.models import PaperlessUpload
+
+from .paperless import PaperlessSearchError, PaperlessService
+from .paperless_metrics import PaperlessMetrics
+from .paperless_search_cache import PaperlessSearchCache
+
+
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BATCH_LIMIT = 50
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+STALE_CLAIM_AFTER = timedelta(minutes=30)
+TASK_DONE_STATUSES = {"SUCCESS", "FAILURE", "REVOKED"}
+logger = logging.getLogger(__name__)
+
+
+class PaperlessOutboxService:
+    """Persistente Warteschlange für Uploads an Paperless.
+
+    Dateien werden zuerst lokal gespeichert und später vom Worker
+    (``send_paperless_uploads``) mit Backoff übertragen.
+    """
+
+    # Nur noch nicht übertragene Einträge fassen identische Anfragen zusammen.
+    QUEUED_STATUSES = (
+        PaperlessUpload.Status.PENDING,
+        PaperlessUpload.Status.SENDING,
+    )
+
+    @staticmethod
+    def max_workers() -> int:
+        raw_value = getattr(settings, "PAPERLESS_OUTBOX_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_WORKERS
+        return max(value, 1)
+
+    @staticmethod
+    def max_attempts() -> int:
+        raw_value = getattr(settings, "PAPERLESS_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_ATTEMPTS
+        return max(value, 1)
+
+    @staticmethod
+    def backoff_delay(attempts: int) -> timedelta:
+        exponent = max(int(attempts) - 1, 0)
+        seconds = min(BACKOFF_BASE_SECONDS * (2**exponent), BACKOFF_MAX_SECONDS)
+        return timedelta(seconds=seconds)
+
+    @classmethod
+    def enqueue(
+        cls,
+        *,
+        uploaded_file,
+        title: str = "",
+        description: str = "",
+        q_liegenschaft: str = "",
+        q_einheit: str = "",
+        q_mieter: str = "",
+        q_source_ref: str = "",
+        tags: list[str] | None = None,
+        document_type_id: int | None = None,
+        created: date | datetime | str | None = None,
+    ) -> tuple[PaperlessUpload, bool]:
+        if not PaperlessService.is_configured():
+            raise PaperlessSearchError(
+                "Paperless ist noch nicht konfiguriert. "
+                "Bitte PAPERLESS_BASE_URL und PAPERLESS_API_TOKEN in der .env setzen."
+            )
+
+        checksum, size_bytes = cls._checksum_and_size(uploaded_file)
+        metadata = {
+            "title": str(title or "").strip(),
+            "description": str(description or "").strip(),
+            "q_liegenschaft": str(q_liegenschaft or "").strip(),
+            "q_einheit": str(q_einheit or "").strip(),
+            "q_mieter": str(q_mieter or "").strip(),
+            "q_source_ref": str(q_source_ref or "").strip(),
+            "document_type_id": PaperlessService._to_int(document_type_id),
+            "document_created": cls._normalize_created(created),
+        }
+        normalized_tags = PaperlessService._normalize_tag_names(tags)
+        # Gleiche Datei für ein anderes Ziel oder mit anderen Angaben wird erneut vorgemerkt.
+        for existing in PaperlessUpload.objects.filter(
+            checksum_sha256=checksum,
+            status__in=cls.QUEUED_STATUSES,
+            **metadata,
+        ).order_by("id"):
+            if list(existing.tags or []) == normalized_tags:
+                return existing, False
+
+        file_name = os.path.basename(getattr(uploaded_file, "name", "") or "upload.bin")
+        content_type = (
+            str(getattr(uploaded_file, "content_type", "") or "").strip()
+            or mimetypes.guess_type(file_name)[0]
+            or "application/octet-stream"
+        )
+        upload = PaperlessUpload(
+            file=uploaded_file,
+            original_name=file_name,
+            content_type=content_type,
+            size_bytes=size_bytes,
+            checksum_sha256=checksum,
+            tags=normalized_tags,
+            **metadata,
+        )
+        upload.save()
+        return upload, True
+
+    @classmethod
+    def dispatch_pending(
+        cls,
+        *,
+        limit: int = DEFAULT_BATCH_LIMIT,
+        max_workers: int | None = None,
+        now: datetime | None = None,
+    ) -> dict[str, int]:
+        current_time = now or timezone.now()
+        released = cls._release_stale_claims(now=current_time)
+        uploads = cls._claim_due_uploads(limit=limit, now=current_time)
+        summary = {
+            "claimed": len(uploads),
+            "sent": 0,
+            "retry_scheduled": 0,
+            "failed": 0,
+            "released_stale": released,
+        }
+        if not uploads:
+            return summary
+
+        # Nur die HTTP-Übertragung läuft parallel; DB-Updates bleiben im aufrufenden Thread.
+        worker_count = min(max_workers or cls.max_workers(), len(uploads))
+        with PaperlessMetrics.collect(view_name="command:send_paperless_uploads"), ThreadPoolExecutor(
+            max_workers=worker_count
+        ) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, cls._send, upload): upload
+                for upload in uploads
+            }
+            for future in as_completed(futures):
+                upload = futures[future]
+                try:
+                    task_id = future.result()
+                except PaperlessSearchError as exc:
+                    outcome = cls._record_failure(upload, error=str(exc), now=current_time)
+                except Exception as exc:
+                    logger.exception("Paperless outbox upload %s failed unexpectedly", upload.pk)
+                    outcome = cls._record_failure(upload, error=str(exc), now=current_time)
+                else:
+                    cls._record_success(upload, task_id=task_id, now=current_time)
+                    outcome = "sent"
+                summary[outcome] += 1
+        return summary
+
+    @classmethod
+    def confirm_consumed(cls, *, limit: int = DEFAULT_BATCH_LIMIT, now: datetime | None = None) -> int:
+        """Gleicht übertragene Uploads mit den Paperless-Tasks ab und vermerkt deren Abschluss.
+
+        Erst danach ist das Dokument in Paperless auffindbar; das Setzen von ``consumed_at``
+        verwirft die zwischengespeicherten Suchergebnisse.
+        """
+        current_time = now or timezone.now()
+        uploads = list(
+            PaperlessUpload.objects.filter(
+                status=PaperlessUpload.Status.SENT,
+                consumed_at__isnull=True,
+            )
+            .exclude(task_id="")
+            .order_by("sent_at", "id")[: max(int(limit), 1)]
+        )
+        consumed = 0
+        with PaperlessMetrics.collect(view_name="command:send_paperless_uploads"):
+            for upload in uploads:
+                try:
+                    task = PaperlessService.fetch_task(upload.task_id)
+                except PaperlessSearchError as exc:
+                    logger.warning("Paperless task lookup for upload %s failed: %s", upload.pk, exc)
+                    break
+                task_status = str((task or {}).get("status") or "").upper()
+                if task is not None and task_status not in TASK_DONE_STATUSES:
+                    continue
+                upload.consumed_at = current_time
+                update_fields = ["consumed_at", "updated_at"]
+                if task_status == "FAILURE":
+                    upload.last_error = PaperlessService._truncate_debug_text(
+                        str(task.get("result") or "Paperless konnte das Dokument nicht verarbeiten."),
+                        limit=2000,
+                    )
+                    update_fields.append("last_error")
+                upload.save(update_fields=update_fields)
+                consumed += 1
+        if consumed:
+            PaperlessSearchCache.invalidate()
+        return consumed
+
+    @classmethod
+    def retry_failed(cls, *, now: datetime | None = None) -> int:
+        return PaperlessUpload.objects.filter(status=PaperlessUpload.Status.FAILED).update(
+            status=PaperlessUpload.Status.PENDING,
+            attempts=0,
+            next_attempt_at=now or timezone.now(),
+            claim_token="",
+            claimed_at=None,
+        )
+
+    @classmethod
+    def recent_uploads(cls, *, q_source_ref: str = "", limit: int = 10) -> list[PaperlessUpload]:
+        queryset = PaperlessUpload.objects.order_by("-created_at", "-id")
+        normalized_source_ref = str(q_source_ref or "").strip()
+        if normalized_source_ref:
+            queryset = queryset.filter(q_source_ref=normalized_source_ref)
+        return list(queryset[:limit])
+
+    @classmethod
+    def _claim_due_uploads(cls, *, limit: int, now: datetime) -> list[PaperlessUpload]:
+        candidate_ids = list(
+            PaperlessUpload.objects.filter(
+                status=PaperlessUpload.Status.PENDING,
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[: max(int(limit), 1)]
+        )
+        if not candidate_ids:
+            return []
+
+        claim_token = uuid4().hex
+        PaperlessUpload.objects.filter(
+            pk__in=candidate_ids,
+            status=PaperlessUpload.Status.PENDING,
+        ).update(
+            status=PaperlessUpload.Status.SENDING,
+            claim_token=claim_token,
+            claimed_at=now,
+        )
+        return list(
+            PaperlessUpload.objects.filter(claim_token=claim_token).order_by("id")
+        )
+
+    @classmethod
+    def _release_stale_claims(cls, *, now: datetime) -> int:
+        return PaperlessUpload.objects.filter(
+            status=PaperlessUpload.Status.SENDING,
+            claimed_at__lt=now - STALE_CLAIM_AFTER,
+        ).update(
+            status=PaperlessUpload.Status.PENDING,
+            claim_token="",
+            claimed_at=None,
+        )
+
+    @classmethod
+    def _send(cls, upload: PaperlessUpload) -> str:
+        if not upload.file:
+            raise PaperlessSearchError("Lokale Datei für den Paperless-Upload fehlt.")
+        with upload.file.open("rb") as stream:
+            content = stream.read()
+        uploaded_file = SimpleUploadedFile(
+            upload.original_name,
+            content,
+            content_type=upload.content_type or None,
+        )
+        return PaperlessService.upload_document(
+            uploaded_file=uploaded_file,
+            title=upload.title,
+            description=upload.description,
+            q_liegenschaft=upload.q_liegenschaft,
+            q_einheit=upload.q_einheit,
+            q_mieter=upload.q_mieter,
+            q_source_ref=upload.q_source_ref,
+            tags=list(upload.tags or []),
+            document_type_id=upload.document_type_id,
+            created=upload.document_created,
+        )
+
+    @classmethod
+    def _record_success(cls, upload: PaperlessUpload, *, task_id: str, now: datetime) -> None:
+        if upload.file:
+            upload.file.delete(save=False)
+        upload.file = ""
+        upload.status = PaperlessUpload.Status.SENT
+        upload.task_id = str(task_id or "").strip()
+        upload.sent_at = now
+        upload.attempts += 1
+        upload.last_error = ""
+        upload.claim_token = ""
+        upload.claimed_at = None
+        upload.save(
+            update_fields=[
+                "file",
+                "status",
+                "task_id",
+                "sent_at",
+                "attempts",
+                "last_error",
+                "claim_token",
+                "claimed_at",
+                "updated_at",
+            ]
+        )
+
+    @classmethod
+    def _record_failure(cls, upload: PaperlessUpload, *, error: str, now: datetime) -> str:
+        upload.attempts += 1
+        upload.last_error = PaperlessService._truncate_debug_text(error, limit=2000)
+        upload.claim_token = ""
+        upload.claimed_at = None
+        if upload.attempts >= cls.max_attempts():
+            upload.status = PaperlessUpload.Status.FAILED
+            outcome = "failed"
+        else:
+            upload.status = PaperlessUpload.Status.PENDING
+            upload.next_attempt_at = now + cls.backoff_delay(upload.attempts)
+            outcome = "retry_scheduled"
+        upload.save(
+            update_fields=[
+                "attempts",
+                "last_error",
+                "claim_token",
+                "claimed_at",
+                "status",
+                "next_attempt_at",
+                "updated_at",
+            ]
+        )
+        return outcome
+
+    @staticmethod
+    def _checksum_and_size(uploaded_file) -> tuple[str, int]:
+        hasher = hashlib.sha256()
+        size_bytes = 0
+        if hasattr(uploaded_file, "seek"):
+            uploaded_file.seek(0)
+        if hasattr(uploaded_file, "chunks"):
+            chunks = uploaded_file.chunks()
+        else:
+            chunks = iter(lambda: uploaded_file.read(64 * 1024), b"")
+        for chunk in chunks:
+            if not chunk:
+                continue
+            hasher.update(chunk)
+            size_bytes += len(chunk)
+        if hasattr(uploaded_file, "seek"):
+            uploaded_file.seek(0)
+        return hasher.hexdigest(), size_bytes
+
+    @staticmethod
+    def _normalize_created(value: date | datetime | str | None) -> date | None:
+        if value in {None, ""}:
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return datetime.fromisoformat(str(value).strip()).date()
+        except ValueError:
+            return None
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_RESET_SECONDS = 60
+DEFAULT_PAGE_BUDGET_SECONDS = 4
+logger = logging.getLogger(__name__)
+
+_page_deadline: ContextVar[float | None] = ContextVar("paperless_page_deadline", default=None)
+
+
+def _setting_int(name: str, default: int) -> int:
+    raw_value = getattr(settings, name, default)
+    try:
+        return int(raw_value)
+    except (TypeError, ValueError):
+        return default
+
+
+class PaperlessCircuitBreaker:
+    """Prozessweiter Circuit Breaker für Paperless-Anfragen.
+
+    Nach ``PAPERLESS_CIRCUIT_FAILURE_THRESHOLD`` aufeinanderfolgenden Fehlern
+    werden Anfragen für ``PAPERLESS_CIRCUIT_RESET_SECONDS`` übersprungen.
+    Danach wird genau eine Probeanfrage durchgelassen (half-open).
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    _lock = threading.Lock()
+    _consecutive_failures = 0
+    _opened_at: float | None = None
+    _probe_in_flight = False
+
+    @staticmethod
+    def failure_threshold() -> int:
+        return _setting_int("PAPERLESS_CIRCUIT_FAILURE_THRESHOLD", DEFAULT_CIRCUIT_FAILURE_THRESHOLD)
+
+    @staticmethod
+    def reset_seconds() -> int:
+        return max(
+            _setting_int("PAPERLESS_CIRCUIT_RESET_SECONDS", DEFAULT_CIRCUIT_RESET_SECONDS),
+            1,
+        )
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.failure_threshold() > 0
+
+    @classmethod
+    def state(cls) -> str:
+        with cls._lock:
+            return cls._state_locked(time.monotonic())
+
+    @classmethod
+    def allow_request(cls) -> bool:
+        if not cls.is_enabled():
+            return True
+        with cls._lock:
+            current_state = cls._state_locked(time.monotonic())
+            if current_state == cls.STATE_CLOSED:
+                return True
+            if current_state == cls.STATE_HALF_OPEN and not cls._probe_in_flight:
+                cls._probe_in_flight = True
+                return True
+            return False
+
+    @classmethod
+    def record_success(cls) -> None:
+        with cls._lock:
+            if cls._opened_at is not None:
+                logger.info("Paperless circuit closed after successful probe.")
+            cls._consecutive_failures = 0
+            cls._opened_at = None
+            cls._probe_in_flight = False
+
+    @classmethod
+    def record_failure(cls) -> None:
+        if not cls.is_enabled():
+            return
+        with cls._lock:
+            now = time.monotonic()
+            cls._consecutive_failures += 1
+            was_probe = cls._probe_in_flight
+            cls._probe_in_flight = False
+            if was_probe or cls._consecutive_failures >= cls.failure_threshold():
+                if cls._opened_at is None or was_probe:
+                    logger.warning(
+                        "Paperless circuit opened after %s consecutive failures.",
+                        cls._consecutive_failures,
+                    )
+                cls._opened_at = now
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._consecutive_failures = 0
+            cls._opened_at = None
+            cls._probe_in_flight = False
+
+    @classmethod
+    def _state_locked(cls, now: float) -> str:
+        if cls._opened_at is None:
+            return cls.STATE_CLOSED
+        if now - cls._opened_at < cls.reset_seconds():
+            return cls.STATE_OPEN
+        return cls.STATE_HALF_OPEN
+
+
+class PaperlessLatencyBudget:
+    """Gemeinsames Zeitbudget aller Paperless-Anfragen einer Seite."""
+
+    @staticmethod
+    def page_budget_seconds() -> int:
+        return _setting_int("PAPERLESS_PAGE_BUDGET_SECONDS", DEFAULT_PAGE_BUDGET_SECONDS)
+
+    @classmethod
+    @contextmanager
+    def scope(cls, seconds: float | None = None):
+        budget_seconds = cls.page_budget_seconds() if seconds is None else seconds
+        if budget_seconds is None or budget_seconds <= 0:
+            yield
+            return
+        token = _page_deadline.set(time.monotonic() + float(budget_seconds))
+        try:
+            yield
+        finally:
+            _page_deadline.reset(token)
+
+    @staticmethod
+    def remaining_seconds() -> float | None:
+        deadline = _page_deadline.get()
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic(), 0.0)
+
+
+@receiver(setting_changed)
+def _reset_circuit_on_paperless_setting_change(*, setting, **kwargs):
+    if str(setting or "").startswith("PAPERLESS_"):
+        PaperlessCircuitBreaker.reset()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db.models import Max
+from django.dispatch import receiver
+
+from webapp.models import PaperlessUpload
+
+from .paperless_resilience import PaperlessLatencyBudget
+
+
+DEFAULT_SEARCH_CACHE_SECONDS = 60
+GENERATION_CACHE_KEY = "paperless:search:generation"
+
+
+class _InFlightSearch:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: list[dict[str, Any]] | None = None
+        self.error_message = ""
+
+
+class PaperlessSearchCache:
+    """Kurzlebiger Cache für Paperless-Suchergebnisse mit Bündelung gleichzeitiger Anfragen.
+
+    Gleiche Suchen innerhalb eines Prozesses teilen sich eine laufende Anfrage.
+    Der Schlüssel enthält den Stand der Upload-Warteschlange aus der Datenbank: Vormerken,
+    Übertragen und abgeschlossene Verarbeitung eines Uploads verwerfen damit die Einträge
+    aller Prozesse, auch mit prozesslokalem Cache.
+    """
+
+    _lock = threading.Lock()
+    _in_flight: dict[str, _InFlightSearch] = {}
+
+    @staticmethod
+    def ttl_seconds() -> int:
+        raw_value = getattr(settings, "PAPERLESS_SEARCH_CACHE_SECONDS", DEFAULT_SEARCH_CACHE_SECONDS)
+        try:
+            return max(int(raw_value), 0)
+        except (TypeError, ValueError):
+            return DEFAULT_SEARCH_CACHE_SECONDS
+
+    @staticmethod
+    def generation() -> int:
+        cache.add(GENERATION_CACHE_KEY, 1, timeout=None)
+        return int(cache.get(GENERATION_CACHE_KEY) or 1)
+
+    @staticmethod
+    def outbox_marker() -> str:
+        # Läuft bei jeder gecachten Suche; paperlessup_updated_idx macht daraus einen Indexzugriff.
+        latest = PaperlessUpload.objects.aggregate(latest=Max("updated_at"))["latest"]
+        return latest.isoformat() if latest else "0"
+
+    @staticmethod
+    def invalidate() -> None:
+        try:
+            cache.incr(GENERATION_CACHE_KEY)
+        except ValueError:
+            cache.set(GENERATION_CACHE_KEY, 2, timeout=None)
+
+    @classmethod
+    def build_key(cls, params: dict[str, Any]) -> str:
+        serialized = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        return f"paperless:search:v{cls.generation()}:{digest}"
+
+    @classmethod
+    def get_or_fetch(
+        cls,
+        params: dict[str, Any],
+        fetch: Callable[[], list[dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        from .paperless import PaperlessSearchError, PaperlessService
+
+        ttl = cls.ttl_seconds()
+        cache_key = cls.build_key(params)
+        if ttl > 0:
+            cache_key = f"{cache_key}:{cls.outbox_marker()}"
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        with cls._lock:
+            in_flight = cls._in_flight.get(cache_key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = _InFlightSearch()
+                cls._in_flight[cache_key] = in_flight
+
+        if not is_leader:
+            wait_seconds = float(PaperlessService.timeout_seconds())
+            remaining = PaperlessLatencyBudget.remaining_seconds()
+            if remaining is not None:
+                wait_seconds = min(wait_seconds, remaining)
+            if in_flight.done.wait(timeout=wait_seconds):
+                if in_flight.result is not None:
+                    return copy.deepcopy(in_flight.result)
+                if in_flight.error_message:
+                    raise PaperlessSearchError(in_flight.error_message)
+            return fetch()
+
+        try:
+            result = fetch()
+        except PaperlessSearchError as exc:
+            in_flight.error_message = str(exc)
+            raise
+        else:
+            in_flight.result = result
+            if ttl > 0:
+                cache.set(cache_key, result, timeout=ttl)
+            return result
+        finally:
+            with cls._lock:
+                cls._in_flight.pop(cache_key, None)
+            in_flight.done.set()
+
+
+@receiver(setting_changed)
+def _invalidate_search_cache_on_paperless_setting_change(*, setting, **kwargs):
+    if str(setting or "").startswith("PAPERLESS_"):
+        PaperlessSearchCache.invalidate()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+from io import BytesIO
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from webapp.storage_paths import build_deterministic_derived_upload_path
+
+from .paperless import PaperlessService
+
+
+DEFAULT_THUMBNAIL_SIZE = 480
+THUMBNAIL_CACHE_MAX_AGE_SECONDS = 365 * 24 * 60 * 60
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PaperlessPreviewImage:
+    content_type: str
+    storage_path: str = ""
+    content: bytes = b""
+    from_cache: bool = False
+    current_modified: str = ""
+
+    @property
+    def is_cached_file(self) -> bool:
+        return bool(self.storage_path)
+
+    @property
+    def is_outdated(self) -> bool:
+        """Die angefragte Version ist nicht (mehr) der Stand in Paperless."""
+        return bool(self.current_modified)
+
+
+class PaperlessThumbnailService:
+    """Lokaler Vorschaubild-Cache für Paperless-Dokumente (uploads/_derived/paperless).
+
+    Neue Cache-Dateien entstehen nur für den ``modified``-Stand, den Paperless selbst meldet;
+    ältere Versionen desselben Dokuments werden dabei entfernt.
+    """
+
+    @staticmethod
+    def thumbnail_size() -> int:
+        raw_size = getattr(settings, "PAPERLESS_THUMBNAIL_SIZE", DEFAULT_THUMBNAIL_SIZE)
+        try:
+            size = int(raw_size)
+        except (TypeError, ValueError):
+            return DEFAULT_THUMBNAIL_SIZE
+        return max(size, 64)
+
+    @classmethod
+    def preferred_format(cls, *, accept_header: str = "") -> str:
+        normalized_accept = str(accept_header or "").lower()
+        if "image/webp" in normalized_accept and cls._webp_supported():
+            return "webp"
+        return "jpeg"
+
+    @staticmethod
+    def version_key(modified: str) -> str:
+        return hashlib.sha256(str(modified or "").strip().encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def cache_path(cls, *, document_id: int, modified: str, image_format: str) -> str:
+        version_key = cls.version_key(modified)
+        extension = ".webp" if image_format == "webp" else ".jpg"
+        return build_deterministic_derived_upload_path(
+            f"paperless/{int(document_id)}/preview",
+            f"thumb-{cls.thumbnail_size()}",
+            filename=version_key,
+            extension=extension,
+        )
+
+    @classmethod
+    def get_or_create(
+        cls,
+        *,
+        document_id: int,
+        modified: str,
+        accept_header: str = "",
+    ) -> PaperlessPreviewImage | None:
+        image_format = cls.preferred_format(accept_header=accept_header)
+        content_type = f"image/{image_format}"
+        target_path = cls.cache_path(
+            document_id=document_id,
+            modified=modified,
+            image_format=image_format,
+        )
+        if default_storage.exists(target_path):
+            return PaperlessPreviewImage(
+                content_type=content_type,
+                storage_path=target_path,
+                from_cache=True,
+            )
+
+        current_modified = PaperlessService.document_modified(document_id=document_id)
+        if current_modified != str(modified or "").strip():
+            return PaperlessPreviewImage(content_type=content_type, current_modified=current_modified)
+
+        content, source_content_type, _filename = PaperlessService.download_document(
+            document_id=document_id
+        )
+        normalized_source_type = str(source_content_type or "").strip().lower()
+        if not normalized_source_type.startswith("image/"):
+            return None
+
+        thumbnail_bytes = cls._render_thumbnail(content, image_format=image_format)
+        if thumbnail_bytes is None:
+            return PaperlessPreviewImage(content_type=normalized_source_type, content=content)
+
+        saved_path = default_storage.save(target_path, ContentFile(thumbnail_bytes))
+        cls._delete_other_versions(keep_path=saved_path)
+        return PaperlessPreviewImage(content_type=content_type, storage_path=saved_path)
+
+    @classmethod
+    def _delete_other_versions(cls, *, keep_path: str) -> int:
+        """Entfernt Vorschaubilder älterer Versionen (und anderer Größen) eines Dokuments."""
+        keep_directory = posixpath.dirname(keep_path)
+        keep_version = posixpath.splitext(posixpath.basename(keep_path))[0]
+        # uploads/_derived/paperless/<id>/thumb-<größe>/<version>.<ext>
+        document_directory = posixpath.dirname(keep_directory)
+        try:
+            subdirectories, _files = default_storage.listdir(document_directory)
+        except (FileNotFoundError, NotImplementedError):
+            return 0
+        deleted = 0
+        for subdirectory in subdirectories:
+            directory = posixpath.join(document_directory, subdirectory)
+            try:
+                _nested, file_names = default_storage.listdir(directory)
+            except FileNotFoundError:
+                continue
+            for file_name in file_names:
+                # Namenszusatz bei parallel gespeicherten Kopien derselben Version zulassen.
+                if directory == keep_directory and file_name.startswith(keep_version):
+                    continue
+                default_storage.delete(posixpath.join(directory, file_name))
+                deleted += 1
+        return deleted
+
+    @classmethod
+    def _render_thumbnail(cls, content: bytes, *, image_format: str) -> bytes | None:
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+
+        size = cls.thumbnail_size()
+        try:
+            with Image.open(BytesIO(content)) as image:
+                image = image.convert("RGB")
+                image.thumbnail((size, size))
+                buffer = BytesIO()
+                if image_format == "webp":
+                    image.save(buffer, format="WEBP", quality=80, method=4)
+                else:
+                    image.save(buffer, format="JPEG", quality=85, optimize=True)
+        except Exception:
+            logger.warning("Paperless preview could not be resized; serving original image.")
+            return None
+        return buffer.getvalue()
+
+    @staticmethod
+    def _webp_supported() -> bool:
+        try:
+            from PIL import features
+        except ImportError:
+            return False
+        try:
+            return bool(features.check("webp"))
+        except Exception:
+            return False
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import re
+import unicodedata
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from webapp.models import BetriebskostenBeleg, BetriebskostenGruppe, Buchung, Property, Unit
+
+
+BATCH_SIZE = 500
+SUPPORTED_VENDORS = {"sqlite", "postgresql"}
+GERMAN_FOLDING = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+TOKEN_PATTERN = re.compile(r"\w+")
+# Felder verknüpfter Modelle, die in die Suchtexte eingehen (siehe VolltextIndex.DOCUMENT_FIELDS).
+RELATED_INDEXED_FIELDS = {
+    Property: ("name",),
+    Unit: ("name", "door_number", "property_id"),
+    BetriebskostenGruppe: ("name",),
+}
+
+
+def normalize_search_text(value: str) -> str:
+    """Kleinschreibung, Umlaute als ae/oe/ue, ß als ss, übrige Akzente entfernt."""
+    folded = str(value or "").lower().translate(GERMAN_FOLDING)
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def search_tokens(query: str) -> list[str]:
+    return TOKEN_PATTERN.findall(normalize_search_text(query))
+
+
+class VolltextIndex:
+    """Suchindex für Buchungen und Betriebskostenbelege.
+
+    Je Zeile wird ein normalisierter Suchtext (Buchungstext, Liegenschaft, Einheit,
+    Referenz, Gruppe, Kategorie) abgelegt: unter SQLite in einer FTS5-Tabelle, unter
+    PostgreSQL als ``tsvector`` mit GIN-Index. Die Listen filtern über ``match_filter``
+    statt über mehrere ``icontains`` auf verknüpfte Tabellen. Suchbegriffe gelten als
+    Wortanfang und werden UND-verknüpft.
+    """
+
+    TABLES = {
+        "buchung": "webapp_buchung_fts",
+        "betriebskostenbeleg": "webapp_betriebskostenbeleg_fts",
+    }
+    DOCUMENT_FIELDS = {
+        "buchung": (
+            "buchungstext",
+            "mietervertrag__unit__property__name",
+            "mietervertrag__unit__name",
+            "mietervertrag__unit__door_number",
+            "einheit__property__name",
+            "einheit__name",
+            "einheit__door_number",
+            "kategorie",
+            "typ",
+        ),
+        "betriebskostenbeleg": (
+            "buchungstext",
+            "import_referenz",
+            "liegenschaft__name",
+            "ausgabengruppe__name",
+            "bk_art",
+        ),
+    }
+
+    _available: dict[tuple[str, str], bool] = {}
+
+    @classmethod
+    def available(cls, db_connection=None) -> bool:
+        db_connection = db_connection or connection
+        if db_connection.vendor not in SUPPORTED_VENDORS:
+            return False
+        cache_key = (db_connection.alias, str(db_connection.settings_dict.get("NAME")))
+        if not cls._available.get(cache_key):
+            with db_connection.cursor() as cursor:
+                existing = set(db_connection.introspection.table_names(cursor))
+            # Nur den positiven Befund merken, damit eine spätere Migration sofort greift.
+            cls._available[cache_key] = set(cls.TABLES.values()) <= existing
+        return cls._available[cache_key]
+
+    @classmethod
+    def create_tables(cls, db_connection) -> bool:
+        """Legt die Indextabellen an; ``False``, wenn die Datenbank keine Volltextsuche bietet."""
+        if db_connection.vendor not in SUPPORTED_VENDORS:
+            return False
+        with db_connection.cursor() as cursor:
+            for table in cls.TABLES.values():
+                if db_connection.vendor == "sqlite":
+                    try:
+                        cursor.execute(
+                            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                            "USING fts5(inhalt, tokenize = 'unicode61 remove_diacritics 2')"
+                        )
+                    except Exception:
+                        # SQLite ohne FTS5: Listen suchen weiter per icontains.
+                        return False
+                else:
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {table} (rowid bigint PRIMARY KEY, inhalt tsvector NOT NULL)"
+                    )
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_inhalt_gin ON {table} USING gin (inhalt)")
+        return True
+
+    @classmethod
+    def drop_tables(cls, db_connection) -> None:
+        with db_connection.cursor() as cursor:
+            for table in cls.TABLES.values():
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cls._available.clear()
+
+    @classmethod
+    def refresh(cls, model, pks: Iterable[int]) -> int:
+        """Schreibt die Einträge der angegebenen Zeilen neu; gelöschte Zeilen fallen heraus."""
+        db_connection = connections[model.objects.db]
+        if not cls.available(db_connection):
+            return 0
+        pks = sorted({int(pk) for pk in pks if pk})
+        written = 0
+        for start in range(0, len(pks), BATCH_SIZE):
+            chunk = pks[start : start + BATCH_SIZE]
+            documents = cls._documents(model, model.objects.filter(pk__in=chunk))
+            cls._delete(model, chunk)
+            cls._insert(model, documents)
+            written += len(documents)
+        return written
+
+    @classmethod
+    def refresh_queryset(cls, queryset) -> int:
+        pks = list(queryset.order_by().values_list("pk", flat=True).distinct())
+        return cls.refresh(queryset.model, pks)
+
+    @classmethod
+    def index_missing(cls, model) -> int:
+        """Nachführen nach ``bulk_create(ignore_conflicts=True)``, das keine IDs liefert."""
+        if not cls.available(connections[model.objects.db]):
+            return 0
+        missing = model.objects.exclude(pk__in=RawSQL(f"SELECT rowid FROM {cls._table(model)}", []))
+        return cls.refresh_queryset(missing)
+
+    @classmethod
+    def rebuild(cls, models: Iterable | None = None) -> dict[str, int]:
+        models = list(models) if models is not None else [Buchung, BetriebskostenBeleg]
+        summary: dict[str, int] = {}
+        for model in models:
+            db_connection = connections[model.objects.db]
+            if not cls.available(db_connection):
+                summary[model._meta.model_name] = 0
+                continue
+            with db_connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {cls._table(model)}")
+            count = 0
+            batch = []
+            for document in cls._iter_documents(model, model.objects.all()):
+                batch.append(document)
+                if len(batch) >= BATCH_SIZE:
+                    count += cls._insert(model, batch)
+                    batch = []
+            count += cls._insert(model, batch)
+            summary[model._meta.model_name] = count
+        return summary
+
+    @classmethod
+    def match_filter(cls, model, query: str) -> Q | None:
+        """``Q`` auf die Treffer-IDs, oder ``None`` (kein Index bzw. keine Suchwörter)."""
+        tokens = search_tokens(query)
+        db_connection = connections[model.objects.db]
+        if not tokens or not cls.available(db_connection):
+            return None
+        sql, params = cls._match_sql(model, tokens, db_connection)
+        return Q(pk__in=RawSQL(sql, params))
+
+    @classmethod
+    def search(cls, model, query: str, *, limit: int = 50) -> list[int]:
+        """Treffer-IDs nach Relevanz, beste zuerst."""
+        tokens = search_tokens(query)
+        db_connection = connections[model.objects.db]
+        if not tokens or not cls.available(db_connection):
+            return []
+        table = cls._table(model)
+        expression = cls._query_expression(tokens, db_connection)
+        if db_connection.vendor == "sqlite":
+            sql = f"SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s"
+            params = [expression, int(limit)]
+        else:
+            sql = (
+                f"SELECT rowid FROM {table} WHERE inhalt @@ to_tsquery('simple', %s) "
+                "ORDER BY ts_rank(inhalt, to_tsquery('simple', %s)) DESC, rowid DESC LIMIT %s"
+            )
+            params = [expression, expression, int(limit)]
+        with db_connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [int(row[0]) for row in cursor.fetchall()]
+
+    @classmethod
+    def _match_sql(cls, model, tokens: list[str], db_connection) -> tuple[str, list[str]]:
+        table = cls._table(model)
+        expression = cls._query_expression(tokens, db_connection)
+        if db_connection.vendor == "sqlite":
+            return f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [expression]
+        return f"SELECT rowid FROM {table} WHERE inhalt @@ to_tsquery('simple', %s)", [expression]
+
+    @staticmethod
+    def _query_expression(tokens: list[str], db_connection) -> str:
+        if db_connection.vendor == "sqlite":
+            return " ".join(f'"{token}"*' for token in tokens)
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    @classmethod
+    def _table(cls, model) -> str:
+        return cls.TABLES[model._meta.model_name]
+
+    @classmethod
+    def _documents(cls, model, queryset) -> list[tuple[int, str]]:
+        return list(cls._iter_documents(model, queryset))
+
+    @classmethod
+    def _iter_documents(cls, model, queryset):
+        fields = cls.DOCUMENT_FIELDS[model._meta.model_name]
+        choice_labels = {}
+        for name in fields:
+            if "__" not in name:
+                choices = model._meta.get_field(name).choices
+                if choices:
+                    choice_labels[name] = {str(value): str(label) for value, label in choices}
+        rows = queryset.order_by("pk").values_list("pk", *fields)
+        for pk, *values in rows.iterator(chunk_size=BATCH_SIZE):
+            parts = []
+            for name, value in zip(fields, values):
+                if value in (None, ""):
+                    continue
+                parts.append(str(value))
+                label = choice_labels.get(name, {}).get(str(value))
+                if label:
+                    parts.append(label)
+            yield pk, normalize_search_text(" ".join(parts))
+
+    @classmethod
+    def _delete(cls, model, pks: list[int]) -> None:
+        if not pks:
+            return
+        placeholders = ", ".join(["%s"] * len(pks))
+        with connections[model.objects.db].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {cls._table(model)} WHERE rowid IN ({placeholders})", pks)
+
+    @classmethod
+    def _insert(cls, model, documents: list[tuple[int, str]]) -> int:
+        if not documents:
+            return 0
+        db_connection = connections[model.objects.db]
+        value_sql = "%s" if db_connection.vendor == "sqlite" else "to_tsvector('simple', %s)"
+        with db_connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {cls._table(model)} (rowid, inhalt) VALUES (%s, {value_sql})",
+                documents,
+            )
+        return len(documents)
+
+
+@receiver(post_save, sender=Buchung, dispatch_uid="volltext_buchung_post_save")
+@receiver(post_delete, sender=Buchung, dispatch_uid="volltext_buchung_post_delete")
+@receiver(post_save, sender=BetriebskostenBeleg, dispatch_uid="volltext_beleg_post_save")
+@receiver(post_delete, sender=BetriebskostenBeleg, dispatch_uid="volltext_beleg_post_delete")
+def _refresh_row(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    VolltextIndex.refresh(sender, [instance.pk])
+
+
+@receiver(pre_save, sender=Property, dispatch_uid="volltext_property_pre_save")
+@receiver(pre_save, sender=Unit, dispatch_uid="volltext_unit_pre_save")
+@receiver(pre_save, sender=BetriebskostenGruppe, dispatch_uid="volltext_gruppe_pre_save")
+def _remember_indexed_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    fields = RELATED_INDEXED_FIELDS[sender]
+    instance._volltext_previous = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {
+        name for field in fields for name in (field, field.removesuffix("_id"))
+    } & set(update_fields):
+        instance._volltext_previous = _indexed_values(sender, instance)
+        return
+    instance._volltext_previous = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+def _indexed_values(sender, instance) -> tuple:
+    return tuple(getattr(instance, field) for field in RELATED_INDEXED_FIELDS[sender])
+
+
+def _indexed_values_changed(sender, instance) -> bool:
+    return getattr(instance, "_volltext_previous", None) != _indexed_values(sender, instance)
+
+
+@receiver(post_save, sender=Property, dispatch_uid="volltext_property_post_save")
+def _refresh_property_rows(sender, instance: Property, created=False, raw=False, **kwargs):
+    if raw or created or not _indexed_values_changed(sender, instance):
+        return
+    VolltextIndex.refresh_queryset(
+        Buchung.objects.filter(Q(mietervertrag__unit__property=instance) | Q(einheit__property=instance))
+    )
+    VolltextIndex.refresh_queryset(BetriebskostenBeleg.objects.filter(liegenschaft=instance))
+
+
+@receiver(post_save, sender=Unit, dispatch_uid="volltext_unit_post_save")
+def _refresh_unit_rows(sender, instance: Unit, created=False, raw=False, **kwargs):
+    if raw or created or not _indexed_values_changed(sender, instance):
+        return
+    VolltextIndex.refresh_queryset(Buchung.objects.filter(Q(mietervertrag__unit=instance) | Q(einheit=instance)))
+
+
+@receiver(post_save, sender=BetriebskostenGruppe, dispatch_uid="volltext_gruppe_post_save")
+def _refresh_group_rows(sender, instance: BetriebskostenGruppe, created=False, raw=False, **kwargs):
+    if raw or created or not _indexed_values_changed(sender, instance):
+        return
+    VolltextIndex.refresh_queryset(BetriebskostenBeleg.objects.filter(ausgabengruppe=instance))
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import gzip
+import hashlib
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from webapp.models import Datei
+from webapp.services.datei_thumbnails import DateiThumbnailService
+
+
+DEFAULT_COLD_AFTER_DAYS = 90
+COPY_CHUNK_BYTES = 1024 * 1024
+COLD_GZIP_SUFFIX = ".gz"
+HOT = Datei.StorageTier.HOT
+COLD = Datei.StorageTier.COLD
+COLD_GZIP = Datei.StorageTier.COLD_GZIP
+
+
+class _GzipReader(gzip.GzipFile):
+    """Entpackt beim Lesen und schließt dabei auch den Storage-Stream."""
+
+    def __init__(self, source):
+        super().__init__(fileobj=source, mode="rb")
+        self._source = source
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._source.close()
+
+
+class _ColdReadStorage:
+    """Lesesicht auf die Kaltablage für ``DateiDelivery``; gzip-Objekte werden transparent entpackt."""
+
+    supports_sendfile = False
+
+    def __init__(self, storage, *, compressed: bool, size: int):
+        self._storage = storage
+        self._compressed = compressed
+        self._size = size
+
+    def open(self, name, mode="rb"):
+        stream = self._storage.open(name, "rb")
+        return _GzipReader(stream) if self._compressed else stream
+
+    def size(self, name):
+        return self._size if self._compressed else self._storage.size(name)
+
+    def exists(self, name):
+        return self._storage.exists(name)
+
+    def get_modified_time(self, name):
+        return self._storage.get_modified_time(name)
+
+    def path(self, name):
+        raise NotImplementedError("Kaltablage wird nicht über den Webserver ausgeliefert.")
+
+
+class DateiStorageTiers:
+    """Router zwischen aktivem Storage (MEDIA_ROOT) und Kaltablage für archivierte Dateien.
+
+    Ein Blob wandert erst, wenn alle Datei-Zeilen, die ihn referenzieren, länger als
+    ``DATEI_COLD_STORAGE_AFTER_DAYS`` archiviert sind. Der Storage-Name bleibt gleich;
+    ``storage_tier`` sagt, wo er liegt.
+    """
+
+    @staticmethod
+    def cold_storage():
+        backend = str(
+            getattr(settings, "DATEI_COLD_STORAGE_BACKEND", "") or "django.core.files.storage.FileSystemStorage"
+        )
+        storage_class = import_string(backend)
+        if issubclass(storage_class, FileSystemStorage):
+            return storage_class(location=str(settings.DATEI_COLD_STORAGE_ROOT))
+        return storage_class()
+
+    @staticmethod
+    def after_days() -> int:
+        raw_value = getattr(settings, "DATEI_COLD_STORAGE_AFTER_DAYS", DEFAULT_COLD_AFTER_DAYS)
+        try:
+            return max(int(raw_value), 0)
+        except (TypeError, ValueError):
+            return DEFAULT_COLD_AFTER_DAYS
+
+    @staticmethod
+    def compress_enabled() -> bool:
+        return bool(getattr(settings, "DATEI_COLD_STORAGE_COMPRESS", True))
+
+    @staticmethod
+    def is_cold(datei: Datei) -> bool:
+        return datei.storage_tier in {COLD, COLD_GZIP}
+
+    @staticmethod
+    def cold_name(name: str, tier: str) -> str:
+        return f"{name}{COLD_GZIP_SUFFIX}" if tier == COLD_GZIP else name
+
+    @classmethod
+    def read_source(cls, datei: Datei):
+        """``(storage, name)`` für Lesezugriffe, egal in welcher Stufe der Blob liegt."""
+        return cls.read_source_for(datei.file.name, datei.storage_tier, size=datei.size_bytes)
+
+    @classmethod
+    def read_source_for(cls, name: str, tier: str, *, size: int = 0, hot_storage=None):
+        if tier not in {COLD, COLD_GZIP}:
+            return hot_storage or default_storage, name
+        storage = _ColdReadStorage(cls.cold_storage(), compressed=tier == COLD_GZIP, size=int(size or 0))
+        return storage, cls.cold_name(name, tier)
+
+    @classmethod
+    def open(cls, datei: Datei):
+        storage, name = cls.read_source(datei)
+        return storage.open(name, "rb")
+
+    @classmethod
+    def exists(cls, datei: Datei) -> bool:
+        storage, name = cls.read_source(datei)
+        return storage.exists(name)
+
+    @classmethod
+    def eligible_names(cls, *, older_than_days: int, now: datetime | None = None) -> list[str]:
+        """Storage-Namen, deren Zeilen alle lange genug archiviert sind und noch aktiv liegen."""
+        cutoff = (now or timezone.now()) - timedelta(days=max(int(older_than_days), 0))
+        candidate_names = set(
+            Datei.objects.filter(is_archived=True, archived_at__lt=cutoff, storage_tier=HOT)
+            .exclude(file="")
+            .values_list("file", flat=True)
+        )
+        if not candidate_names:
+            return []
+        blocked_names = set(
+            Datei.objects.filter(file__in=candidate_names)
+            .filter(Q(is_archived=False) | Q(archived_at__isnull=True) | Q(archived_at__gte=cutoff))
+            .values_list("file", flat=True)
+        )
+        return sorted(candidate_names - blocked_names)
+
+    @classmethod
+    def move_to_cold(cls, name: str, *, compress: bool | None = None) -> dict[str, object]:
+        """Kopiert einen Blob in die Kaltablage, prüft die Kopie und löscht erst dann das Original."""
+        tier = COLD_GZIP if (cls.compress_enabled() if compress is None else compress) else COLD
+        result = {"name": name, "tier": tier, "status": "moved", "hot_bytes": 0, "cold_bytes": 0}
+        hot_storage = default_storage
+        if not hot_storage.exists(name):
+            result["status"] = "missing"
+            return result
+
+        cold_storage = cls.cold_storage()
+        cold_name = cls.cold_name(name, tier)
+        source_hasher = hashlib.sha256()
+        with tempfile.SpooledTemporaryFile(max_size=8 * COPY_CHUNK_BYTES) as staging:
+            with hot_storage.open(name, "rb") as source:
+                target = gzip.GzipFile(fileobj=staging, mode="wb", mtime=0) if tier == COLD_GZIP else staging
+                while True:
+                    chunk = source.read(COPY_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    source_hasher.update(chunk)
+                    result["hot_bytes"] += len(chunk)
+                    target.write(chunk)
+                if target is not staging:
+                    target.close()
+            staging.seek(0)
+            if cold_storage.exists(cold_name):
+                # Rest eines abgebrochenen Laufs.
+                cold_storage.delete(cold_name)
+            saved_name = cold_storage.save(cold_name, File(staging, name=cold_name))
+        if saved_name != cold_name:
+            cold_storage.delete(saved_name)
+            result["status"] = "failed"
+            return result
+
+        cold_reader, _name = cls.read_source_for(name, tier, size=result["hot_bytes"])
+        if cls._sha256(cold_reader, cold_name) != source_hasher.hexdigest():
+            cold_storage.delete(cold_name)
+            result["status"] = "failed"
+            return result
+        result["cold_bytes"] = cold_storage.size(cold_name)
+
+        with transaction.atomic():
+            rows = Datei.objects.select_for_update().filter(file=name)
+            if rows.filter(is_archived=False).exists():
+                # Zwischenzeitlich wiederhergestellt.
+                cold_storage.delete(cold_name)
+                result["status"] = "skipped_restored"
+                return result
+            rows.filter(size_bytes=0).update(size_bytes=result["hot_bytes"])
+            rows.update(storage_tier=tier)
+            transaction.on_commit(lambda: cls._delete_hot_copy(name))
+        return result
+
+    @classmethod
+    def rehydrate(cls, datei: Datei) -> bool:
+        """Holt einen Blob aus der Kaltablage zurück, z. B. beim Wiederherstellen."""
+        if not cls.is_cold(datei) or not datei.file:
+            return False
+        name = datei.file.name
+        tier = datei.storage_tier
+        if not default_storage.exists(name):
+            with cls.open(datei) as source, tempfile.SpooledTemporaryFile(max_size=8 * COPY_CHUNK_BYTES) as staging:
+                shutil.copyfileobj(source, staging, COPY_CHUNK_BYTES)
+                staging.seek(0)
+                saved_name = default_storage.save(name, File(staging, name=name))
+            if saved_name != name:
+                default_storage.delete(saved_name)
+                return False
+        Datei.objects.filter(file=name).update(storage_tier=HOT)
+        datei.storage_tier = HOT
+        cls.delete_cold_copy(name, tier)
+        return True
+
+    @classmethod
+    def release_cold(cls, datei: Datei) -> bool:
+        """Löscht die kalte Kopie, sofern keine andere kalte Datei-Zeile sie referenziert."""
+        if not cls.is_cold(datei) or not datei.file:
+            return False
+        others = Datei.objects.filter(file=datei.file.name, storage_tier=datei.storage_tier).exclude(pk=datei.pk)
+        if others.exists():
+            return False
+        cls.delete_cold_copy(datei.file.name, datei.storage_tier)
+        return True
+
+    @classmethod
+    def delete_cold_copy(cls, name: str, tier: str) -> None:
+        if tier not in {COLD, COLD_GZIP} or not name:
+            return
+        cold_storage = cls.cold_storage()
+        cold_name = cls.cold_name(name, tier)
+        if cold_storage.exists(cold_name):
+            cold_storage.delete(cold_name)
+
+    @classmethod
+    def tier_archived(
+        cls,
+        *,
+        older_than_days: int | None = None,
+        apply: bool = False,
+        limit: int = 0,
+        compress: bool | None = None,
+        now: datetime | None = None,
+    ) -> dict[str, object]:
+        days = cls.after_days() if older_than_days is None else max(int(older_than_days), 0)
+        names = cls.eligible_names(older_than_days=days, now=now)
+        if limit > 0:
+            names = names[:limit]
+        summary = {
+            "mode": "apply" if apply else "dry-run",
+            "older_than_days": days,
+            "candidates": len(names),
+            "moved": 0,
+            "missing": 0,
+            "failed": 0,
+            "skipped_restored": 0,
+            "hot_bytes": 0,
+            "cold_bytes": 0,
+            "items": [],
+        }
+        if not apply:
+            summary["items"] = [{"name": name, "status": "candidate"} for name in names]
+            return summary
+
+        for name in names:
+            result = cls.move_to_cold(name, compress=compress)
+            summary[result["status"]] += 1
+            if result["status"] == "moved":
+                summary["hot_bytes"] += result["hot_bytes"]
+                summary["cold_bytes"] += result["cold_bytes"]
+            summary["items"].append(result)
+        return summary
+
+    @staticmethod
+    def _delete_hot_copy(name: str) -> None:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        DateiThumbnailService.delete_derived(name)
+
+    @staticmethod
+    def _sha256(storage, name: str) -> str:
+        hasher = hashlib.sha256()
+        with storage.open(name, "rb") as stream:
+            while True:
+                chunk = stream.read(COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+        return hasher.hexdigest()
@@ -57,6 +57,22 @@ def datei_upload_to(instance, filename: str) -> str:
     )
 
 
+def paperless_outbox_upload_to(instance, filename: str) -> str:
+    now = timezone.now()
+    safe_base, safe_ext = _split_filename(filename)
+    unique_name = f"{uuid.uuid4().hex}_{safe_base}{safe_ext}"
+    return f"uploads/_outbox/paperless/{now:%Y}/{now:%m}/{unique_name}"
+
+
+BLOB_STORAGE_PREFIX = "uploads/_blobs/"
+
+
+def build_blob_upload_path(checksum_sha256: str, extension: str = "") -> str:
+    checksum = str(checksum_sha256 or "").strip().lower()
+    _base, safe_ext = _split_filename(f"blob{extension or ''}")
+    return f"{BLOB_STORAGE_PREFIX}{checksum[:2]}/{checksum[2:4]}/{checksum}{safe_ext}"
+
+
 def build_derived_upload_path(
     original_upload_path: str,
     derivative_kind: str,
@@ -1,22 +1,38 @@
+import hashlib
 import io
 import json
 import os
 import re
+import runpy
 import tempfile
+import threading
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from io import StringIO
 from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import call, patch
-from urllib.error import HTTPError
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
 from django.core import mail
-from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied, ValidationError
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase, override_settings
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -28,13 +44,19 @@ from .models import (
     BetriebskostenBeleg,
     BetriebskostenGruppe,
     Buchung,
+    DashboardMonatswert,
+    DashboardStand,
     Datei,
+    DateiOperationDailyStat,
     DateiOperationLog,
     DateiZuordnung,
     LeaseAgreement,
     Manager,
     Meter,
     MeterReading,
+    MietkontoSaldo,
+    PaperlessRequestStat,
+    PaperlessUpload,
     Property,
     ReminderEmailLog,
     ReminderRuleConfig,
@@ -51,12 +73,28 @@ from .services.annual_statement_pdf_service import (
 )
 from .services.annual_statement_portal_export_service import AnnualStatementPortalExportService
 from .services.annual_statement_run_service import AnnualStatementRunService
+from .services.annual_statement_storage_service import AnnualStatementStorageService
+from .services.bulk_upload import BulkUploadItem, DateiBulkUpload
+from .services.dashboard_stats import DashboardStatistik
+from .services.datei_audit import DateiOperationAudit
+from .services.datei_thumbnails import DateiThumbnailService, derive_thumbnails
+from .services.file_integrity import DateiIntegrityScan
+from .services.file_delivery import DateiDelivery
 from .services.files import MAX_FILE_SIZE_BY_CATEGORY, DateiService
+from .services.search_index import VolltextIndex, normalize_search_text
+from .services.storage_tiers import DateiStorageTiers
+from .services.lease_balance import MietkontoSaldoService
 from .services.lease_history_package_service import LeaseHistoryPackageService
 from .services.operating_cost_service import OperatingCostService
 from .services.paperless import PaperlessSearchError, PaperlessService
+from .services.paperless_metrics import PaperlessMetrics
+from .services.paperless_outbox import PaperlessOutboxService
+from .services.paperless_resilience import PaperlessCircuitBreaker, PaperlessLatencyBudget
+from .services.paperless_search_cache import PaperlessSearchCache
+from .services.paperless_thumbnails import PaperlessThumbnailService
 from .services.reminders import ReminderService, add_months
 from .services.vpi_adjustment_run_service import VpiAdjustmentRunService
+from .views import year_choices_for_queryset, year_range_filter
 
 
 class MeterYearlyConsumptionTests(TestCase):
@@ -203,6 +241,11 @@ class MeterYearlyConsumptionTests(TestCase):
 
 class MeterReadingAttachmentPanelViewTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Zähler",
             zip_code="1050",
@@ -343,9 +386,8 @@ class MeterReadingAttachmentPanelViewTests(TestCase):
         )
         source_ref = f"meterreading:{reading.source_uuid}"
 
-        with patch(
-            "webapp.views.PaperlessService.upload_document",
-            return_value="task-555",
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), patch(
+            "webapp.services.paperless_outbox.PaperlessService.upload_document",
         ) as mocked_upload:
             response = self.client.post(
                 reverse("meter_reading_update", args=[reading.pk]),
@@ -363,12 +405,14 @@ class MeterReadingAttachmentPanelViewTests(TestCase):
 
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.url, reverse("meter_reading_update", args=[reading.pk]))
-        mocked_upload.assert_called_once()
-        self.assertEqual(mocked_upload.call_args.kwargs["q_liegenschaft"], "Objekt Zähler")
-        self.assertEqual(mocked_upload.call_args.kwargs["q_einheit"], "Top 5")
-        self.assertEqual(mocked_upload.call_args.kwargs["q_source_ref"], source_ref)
-        self.assertEqual(mocked_upload.call_args.kwargs["document_type_id"], 6)
-        self.assertEqual(mocked_upload.call_args.kwargs["created"], date(2026, 2, 1))
+        mocked_upload.assert_not_called()
+        upload = PaperlessUpload.objects.get()
+        self.assertEqual(upload.status, PaperlessUpload.Status.PENDING)
+        self.assertEqual(upload.q_liegenschaft, "Objekt Zähler")
+        self.assertEqual(upload.q_einheit, "Top 5")
+        self.assertEqual(upload.q_source_ref, source_ref)
+        self.assertEqual(upload.document_type_id, 6)
+        self.assertEqual(upload.document_created, date(2026, 2, 1))
 
     @override_settings(
         PAPERLESS_BASE_URL="https://paperless.example.invalid",
@@ -384,7 +428,7 @@ class MeterReadingAttachmentPanelViewTests(TestCase):
         )
 
         with patch(
-            "webapp.views.PaperlessService.upload_document",
+            "webapp.views.PaperlessOutboxService.enqueue",
             side_effect=PaperlessSearchError("Paperless-Upload fehlgeschlagen."),
         ), patch(
             "webapp.views.PaperlessService.search_documents",
@@ -1216,7 +1260,7 @@ class TenantLifecycleTests(TestCase):
 
         response = self.client.get(reverse("tenant_list"))
         self.assertEqual(response.status_code, 200)
-        tenant_ids = set(response.context["tenants"].values_list("pk", flat=True))
+        tenant_ids = {tenant.pk for tenant in response.context["tenants"]}
         self.assertIn(first.pk, tenant_ids)
         self.assertIn(second.pk, tenant_ids)
 
@@ -1262,6 +1306,11 @@ class TenantLifecycleTests(TestCase):
 
 class LeaseHistoryPackageTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.manager = Manager.objects.create(
             company_name="Hausverwaltung Stark GmbH",
             contact_person="Max Stark",
@@ -1666,6 +1715,176 @@ class SollStellungCommandTests(TestCase):
         self.assertEqual(parking_bk.ust_prozent, Decimal("10.00"))
         self.assertEqual(parking_hk.ust_prozent, Decimal("20.00"))
 
+    def test_generate_monthly_soll_range_creates_missing_rows_with_history(self):
+        LeaseAgreement.objects.filter(pk=self.lease.pk).update(exit_date=date(2025, 5, 20))
+        Buchung.objects.create(
+            mietervertrag=self.lease,
+            einheit=self.unit,
+            typ=Buchung.Typ.SOLL,
+            kategorie=Buchung.Kategorie.BK,
+            buchungstext="SOLL Betriebskosten 02.2025",
+            datum=date(2025, 2, 1),
+            netto=Decimal("100.00"),
+            ust_prozent=Decimal("10.00"),
+            brutto=Decimal("110.00"),
+        )
+        out = StringIO()
+
+        call_command("generate_monthly_soll", "--from", "2024-11", "--to", "2025-07", "--json", stdout=out)
+
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["months"], 9)
+        self.assertEqual(summary["created"], 14)
+        self.assertEqual(summary["skipped"], 1)
+        created = Buchung.objects.filter(mietervertrag=self.lease, typ=Buchung.Typ.SOLL)
+        self.assertEqual(created.count(), 15)
+        self.assertEqual(
+            sorted(set(created.values_list("datum", flat=True))),
+            [date(2025, month, 1) for month in range(1, 6)],
+        )
+        hmz = created.get(kategorie=Buchung.Kategorie.HMZ, datum=date(2025, 3, 1))
+        self.assertEqual(hmz.buchungstext, "SOLL Hauptmietzins 03.2025")
+        self.assertEqual(hmz.brutto, Decimal("550.00"))
+        self.assertEqual(Buchung.history.filter(id__in=created.values("id"), history_type="+").count(), 15)
+        self.assertEqual(
+            MietkontoSaldo.objects.get(mietervertrag=self.lease, monat=date(2025, 5, 1)).endsaldo,
+            Decimal("-3600.00"),
+        )
+
+    def test_generate_monthly_soll_range_rerun_reports_exact_skips(self):
+        call_command("generate_monthly_soll", "--from", "2025-11", "--to", "2026-02", stdout=StringIO())
+        out = StringIO()
+
+        with self.assertNumQueries(2):
+            call_command("generate_monthly_soll", "--from", "2025-11", "--to", "2026-02", stdout=out)
+
+        self.assertIn("0 SOLL-Buchungen für 11.2025–02.2026 erstellt. 12 aufgrund", out.getvalue())
+        self.assertEqual(Buchung.objects.filter(typ=Buchung.Typ.SOLL).count(), 12)
+
+    def test_generate_monthly_soll_rejects_inverted_range(self):
+        with self.assertRaises(CommandError):
+            call_command("generate_monthly_soll", "--from", "2026-03", "--to", "2026-01")
+
+
+class ImportLegacyBuchungenCommandTests(TestCase):
+    LEGACY_DUMP = (
+        "-- Legacy-Dump\n"
+        "CREATE TABLE `buchungen` (`id` int, `rechnungtext` text);\n"
+        "INSERT INTO `buchungen` (`id`, `rechnungtext`, `bruttobetrag`, `nettobetrag`, `x`, `ust`, `bk`, "
+        "`ausgabe`, `datum`, `y`, `einheit_id`, `liegenschaft_id`) VALUES\n"
+        "(1, 'Miete Jän; Teil (1),(2)', '550.00', '500.00', 0, '10', 'miete', 0, '2025-01-03', NULL, 7, NULL),\n"
+        "(2, 'BK O\\'Brien', '110.00', '100.00', 0, '10', 'bk', 0, '2025-01-03', NULL, 7, NULL),\n"
+        "(3, 'Wasser it''s', '120.00', '100.00', 0, '20', 'wasser', 1, '2025-02-10', NULL, NULL, 3),\n"
+        "(4, 'Unbekannt', '10.00', '10.00', 0, '0', 'sonst', 0, '2025-02-10', NULL, 7, NULL);\n"
+        "INSERT INTO `einheiten` VALUES (7, 'x', 'y', '5', 'a', 'b', 'c', 3);\n"
+        "INSERT INTO `liegenschaften` VALUES (3, 'Objekt Alt');\n"
+    )
+
+    def setUp(self):
+        self.property = Property.objects.create(
+            name="Objekt Alt",
+            zip_code="1010",
+            city="Wien",
+            street_address="Altgasse 1",
+        )
+        self.unit = Unit.objects.create(
+            property=self.property,
+            unit_type=Unit.UnitType.APARTMENT,
+            door_number="5",
+            name="Top 5",
+        )
+        self.lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.AKTIV,
+            entry_date=date(2024, 1, 1),
+            net_rent=Decimal("500.00"),
+            operating_costs_net=Decimal("100.00"),
+            heating_costs_net=Decimal("0.00"),
+        )
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.sql_file = os.path.join(tmp_dir.name, "legacy.sql")
+        with open(self.sql_file, "w", encoding="utf-8") as handle:
+            handle.write(self.LEGACY_DUMP)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("import_legacy_buchungen", "--sql-file", self.sql_file, *args, stdout=out)
+        return dict(line.split(": ", 1) for line in out.getvalue().splitlines())
+
+    def test_import_streams_dump_in_small_chunks_and_is_idempotent(self):
+        with patch("webapp.management.commands.import_legacy_buchungen.READ_CHUNK_CHARS", 7):
+            first = self._run("--batch-size", "3")
+
+        self.assertEqual(first["parsed_rows"], "4")
+        self.assertEqual(first["inserted_buchung_rows"], "4")
+        self.assertEqual(first["inserted_beleg_rows"], "1")
+        self.assertEqual(first["income_category_warnings"], "1")
+        texts = set(Buchung.objects.filter(mietervertrag=self.lease).values_list("buchungstext", flat=True))
+        self.assertEqual(texts, {"Miete Jän; Teil (1),(2)", "BK O'Brien"})
+        beleg = BetriebskostenBeleg.objects.get(import_referenz="ifkg-buchungen-3")
+        self.assertEqual(beleg.buchungstext, "Wasser it's")
+        self.assertEqual(beleg.liegenschaft, self.property)
+        self.assertEqual(
+            MietkontoSaldo.objects.get(mietervertrag=self.lease, monat=date(2025, 1, 1)).endsaldo,
+            Decimal("0.00"),
+        )
+
+        second = self._run()
+
+        self.assertEqual(second["inserted_rows"], "0")
+        self.assertEqual(second["skipped_existing_buchung_rows"], "4")
+        self.assertEqual(second["skipped_existing_beleg_rows"], "1")
+        self.assertEqual(Buchung.objects.count(), 4)
+
+    def test_dry_run_counts_without_writing(self):
+        with self.assertNumQueries(6):
+            summary = self._run("--dry-run")
+
+        self.assertEqual(summary["inserted_rows"], "5")
+        self.assertFalse(Buchung.objects.exists())
+        self.assertFalse(BetriebskostenBeleg.objects.exists())
+
+
+class DatenbankProfilTests(TestCase):
+    def test_sqlite_connection_applies_pragmas(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Nur für SQLite.")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            synchronous = cursor.fetchone()[0]
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+
+        self.assertEqual(synchronous, 1)
+        self.assertEqual(busy_timeout, settings.SQLITE_BUSY_TIMEOUT_MS)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_unknown_db_engine_is_rejected(self):
+        settings_path = settings.BASE_DIR / "core" / "settings.py"
+        with patch.dict(os.environ, {"DB_ENGINE": "mysql"}):
+            with self.assertRaisesMessage(ImproperlyConfigured, "DB_ENGINE='mysql'"):
+                runpy.run_path(str(settings_path))
+        with patch.dict(os.environ, {"DB_ENGINE": "SQLite", "DB_NAME": ""}):
+            self.assertEqual(
+                runpy.run_path(str(settings_path))["DATABASES"]["default"]["ENGINE"],
+                "django.db.backends.sqlite3",
+            )
+
+    def test_benchmark_db_reports_throughput_and_cleans_up(self):
+        out = StringIO()
+
+        call_command("benchmark_db", "--workers", "1", "--operations", "3", "--json", stdout=out)
+
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["database"]["vendor"], connection.vendor)
+        self.assertEqual(set(summary["operations"]), {"buchung", "session", "liste"})
+        self.assertEqual(summary["operations"]["buchung"]["count"], 3)
+        self.assertEqual(summary["operations"]["buchung"]["errors"], 0)
+        self.assertFalse(Buchung.objects.exists())
+        self.assertFalse(Buchung.history.exists())
+        self.assertFalse(Session.objects.exists())
+
 
 class MarkSettlementAdjustmentsCommandTests(TestCase):
     def setUp(self):
@@ -2166,6 +2385,399 @@ class LeaseDetailViewTests(TestCase):
         self.assertEqual(response.context["dms_context_panel"]["title"], "Dokumente im DMS")
 
 
+@override_settings(LIST_PAGE_SIZE=2)
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.year = date.today().year
+        self.property = Property.objects.create(
+            name="Objekt Seiten",
+            zip_code="1080",
+            city="Wien",
+            street_address="Seitengasse 8",
+        )
+        self.unit = Unit.objects.create(
+            property=self.property,
+            unit_type=Unit.UnitType.APARTMENT,
+            door_number="8",
+            name="Top 8",
+        )
+        self.lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.AKTIV,
+            entry_date=date(self.year, 1, 1),
+            net_rent=Decimal("500.00"),
+            operating_costs_net=Decimal("100.00"),
+            heating_costs_net=Decimal("50.00"),
+        )
+        # Gleiche Daten über die Seitengrenze hinweg: die ID entscheidet die Reihenfolge.
+        self.buchungen = [
+            Buchung.objects.create(
+                mietervertrag=self.lease,
+                typ=Buchung.Typ.IST,
+                kategorie=Buchung.Kategorie.ZAHLUNG,
+                datum=date(self.year, 1, day),
+                buchungstext=f"Zahlung {index}",
+                netto=Decimal("10.00"),
+                ust_prozent=Decimal("0.00"),
+                brutto=Decimal("10.00"),
+            )
+            for index, day in enumerate((5, 5, 5, 3, 1))
+        ]
+        self.list_params = {"liegenschaft": "all", "jahr": str(self.year)}
+
+    def _collect_pages(self, url_name: str, params: dict) -> list[int]:
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        collected = [row.pk for row in response.context["object_list"]]
+        cursor = response.context["keyset_next_cursor"]
+        while cursor:
+            fragment = self.client.get(reverse(url_name), {**params, "fragment": "rows", "nach": cursor})
+            self.assertEqual(fragment.status_code, 200)
+            payload = fragment.json()
+            collected.extend(int(pk) for pk in re.findall(r'data-id="(\d+)"', payload["html"]))
+            self.assertLessEqual(payload["count"], 2)
+            cursor = payload["next_cursor"]
+        return collected
+
+    def test_buchung_list_renders_first_page_with_totals_of_whole_filter(self):
+        response = self.client.get(reverse("buchung_list"), self.list_params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["buchungen"]), 2)
+        self.assertTrue(response.context["keyset_next_cursor"])
+        self.assertEqual(response.context["total_count"], 5)
+        self.assertEqual(response.context["filtered_sum_brutto"], Decimal("50.00"))
+
+    def test_buchung_pages_cover_all_rows_in_order_without_duplicates(self):
+        collected = self._collect_pages("buchung_list", self.list_params)
+
+        expected = list(
+            Buchung.objects.filter(pk__in=[buchung.pk for buchung in self.buchungen])
+            .order_by("-datum", "-id")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(collected, expected)
+
+    def test_buchung_export_ignores_page_size(self):
+        response = self.client.get(reverse("buchung_export_excel"), self.list_params)
+
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            worksheet_xml = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        for index in range(5):
+            self.assertIn(f"Zahlung {index}", worksheet_xml)
+
+    def test_invalid_cursor_returns_bad_request(self):
+        response = self.client.get(
+            reverse("buchung_list"),
+            {**self.list_params, "fragment": "rows", "nach": "kein-cursor"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_beleg_pages_cover_all_rows(self):
+        belege = [
+            BetriebskostenBeleg.objects.create(
+                liegenschaft=self.property,
+                bk_art=BetriebskostenBeleg.BKArt.BETRIEBSKOSTEN,
+                datum=date(self.year, 2, 1),
+                netto=Decimal("10.00"),
+                ust_prozent=Decimal("20.00"),
+                brutto=Decimal("12.00"),
+                buchungstext=f"Beleg {index}",
+            )
+            for index in range(3)
+        ]
+
+        collected = self._collect_pages("betriebskostenbeleg_list", {"jahr": str(self.year)})
+
+        self.assertEqual(collected, sorted((beleg.pk for beleg in belege), reverse=True))
+
+    def test_tenant_pages_follow_name_order(self):
+        for first_name, last_name in (("Berta", "Bauer"), ("Anna", "Bauer"), ("Carl", "Amsel")):
+            Tenant.objects.create(
+                salutation=Tenant.Salutation.FRAU,
+                first_name=first_name,
+                last_name=last_name,
+            )
+
+        collected = self._collect_pages("tenant_list", {})
+
+        self.assertEqual(
+            collected,
+            list(Tenant.objects.order_by("last_name", "first_name", "id").values_list("pk", flat=True)),
+        )
+
+
+class VolltextIndexTests(TestCase):
+    def setUp(self):
+        if not VolltextIndex.available():
+            self.skipTest("Datenbank ohne Volltextsuche.")
+        self.year = date.today().year
+        self.property = Property.objects.create(
+            name="Haus Großgasse",
+            zip_code="1050",
+            city="Wien",
+            street_address="Großgasse 5",
+        )
+        self.unit = Unit.objects.create(
+            property=self.property,
+            unit_type=Unit.UnitType.APARTMENT,
+            door_number="12",
+            name="Top 12",
+        )
+        self.lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.AKTIV,
+            entry_date=date(self.year, 1, 1),
+            net_rent=Decimal("500.00"),
+            operating_costs_net=Decimal("100.00"),
+            heating_costs_net=Decimal("50.00"),
+        )
+        self.buchung = self._create_buchung("Miete Jänner Müller")
+        self.other = self._create_buchung("Überweisung Bauer")
+
+    def _create_buchung(self, text: str) -> Buchung:
+        return Buchung.objects.create(
+            mietervertrag=self.lease,
+            typ=Buchung.Typ.IST,
+            kategorie=Buchung.Kategorie.ZAHLUNG,
+            datum=date(self.year, 1, 15),
+            buchungstext=text,
+            netto=Decimal("10.00"),
+            ust_prozent=Decimal("0.00"),
+            brutto=Decimal("10.00"),
+        )
+
+    def test_normalization_folds_umlauts_and_sharp_s(self):
+        self.assertEqual(normalize_search_text("Großgasse MÜLLER Café"), "grossgasse mueller cafe")
+
+    def test_search_matches_spelling_variants_and_prefixes(self):
+        self.assertEqual(VolltextIndex.search(Buchung, "mueller"), [self.buchung.pk])
+        self.assertEqual(VolltextIndex.search(Buchung, "Müll"), [self.buchung.pk])
+        self.assertEqual(VolltextIndex.search(Buchung, "grossgasse top 12 bauer"), [self.other.pk])
+        self.assertEqual(VolltextIndex.search(Buchung, "xyz"), [])
+
+    def test_index_follows_updates_deletes_and_renames(self):
+        self.buchung.buchungstext = "Miete Februar Huber"
+        self.buchung.save()
+        self.assertEqual(VolltextIndex.search(Buchung, "huber"), [self.buchung.pk])
+        self.assertEqual(VolltextIndex.search(Buchung, "mueller"), [])
+
+        self.property.name = "Haus Lindengasse"
+        self.property.save()
+        self.assertCountEqual(VolltextIndex.search(Buchung, "lindengasse"), [self.buchung.pk, self.other.pk])
+
+        other_pk = self.other.pk
+        self.other.delete()
+        self.assertEqual(VolltextIndex.search(Buchung, "bauer"), [])
+        self.assertNotIn(other_pk, VolltextIndex.search(Buchung, "lindengasse"))
+
+    def test_related_saves_reindex_only_when_indexed_fields_change(self):
+        self.property.city = "Graz"
+        self.unit.usable_area = Decimal("70.00")
+        with patch.object(VolltextIndex, "refresh_queryset") as mocked_refresh:
+            self.property.save()
+            self.unit.save()
+            self.unit.save(update_fields=["usable_area"])
+        mocked_refresh.assert_not_called()
+
+        self.unit.door_number = "14"
+        self.unit.save()
+        self.assertCountEqual(VolltextIndex.search(Buchung, "grossgasse 14"), [self.buchung.pk, self.other.pk])
+
+    def test_list_view_filters_through_index(self):
+        response = self.client.get(
+            reverse("buchung_list"),
+            {"liegenschaft": "all", "jahr": str(self.year), "q": "Mueller"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([buchung.pk for buchung in response.context["buchungen"]], [self.buchung.pk])
+
+    def test_beleg_group_assignment_is_searchable(self):
+        beleg = BetriebskostenBeleg.objects.create(
+            liegenschaft=self.property,
+            bk_art=BetriebskostenBeleg.BKArt.WASSER,
+            datum=date(self.year, 2, 1),
+            netto=Decimal("10.00"),
+            ust_prozent=Decimal("10.00"),
+            brutto=Decimal("11.00"),
+            import_referenz="RE-2044",
+        )
+        group = BetriebskostenGruppe.objects.create(name="Gartenpflege")
+        BetriebskostenBeleg.objects.filter(pk=beleg.pk).update(ausgabengruppe=group)
+        self.assertEqual(VolltextIndex.search(BetriebskostenBeleg, "garten"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(VolltextIndex.search(BetriebskostenBeleg, "garten re 2044"), [beleg.pk])
+        response = self.client.get(reverse("betriebskostenbeleg_list"), {"jahr": str(self.year), "suche": "Gartenpflege"})
+        self.assertEqual([row.pk for row in response.context["belege"]], [beleg.pk])
+
+
+class MietkontoSaldoServiceTests(TestCase):
+    def setUp(self):
+        self.property = Property.objects.create(
+            name="Objekt Saldo",
+            zip_code="1070",
+            city="Wien",
+            street_address="Saldogasse 7",
+        )
+        self.unit = Unit.objects.create(
+            property=self.property,
+            unit_type=Unit.UnitType.APARTMENT,
+            door_number="7",
+            name="Top 7",
+        )
+        self.lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.AKTIV,
+            entry_date=date(2025, 1, 1),
+            net_rent=Decimal("500.00"),
+            operating_costs_net=Decimal("100.00"),
+            heating_costs_net=Decimal("50.00"),
+        )
+
+    def _booking(self, *, typ, datum, brutto, lease=None):
+        return Buchung.objects.create(
+            mietervertrag=lease or self.lease,
+            einheit=self.unit,
+            typ=typ,
+            kategorie=Buchung.Kategorie.HMZ if typ == Buchung.Typ.SOLL else Buchung.Kategorie.ZAHLUNG,
+            buchungstext="Saldo Test",
+            datum=datum,
+            netto=brutto,
+            ust_prozent=Decimal("0.00"),
+            brutto=brutto,
+        )
+
+    def _salden(self, lease=None):
+        return list(
+            MietkontoSaldo.objects.filter(mietervertrag=lease or self.lease)
+            .order_by("monat")
+            .values_list("monat", "vortrag", "soll", "haben", "endsaldo")
+        )
+
+    def test_saving_bookings_maintains_monthly_snapshots(self):
+        self._booking(typ=Buchung.Typ.SOLL, datum=date(2026, 1, 1), brutto=Decimal("110.00"))
+        self._booking(typ=Buchung.Typ.IST, datum=date(2026, 1, 10), brutto=Decimal("55.00"))
+        self._booking(typ=Buchung.Typ.SOLL, datum=date(2026, 2, 1), brutto=Decimal("55.00"))
+
+        self.assertEqual(
+            self._salden(),
+            [
+                (date(2026, 1, 1), Decimal("0.00"), Decimal("110.00"), Decimal("55.00"), Decimal("-55.00")),
+                (date(2026, 2, 1), Decimal("-55.00"), Decimal("55.00"), Decimal("0.00"), Decimal("-110.00")),
+            ],
+        )
+
+    def test_backdated_change_and_delete_roll_forward(self):
+        january = self._booking(typ=Buchung.Typ.SOLL, datum=date(2026, 1, 1), brutto=Decimal("100.00"))
+        self._booking(typ=Buchung.Typ.IST, datum=date(2026, 3, 5), brutto=Decimal("40.00"))
+
+        january.datum = date(2026, 2, 1)
+        january.save()
+        self.assertEqual(
+            [row[0] for row in self._salden()],
+            [date(2026, 2, 1), date(2026, 3, 1)],
+        )
+        self.assertEqual(self._salden()[-1][4], Decimal("-60.00"))
+
+        january.delete()
+        self.assertEqual(
+            self._salden(),
+            [(date(2026, 3, 1), Decimal("0.00"), Decimal("0.00"), Decimal("40.00"), Decimal("40.00"))],
+        )
+
+    def test_moving_booking_to_other_lease_refreshes_both(self):
+        other_lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.BEENDET,
+            entry_date=date(2024, 1, 1),
+            exit_date=date(2024, 12, 31),
+            net_rent=Decimal("400.00"),
+            operating_costs_net=Decimal("80.00"),
+            heating_costs_net=Decimal("40.00"),
+        )
+        booking = self._booking(typ=Buchung.Typ.IST, datum=date(2026, 1, 5), brutto=Decimal("30.00"))
+
+        booking.mietervertrag = other_lease
+        booking.save()
+
+        self.assertEqual(self._salden(), [])
+        self.assertEqual(self._salden(other_lease)[0][4], Decimal("30.00"))
+
+    def test_bulk_created_bookings_are_refreshed_explicitly(self):
+        bookings = [
+            Buchung(
+                mietervertrag=self.lease,
+                einheit=self.unit,
+                typ=Buchung.Typ.SOLL,
+                kategorie=Buchung.Kategorie.HMZ,
+                buchungstext="Bulk",
+                datum=date(2026, month, 1),
+                netto=Decimal("10.00"),
+                ust_prozent=Decimal("0.00"),
+                brutto=Decimal("10.00"),
+            )
+            for month in (1, 2)
+        ]
+        Buchung.objects.bulk_create(bookings)
+        self.assertEqual(self._salden(), [])
+
+        MietkontoSaldoService.refresh_for_bookings(bookings)
+
+        self.assertEqual([row[4] for row in self._salden()], [Decimal("-10.00"), Decimal("-20.00")])
+
+    def test_endsaldo_subquery_reads_balance_before_month(self):
+        self._booking(typ=Buchung.Typ.SOLL, datum=date(2026, 1, 1), brutto=Decimal("100.00"))
+        self._booking(typ=Buchung.Typ.IST, datum=date(2026, 2, 3), brutto=Decimal("30.00"))
+
+        lease = LeaseAgreement.objects.annotate(
+            vortrag=MietkontoSaldoService.endsaldo_subquery(before=date(2026, 2, 1)),
+            saldo=MietkontoSaldoService.endsaldo_subquery(),
+            vortrag_leer=MietkontoSaldoService.endsaldo_subquery(before=date(2025, 12, 1)),
+        ).get(pk=self.lease.pk)
+
+        self.assertEqual(lease.vortrag, Decimal("-100.00"))
+        self.assertEqual(lease.saldo, Decimal("-70.00"))
+        self.assertEqual(lease.vortrag_leer, Decimal("0.00"))
+
+    def test_rebuild_command_restores_snapshots(self):
+        self._booking(typ=Buchung.Typ.SOLL, datum=date(2026, 1, 1), brutto=Decimal("100.00"))
+        self._booking(typ=Buchung.Typ.IST, datum=date(2026, 2, 3), brutto=Decimal("30.00"))
+        expected = self._salden()
+        MietkontoSaldo.objects.all().delete()
+
+        stdout = StringIO()
+        call_command("rebuild_mietkonto_salden", "--json", stdout=stdout)
+
+        self.assertEqual(json.loads(stdout.getvalue()), {"leases": 1, "months": 2})
+        self.assertEqual(self._salden(), expected)
+
+    def test_lease_detail_reads_snapshot_and_latest_month_only(self):
+        self._booking(typ=Buchung.Typ.SOLL, datum=date(2025, 12, 1), brutto=Decimal("100.00"))
+        self._booking(typ=Buchung.Typ.SOLL, datum=date(2026, 1, 1), brutto=Decimal("100.00"))
+        self._booking(typ=Buchung.Typ.IST, datum=date(2026, 1, 9), brutto=Decimal("150.00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("lease_detail", args=[self.lease.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["soll_summe"], Decimal("200.00"))
+        self.assertEqual(response.context["haben_summe"], Decimal("150.00"))
+        self.assertEqual(response.context["kontostand"], Decimal("-50.00"))
+        self.assertEqual(len(response.context["buchungen"]), 2)
+        self.assertEqual(response.context["buchungen"][0].kontostand, Decimal("-200.00"))
+        booking_selects = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "webapp_buchung"' in query["sql"] and '"webapp_buchung"."datum" >=' not in query["sql"]
+        ]
+        self.assertEqual(booking_selects, [])
+
+
 class BetriebskostenBelegModelTests(TestCase):
     def setUp(self):
         self.property = Property.objects.create(
@@ -2325,6 +2937,11 @@ class BetriebskostenGruppeViewTests(TestCase):
 
 class BetriebskostenBelegListViewTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Belegliste",
             zip_code="1140",
@@ -3352,6 +3969,53 @@ class OffenePostenViewTests(TestCase):
         self.assertEqual(rows[0]["offen"], Decimal("20.00"))
         self.assertEqual(rows[0]["status_label"], "Rückstand")
 
+    def test_offene_posten_month_reads_snapshot_without_booking_join(self):
+        self._create_booking(Buchung.Typ.SOLL, date(2026, 1, 1), Decimal("100.00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("offene_posten"), {"monat": "2026-01"})
+
+        self.assertEqual(response.context["rows"][0]["soll"], Decimal("100.00"))
+        self.assertFalse(
+            [query["sql"] for query in queries if 'JOIN "webapp_buchung"' in query["sql"]],
+        )
+
+    def test_excel_export_covers_month_range_with_carry_forward(self):
+        self._create_booking(Buchung.Typ.SOLL, date(2026, 1, 1), Decimal("100.00"))
+        self._create_booking(Buchung.Typ.IST, date(2026, 1, 15), Decimal("80.00"))
+        self._create_booking(Buchung.Typ.SOLL, date(2026, 3, 1), Decimal("100.00"))
+
+        series = MietkontoSaldoService.month_series(
+            LeaseAgreement.objects.filter(pk=self.lease.pk),
+            start=date(2026, 1, 1),
+            end=date(2026, 3, 1),
+        )[self.lease.pk]
+        self.assertEqual([row["endsaldo"] for row in series], [Decimal("-20.00"), Decimal("-20.00"), Decimal("-120.00")])
+        self.assertEqual(series[2]["vortrag"], Decimal("-20.00"))
+
+        response = self.client.get(reverse("offene_posten_export_excel"), {"von": "2026-01", "bis": "2026-03"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("offene_posten_2026-01_2026-03.xlsx", response["Content-Disposition"])
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            worksheet_xml = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertEqual(worksheet_xml.count("Anna Offen"), 3)
+        self.assertLess(worksheet_xml.index("01.2026"), worksheet_xml.index("03.2026"))
+        self.assertIn("<v>-120.00</v>", worksheet_xml)
+
+    def _create_booking(self, typ, booking_date, amount):
+        return Buchung.objects.create(
+            mietervertrag=self.lease,
+            einheit=self.unit,
+            typ=typ,
+            kategorie=Buchung.Kategorie.HMZ if typ == Buchung.Typ.SOLL else Buchung.Kategorie.ZAHLUNG,
+            buchungstext="Offene Posten Test",
+            datum=booking_date,
+            netto=amount,
+            ust_prozent=Decimal("0.00"),
+            brutto=amount,
+        )
+
 
 class BetriebskostenAbrechnungViewTests(TestCase):
     def setUp(self):
@@ -3889,6 +4553,11 @@ class BetriebskostenAbrechnungViewTests(TestCase):
 
 class AnnualStatementLetterRunTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.manager = Manager.objects.create(
             company_name="HV Muster GmbH",
             contact_person="Max Muster",
@@ -5099,6 +5768,11 @@ class OperatingCostServiceTests(TestCase):
 
 class DateiManagementModelTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Datei",
             zip_code="1090",
@@ -5225,6 +5899,11 @@ class DateiManagementModelTests(TestCase):
 
 class DateiUploadFormValidationTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.user = get_user_model().objects.create_user(
             username="upload-admin",
             password="pw",
@@ -5411,6 +6090,11 @@ class DateiUploadFormValidationTests(TestCase):
 
 class DateiServicePermissionAndAuditTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Rechte",
             zip_code="1030",
@@ -5505,42 +6189,496 @@ class DateiServicePermissionAndAuditTests(TestCase):
         )
 
 
-class DateiDownloadViewTests(TestCase):
+class DateiOperationAuditTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
-            name="Objekt Download",
-            zip_code="1040",
+            name="Objekt Protokoll",
+            zip_code="1090",
             city="Wien",
-            street_address="Downloadgasse 4",
+            street_address="Protokollgasse 9",
         )
         self.datei = DateiService.upload(
-            user=None,
-            uploaded_file=SimpleUploadedFile(
-                "download.pdf",
-                b"%PDF",
-                content_type="application/pdf",
-            ),
+            uploaded_file=SimpleUploadedFile("beleg.pdf", b"%PDF-1.7 audit", content_type="application/pdf"),
             kategorie=Datei.Kategorie.DOKUMENT,
             target_object=self.property,
         )
 
-    def test_download_is_publicly_accessible(self):
-        response = self.client.get(reverse("datei_download", kwargs={"pk": self.datei.pk}))
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response["Content-Type"], "application/octet-stream")
+    def _start_buffering(self):
+        DateiOperationAudit.start_buffering(periodic=False)
+        self.addCleanup(DateiOperationAudit.stop_buffering)
 
-    def test_download_of_archived_file_returns_403(self):
-        DateiService.archive(user=None, datei=self.datei)
-        response = self.client.get(reverse("datei_download", kwargs={"pk": self.datei.pk}))
-        self.assertEqual(response.status_code, 403)
+    def _view_logs(self):
+        return DateiOperationLog.objects.filter(operation=DateiOperationLog.Operation.VIEW)
 
-    def test_open_returns_inline_response(self):
-        response = self.client.get(reverse("datei_open", kwargs={"pk": self.datei.pk}))
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response["Content-Type"], "application/pdf")
+    def test_successful_views_are_buffered_and_flushed_in_one_insert(self):
+        self._start_buffering()
+        for _index in range(3):
+            DateiService.prepare_download(user=None, datei=self.datei)
 
-    def test_open_uses_filename_mime_fallback_for_legacy_octet_stream(self):
-        Datei.objects.filter(pk=self.datei.pk).update(mime_type="application/octet-stream")
+        self.assertEqual(self._view_logs().count(), 0)
+        self.assertEqual(DateiOperationAudit.pending_count(), 3)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(DateiOperationAudit.flush(), 3)
+
+        property_type = ContentType.objects.get_for_model(Property)
+        self.assertEqual(
+            self._view_logs().filter(content_type=property_type, object_id=self.property.pk).count(),
+            3,
+        )
+
+    def test_security_relevant_operations_bypass_the_buffer(self):
+        self._start_buffering()
+        DateiService.archive(user=None, datei=self.datei)
+        with self.assertRaises(PermissionDenied):
+            DateiService.prepare_download(user=None, datei=self.datei)
+
+        self.assertEqual(DateiOperationAudit.pending_count(), 0)
+        self.assertTrue(self._view_logs().filter(success=False, datei=self.datei).exists())
+
+    @override_settings(DATEI_OPERATION_LOG_FLUSH_SECONDS=0)
+    def test_middleware_flushes_due_buffer_at_end_of_request(self):
+        self._start_buffering()
+        response = self.client.get(reverse("datei_open", kwargs={"pk": self.datei.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DateiOperationAudit.pending_count(), 0)
+        self.assertEqual(self._view_logs().filter(success=True).count(), 1)
+
+    def test_flush_keeps_entries_of_meanwhile_deleted_files(self):
+        self._start_buffering()
+        DateiService.prepare_download(user=None, datei=self.datei)
+        DateiService.delete(user=None, datei=self.datei)
+
+        DateiOperationAudit.flush()
+
+        entry = self._view_logs().get()
+        self.assertIsNone(entry.datei_id)
+        self.assertEqual(entry.datei_name, "beleg.pdf")
+
+    def test_prune_command_rolls_up_old_views_and_keeps_security_entries(self):
+        DateiService.prepare_download(user=None, datei=self.datei)
+        DateiService.prepare_download(user=None, datei=self.datei)
+        DateiService.prepare_download(user=None, datei=self.datei)
+        old = timezone.now() - timedelta(days=400)
+        DateiOperationLog.objects.update(created_at=old)
+        recent = self._view_logs().order_by("id").last()
+        DateiOperationLog.objects.filter(pk=recent.pk).update(created_at=timezone.now())
+
+        dry_out = StringIO()
+        call_command("files_prune_operation_log", "--days", "180", json=True, stdout=dry_out)
+        self.assertEqual(json.loads(dry_out.getvalue())["rows"], 2)
+        self.assertEqual(DateiOperationDailyStat.objects.count(), 0)
+
+        out = StringIO()
+        call_command("files_prune_operation_log", "--days", "180", "--apply", json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+
+        self.assertEqual(summary["deleted_rows"], 2)
+        stat = DateiOperationDailyStat.objects.get()
+        self.assertEqual(stat.day, timezone.localdate(old))
+        self.assertEqual(stat.operation, DateiOperationLog.Operation.VIEW)
+        self.assertEqual(stat.count, 2)
+        self.assertEqual(self._view_logs().count(), 1)
+        self.assertTrue(
+            DateiOperationLog.objects.filter(operation=DateiOperationLog.Operation.UPLOAD).exists()
+        )
+
+
+class DateiAttachmentSummaryTests(TestCase):
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def _property(self, name):
+        return Property.objects.create(name=name, zip_code="1100", city="Wien", street_address=f"{name} 1")
+
+    def _attach(self, target, name, content, content_type, kategorie):
+        return DateiService.upload(
+            uploaded_file=SimpleUploadedFile(name, content, content_type=content_type),
+            kategorie=kategorie,
+            target_object=target,
+        )
+
+    def test_summaries_for_many_objects_use_one_grouped_query(self):
+        with_files = self._property("Mit Dateien")
+        archived_only = self._property("Nur Archiv")
+        empty = self._property("Leer")
+        self._attach(with_files, "vertrag.pdf", b"%PDF-1.7 vertrag", "application/pdf", Datei.Kategorie.VERTRAG)
+        first_image = self._attach(with_files, "a.png", b"\x89PNG\r\n\x1a\na", "image/png", Datei.Kategorie.BILD)
+        latest_image = self._attach(with_files, "b.png", b"\x89PNG\r\n\x1a\nb", "image/png", Datei.Kategorie.BILD)
+        archived = self._attach(archived_only, "alt.pdf", b"%PDF-1.7 alt", "application/pdf", Datei.Kategorie.DOKUMENT)
+        DateiService.archive(user=None, datei=archived)
+        ContentType.objects.get_for_model(Property)
+
+        with self.assertNumQueries(1):
+            summaries = DateiService.attachment_summaries(
+                model=Property,
+                object_ids=[with_files.pk, archived_only.pk, empty.pk],
+            )
+
+        summary = summaries[with_files.pk]
+        self.assertEqual(summary.total, 3)
+        self.assertEqual(summary.by_category, {Datei.Kategorie.VERTRAG: 1, Datei.Kategorie.BILD: 2})
+        self.assertTrue(summary.has_contract)
+        self.assertEqual(summary.image_count, 2)
+        self.assertEqual(summary.latest_image_id, latest_image.pk)
+        self.assertNotEqual(summary.latest_image_id, first_image.pk)
+        self.assertNotIn(archived_only.pk, summaries)
+        self.assertNotIn(empty.pk, summaries)
+        self.assertEqual(
+            DateiService.attachment_summaries(
+                model=Property,
+                object_ids=[archived_only.pk],
+                include_archived=True,
+            )[archived_only.pk].total,
+            1,
+        )
+
+    def test_property_list_query_count_does_not_grow_with_rows(self):
+        first = self._property("Objekt A")
+        self._attach(first, "vertrag.pdf", b"%PDF-1.7 a", "application/pdf", Datei.Kategorie.VERTRAG)
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.get(reverse("property_list"))
+        self.assertContains(response, "bi-paperclip")
+        self.assertContains(response, "Vertrag hinterlegt")
+
+        for index in range(3):
+            target = self._property(f"Objekt {index}")
+            self._attach(target, f"foto-{index}.png", b"\x89PNG\r\n\x1a\n" + bytes([index]), "image/png", Datei.Kategorie.BILD)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(reverse("property_list"))
+
+        self.assertEqual(len(many.captured_queries), len(single.captured_queries))
+
+
+class DateiUploadPipelineTests(TestCase):
+    PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Pipeline",
+            zip_code="1040",
+            city="Wien",
+            street_address="Streamgasse 4",
+        )
+
+    def _stored_files(self):
+        return [
+            os.path.join(root, name)
+            for root, _dirs, files in os.walk(self._media_dir.name)
+            for name in files
+        ]
+
+    def test_upload_hashes_sizes_and_sniffs_while_storing_without_rereading(self):
+        with patch("webapp.models.read_file_metadata") as mocked_reread:
+            datei = DateiService.upload(
+                uploaded_file=SimpleUploadedFile("foto.png", self.PNG_BYTES, content_type="image/png"),
+                kategorie=Datei.Kategorie.BILD,
+                target_object=self.property,
+            )
+
+        mocked_reread.assert_not_called()
+        self.assertEqual(datei.checksum_sha256, hashlib.sha256(self.PNG_BYTES).hexdigest())
+        self.assertEqual(datei.size_bytes, len(self.PNG_BYTES))
+        self.assertEqual(datei.mime_type, "image/png")
+        self.assertEqual(len(self._stored_files()), 1)
+
+    def test_loaded_instances_do_not_reread_file_on_save(self):
+        datei = DateiService.upload(
+            uploaded_file=SimpleUploadedFile("beleg.pdf", b"%PDF-1.7 pipeline", content_type="application/pdf"),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+        reloaded = Datei.objects.get(pk=datei.pk)
+
+        with patch("webapp.models.read_file_metadata") as mocked_reread:
+            reloaded.beschreibung = "Neu beschrieben"
+            reloaded.full_clean()
+            reloaded.save()
+
+        mocked_reread.assert_not_called()
+        reloaded.refresh_from_db()
+        self.assertEqual(reloaded.checksum_sha256, datei.checksum_sha256)
+        self.assertEqual(reloaded.mime_type, "application/pdf")
+
+    def test_content_sniffing_overrides_name_based_mime_type(self):
+        datei = Datei(file=SimpleUploadedFile("scan.bin", b"%PDF-1.4 body"))
+        datei.store_file()
+        datei.save()
+
+        self.assertEqual(datei.mime_type, "application/pdf")
+
+    @override_settings(DATEI_HARD_DEDUP=True)
+    def test_hard_dedup_rejection_removes_already_stored_file(self):
+        DateiService.upload(
+            uploaded_file=SimpleUploadedFile("a.pdf", b"%PDF-1.4 same", content_type="application/pdf"),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+
+        with self.assertRaises(ValidationError):
+            DateiService.upload(
+                uploaded_file=SimpleUploadedFile("b.pdf", b"%PDF-1.4 same", content_type="application/pdf"),
+                kategorie=Datei.Kategorie.DOKUMENT,
+                target_object=self.property,
+            )
+
+        self.assertEqual(Datei.objects.count(), 1)
+        self.assertEqual(len(self._stored_files()), 1)
+
+
+class DateiBlobStorageTests(TestCase):
+    CONTENT = b"%PDF-1.7 gemeinsamer Inhalt"
+
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Blob",
+            zip_code="1050",
+            city="Wien",
+            street_address="Blobgasse 2",
+        )
+
+    def _upload(self, name="beleg.pdf", content=CONTENT):
+        return DateiService.upload(
+            uploaded_file=SimpleUploadedFile(name, content, content_type="application/pdf"),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+
+    def _stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self._media_dir.name).replace(os.sep, "/")
+            for root, _dirs, files in os.walk(self._media_dir.name)
+            for name in files
+        )
+
+    @override_settings(DATEI_CONTENT_ADDRESSED_STORAGE=True)
+    def test_identical_uploads_share_one_blob_until_last_reference_is_deleted(self):
+        first = self._upload("beleg.pdf")
+        second = self._upload("beleg-kopie.pdf")
+        checksum = hashlib.sha256(self.CONTENT).hexdigest()
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.file.name, f"uploads/_blobs/{checksum[:2]}/{checksum[2:4]}/{checksum}.pdf")
+        self.assertEqual(self._stored_files(), [first.file.name])
+        self.assertEqual(second.original_name, "beleg-kopie.pdf")
+
+        DateiService.delete(user=None, datei=first)
+        self.assertEqual(self._stored_files(), [second.file.name])
+
+        DateiService.delete(user=None, datei=second)
+        self.assertEqual(self._stored_files(), [])
+
+    def test_collapse_duplicates_command_repoints_rows_and_reclaims_space(self):
+        first = self._upload("beleg.pdf")
+        second = self._upload("beleg-kopie.pdf")
+        self.assertEqual(len(self._stored_files()), 2)
+
+        dry_out = io.StringIO()
+        call_command("files_collapse_duplicates", json=True, stdout=dry_out)
+        dry_summary = json.loads(dry_out.getvalue())
+        self.assertEqual(dry_summary["mode"], "dry-run")
+        self.assertEqual(dry_summary["reclaimed_bytes"], len(self.CONTENT))
+        self.assertEqual(len(self._stored_files()), 2)
+
+        out = io.StringIO()
+        call_command("files_collapse_duplicates", "--apply", json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(summary["duplicate_groups_count"], 1)
+        self.assertEqual(summary["removed_files_count"], 2)
+        self.assertEqual(summary["reclaimed_bytes"], len(self.CONTENT))
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith("uploads/_blobs/"))
+        self.assertEqual(self._stored_files(), [first.file.name])
+        with first.file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.CONTENT)
+
+    def test_cleanup_orphans_reports_and_deletes_unreferenced_blobs(self):
+        with override_settings(DATEI_CONTENT_ADDRESSED_STORAGE=True):
+            datei = self._upload()
+        blob_name = datei.file.name
+        Datei.objects.filter(pk=datei.pk).delete()
+
+        dry_out = io.StringIO()
+        call_command("files_cleanup_orphans", json=True, stdout=dry_out)
+        dry_summary = json.loads(dry_out.getvalue())
+        self.assertEqual(dry_summary["unreferenced_blobs"], [blob_name])
+        self.assertEqual(self._stored_files(), [blob_name])
+
+        out = io.StringIO()
+        call_command("files_cleanup_orphans", "--delete-unreferenced-blobs", json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["deleted_blobs_count"], 1)
+        self.assertEqual(self._stored_files(), [])
+
+
+@override_settings(DATEI_THUMBNAIL_SIZES=["64", "128"], DATEI_THUMBNAIL_WORKERS=0)
+class DateiThumbnailTests(TestCase):
+    def setUp(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("Pillow ist nicht installiert.")
+        self.Image = Image
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Vorschau",
+            zip_code="1060",
+            city="Wien",
+            street_address="Bildgasse 6",
+        )
+
+    def _png_bytes(self, width=300, height=200, color=(200, 30, 30)):
+        buffer = io.BytesIO()
+        self.Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def _upload(self, name, content, content_type):
+        return DateiService.upload(
+            uploaded_file=SimpleUploadedFile(name, content, content_type=content_type),
+            kategorie=Datei.Kategorie.BILD if content_type.startswith("image/") else Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+
+    def test_upload_derives_all_sizes_and_preview_serves_thumbnail(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            datei = self._upload("foto.png", self._png_bytes(), "image/png")
+
+        for size in (64, 128):
+            self.assertTrue(datei.file.storage.exists(DateiThumbnailService.derived_path(datei.file.name, size)))
+
+        response = self.client.get(reverse("datei_preview", kwargs={"pk": datei.pk}), {"size": "100"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        with self.Image.open(io.BytesIO(b"".join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (128, 85))
+
+    def test_preview_falls_back_to_original_until_thumbnail_exists(self):
+        content = self._png_bytes()
+        datei = self._upload("foto.png", content, "image/png")
+
+        response = self.client.get(reverse("datei_preview", kwargs={"pk": datei.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(b"".join(response.streaming_content), content)
+
+    def test_pdf_first_page_is_derived_and_served_as_preview(self):
+        datei = self._upload("vertrag.pdf", b"%PDF-1.7 vorschau", "application/pdf")
+        response = self.client.get(reverse("datei_preview", kwargs={"pk": datei.pk}))
+        self.assertEqual(response.status_code, 404)
+
+        with patch.object(
+            DateiThumbnailService,
+            "render_pdf_first_page",
+            return_value=self.Image.new("RGB", (100, 141), (255, 255, 255)),
+        ) as mocked_render:
+            result = derive_thumbnails(datei.file.name, "application/pdf")
+
+        mocked_render.assert_called_once()
+        self.assertEqual(result["created"], 2)
+        response = self.client.get(reverse("datei_preview", kwargs={"pk": datei.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+
+    def test_backfill_command_uses_process_pool_and_skips_existing(self):
+        first = self._upload("eins.png", self._png_bytes(color=(10, 20, 30)), "image/png")
+        self._upload("zwei.png", self._png_bytes(color=(30, 20, 10)), "image/png")
+
+        out = io.StringIO()
+        with patch(
+            "webapp.management.commands.files_generate_thumbnails.ProcessPoolExecutor",
+            wraps=ProcessPoolExecutor,
+        ) as mocked_pool:
+            call_command("files_generate_thumbnails", "--json", "--workers", "2", stdout=out)
+        summary = json.loads(out.getvalue())
+
+        mocked_pool.assert_called_once()
+        self.assertEqual(summary["created"], 4)
+        self.assertEqual(summary["failed"], 0)
+        self.assertTrue(first.file.storage.exists(DateiThumbnailService.derived_path(first.file.name, 64)))
+
+        out_second = io.StringIO()
+        call_command("files_generate_thumbnails", "--json", "--workers", "1", stdout=out_second)
+        self.assertEqual(json.loads(out_second.getvalue())["skipped_existing"], 4)
+
+    def test_delete_removes_derived_thumbnails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            datei = self._upload("foto.png", self._png_bytes(), "image/png")
+        derived = DateiThumbnailService.derived_path(datei.file.name, 64)
+        self.assertTrue(datei.file.storage.exists(derived))
+
+        DateiService.delete(user=None, datei=datei)
+
+        self.assertFalse(default_storage.exists(derived))
+
+
+class DateiDownloadViewTests(TestCase):
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Download",
+            zip_code="1040",
+            city="Wien",
+            street_address="Downloadgasse 4",
+        )
+        self.datei = DateiService.upload(
+            user=None,
+            uploaded_file=SimpleUploadedFile(
+                "download.pdf",
+                b"%PDF",
+                content_type="application/pdf",
+            ),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+
+    def test_download_is_publicly_accessible(self):
+        response = self.client.get(reverse("datei_download", kwargs={"pk": self.datei.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+
+    def test_download_of_archived_file_returns_403(self):
+        DateiService.archive(user=None, datei=self.datei)
+        response = self.client.get(reverse("datei_download", kwargs={"pk": self.datei.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_open_returns_inline_response(self):
+        response = self.client.get(reverse("datei_open", kwargs={"pk": self.datei.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    def test_open_uses_filename_mime_fallback_for_legacy_octet_stream(self):
+        Datei.objects.filter(pk=self.datei.pk).update(mime_type="application/octet-stream")
         response = self.client.get(reverse("datei_open", kwargs={"pk": self.datei.pk}))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Type"], "application/pdf")
@@ -5562,8 +6700,633 @@ class DateiDownloadViewTests(TestCase):
         self.assertEqual(response["Content-Type"], "image/jpeg")
 
 
+class DateiDeliveryTests(TestCase):
+    CONTENT = b"%PDF-1.7 " + bytes(range(256)) * 4
+
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Auslieferung",
+            zip_code="1070",
+            city="Wien",
+            street_address="Rangegasse 7",
+        )
+        self.datei = DateiService.upload(
+            uploaded_file=SimpleUploadedFile("gross.pdf", self.CONTENT, content_type="application/pdf"),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+        self.open_url = reverse("datei_open", kwargs={"pk": self.datei.pk})
+        self.etag = f'"{hashlib.sha256(self.CONTENT).hexdigest()}"'
+
+    def test_response_carries_checksum_etag_and_cache_headers(self):
+        response = self.client.get(self.open_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertEqual(b"".join(response.streaming_content), self.CONTENT)
+
+    def test_matching_if_none_match_returns_304_without_body(self):
+        response = self.client.get(self.open_url, HTTP_IF_NONE_MATCH=self.etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response.content, b"")
+
+    def test_byte_range_returns_206_with_partial_content(self):
+        response = self.client.get(self.open_url, HTTP_RANGE="bytes=9-18")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 9-18/{len(self.CONTENT)}")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), self.CONTENT[9:19])
+
+        suffix = self.client.get(self.open_url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(suffix.status_code, 206)
+        self.assertEqual(b"".join(suffix.streaming_content), self.CONTENT[-5:])
+
+    def test_stale_if_range_and_unsatisfiable_ranges(self):
+        stale = self.client.get(self.open_url, HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE='"veraltet"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(b"".join(stale.streaming_content), self.CONTENT)
+
+        unsatisfiable = self.client.get(self.open_url, HTTP_RANGE=f"bytes={len(self.CONTENT)}-")
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable["Content-Range"], f"bytes */{len(self.CONTENT)}")
+
+    @override_settings(DATEI_SENDFILE_MODE="nginx", DATEI_SENDFILE_NGINX_PREFIX="/protected-media/")
+    def test_nginx_mode_hands_file_to_web_server(self):
+        response = self.client.get(reverse("datei_download", kwargs={"pk": self.datei.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.datei.file.name}")
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertIn('attachment; filename="gross.pdf"', response["Content-Disposition"])
+        self.assertEqual(response.content, b"")
+
+    @override_settings(DATEI_SENDFILE_MODE="apache")
+    def test_apache_mode_sets_x_sendfile_path(self):
+        response = self.client.get(self.open_url)
+
+        self.assertEqual(response["X-Sendfile"], self.datei.file.path)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+
+class DateiIntegrityScanTests(TestCase):
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Integrität",
+            zip_code="1070",
+            city="Wien",
+            street_address="Prüfgasse 7",
+        )
+
+    def _upload(self, name: str, content: bytes):
+        return DateiService.upload(
+            uploaded_file=SimpleUploadedFile(name, content, content_type="application/pdf"),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+
+    def _overwrite(self, datei, content: bytes):
+        with open(default_storage.path(datei.file.name), "wb") as handle:
+            handle.write(content)
+
+    def test_scan_reports_checksum_mismatch_and_missing_files(self):
+        intact = self._upload("intakt.pdf", b"%PDF-1.7 intakt")
+        corrupted = self._upload("kaputt.pdf", b"%PDF-1.7 original")
+        missing = self._upload("weg.pdf", b"%PDF-1.7 weg")
+        self._overwrite(corrupted, b"%PDF-1.7 xriginal")
+        default_storage.delete(missing.file.name)
+
+        summary = DateiIntegrityScan(workers=2, batch_size=2).run()
+
+        self.assertTrue(summary["complete"])
+        self.assertEqual(summary["scanned_dateien"], 3)
+        self.assertEqual(summary["counts"], {"ok": 1, "checksum_mismatch": 1, "missing": 1})
+        statuses = {tuple(finding["datei_ids"]): finding["status"] for finding in summary["findings"]}
+        self.assertEqual(statuses, {(corrupted.pk,): "checksum_mismatch", (missing.pk,): "missing"})
+        self.assertNotIn((intact.pk,), statuses)
+
+    def test_scan_reports_size_mismatch_before_checksum(self):
+        truncated = self._upload("gekuerzt.pdf", b"%PDF-1.7 vollstaendig")
+        self._overwrite(truncated, b"%PDF")
+
+        summary = DateiIntegrityScan(workers=1).run()
+
+        self.assertEqual(summary["findings"][0]["status"], "size_mismatch")
+        self.assertEqual(summary["findings"][0]["actual_size"], 4)
+
+    def test_time_limited_scan_resumes_from_checkpoint(self):
+        dateien = [self._upload(f"beleg-{index}.pdf", f"%PDF-1.7 {index}".encode()) for index in range(3)]
+        self._overwrite(dateien[2], b"%PDF-1.7 X")
+        checkpoint_path = os.path.join(self._media_dir.name, "audit-checkpoint.json")
+
+        # Nach dem ersten Batch ist das Zeitbudget aufgebraucht.
+        scan = DateiIntegrityScan(batch_size=1, max_seconds=5, checkpoint_path=checkpoint_path)
+        clock = iter([0.0, 0.0, 10.0, 10.0, 10.0])
+        with patch("webapp.services.file_integrity.time.monotonic", side_effect=lambda: next(clock)):
+            first = scan.run()
+
+        self.assertFalse(first["complete"])
+        self.assertEqual(first["scanned_dateien"], 1)
+        self.assertEqual(first["last_datei_id"], dateien[0].pk)
+        self.assertTrue(os.path.exists(checkpoint_path))
+
+        progress_events = []
+        second = DateiIntegrityScan(
+            batch_size=1,
+            checkpoint_path=checkpoint_path,
+            progress=progress_events.append,
+        ).run()
+
+        self.assertTrue(second["complete"])
+        self.assertEqual(second["scanned_dateien"], 3)
+        self.assertEqual(second["counts"], {"ok": 2, "checksum_mismatch": 1})
+        self.assertEqual([event["scanned_dateien"] for event in progress_events], [2, 3])
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_files_audit_verify_checksums_outputs_json_and_progress(self):
+        corrupted = self._upload("kaputt.pdf", b"%PDF-1.7 original")
+        self._overwrite(corrupted, b"%PDF-1.7 geaendert")
+        stdout = StringIO()
+        stderr = StringIO()
+
+        call_command(
+            "files_audit",
+            "--verify-checksums",
+            "--json",
+            "--progress",
+            "--workers=2",
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        summary = json.loads(stdout.getvalue())
+        self.assertTrue(summary["complete"])
+        self.assertEqual(summary["findings"][0]["status"], "size_mismatch")
+        self.assertEqual(summary["findings"][0]["datei_ids"], [corrupted.pk])
+        progress = [json.loads(line) for line in stderr.getvalue().splitlines() if line.strip()]
+        self.assertEqual(progress[-1]["event"], "progress")
+        self.assertEqual(progress[-1]["scanned_dateien"], 1)
+
+    def test_files_audit_interrupted_without_checkpoint_does_not_claim_one(self):
+        for index in range(2):
+            self._upload(f"beleg-{index}.pdf", f"%PDF-1.7 {index}".encode())
+        stdout = StringIO()
+
+        clock = iter([0.0, 0.0, 10.0, 10.0, 10.0])
+        with patch("webapp.services.file_integrity.time.monotonic", side_effect=lambda: next(clock)):
+            call_command(
+                "files_audit",
+                "--verify-checksums",
+                "--batch-size=1",
+                "--max-seconds=5",
+                stdout=stdout,
+            )
+
+        output = stdout.getvalue()
+        self.assertIn("unterbrochen (ohne --checkpoint", output)
+        self.assertNotIn("Checkpoint gespeichert", output)
+
+
+class DateiSupersededLetterTests(TestCase):
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Ersatz",
+            zip_code="1080",
+            city="Wien",
+            street_address="Neugasse 8",
+        )
+        self.unit = Unit.objects.create(
+            property=self.property,
+            unit_type=Unit.UnitType.APARTMENT,
+            door_number="3",
+            name="Top 3",
+        )
+        self.lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.AKTIV,
+            entry_date=date(2025, 1, 1),
+            net_rent=Decimal("500.00"),
+            operating_costs_net=Decimal("120.00"),
+            heating_costs_net=Decimal("50.00"),
+        )
+        run = Abrechnungslauf.objects.create(liegenschaft=self.property, jahr=2026)
+        self.letter = Abrechnungsschreiben.objects.create(lauf=run, mietervertrag=self.lease, einheit=self.unit)
+
+    def _persist(self, content: bytes) -> Datei:
+        return AnnualStatementStorageService.persist_letter_pdf(
+            letter=self.letter,
+            filename="bk-2026.pdf",
+            pdf_bytes=content,
+        )
+
+    def test_regenerated_letters_point_every_archived_version_at_current_pdf(self):
+        first = self._persist(b"%PDF-1.4 erste")
+        second = self._persist(b"%PDF-1.4 zweite")
+        third = self._persist(b"%PDF-1.4 dritte")
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.superseded_by_id, third.pk)
+        self.assertEqual(second.superseded_by_id, third.pk)
+        self.assertIsNone(third.superseded_by_id)
+
+        with self.assertNumQueries(1):
+            replacement = DateiService.replacement_for_archived_download(datei=first)
+        self.assertEqual(replacement, third)
+        self.assertIsNone(DateiService.replacement_for_archived_download(datei=third))
+
+        response = self.client.get(reverse("datei_download", kwargs={"pk": first.pk}))
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 dritte")
+
+    def test_archived_replacement_is_not_served(self):
+        first = self._persist(b"%PDF-1.4 erste")
+        second = self._persist(b"%PDF-1.4 zweite")
+        DateiService.archive(user=None, datei=second)
+        first.refresh_from_db()
+
+        self.assertIsNone(DateiService.replacement_for_archived_download(datei=first))
+
+    def test_backfill_links_legacy_archived_letters(self):
+        first = self._persist(b"%PDF-1.4 erste")
+        second = self._persist(b"%PDF-1.4 zweite")
+        Datei.objects.filter(pk=first.pk).update(superseded_by=None)
+        unrelated = Datei.objects.create(
+            file=SimpleUploadedFile("alt.pdf", b"%PDF-1.4 alt", content_type="application/pdf"),
+            original_name="alt.pdf",
+            kategorie=Datei.Kategorie.DOKUMENT,
+            beschreibung="BK-Abrechnung 2020",
+            is_archived=True,
+        )
+
+        stdout = StringIO()
+        call_command("files_backfill_superseded_by", "--json", stdout=stdout)
+        dry_run = json.loads(stdout.getvalue())
+        self.assertEqual(dry_run["mode"], "dry-run")
+        self.assertEqual(dry_run["links"], [{"datei_id": first.pk, "superseded_by": second.pk}])
+        self.assertEqual(dry_run["without_replacement"], 1)
+        first.refresh_from_db()
+        self.assertIsNone(first.superseded_by_id)
+
+        call_command("files_backfill_superseded_by", "--apply", stdout=StringIO())
+        first.refresh_from_db()
+        unrelated.refresh_from_db()
+        self.assertEqual(first.superseded_by_id, second.pk)
+        self.assertIsNone(unrelated.superseded_by_id)
+
+
+class DateiStorageTierTests(TestCase):
+    CONTENT = b"%PDF-1.7 " + b"alte Abrechnung " * 64
+
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        self._cold_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._cold_dir.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=self._media_dir.name,
+            DATEI_COLD_STORAGE_ROOT=self._cold_dir.name,
+            DATEI_COLD_STORAGE_AFTER_DAYS=30,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Kalt",
+            zip_code="1090",
+            city="Wien",
+            street_address="Kellergasse 9",
+        )
+
+    def _upload(self, name="alt.pdf", content=CONTENT):
+        return DateiService.upload(
+            uploaded_file=SimpleUploadedFile(name, content, content_type="application/pdf"),
+            kategorie=Datei.Kategorie.DOKUMENT,
+            target_object=self.property,
+        )
+
+    def _archive(self, datei, *, days_ago: int):
+        DateiService.archive(user=None, datei=datei)
+        Datei.objects.filter(pk=datei.pk).update(archived_at=timezone.now() - timedelta(days=days_ago))
+        datei.refresh_from_db()
+        return datei
+
+    def _tier(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return DateiStorageTiers.tier_archived(apply=True, **kwargs)
+
+    def _serve(self, datei, **headers):
+        storage, name = DateiStorageTiers.read_source(datei)
+        return DateiDelivery.serve(
+            RequestFactory().get("/", headers=headers),
+            storage=storage,
+            name=name,
+            content_type="application/pdf",
+        )
+
+    def test_old_archived_file_moves_to_compressed_cold_storage_and_is_still_served(self):
+        old = self._archive(self._upload(), days_ago=60)
+        recent = self._archive(self._upload("neu.pdf", b"%PDF-1.7 neu"), days_ago=5)
+
+        summary = self._tier()
+
+        self.assertEqual(summary["moved"], 1)
+        self.assertLess(summary["cold_bytes"], summary["hot_bytes"])
+        old.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(old.storage_tier, Datei.StorageTier.COLD_GZIP)
+        self.assertEqual(recent.storage_tier, Datei.StorageTier.HOT)
+        self.assertFalse(default_storage.exists(old.file.name))
+        self.assertTrue(os.path.exists(os.path.join(self._cold_dir.name, old.file.name + ".gz")))
+
+        response = self._serve(old)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.CONTENT)
+
+        ranged = self._serve(old, Range="bytes=9-12")
+        self.assertEqual(ranged.status_code, 206)
+        self.assertEqual(b"".join(ranged.streaming_content), self.CONTENT[9:13])
+
+    @override_settings(DATEI_SENDFILE_MODE="nginx")
+    def test_cold_files_are_streamed_by_django_even_with_sendfile(self):
+        old = self._archive(self._upload(), days_ago=60)
+        self._tier(compress=False)
+        old.refresh_from_db()
+        self.assertEqual(old.storage_tier, Datei.StorageTier.COLD)
+
+        response = self._serve(old)
+
+        self.assertNotIn("X-Accel-Redirect", response)
+        self.assertEqual(b"".join(response.streaming_content), self.CONTENT)
+
+    @override_settings(DATEI_CONTENT_ADDRESSED_STORAGE=True)
+    def test_shared_blob_stays_hot_while_any_reference_is_active(self):
+        archived = self._archive(self._upload("a.pdf"), days_ago=60)
+        active = self._upload("b.pdf")
+        self.assertEqual(archived.file.name, active.file.name)
+
+        summary = DateiStorageTiers.tier_archived(apply=False)
+
+        self.assertEqual(summary["candidates"], 0)
+        self.assertTrue(default_storage.exists(active.file.name))
+
+    def test_collapse_duplicates_leaves_cold_rows_untouched(self):
+        cold = self._archive(self._upload("kalt.pdf"), days_ago=60)
+        self._tier(compress=False)
+        cold.refresh_from_db()
+        cold_name = cold.file.name
+        first = self._upload("a.pdf")
+        second = self._upload("b.pdf")
+
+        out = StringIO()
+        call_command("files_collapse_duplicates", "--apply", json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+
+        self.assertEqual(summary["duplicate_groups_count"], 1)
+        self.assertEqual(summary["skipped_files_count"], 1)
+        cold.refresh_from_db()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith("uploads/_blobs/"))
+        self.assertEqual(cold.file.name, cold_name)
+        self.assertEqual(cold.storage_tier, Datei.StorageTier.COLD)
+        self.assertTrue(os.path.exists(os.path.join(self._cold_dir.name, cold_name)))
+        self.assertEqual(b"".join(self._serve(cold).streaming_content), self.CONTENT)
+
+    @override_settings(DATEI_CONTENT_ADDRESSED_STORAGE=True)
+    def test_hot_blob_is_released_even_if_cold_rows_share_its_name(self):
+        cold = self._archive(self._upload("a.pdf"), days_ago=60)
+        self._tier()
+        active = self._upload("b.pdf")
+        cold.refresh_from_db()
+        self.assertEqual(active.file.name, cold.file.name)
+        self.assertTrue(default_storage.exists(active.file.name))
+
+        DateiService.delete(user=None, datei=active)
+
+        self.assertFalse(default_storage.exists(cold.file.name))
+        self.assertEqual(b"".join(self._serve(cold).streaming_content), self.CONTENT)
+
+    def test_restore_rehydrates_and_delete_removes_cold_copy(self):
+        restored = self._archive(self._upload("zurueck.pdf", b"%PDF-1.7 zurueck"), days_ago=60)
+        deleted = self._archive(self._upload("weg.pdf", b"%PDF-1.7 weg"), days_ago=60)
+        self._tier()
+        restored.refresh_from_db()
+        deleted.refresh_from_db()
+
+        DateiService.restore(user=None, datei=restored)
+        restored.refresh_from_db()
+        self.assertEqual(restored.storage_tier, Datei.StorageTier.HOT)
+        with default_storage.open(restored.file.name, "rb") as stream:
+            self.assertEqual(stream.read(), b"%PDF-1.7 zurueck")
+        self.assertFalse(os.path.exists(os.path.join(self._cold_dir.name, restored.file.name + ".gz")))
+
+        cold_path = os.path.join(self._cold_dir.name, deleted.file.name + ".gz")
+        self.assertTrue(os.path.exists(cold_path))
+        DateiService.delete(user=None, datei=deleted)
+        self.assertFalse(os.path.exists(cold_path))
+
+    def test_files_tier_archived_dry_run_and_integrity_scan_reads_cold_tier(self):
+        old = self._archive(self._upload(), days_ago=60)
+        stdout = StringIO()
+
+        call_command("files_tier_archived", "--json", stdout=stdout)
+
+        dry_run = json.loads(stdout.getvalue())
+        self.assertEqual(dry_run["items"], [{"name": old.file.name, "status": "candidate"}])
+        self.assertTrue(default_storage.exists(old.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("files_tier_archived", "--apply", stdout=StringIO())
+        scan = DateiIntegrityScan().run()
+        self.assertEqual(scan["counts"], {"ok": 1})
+
+
+class DateiBulkUploadTests(TestCase):
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.property = Property.objects.create(
+            name="Objekt Sammel",
+            zip_code="1100",
+            city="Wien",
+            street_address="Stapelgasse 10",
+        )
+        self.belege = [
+            BetriebskostenBeleg.objects.create(
+                liegenschaft=self.property,
+                bk_art=BetriebskostenBeleg.BKArt.BETRIEBSKOSTEN,
+                datum=date(2026, month, 1),
+                netto=Decimal("100.00"),
+                ust_prozent=Decimal("20.00"),
+                brutto=Decimal("120.00"),
+            )
+            for month in (1, 2)
+        ]
+
+    @staticmethod
+    def _pdf(name: str, content: bytes):
+        return SimpleUploadedFile(name, content, content_type="application/pdf")
+
+    def test_bulk_upload_reports_per_file_results_with_batched_inserts(self):
+        existing = DateiService.upload(uploaded_file=self._pdf("alt.pdf", b"%PDF-1.4 alt"), target_object=self.property)
+        items = [
+            BulkUploadItem(uploaded_file=self._pdf("jan.pdf", b"%PDF-1.4 jan"), target_object=self.belege[0]),
+            BulkUploadItem(uploaded_file=self._pdf("feb.pdf", b"%PDF-1.4 feb"), target_object=self.belege[1]),
+            BulkUploadItem(uploaded_file=self._pdf("kopie.pdf", b"%PDF-1.4 alt"), target_object=self.belege[1]),
+            BulkUploadItem(
+                uploaded_file=SimpleUploadedFile("virus.exe", b"MZ", content_type="application/octet-stream"),
+                target_object=self.belege[0],
+            ),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            results = DateiBulkUpload.upload(items, workers=3)
+
+        self.assertEqual(
+            [result.status for result in results],
+            ["created", "created", "duplicate", "rejected"],
+        )
+        self.assertEqual(results[2].duplicate_of_id, existing.pk)
+        self.assertIn("Dateityp nicht erlaubt", results[3].error)
+        datei_inserts = [query for query in queries.captured_queries if query["sql"].startswith('INSERT INTO "webapp_datei"')]
+        self.assertEqual(len(datei_inserts), 1)
+
+        january = Datei.objects.get(pk=results[0].datei_id)
+        self.assertEqual(january.kategorie, Datei.Kategorie.RECHNUNG)
+        self.assertEqual(january.checksum_sha256, hashlib.sha256(b"%PDF-1.4 jan").hexdigest())
+        self.assertEqual(january.mime_type, "application/pdf")
+        self.assertTrue(default_storage.exists(january.file.name))
+        self.assertEqual(
+            DateiService.attachment_summaries(model=BetriebskostenBeleg, object_ids=[self.belege[1].pk])[
+                self.belege[1].pk
+            ].total,
+            2,
+        )
+        self.assertEqual(
+            DateiOperationLog.objects.filter(operation=DateiOperationLog.Operation.UPLOAD, success=False).count(),
+            1,
+        )
+
+    def test_identical_files_in_one_batch_are_linked_as_duplicates(self):
+        results = DateiBulkUpload.upload(
+            [
+                BulkUploadItem(uploaded_file=self._pdf("a.pdf", b"%PDF-1.4 gleich"), target_object=self.belege[0]),
+                BulkUploadItem(uploaded_file=self._pdf("b.pdf", b"%PDF-1.4 gleich"), target_object=self.belege[1]),
+            ],
+            workers=2,
+        )
+
+        self.assertEqual([result.status for result in results], ["created", "duplicate"])
+        self.assertEqual(results[1].duplicate_of_id, results[0].datei_id)
+
+    @override_settings(DATEI_HARD_DEDUP=True, DATEI_CONTENT_ADDRESSED_STORAGE=True)
+    def test_hard_dedup_rejects_batch_duplicate_without_removing_shared_blob(self):
+        results = DateiBulkUpload.upload(
+            [
+                BulkUploadItem(uploaded_file=self._pdf("a.pdf", b"%PDF-1.4 gleich"), target_object=self.belege[0]),
+                BulkUploadItem(uploaded_file=self._pdf("b.pdf", b"%PDF-1.4 gleich"), target_object=self.belege[1]),
+            ],
+        )
+
+        self.assertEqual([result.status for result in results], ["created", "rejected"])
+        created = Datei.objects.get(pk=results[0].datei_id)
+        self.assertTrue(default_storage.exists(created.file.name))
+
+    def test_bulk_upload_view_returns_json_results(self):
+        response = self.client.post(
+            reverse("datei_bulk_upload"),
+            data={
+                "target_app_label": "webapp",
+                "target_model": "betriebskostenbeleg",
+                "target_object_id": self.belege[0].pk,
+                "files": [self._pdf("eins.pdf", b"%PDF-1.4 eins"), self._pdf("leer.pdf", b"")],
+            },
+            HTTP_ACCEPT="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["uploaded"], 1)
+        self.assertEqual(payload["rejected"], 1)
+        self.assertEqual([result["name"] for result in payload["results"]], ["eins.pdf", "leer.pdf"])
+
+    def test_bulk_upload_view_redirects_with_messages(self):
+        response = self.client.post(
+            reverse("datei_bulk_upload"),
+            data={
+                "next": reverse("dashboard"),
+                "target_app_label": "webapp",
+                "target_model": "property",
+                "target_object_id": self.property.pk,
+                "files": [self._pdf("eins.pdf", b"%PDF-1.4 eins"), self._pdf("zwei.pdf", b"%PDF-1.4 zwei")],
+            },
+            follow=True,
+        )
+
+        self.assertContains(response, "2 Dateien wurden hochgeladen.")
+        self.assertEqual(DateiZuordnung.objects.filter(object_id=self.property.pk).count(), 2)
+
+    def test_files_bulk_upload_command_reads_directory_and_manifest(self):
+        source_dir = tempfile.mkdtemp(dir=self._media_dir.name)
+        for name, content in (("jan.pdf", b"%PDF-1.4 jan"), ("notiz.txt", b"text")):
+            with open(os.path.join(source_dir, name), "wb") as handle:
+                handle.write(content)
+        manifest_path = os.path.join(source_dir, "manifest.csv")
+        with open(os.path.join(source_dir, "feb.pdf"), "wb") as handle:
+            handle.write(b"%PDF-1.4 feb")
+        with open(manifest_path, "w", encoding="utf-8") as handle:
+            handle.write(f"path,target,beschreibung\nfeb.pdf,webapp.betriebskostenbeleg:{self.belege[1].pk},Februar\n")
+        stdout = StringIO()
+
+        call_command(
+            "files_bulk_upload",
+            os.path.join(source_dir, "jan.pdf"),
+            os.path.join(source_dir, "notiz.txt"),
+            f"--target=webapp.betriebskostenbeleg:{self.belege[0].pk}",
+            f"--manifest={manifest_path}",
+            "--json",
+            stdout=stdout,
+        )
+
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual((summary["created"], summary["rejected"]), (2, 1))
+        february = Datei.objects.get(pk=summary["results"][2]["datei_id"])
+        self.assertEqual(february.beschreibung, "Februar")
+        self.assertTrue(
+            DateiZuordnung.objects.filter(datei=february, object_id=self.belege[1].pk).exists()
+        )
+
+
 class DateiUploadViewAnonymousTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Upload Anonym",
             zip_code="1080",
@@ -5642,6 +7405,11 @@ class DateiUploadViewAnonymousTests(TestCase):
 
 class DateiArchiveTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Archiv",
             zip_code="1050",
@@ -5726,6 +7494,11 @@ class DateiManagementCommandTests(TestCase):
     )
 
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.property = Property.objects.create(
             name="Objekt Kommando",
             zip_code="1060",
@@ -5819,16 +7592,15 @@ class DateiManagementCommandTests(TestCase):
             "image/png",
             Datei.Kategorie.ZAEHLERFOTO,
         )
-        target_path = build_deterministic_derived_upload_path(
+        target_path = DateiThumbnailService.derived_path(
             image_datei.file.name,
-            "thumb",
-            extension=".jpg",
+            DateiThumbnailService.sizes()[0],
         )
         if image_datei.file.storage.exists(target_path):
             image_datei.file.storage.delete(target_path)
 
         out_first = StringIO()
-        call_command("files_generate_thumbnails", "--json", stdout=out_first)
+        call_command("files_generate_thumbnails", "--json", "--workers", "1", stdout=out_first)
         first_payload = json.loads(out_first.getvalue())
         if first_payload.get("status") == "skipped":
             self.assertIn("Pillow", first_payload.get("reason", ""))
@@ -5838,7 +7610,7 @@ class DateiManagementCommandTests(TestCase):
         self.assertTrue(image_datei.file.storage.exists(target_path))
 
         out_second = StringIO()
-        call_command("files_generate_thumbnails", "--json", stdout=out_second)
+        call_command("files_generate_thumbnails", "--json", "--workers", "1", stdout=out_second)
         second_payload = json.loads(out_second.getvalue())
         self.assertGreaterEqual(second_payload["skipped_existing"], 1)
 
@@ -6043,6 +7815,8 @@ class ReminderCommandTests(TestCase):
 
 class ReminderUiIntegrationTests(TestCase):
     def setUp(self):
+        # Die Generation liegt in der Datenbank und wird je Test zurückgerollt.
+        cache.clear()
         self.manager = Manager.objects.create(
             company_name="UI Verwaltung",
             contact_person="Uli UI",
@@ -6178,6 +7952,8 @@ class ReminderUiIntegrationTests(TestCase):
 
 class DashboardFinanceChartTests(TestCase):
     def setUp(self):
+        # Die Generation liegt in der Datenbank und wird je Test zurückgerollt.
+        cache.clear()
         self.manager = Manager.objects.create(
             company_name="Chart Verwaltung",
             contact_person="Cora Charts",
@@ -6217,29 +7993,31 @@ class DashboardFinanceChartTests(TestCase):
         net_amount: Decimal,
     ):
         gross_amount = (net_amount * Decimal("1.10")).quantize(Decimal("0.01"))
-        Buchung.objects.create(
-            mietervertrag=self.lease,
-            typ=Buchung.Typ.IST,
-            kategorie=category,
-            datum=booking_date,
-            buchungstext="Dashboard Test",
-            netto=net_amount,
-            ust_prozent=Decimal("10.00"),
-            brutto=gross_amount,
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return Buchung.objects.create(
+                mietervertrag=self.lease,
+                typ=Buchung.Typ.IST,
+                kategorie=category,
+                datum=booking_date,
+                buchungstext="Dashboard Test",
+                netto=net_amount,
+                ust_prozent=Decimal("10.00"),
+                brutto=gross_amount,
+            )
 
     def _create_bk_expense(self, *, booking_date: date, net_amount: Decimal):
         gross_amount = (net_amount * Decimal("1.20")).quantize(Decimal("0.01"))
-        BetriebskostenBeleg.objects.create(
-            liegenschaft=self.property,
-            bk_art=BetriebskostenBeleg.BKArt.BETRIEBSKOSTEN,
-            datum=booking_date,
-            netto=net_amount,
-            ust_prozent=Decimal("20.00"),
-            brutto=gross_amount,
-            lieferant_name="Chart Lieferant",
-            buchungstext="Chart Ausgabe",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            BetriebskostenBeleg.objects.create(
+                liegenschaft=self.property,
+                bk_art=BetriebskostenBeleg.BKArt.BETRIEBSKOSTEN,
+                datum=booking_date,
+                netto=net_amount,
+                ust_prozent=Decimal("20.00"),
+                brutto=gross_amount,
+                lieferant_name="Chart Lieferant",
+                buchungstext="Chart Ausgabe",
+            )
 
     def test_dashboard_chart_context_contains_yearly_finance_series(self):
         current_year = timezone.localdate().year
@@ -6293,6 +8071,214 @@ class DashboardFinanceChartTests(TestCase):
         self.assertEqual(charts["latest_bk_balance_net"], Decimal("-70.00"))
         self.assertEqual(len(charts["month_labels"]), 12)
 
+    def test_monthly_values_follow_booking_changes(self):
+        booking = self._create_ist_booking(
+            booking_date=date(2025, 3, 10),
+            category=Buchung.Kategorie.HMZ,
+            net_amount=Decimal("700.00"),
+        )
+        self._create_bk_expense(booking_date=date(2025, 3, 12), net_amount=Decimal("40.00"))
+        self.assertEqual(DashboardMonatswert.objects.get(monat=date(2025, 3, 1)).miete_netto, Decimal("700.00"))
+
+        booking.datum = date(2025, 4, 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        march = DashboardMonatswert.objects.get(monat=date(2025, 3, 1))
+        self.assertEqual(march.miete_netto, Decimal("0.00"))
+        self.assertEqual(march.bk_ausgaben_netto, Decimal("40.00"))
+        self.assertEqual(DashboardMonatswert.objects.get(monat=date(2025, 4, 1)).miete_netto, Decimal("700.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertFalse(DashboardMonatswert.objects.filter(monat=date(2025, 4, 1)).exists())
+
+        incremental = list(DashboardMonatswert.objects.values_list("monat", "miete_netto", "bk_ausgaben_netto"))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_dashboard_stats", stdout=StringIO())
+        self.assertEqual(
+            list(DashboardMonatswert.objects.values_list("monat", "miete_netto", "bk_ausgaben_netto")),
+            incremental,
+        )
+
+    def test_dashboard_snapshot_is_cached_until_data_changes(self):
+        self.client.get(reverse("dashboard"))
+        with CaptureQueriesContext(connection) as queries:
+            cached_response = self.client.get(reverse("dashboard"))
+        self.assertLessEqual(len(queries), 3)
+        self.assertIsNotNone(cached_response.context["stand"])
+        self.assertContains(cached_response, "Stand:")
+
+        self._create_ist_booking(
+            booking_date=timezone.localdate(),
+            category=Buchung.Kategorie.HMZ,
+            net_amount=Decimal("700.00"),
+        )
+        response = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(response.context["finance_charts"]["current_year_rent_net"], Decimal("700.00"))
+        self.assertEqual(response.context["recent_bookings"][0].buchungstext, "Dashboard Test")
+
+    def test_invalidation_reaches_snapshots_of_other_processes(self):
+        builds = []
+
+        def build():
+            builds.append(len(builds) + 1)
+            return {"build": builds[-1]}
+
+        web_cache = LocMemCache("dashboard-web", {})
+        with patch("webapp.services.dashboard_stats.cache", web_cache):
+            DashboardStatistik.snapshot(build, today=date(2026, 1, 15))
+            self.assertEqual(DashboardStatistik.snapshot(build, today=date(2026, 1, 15))["build"], 1)
+
+        with patch("webapp.services.dashboard_stats.cache", LocMemCache("dashboard-worker", {})):
+            DashboardStatistik.invalidate()
+
+        with patch("webapp.services.dashboard_stats.cache", web_cache):
+            refreshed = DashboardStatistik.snapshot(build, today=date(2026, 1, 15))
+
+        self.assertEqual(refreshed["build"], 2)
+        self.assertEqual(DashboardStand.objects.get().generation, DashboardStatistik.generation())
+
+    def test_month_refresh_and_invalidation_wait_for_commit(self):
+        generation = DashboardStatistik.generation()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Buchung.objects.create(
+                mietervertrag=self.lease,
+                typ=Buchung.Typ.IST,
+                kategorie=Buchung.Kategorie.HMZ,
+                datum=date(2025, 5, 10),
+                buchungstext="Offene Transaktion",
+                netto=Decimal("700.00"),
+                ust_prozent=Decimal("10.00"),
+                brutto=Decimal("770.00"),
+            )
+            self.unit.save()
+            self.assertEqual(DashboardStatistik.generation(), generation)
+            self.assertFalse(DashboardMonatswert.objects.filter(monat=date(2025, 5, 1)).exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(DashboardStatistik.generation(), generation)
+        self.assertEqual(DashboardMonatswert.objects.get(monat=date(2025, 5, 1)).miete_netto, Decimal("700.00"))
+
+
+class BuchungLedgerIndexTests(TestCase):
+    """EXPLAIN-Regression: die häufigsten Buchungsabfragen laufen über einen Index, nicht als Tabellenscan."""
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Planprüfung ist auf SQLite-Ausgabe abgestimmt.")
+        self.property = Property.objects.create(
+            name="Objekt Index",
+            zip_code="1060",
+            city="Wien",
+            street_address="Indexgasse 6",
+        )
+        self.unit = Unit.objects.create(
+            property=self.property,
+            unit_type=Unit.UnitType.APARTMENT,
+            door_number="6",
+            name="Top 6",
+        )
+        self.lease = LeaseAgreement.objects.create(
+            unit=self.unit,
+            status=LeaseAgreement.Status.AKTIV,
+            entry_date=date(2024, 1, 1),
+            net_rent=Decimal("500.00"),
+            operating_costs_net=Decimal("100.00"),
+            heating_costs_net=Decimal("50.00"),
+        )
+        for month in range(1, 13):
+            for typ in (Buchung.Typ.SOLL, Buchung.Typ.IST):
+                Buchung.objects.create(
+                    mietervertrag=self.lease,
+                    typ=typ,
+                    kategorie=Buchung.Kategorie.HMZ if typ == Buchung.Typ.SOLL else Buchung.Kategorie.ZAHLUNG,
+                    datum=date(2025, month, 1),
+                    buchungstext="Index Test",
+                    netto=Decimal("500.00"),
+                    ust_prozent=Decimal("10.00"),
+                    brutto=Decimal("550.00"),
+                )
+        Buchung.objects.create(
+            einheit=self.unit,
+            typ=Buchung.Typ.IST,
+            kategorie=Buchung.Kategorie.SONST,
+            datum=date(2025, 3, 1),
+            buchungstext="Ohne Vertrag",
+            netto=Decimal("10.00"),
+            ust_prozent=Decimal("0.00"),
+            brutto=Decimal("10.00"),
+        )
+
+    def _assert_uses_index(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertIsNone(re.search(r"SCAN webapp_buchung\b(?! USING)", plan), plan)
+
+    def test_lease_ledger_range_uses_lease_index(self):
+        queryset = Buchung.objects.filter(
+            mietervertrag=self.lease,
+            typ=Buchung.Typ.SOLL,
+            datum__gte=date(2025, 1, 1),
+            datum__lte=date(2025, 1, 31),
+        )
+        self._assert_uses_index(queryset, "buchung_mv_typ_datum_idx")
+
+    def test_dashboard_year_uses_type_category_index(self):
+        queryset = (
+            Buchung.objects.filter(
+                typ=Buchung.Typ.IST,
+                kategorie__in=[Buchung.Kategorie.BK, Buchung.Kategorie.HK],
+                **year_range_filter(2025),
+            )
+            .values("datum__month")
+            .annotate(total=Sum("netto"))
+        )
+        self._assert_uses_index(queryset, "buchung_typ_kat_datum_idx")
+
+    def test_unit_bookings_use_unit_index(self):
+        queryset = Buchung.objects.filter(einheit=self.unit, typ=Buchung.Typ.IST, **year_range_filter(2025))
+        self._assert_uses_index(queryset, "buchung_einh_typ_datum_idx")
+
+    def test_year_range_filter_matches_calendar_year(self):
+        Buchung.objects.create(
+            mietervertrag=self.lease,
+            typ=Buchung.Typ.IST,
+            kategorie=Buchung.Kategorie.ZAHLUNG,
+            datum=date(2026, 1, 1),
+            buchungstext="Folgejahr",
+            netto=Decimal("1.00"),
+            ust_prozent=Decimal("0.00"),
+            brutto=Decimal("1.00"),
+        )
+        self.assertEqual(
+            Buchung.objects.filter(**year_range_filter(2025)).count(),
+            Buchung.objects.filter(datum__year=2025).count(),
+        )
+        self.assertEqual(Buchung.objects.filter(**year_range_filter(2026)).count(), 1)
+
+    def test_year_choices_are_distinct_years_from_one_query(self):
+        Buchung.objects.create(
+            mietervertrag=self.lease,
+            typ=Buchung.Typ.IST,
+            kategorie=Buchung.Kategorie.ZAHLUNG,
+            datum=date(2023, 6, 1),
+            buchungstext="Altjahr",
+            netto=Decimal("1.00"),
+            ust_prozent=Decimal("0.00"),
+            brutto=Decimal("1.00"),
+        )
+        queryset = Buchung.objects.select_related("mietervertrag").filter(typ=Buchung.Typ.IST).order_by("-datum")
+
+        with CaptureQueriesContext(connection) as queries:
+            years = year_choices_for_queryset(queryset)
+
+        self.assertEqual(years, [2023, 2025])
+        self.assertEqual(len(queries), 1)
+        self.assertIn("DISTINCT", queries[0]["sql"])
+
 
 class VpiAdjustmentModelTests(TestCase):
     def setUp(self):
@@ -6393,6 +8379,11 @@ class VpiAdjustmentModelTests(TestCase):
 
 class VpiAdjustmentRunServiceTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.manager = Manager.objects.create(
             company_name="Service Verwaltung",
             contact_person="Susi Service",
@@ -7033,6 +9024,11 @@ class CheckVpiReleasesCommandTests(TestCase):
 
 class VpiAdjustmentUiIntegrationTests(TestCase):
     def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.manager = Manager.objects.create(
             company_name="UI VPI Verwaltung",
             contact_person="Ute UI",
@@ -8102,14 +10098,11 @@ class PaperlessSearchViewTests(TestCase):
         PAPERLESS_API_TOKEN="dummy-token",
         PAPERLESS_TIMEOUT_SECONDS=10,
     )
-    def test_upload_post_calls_service_with_prefilled_metadata(self):
-        with patch(
+    def test_upload_post_enqueues_upload_with_prefilled_metadata(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), patch(
             "webapp.views.PaperlessService.list_tags",
             return_value=[{"id": "1", "name": "Vertrag"}],
-        ), patch(
-            "webapp.views.PaperlessService.upload_document",
-            return_value="task-123",
-        ) as mocked_upload:
+        ):
             response = self.client.post(
                 f"{reverse('paperless_search')}?source_model=leaseagreement&source_id={self.lease.pk}",
                 {
@@ -8128,15 +10121,17 @@ class PaperlessSearchViewTests(TestCase):
             response.url,
             f"{reverse('paperless_search')}?source_model=leaseagreement&source_id={self.lease.pk}",
         )
-        mocked_upload.assert_called_once()
-        self.assertEqual(mocked_upload.call_args.kwargs["title"], "Mietvertrag")
-        self.assertEqual(mocked_upload.call_args.kwargs["description"], "Unterzeichnet")
-        self.assertEqual(mocked_upload.call_args.kwargs["q_liegenschaft"], "BHG14")
-        self.assertEqual(mocked_upload.call_args.kwargs["q_einheit"], "Top 3")
-        self.assertEqual(mocked_upload.call_args.kwargs["q_mieter"], "Anna Bondar")
-        self.assertEqual(mocked_upload.call_args.kwargs["q_source_ref"], "")
-        self.assertEqual(mocked_upload.call_args.kwargs["tags"], ["Vertrag"])
-        self.assertIsNone(mocked_upload.call_args.kwargs["created"])
+        upload = PaperlessUpload.objects.get()
+        self.assertEqual(upload.status, PaperlessUpload.Status.PENDING)
+        self.assertEqual(upload.original_name, "vertrag.pdf")
+        self.assertEqual(upload.title, "Mietvertrag")
+        self.assertEqual(upload.description, "Unterzeichnet")
+        self.assertEqual(upload.q_liegenschaft, "BHG14")
+        self.assertEqual(upload.q_einheit, "Top 3")
+        self.assertEqual(upload.q_mieter, "Anna Bondar")
+        self.assertEqual(upload.q_source_ref, "")
+        self.assertEqual(upload.tags, ["Vertrag"])
+        self.assertIsNone(upload.document_created)
 
     @override_settings(
         PAPERLESS_BASE_URL="https://paperless.example.invalid",
@@ -8144,7 +10139,7 @@ class PaperlessSearchViewTests(TestCase):
         PAPERLESS_TIMEOUT_SECONDS=10,
         PAPERLESS_METER_READING_DOCUMENT_TYPE_ID=6,
     )
-    def test_meter_reading_upload_post_calls_service_with_source_ref_and_created(self):
+    def test_meter_reading_upload_post_enqueues_upload_with_source_ref_and_created(self):
         reading = MeterReading.objects.create(
             meter=Meter.objects.create(
                 property=self.property,
@@ -8157,13 +10152,10 @@ class PaperlessSearchViewTests(TestCase):
             value=Decimal("321.000"),
         )
 
-        with patch(
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), patch(
             "webapp.views.PaperlessService.list_tags",
             return_value=[],
-        ), patch(
-            "webapp.views.PaperlessService.upload_document",
-            return_value="task-555",
-        ) as mocked_upload:
+        ):
             response = self.client.post(
                 f"{reverse('paperless_search')}?source_model=meterreading&source_id={reading.pk}",
                 {
@@ -8183,12 +10175,10 @@ class PaperlessSearchViewTests(TestCase):
             response.url,
             f"{reverse('paperless_search')}?source_model=meterreading&source_id={reading.pk}",
         )
-        self.assertEqual(
-            mocked_upload.call_args.kwargs["q_source_ref"],
-            f"meterreading:{reading.source_uuid}",
-        )
-        self.assertEqual(mocked_upload.call_args.kwargs["document_type_id"], 6)
-        self.assertEqual(mocked_upload.call_args.kwargs["created"], date(2026, 2, 1))
+        upload = PaperlessUpload.objects.get()
+        self.assertEqual(upload.q_source_ref, f"meterreading:{reading.source_uuid}")
+        self.assertEqual(upload.document_type_id, 6)
+        self.assertEqual(upload.document_created, date(2026, 2, 1))
 
     @override_settings(
         PAPERLESS_BASE_URL="https://paperless.example.invalid",
@@ -8200,7 +10190,7 @@ class PaperlessSearchViewTests(TestCase):
             "webapp.views.PaperlessService.list_tags",
             return_value=[{"id": "1", "name": "Vertrag"}],
         ), patch(
-            "webapp.views.PaperlessService.upload_document",
+            "webapp.views.PaperlessOutboxService.enqueue",
             side_effect=PaperlessSearchError("Paperless-Upload fehlgeschlagen."),
         ):
             response = self.client.post(
@@ -8293,6 +10283,130 @@ class PaperlessSearchViewTests(TestCase):
 
         self.assertEqual(response.status_code, 404)
 
+    @override_settings(
+        PAPERLESS_BASE_URL="https://paperless.example.invalid",
+        PAPERLESS_API_TOKEN="dummy-token",
+        PAPERLESS_TIMEOUT_SECONDS=10,
+        PAPERLESS_THUMBNAIL_SIZE=64,
+    )
+    def test_versioned_document_preview_is_cached_as_derived_thumbnail(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("Pillow ist nicht installiert.")
+        image_buffer = io.BytesIO()
+        Image.new("RGB", (640, 320), color=(20, 40, 60)).save(image_buffer, format="PNG")
+        preview_url = reverse("paperless_document_preview", kwargs={"document_id": 101})
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with patch(
+                "webapp.services.paperless_thumbnails.PaperlessService.download_document",
+                return_value=(image_buffer.getvalue(), "image/png", "zaehlerfoto.png"),
+            ) as mocked_download, patch(
+                "webapp.services.paperless_thumbnails.PaperlessService.document_modified",
+                return_value="2026-02-14T10:15:30.123+01:00",
+            ) as mocked_modified:
+                first_response = self.client.get(preview_url, {"v": "2026-02-14T10:15:30.123+01:00"})
+                first_content = b"".join(first_response.streaming_content)
+                second_response = self.client.get(preview_url, {"v": "2026-02-14T10:15:30.123+01:00"})
+                second_content = b"".join(second_response.streaming_content)
+
+            cached_path = PaperlessThumbnailService.cache_path(
+                document_id=101,
+                modified="2026-02-14T10:15:30.123+01:00",
+                image_format="jpeg",
+            )
+            self.assertTrue(cached_path.startswith("uploads/_derived/paperless/101/thumb-64/"))
+            self.assertTrue(os.path.exists(os.path.join(media_root, cached_path)))
+
+        mocked_download.assert_called_once_with(document_id=101)
+        mocked_modified.assert_called_once_with(document_id=101)
+        self.assertEqual(first_response.status_code, 200)
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second_response["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", second_response["Cache-Control"])
+        self.assertEqual(first_content, second_content)
+        with Image.open(io.BytesIO(second_content)) as thumbnail:
+            self.assertEqual(thumbnail.size, (64, 32))
+
+    @override_settings(
+        PAPERLESS_BASE_URL="https://paperless.example.invalid",
+        PAPERLESS_API_TOKEN="dummy-token",
+        PAPERLESS_TIMEOUT_SECONDS=10,
+    )
+    def test_versioned_document_preview_returns_404_for_non_image(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with patch(
+                "webapp.services.paperless_thumbnails.PaperlessService.download_document",
+                return_value=(b"%PDF-1.4", "application/pdf", "dok.pdf"),
+            ), patch(
+                "webapp.services.paperless_thumbnails.PaperlessService.document_modified",
+                return_value="2026-02-14T10:15:30+01:00",
+            ):
+                response = self.client.get(
+                    reverse("paperless_document_preview", kwargs={"document_id": 101}),
+                    {"v": "2026-02-14T10:15:30+01:00"},
+                )
+
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        PAPERLESS_BASE_URL="https://paperless.example.invalid",
+        PAPERLESS_API_TOKEN="dummy-token",
+        PAPERLESS_TIMEOUT_SECONDS=10,
+        PAPERLESS_THUMBNAIL_SIZE=64,
+    )
+    def test_versioned_document_preview_redirects_unknown_versions_and_evicts_old_ones(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("Pillow ist nicht installiert.")
+        image_buffer = io.BytesIO()
+        Image.new("RGB", (640, 320), color=(20, 40, 60)).save(image_buffer, format="PNG")
+        preview_url = reverse("paperless_document_preview", kwargs={"document_id": 101})
+        old_version = "2026-02-14T10:15:30+01:00"
+        new_version = "2026-03-01T08:00:00+01:00"
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            old_path = PaperlessThumbnailService.cache_path(
+                document_id=101,
+                modified=old_version,
+                image_format="jpeg",
+            )
+            default_storage.save(old_path, ContentFile(b"alt"))
+            with patch(
+                "webapp.services.paperless_thumbnails.PaperlessService.download_document",
+                return_value=(image_buffer.getvalue(), "image/png", "zaehlerfoto.png"),
+            ) as mocked_download, patch(
+                "webapp.services.paperless_thumbnails.PaperlessService.document_modified",
+                return_value=new_version,
+            ):
+                bogus_response = self.client.get(preview_url, {"v": "beliebig", "next": "/einheiten/"})
+                self.assertEqual(mocked_download.call_count, 0)
+                self.assertEqual(
+                    os.listdir(os.path.join(media_root, os.path.dirname(old_path))),
+                    [os.path.basename(old_path)],
+                )
+                response = self.client.get(preview_url, {"v": new_version})
+                b"".join(response.streaming_content)
+                response.close()
+
+            new_path = PaperlessThumbnailService.cache_path(
+                document_id=101,
+                modified=new_version,
+                image_format="jpeg",
+            )
+            self.assertFalse(os.path.exists(os.path.join(media_root, old_path)))
+            self.assertTrue(os.path.exists(os.path.join(media_root, new_path)))
+
+        self.assertEqual(bogus_response.status_code, 302)
+        self.assertEqual(
+            bogus_response.url,
+            f"{preview_url}?{urlencode({'v': new_version, 'next': '/einheiten/'})}",
+        )
+        self.assertEqual(response.status_code, 200)
+        mocked_download.assert_called_once_with(document_id=101)
+
     @override_settings(
         PAPERLESS_BASE_URL="https://paperless.example.invalid",
         PAPERLESS_API_TOKEN="dummy-token",
@@ -8304,3 +10418,500 @@ class PaperlessSearchViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, reverse("paperless_search"))
         self.assertContains(response, "DMS")
+
+
+@override_settings(
+    PAPERLESS_BASE_URL="https://paperless.example.invalid",
+    PAPERLESS_API_TOKEN="dummy-token",
+    PAPERLESS_TIMEOUT_SECONDS=10,
+    PAPERLESS_OUTBOX_MAX_ATTEMPTS=3,
+)
+class PaperlessOutboxServiceTests(TestCase):
+    def setUp(self):
+        self._media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self._media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def _enqueue(self, content=b"%PDF-1.4 outbox", **kwargs):
+        return PaperlessOutboxService.enqueue(
+            uploaded_file=SimpleUploadedFile("beleg.pdf", content, content_type="application/pdf"),
+            title=kwargs.pop("title", "Beleg"),
+            **kwargs,
+        )
+
+    def test_enqueue_deduplicates_by_checksum(self):
+        first, first_created = self._enqueue(q_source_ref="meterreading:1", tags=["Vertrag"])
+        second, second_created = self._enqueue(q_source_ref=" meterreading:1 ", tags=["Vertrag"])
+
+        self.assertTrue(first_created)
+        self.assertFalse(second_created)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(PaperlessUpload.objects.count(), 1)
+        self.assertEqual(first.size_bytes, len(b"%PDF-1.4 outbox"))
+
+    def test_enqueue_same_file_with_other_metadata_creates_new_upload(self):
+        first, _created = self._enqueue(q_source_ref="meterreading:1")
+        other_target, other_target_created = self._enqueue(q_source_ref="meterreading:2")
+        other_title, other_title_created = self._enqueue(
+            q_source_ref="meterreading:1",
+            title="Anderer Titel",
+        )
+
+        self.assertTrue(other_target_created)
+        self.assertTrue(other_title_created)
+        self.assertEqual(len({first.pk, other_target.pk, other_title.pk}), 3)
+
+    def test_enqueue_same_file_after_sent_creates_new_upload(self):
+        first, _created = self._enqueue(q_source_ref="meterreading:1")
+        PaperlessUpload.objects.filter(pk=first.pk).update(status=PaperlessUpload.Status.SENT)
+
+        second, second_created = self._enqueue(q_source_ref="meterreading:1")
+
+        self.assertTrue(second_created)
+        self.assertNotEqual(first.pk, second.pk)
+
+    def test_dispatch_marks_upload_sent_and_removes_local_file(self):
+        upload, _created = self._enqueue(tags=["Vertrag"], created="2026-02-01")
+        stored_path = os.path.join(self._media_dir.name, upload.file.name)
+        self.assertTrue(os.path.exists(stored_path))
+
+        with patch(
+            "webapp.services.paperless_outbox.PaperlessService.upload_document",
+            return_value="task-777",
+        ) as mocked_upload:
+            summary = PaperlessOutboxService.dispatch_pending(max_workers=2)
+
+        self.assertEqual(summary["claimed"], 1)
+        self.assertEqual(summary["sent"], 1)
+        mocked_upload.assert_called_once()
+        self.assertEqual(mocked_upload.call_args.kwargs["tags"], ["Vertrag"])
+        self.assertEqual(mocked_upload.call_args.kwargs["created"], date(2026, 2, 1))
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, PaperlessUpload.Status.SENT)
+        self.assertEqual(upload.task_id, "task-777")
+        self.assertFalse(upload.file)
+        self.assertFalse(os.path.exists(stored_path))
+
+    def test_dispatch_schedules_retry_with_backoff_and_fails_after_max_attempts(self):
+        upload, _created = self._enqueue()
+        now = timezone.now()
+
+        with patch(
+            "webapp.services.paperless_outbox.PaperlessService.upload_document",
+            side_effect=PaperlessSearchError("Paperless nicht erreichbar."),
+        ):
+            first_summary = PaperlessOutboxService.dispatch_pending(now=now)
+            upload.refresh_from_db()
+            self.assertEqual(first_summary["retry_scheduled"], 1)
+            self.assertEqual(upload.status, PaperlessUpload.Status.PENDING)
+            self.assertEqual(upload.attempts, 1)
+            self.assertEqual(upload.next_attempt_at, now + timedelta(seconds=60))
+            self.assertEqual(upload.last_error, "Paperless nicht erreichbar.")
+
+            not_due_summary = PaperlessOutboxService.dispatch_pending(now=now)
+            self.assertEqual(not_due_summary["claimed"], 0)
+
+            PaperlessOutboxService.dispatch_pending(now=now + timedelta(minutes=1))
+            upload.refresh_from_db()
+            self.assertEqual(upload.next_attempt_at, now + timedelta(minutes=1, seconds=120))
+
+            final_summary = PaperlessOutboxService.dispatch_pending(now=now + timedelta(hours=1))
+
+        upload.refresh_from_db()
+        self.assertEqual(final_summary["failed"], 1)
+        self.assertEqual(upload.status, PaperlessUpload.Status.FAILED)
+        self.assertEqual(upload.attempts, 3)
+        self.assertTrue(upload.file)
+
+        self.assertEqual(PaperlessOutboxService.retry_failed(), 1)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, PaperlessUpload.Status.PENDING)
+        self.assertEqual(upload.attempts, 0)
+
+    def test_confirm_consumed_records_finished_paperless_tasks(self):
+        uploads = [self._enqueue(content=f"%PDF-1.4 {index}".encode())[0] for index in range(3)]
+        PaperlessUpload.objects.update(status=PaperlessUpload.Status.SENT, sent_at=timezone.now())
+        for upload, task_id in zip(uploads, ("task-ok", "task-running", "task-failed")):
+            PaperlessUpload.objects.filter(pk=upload.pk).update(task_id=task_id)
+        tasks = {
+            "task-ok": {"status": "SUCCESS", "related_document": "12"},
+            "task-running": {"status": "STARTED"},
+            "task-failed": {"status": "FAILURE", "result": "Duplikat in Paperless."},
+        }
+
+        with patch(
+            "webapp.services.paperless_outbox.PaperlessService.fetch_task",
+            side_effect=lambda task_id: tasks[task_id],
+        ), patch("webapp.services.paperless_outbox.PaperlessSearchCache.invalidate") as mocked_invalidate:
+            self.assertEqual(PaperlessOutboxService.confirm_consumed(), 2)
+
+        mocked_invalidate.assert_called_once()
+        done, running, failed = PaperlessUpload.objects.order_by("id")
+        self.assertIsNotNone(done.consumed_at)
+        self.assertIsNone(running.consumed_at)
+        self.assertIsNotNone(failed.consumed_at)
+        self.assertEqual(failed.last_error, "Duplikat in Paperless.")
+
+    def test_send_command_outputs_json_summary(self):
+        self._enqueue()
+        stdout = StringIO()
+
+        with patch(
+            "webapp.services.paperless_outbox.PaperlessService.upload_document",
+            return_value="task-1",
+        ), patch(
+            "webapp.services.paperless_outbox.PaperlessService.fetch_task",
+            return_value={"task_id": "task-1", "status": "STARTED"},
+        ):
+            call_command("send_paperless_uploads", "--json", stdout=stdout)
+
+        payload = json.loads(stdout.getvalue())
+        self.assertEqual(payload["status"], "ok")
+        self.assertEqual(payload["sent"], 1)
+        self.assertEqual(payload["consumed"], 0)
+        self.assertEqual(PaperlessUpload.objects.get().status, PaperlessUpload.Status.SENT)
+
+
+@override_settings(
+    PAPERLESS_BASE_URL="https://paperless.example.invalid",
+    PAPERLESS_API_TOKEN="dummy-token",
+    PAPERLESS_TIMEOUT_SECONDS=10,
+    PAPERLESS_CIRCUIT_FAILURE_THRESHOLD=2,
+    PAPERLESS_CIRCUIT_RESET_SECONDS=60,
+)
+class PaperlessResilienceTests(TestCase):
+    def setUp(self):
+        PaperlessCircuitBreaker.reset()
+        self.addCleanup(PaperlessCircuitBreaker.reset)
+
+    def _document_url(self):
+        return PaperlessService._build_url(endpoint="documents/")
+
+    def test_circuit_opens_after_repeated_failures_and_skips_calls(self):
+        with patch(
+            "webapp.services.paperless.urlopen",
+            side_effect=URLError("connection refused"),
+        ) as mocked_urlopen:
+            for _attempt in range(2):
+                with self.assertRaisesMessage(PaperlessSearchError, "nicht erreichbar"):
+                    PaperlessService._request_json(self._document_url())
+            self.assertEqual(PaperlessCircuitBreaker.state(), PaperlessCircuitBreaker.STATE_OPEN)
+
+            with self.assertRaisesMessage(PaperlessSearchError, "vorübergehend ausgesetzt"):
+                PaperlessService._request_json(self._document_url())
+
+        self.assertEqual(mocked_urlopen.call_count, 2)
+
+    def test_client_errors_do_not_open_circuit(self):
+        http_error = HTTPError(
+            url=self._document_url(),
+            code=404,
+            msg="Not Found",
+            hdrs=None,
+            fp=io.BytesIO(b""),
+        )
+        with patch("webapp.services.paperless.urlopen", side_effect=http_error):
+            for _attempt in range(3):
+                with self.assertRaises(PaperlessSearchError):
+                    PaperlessService.download_document(document_id=1)
+
+        self.assertEqual(PaperlessCircuitBreaker.state(), PaperlessCircuitBreaker.STATE_CLOSED)
+
+    def test_half_open_probe_closes_circuit_on_success(self):
+        with patch("webapp.services.paperless.urlopen", side_effect=URLError("down")):
+            for _attempt in range(2):
+                with self.assertRaises(PaperlessSearchError):
+                    PaperlessService._request_json(self._document_url())
+
+        with patch(
+            "webapp.services.paperless_resilience.time.monotonic",
+            return_value=time.monotonic() + 120,
+        ):
+            self.assertEqual(PaperlessCircuitBreaker.state(), PaperlessCircuitBreaker.STATE_HALF_OPEN)
+            with patch("webapp.services.paperless.urlopen") as mocked_urlopen:
+                mocked_urlopen.return_value.__enter__.return_value.read.return_value = b'{"results": []}'
+                payload = PaperlessService._request_json(self._document_url())
+            self.assertEqual(payload, {"results": []})
+            self.assertEqual(PaperlessCircuitBreaker.state(), PaperlessCircuitBreaker.STATE_CLOSED)
+
+    def test_page_budget_caps_timeout_and_skips_calls_when_exhausted(self):
+        with patch("webapp.services.paperless.urlopen") as mocked_urlopen:
+            mocked_urlopen.return_value.__enter__.return_value.read.return_value = b"{}"
+            with PaperlessLatencyBudget.scope(seconds=2):
+                PaperlessService._request_json(self._document_url())
+            self.assertLessEqual(mocked_urlopen.call_args.kwargs["timeout"], 2)
+
+            with PaperlessLatencyBudget.scope(seconds=0.1):
+                with self.assertRaisesMessage(PaperlessSearchError, "zu langsam"):
+                    PaperlessService._request_json(self._document_url())
+
+        self.assertEqual(mocked_urlopen.call_count, 1)
+
+    @override_settings(PAPERLESS_CIRCUIT_FAILURE_THRESHOLD=1)
+    def test_search_page_degrades_after_first_failure(self):
+        with patch(
+            "webapp.services.paperless.urlopen",
+            side_effect=URLError("connection refused"),
+        ) as mocked_urlopen:
+            response = self.client.get(reverse("paperless_search"), {"q": "Vertrag"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Anfragen werden vorübergehend ausgesetzt")
+        self.assertEqual(mocked_urlopen.call_count, 1)
+
+
+@override_settings(
+    PAPERLESS_BASE_URL="https://paperless.example.invalid",
+    PAPERLESS_API_TOKEN="dummy-token",
+    PAPERLESS_TIMEOUT_SECONDS=10,
+)
+class PaperlessMetricsTests(TestCase):
+    def setUp(self):
+        PaperlessCircuitBreaker.reset()
+        self.addCleanup(PaperlessCircuitBreaker.reset)
+
+    def test_endpoint_for_url_classifies_paperless_endpoints(self):
+        base = "https://paperless.example.invalid/api"
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/documents/?query=x"), "documents")
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/documents/12/download/"), "download")
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/documents/post_document/"), "upload")
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/tags/?page_size=200"), "tags")
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/document_types/"), "document_types")
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/custom_fields/"), "custom_fields")
+        self.assertEqual(PaperlessMetrics.endpoint_for_url(f"{base}/tasks/"), "other")
+
+    def test_search_page_records_requests_per_endpoint_and_view(self):
+        with patch("webapp.services.paperless.urlopen") as mocked_urlopen:
+            mocked_urlopen.return_value.__enter__.return_value.read.return_value = b'{"results": []}'
+            response = self.client.get(reverse("paperless_search"), {"q": "Vertrag"})
+
+        self.assertEqual(response.status_code, 200)
+        stats = {
+            stat.endpoint: stat
+            for stat in PaperlessRequestStat.objects.filter(view_name="view:paperless_search")
+        }
+        self.assertEqual(stats["documents"].request_count, 1)
+        self.assertGreaterEqual(stats["tags"].request_count, 1)
+        self.assertIn("custom_fields", stats)
+        self.assertEqual(
+            sum(stat.request_count for stat in stats.values()),
+            mocked_urlopen.call_count,
+        )
+        self.assertEqual(sum(stats["documents"].duration_histogram.values()), 1)
+
+    def test_metrics_endpoint_and_command_summarize_recorded_traffic(self):
+        with PaperlessMetrics.collect(view_name="view:lease_detail"):
+            PaperlessMetrics.record(
+                request_url="https://paperless.example.invalid/api/documents/",
+                duration_seconds=0.2,
+                outcome=PaperlessMetrics.OUTCOME_OK,
+            )
+            PaperlessMetrics.record(
+                request_url="https://paperless.example.invalid/api/documents/",
+                duration_seconds=3.0,
+                outcome=PaperlessMetrics.OUTCOME_ERROR,
+            )
+            PaperlessMetrics.record(
+                request_url="https://paperless.example.invalid/api/tags/",
+                duration_seconds=None,
+                outcome=PaperlessMetrics.OUTCOME_SKIPPED,
+            )
+
+        response = self.client.get(reverse("paperless_metrics"))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode("utf-8")
+        self.assertIn('quintus_paperless_requests_total{endpoint="documents"} 2', body)
+        self.assertIn('quintus_paperless_request_errors_total{endpoint="documents"} 1', body)
+        self.assertIn('quintus_paperless_requests_skipped_total{endpoint="tags"} 1', body)
+        self.assertIn('quintus_paperless_request_duration_seconds_bucket{endpoint="documents",le="0.25"} 1', body)
+        self.assertIn('quintus_paperless_request_duration_seconds_bucket{endpoint="documents",le="+Inf"} 2', body)
+        self.assertIn('quintus_paperless_view_requests_total{view="view:lease_detail"} 2', body)
+
+        stdout = StringIO()
+        call_command("paperless_traffic", "--json", stdout=stdout)
+        payload = json.loads(stdout.getvalue())
+        self.assertEqual(payload["total_requests"], 2)
+        documents_row = payload["endpoints"][0]
+        self.assertEqual(documents_row["endpoint"], "documents")
+        self.assertEqual(documents_row["avg_duration_ms"], 1600)
+        self.assertEqual(documents_row["max_duration_ms"], 3000)
+        self.assertEqual(documents_row["p95_le_seconds"], "5.0")
+        self.assertEqual(payload["views"][0]["view_name"], "view:lease_detail")
+
+    def test_prometheus_counters_stay_monotonic_after_prune(self):
+        now = timezone.now()
+        for days_ago, view_name in ((40, "view:lease_detail"), (35, "view:unit_detail"), (0, "view:lease_detail")):
+            PaperlessRequestStat.objects.create(
+                bucket_start=PaperlessMetrics.bucket_start(now - timedelta(days=days_ago)),
+                endpoint=PaperlessRequestStat.Endpoint.DOCUMENTS,
+                view_name=view_name,
+                request_count=2,
+                error_count=1,
+                total_duration_ms=400,
+                max_duration_ms=300,
+                duration_histogram={"0.25": 1, "0.5": 1},
+            )
+
+        with self.assertNumQueries(2):
+            before = PaperlessMetrics.render_prometheus()
+        pruned = PaperlessMetrics.prune(older_than_days=30, now=now)
+        after = PaperlessMetrics.render_prometheus()
+
+        self.assertEqual(pruned, 2)
+        self.assertEqual(before, after)
+        self.assertIn('quintus_paperless_requests_total{endpoint="documents"} 6', after)
+        self.assertIn('quintus_paperless_request_duration_seconds_bucket{endpoint="documents",le="0.5"} 6', after)
+        self.assertIn('quintus_paperless_view_requests_total{view="view:lease_detail"} 4', after)
+        self.assertEqual(PaperlessRequestStat.objects.count(), 3)
+        recent = PaperlessMetrics.summarize(since=now - timedelta(hours=1))
+        self.assertEqual(recent["endpoints"][0]["requests"], 2)
+
+
+@override_settings(
+    PAPERLESS_BASE_URL="https://paperless.example.invalid",
+    PAPERLESS_API_TOKEN="dummy-token",
+    PAPERLESS_TIMEOUT_SECONDS=10,
+    PAPERLESS_SEARCH_CACHE_SECONDS=60,
+)
+class PaperlessSearchCacheTests(TestCase):
+    def setUp(self):
+        PaperlessSearchCache.invalidate()
+        lookup_patch = patch.object(PaperlessService, "_safe_fetch_lookup_map", return_value={})
+        custom_field_patch = patch.object(
+            PaperlessService,
+            "_safe_fetch_custom_field_metadata",
+            return_value=({}, {}),
+        )
+        lookup_patch.start()
+        custom_field_patch.start()
+        self.addCleanup(lookup_patch.stop)
+        self.addCleanup(custom_field_patch.stop)
+
+    def test_identical_searches_are_served_from_cache(self):
+        with patch.object(
+            PaperlessService,
+            "_request_json",
+            return_value={"results": [{"id": 7, "title": "Mietvertrag"}]},
+        ) as mocked_request:
+            first = PaperlessService.search_documents(query="Vertrag ", q_einheit="Top 3")
+            second = PaperlessService.search_documents(query="Vertrag", q_einheit="Top 3")
+            other = PaperlessService.search_documents(query="Vertrag", q_einheit="Top 4")
+
+        self.assertEqual(mocked_request.call_count, 2)
+        self.assertEqual(first, second)
+        self.assertEqual(second[0]["title"], "Mietvertrag")
+        self.assertEqual(other[0]["id"], "7")
+
+    def test_own_upload_invalidates_cached_results(self):
+        with patch.object(
+            PaperlessService,
+            "_request_json",
+            side_effect=[{"results": []}, {"results": [{"id": 9, "title": "Neu"}]}],
+        ) as mocked_request:
+            self.assertEqual(PaperlessService.search_documents(query="Neu"), [])
+            with patch.object(PaperlessService, "_fetch_lookup_map", return_value={}), patch.object(
+                PaperlessService,
+                "_fetch_custom_field_metadata",
+                return_value=({}, {}),
+            ), patch.object(PaperlessService, "_request_multipart", return_value=b'"task-1"'):
+                PaperlessService.upload_document(
+                    uploaded_file=SimpleUploadedFile("neu.pdf", b"%PDF", content_type="application/pdf"),
+                )
+            refreshed = PaperlessService.search_documents(query="Neu")
+
+        self.assertEqual(mocked_request.call_count, 2)
+        self.assertEqual(refreshed[0]["id"], "9")
+
+    def test_outbox_changes_invalidate_results_in_other_processes(self):
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        web_cache = LocMemCache("paperless-web", {})
+        worker_cache = LocMemCache("paperless-worker", {})
+        with patch.object(
+            PaperlessService,
+            "_request_json",
+            side_effect=[{"results": []}, {"results": []}, {"results": [{"id": 9, "title": "Neu"}]}],
+        ) as mocked_request, patch("webapp.services.paperless_search_cache.cache", web_cache):
+            self.assertEqual(PaperlessService.search_documents(query="Neu"), [])
+            self.assertEqual(PaperlessService.search_documents(query="Neu"), [])
+            self.assertEqual(mocked_request.call_count, 1)
+
+            upload, _created = PaperlessOutboxService.enqueue(
+                uploaded_file=SimpleUploadedFile("neu.pdf", b"%PDF-1.4 neu", content_type="application/pdf"),
+            )
+            self.assertEqual(PaperlessService.search_documents(query="Neu"), [])
+            self.assertEqual(mocked_request.call_count, 2)
+
+            PaperlessUpload.objects.filter(pk=upload.pk).update(
+                status=PaperlessUpload.Status.SENT,
+                task_id="task-9",
+            )
+            with patch("webapp.services.paperless_search_cache.cache", worker_cache), patch.object(
+                PaperlessService,
+                "fetch_task",
+                return_value={"status": "SUCCESS"},
+            ):
+                self.assertEqual(PaperlessOutboxService.confirm_consumed(), 1)
+            refreshed = PaperlessService.search_documents(query="Neu")
+
+        self.assertEqual(mocked_request.call_count, 3)
+        self.assertEqual(refreshed[0]["id"], "9")
+
+    def test_outbox_marker_uses_updated_at_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Planprüfung ist auf SQLite-Ausgabe abgestimmt.")
+        with CaptureQueriesContext(connection) as queries:
+            PaperlessSearchCache.outbox_marker()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[-1]['sql']}")
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+
+        self.assertIn("paperlessup_updated_idx", plan)
+        self.assertIsNone(re.search(r"SCAN webapp_paperlessupload\b(?! USING)", plan), plan)
+
+    def test_errors_are_not_cached(self):
+        with patch.object(
+            PaperlessService,
+            "_request_json",
+            side_effect=[PaperlessSearchError("Paperless ist nicht erreichbar."), {"results": []}],
+        ) as mocked_request:
+            with self.assertRaises(PaperlessSearchError):
+                PaperlessService.search_documents(query="Vertrag")
+            self.assertEqual(PaperlessService.search_documents(query="Vertrag"), [])
+
+        self.assertEqual(mocked_request.call_count, 2)
+
+    @override_settings(PAPERLESS_SEARCH_CACHE_SECONDS=0)
+    def test_concurrent_identical_searches_share_one_request(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_request(_request_url):
+            started.set()
+            release.wait(timeout=5)
+            return {"results": [{"id": 3, "title": "Geteilt"}]}
+
+        results = []
+        with patch.object(PaperlessService, "_request_json", side_effect=slow_request) as mocked_request:
+            leader = threading.Thread(
+                target=lambda: results.append(PaperlessService.search_documents(query="Geteilt"))
+            )
+            leader.start()
+            self.assertTrue(started.wait(timeout=5))
+            follower = threading.Thread(
+                target=lambda: results.append(PaperlessService.search_documents(query="Geteilt"))
+            )
+            follower.start()
+            time.sleep(0.05)
+            release.set()
+            leader.join(timeout=5)
+            follower.join(timeout=5)
+
+        self.assertEqual(mocked_request.call_count, 1)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0], results[1])
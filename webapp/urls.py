@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     DashboardView,
     DateiArchiveView,
+    DateiBulkUploadView,
     DateiDownloadView,
     DateiOpenView,
     DateiPreviewView,
@@ -22,6 +23,7 @@ from .views import (
     ManagerDeleteView,
     PaperlessDocumentDownloadView,
     PaperlessDocumentPreviewView,
+    PaperlessMetricsView,
     PaperlessSearchView,
     ReminderSettingsView,
     TenantListView,
@@ -43,6 +45,7 @@ from .views import (
     MeterReadingUpdateView,
     MeterReadingDeleteView,
     BankImportView,
+    OffenePostenExcelExportView,
     OffenePostenListView,
     BuchungListView,
     BuchungExcelExportView,
@@ -87,6 +90,7 @@ from .views import (
 urlpatterns = [
     path('', DashboardView.as_view(), name='dashboard'),
     path('dateien/upload/', DateiUploadView.as_view(), name='datei_upload'),
+    path('dateien/upload/sammel/', DateiBulkUploadView.as_view(), name='datei_bulk_upload'),
     path('dateien/<int:pk>/download/', DateiDownloadView.as_view(), name='datei_download'),
     path('dateien/<int:pk>/oeffnen/', DateiOpenView.as_view(), name='datei_open'),
     path('dateien/<int:pk>/vorschau/', DateiPreviewView.as_view(), name='datei_preview'),
@@ -109,6 +113,7 @@ urlpatterns = [
     path('dms/paperless/', PaperlessSearchView.as_view(), name='paperless_search'),
     path('dms/paperless/<int:document_id>/download/', PaperlessDocumentDownloadView.as_view(), name='paperless_document_download'),
     path('dms/paperless/<int:document_id>/preview/', PaperlessDocumentPreviewView.as_view(), name='paperless_document_preview'),
+    path('dms/paperless/metrics/', PaperlessMetricsView.as_view(), name='paperless_metrics'),
     path('tenants/', TenantListView.as_view(), name='tenant_list'),
     path('tenants/add/', TenantCreateView.as_view(), name='tenant_create'),
     path('tenants/<int:pk>/edit/', TenantUpdateView.as_view(), name='tenant_update'),
@@ -129,6 +134,7 @@ urlpatterns = [
     path('meters/<int:pk>/readings/', MeterReadingByMeterListView.as_view(), name='meter_reading_by_meter_list'),
     path('bank-import/', BankImportView.as_view(), name='bank_import'),
     path('offene-posten/', OffenePostenListView.as_view(), name='offene_posten'),
+    path('offene-posten/export/excel/', OffenePostenExcelExportView.as_view(), name='offene_posten_export_excel'),
     path('buchungen/', BuchungListView.as_view(), name='buchung_list'),
     path('buchungen/export/excel/', BuchungExcelExportView.as_view(), name='buchung_export_excel'),
     path('buchungen/add/', BuchungCreateView.as_view(), name='buchung_create'),
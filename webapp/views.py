@@ -11,7 +11,8 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from django.http import FileResponse, Http404, HttpResponse
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.db.models import Case, Count, DecimalField, IntegerField, Max, Prefetch, Q, Sum, Value, When
 from django.db.models.functions import Coalesce
 from django.db import transaction
@@ -27,13 +28,16 @@ from .models import (
     BetriebskostenBeleg,
     BetriebskostenGruppe,
     Buchung,
+    DashboardMonatswert,
     Datei,
     DateiZuordnung,
     LeaseAgreement,
     Manager,
     Meter,
+    MietkontoSaldo,
     MeterReading,
     Owner,
+    PaperlessUpload,
     Property,
     Tenant,
     Unit,
@@ -42,11 +46,13 @@ from .models import (
     VpiAdjustmentRun,
     VpiIndexValue,
 )
+from .pagination import KeysetPaginationMixin
 from .forms import (
     BankImportForm,
     BetriebskostenBelegForm,
     BetriebskostenGruppeForm,
     BuchungForm,
+    DateiBulkUploadForm,
     DateiUploadForm,
     LeaseAgreementForm,
     MeterForm,
@@ -62,20 +68,38 @@ from .forms import (
     ManagerForm,
     TenantForm,
 )
+from .services.bulk_upload import BulkUploadItem, DateiBulkUpload
+from .services.dashboard_stats import DashboardStatistik
+from .services.datei_thumbnails import DateiThumbnailService
 from .services.files import DateiService
 from .services.excel_export import ExcelColumn, ExcelExportService
+from .services.file_delivery import DateiDelivery
+from .services.storage_tiers import DateiStorageTiers
 from .services.annual_statement_pdf_service import AnnualStatementPdfService
 from .services.annual_statement_portal_export_service import AnnualStatementPortalExportService
 from .services.annual_statement_run_service import AnnualStatementRunService
+from .services.lease_balance import MietkontoSaldoService
 from .services.lease_history_package_service import LeaseHistoryPackageService
 from .services.operating_cost_service import OperatingCostService
 from .services.paperless import PaperlessSearchError, PaperlessService
+from .services.paperless_metrics import PaperlessMetrics
+from .services.paperless_outbox import PaperlessOutboxService
+from .services.paperless_thumbnails import (
+    THUMBNAIL_CACHE_MAX_AGE_SECONDS,
+    PaperlessThumbnailService,
+)
+from .services.search_index import VolltextIndex
 from .services.settlement_adjustments import match_settlement_adjustment_text
 from .services.reminders import ReminderService
 from .services.vpi_adjustment_pdf_service import VpiAdjustmentPdfService
 from .services.vpi_adjustment_run_service import VpiAdjustmentRunService
 
 
+THUMBNAIL_TABLE_SIZE = 128
+# Exporte lesen blockweise (PostgreSQL: serverseitiger Cursor) statt den ganzen Queryset zu laden.
+EXPORT_CHUNK_SIZE = 2000
+
+
 def build_attachments_panel_context(request, target_object, *, title: str):
     assignments = DateiService.list_assignments_for_object(
         target_object=target_object,
@@ -88,11 +112,17 @@ def build_attachments_panel_context(request, target_object, *, title: str):
         if datei is None:
             continue
         is_image = DateiService.is_image_file(datei=datei)
+        has_preview = is_image or (
+            DateiThumbnailService.is_pdf(datei)
+            and bool(DateiThumbnailService.existing_thumbnail(datei, requested_size=THUMBNAIL_TABLE_SIZE))
+        )
         rows.append(
             {
                 "assignment": assignment,
                 "datei": datei,
                 "is_image": is_image,
+                "has_preview": has_preview,
+                "thumbnail_size": THUMBNAIL_TABLE_SIZE,
                 "can_download": DateiService.can_download(user=None, datei=datei),
                 "can_archive": DateiService.can_archive(user=None, datei=datei),
             }
@@ -365,16 +395,21 @@ def _paperless_document_download_url(*, request, document_id: object) -> str:
     )
 
 
-def _paperless_document_preview_url(*, request, document_id: object) -> str:
+def _paperless_document_preview_url(*, request, document_id: object, modified: object = "") -> str:
     document_id_text = str(document_id or "").strip()
     if not document_id_text.isdigit():
         return ""
+    query_params = {"next": request.get_full_path()}
+    modified_text = str(modified or "").strip()
+    if modified_text:
+        # Versionierte URL: erlaubt lokalen Thumbnail-Cache und lange Browser-Caches.
+        query_params["v"] = modified_text
     return "{}?{}".format(
         reverse(
             "paperless_document_preview",
             kwargs={"document_id": int(document_id_text)},
         ),
-        urlencode({"next": request.get_full_path()}),
+        urlencode(query_params),
     )
 
 
@@ -395,10 +430,27 @@ def _paperless_document_with_links(request, document: dict[str, object]) -> dict
         "preview_url": _paperless_document_preview_url(
             request=request,
             document_id=document.get("id"),
+            modified=document.get("modified"),
         ),
     }
 
 
+def _add_paperless_outbox_message(request, *, upload: PaperlessUpload, created: bool, label: str) -> None:
+    if created:
+        messages.success(
+            request,
+            f"{label} wurde gespeichert und zur Übertragung an Paperless vorgemerkt.",
+        )
+        return
+    messages.info(
+        request,
+        (
+            f"{label} ist bereits in der Paperless-Warteschlange "
+            f"(Status: {upload.get_status_display()})."
+        ),
+    )
+
+
 def _paperless_document_type_filter_value(document_type_id: object | None) -> int | list[int] | None:
     normalized_document_type_ids = PaperlessService._normalize_document_type_ids(document_type_id)
     if not normalized_document_type_ids:
@@ -563,6 +615,10 @@ def _meterreading_photo_panel_context(request, *, reading: MeterReading) -> dict
         "title": "Zählerfoto in Paperless",
         "description": "Neue Zählerfotos werden direkt in Paperless gespeichert und mit dieser Ablesung verknüpft.",
         "current_document": current_document,
+        "outbox_uploads": PaperlessOutboxService.recent_uploads(
+            q_source_ref=_meterreading_source_ref(reading),
+            limit=5,
+        ),
         "error_message": str(preview_context.get("preview_error_message") or ""),
         "empty_message": (
             ""
@@ -737,60 +793,30 @@ class DashboardView(TemplateView):
         return Decimal(value or Decimal("0.00")).quantize(Decimal("0.01"))
 
     def _build_finance_charts_context(self, *, today: date) -> dict[str, object]:
-        sum_field = DecimalField(max_digits=14, decimal_places=2)
-        zero_money = Value(Decimal("0.00"), output_field=sum_field)
-
-        def build_period_map(rows, period_key: str) -> dict[int, Decimal]:
-            values: dict[int, Decimal] = {}
-            for row in rows:
-                period_value = row.get(period_key)
-                if period_value is None:
-                    continue
-                values[int(period_value)] = self._to_money_decimal(row.get("total"))
-            return values
-
-        rent_year_rows = (
-            Buchung.objects.filter(
-                typ=Buchung.Typ.IST,
-                kategorie=Buchung.Kategorie.HMZ,
-            )
-            .values("datum__year")
-            .annotate(
-                total=Coalesce(
-                    Sum("netto", output_field=sum_field),
-                    zero_money,
-                )
-            )
-            .order_by("datum__year")
-        )
-        bk_income_year_rows = (
-            Buchung.objects.filter(
-                typ=Buchung.Typ.IST,
-                kategorie__in=[Buchung.Kategorie.BK, Buchung.Kategorie.HK],
-            )
-            .values("datum__year")
-            .annotate(
-                total=Coalesce(
-                    Sum("netto", output_field=sum_field),
-                    zero_money,
-                )
-            )
-            .order_by("datum__year")
-        )
-        bk_expense_year_rows = (
-            BetriebskostenBeleg.objects.values("datum__year")
-            .annotate(
-                total=Coalesce(
-                    Sum("netto", output_field=sum_field),
-                    zero_money,
-                )
-            )
-            .order_by("datum__year")
-        )
-
-        rent_year_map = build_period_map(rent_year_rows, "datum__year")
-        bk_income_year_map = build_period_map(bk_income_year_rows, "datum__year")
-        bk_expense_year_map = build_period_map(bk_expense_year_rows, "datum__year")
+        # Netto-Monatssummen aus DashboardMonatswert statt Aggregaten über alle Buchungen.
+        rent_year_map: dict[int, Decimal] = {}
+        bk_income_year_map: dict[int, Decimal] = {}
+        bk_expense_year_map: dict[int, Decimal] = {}
+        rent_month_map: dict[int, Decimal] = {}
+        bk_income_month_map: dict[int, Decimal] = {}
+        bk_expense_month_map: dict[int, Decimal] = {}
+        current_year = today.year
+        for monat, rent_net, bk_income_net, bk_expense_net in DashboardMonatswert.objects.values_list(
+            "monat",
+            "miete_netto",
+            "bk_einnahmen_netto",
+            "bk_ausgaben_netto",
+        ):
+            for year_map, value in (
+                (rent_year_map, rent_net),
+                (bk_income_year_map, bk_income_net),
+                (bk_expense_year_map, bk_expense_net),
+            ):
+                year_map[monat.year] = year_map.get(monat.year, Decimal("0.00")) + self._to_money_decimal(value)
+            if monat.year == current_year:
+                rent_month_map[monat.month] = self._to_money_decimal(rent_net)
+                bk_income_month_map[monat.month] = self._to_money_decimal(bk_income_net)
+                bk_expense_month_map[monat.month] = self._to_money_decimal(bk_expense_net)
 
         year_labels = sorted(
             set(rent_year_map) | set(bk_income_year_map) | set(bk_expense_year_map)
@@ -808,53 +834,6 @@ class DashboardView(TemplateView):
             Decimal("0.01")
         )
 
-        current_year = today.year
-        rent_month_rows = (
-            Buchung.objects.filter(
-                typ=Buchung.Typ.IST,
-                kategorie=Buchung.Kategorie.HMZ,
-                datum__year=current_year,
-            )
-            .values("datum__month")
-            .annotate(
-                total=Coalesce(
-                    Sum("netto", output_field=sum_field),
-                    zero_money,
-                )
-            )
-            .order_by("datum__month")
-        )
-        bk_income_month_rows = (
-            Buchung.objects.filter(
-                typ=Buchung.Typ.IST,
-                kategorie__in=[Buchung.Kategorie.BK, Buchung.Kategorie.HK],
-                datum__year=current_year,
-            )
-            .values("datum__month")
-            .annotate(
-                total=Coalesce(
-                    Sum("netto", output_field=sum_field),
-                    zero_money,
-                )
-            )
-            .order_by("datum__month")
-        )
-        bk_expense_month_rows = (
-            BetriebskostenBeleg.objects.filter(datum__year=current_year)
-            .values("datum__month")
-            .annotate(
-                total=Coalesce(
-                    Sum("netto", output_field=sum_field),
-                    zero_money,
-                )
-            )
-            .order_by("datum__month")
-        )
-
-        rent_month_map = build_period_map(rent_month_rows, "datum__month")
-        bk_income_month_map = build_period_map(bk_income_month_rows, "datum__month")
-        bk_expense_month_map = build_period_map(bk_expense_month_rows, "datum__month")
-
         month_numbers = list(range(1, 13))
         month_labels = ["Jan", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
 
@@ -903,6 +882,13 @@ class DashboardView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         today = timezone.localdate()
+        context.update(
+            DashboardStatistik.snapshot(lambda: self._build_dashboard_context(today=today), today=today)
+        )
+        return context
+
+    def _build_dashboard_context(self, *, today: date) -> dict[str, object]:
+        context: dict[str, object] = {}
         active_leases = LeaseAgreement.objects.filter(status=LeaseAgreement.Status.AKTIV)
 
         stats = {
@@ -918,30 +904,13 @@ class DashboardView(TemplateView):
         }
 
         lease_balances = active_leases.annotate(
-            soll_total=Coalesce(
-                Sum(
-                    "buchungen__brutto",
-                    filter=Q(buchungen__typ=Buchung.Typ.SOLL),
-                    output_field=DecimalField(max_digits=12, decimal_places=2),
-                ),
-                Value(Decimal("0.00")),
-            ),
-            haben_total=Coalesce(
-                Sum(
-                    "buchungen__brutto",
-                    filter=Q(buchungen__typ=Buchung.Typ.IST),
-                    output_field=DecimalField(max_digits=12, decimal_places=2),
-                ),
-                Value(Decimal("0.00")),
-            ),
-        )
+            saldo=MietkontoSaldoService.endsaldo_subquery()
+        ).values_list("saldo", flat=True)
 
         total_open_amount = Decimal("0.00")
         overdue_leases = 0
-        for lease in lease_balances:
-            saldo = (Decimal(lease.haben_total) - Decimal(lease.soll_total)).quantize(
-                Decimal("0.01")
-            )
+        for saldo in lease_balances:
+            saldo = Decimal(saldo).quantize(Decimal("0.01"))
             if saldo < Decimal("0.00"):
                 overdue_leases += 1
                 total_open_amount += -saldo
@@ -951,11 +920,11 @@ class DashboardView(TemplateView):
             "overdue_leases": overdue_leases,
             "open_amount_total": total_open_amount.quantize(Decimal("0.01")),
         }
-        context["recent_bookings"] = (
+        context["recent_bookings"] = list(
             Buchung.objects.select_related("mietervertrag__unit__property", "einheit")
             .order_by("-datum", "-id")[:6]
         )
-        context["upcoming_exits"] = (
+        context["upcoming_exits"] = list(
             active_leases.select_related("unit", "unit__property")
             .prefetch_related("tenants")
             .filter(exit_date__isnull=False, exit_date__gte=today)
@@ -1027,6 +996,66 @@ class DateiUploadView(View):
         return redirect(next_url)
 
 
+class DateiBulkUploadView(DateiUploadView):
+    """Mehrere Dateien in einem POST; mit ``Accept: application/json`` gibt es Ergebnisse je Datei."""
+
+    form_class = DateiBulkUploadForm
+
+    @staticmethod
+    def _wants_json(request) -> bool:
+        return "application/json" in str(request.headers.get("Accept") or "")
+
+    def post(self, request, *args, **kwargs):
+        next_url = request.POST.get("next") or reverse_lazy("dashboard")
+        form = self.form_class(request.POST, request.FILES)
+        if not form.is_valid():
+            errors = list(self._validation_messages(form))
+            if self._wants_json(request):
+                return JsonResponse({"errors": errors, "results": []}, status=400)
+            for message_text in errors:
+                messages.error(request, message_text)
+            return redirect(next_url)
+
+        results = DateiBulkUpload.upload(
+            [
+                BulkUploadItem(
+                    uploaded_file=uploaded_file,
+                    target_object=form.target_object,
+                    kategorie=form.cleaned_data.get("kategorie") or None,
+                    beschreibung=form.cleaned_data.get("beschreibung", ""),
+                )
+                for uploaded_file in form.cleaned_data["files"]
+            ]
+        )
+        uploaded = [result for result in results if result.status != DateiBulkUpload.STATUS_REJECTED]
+        duplicates = [result for result in results if result.status == DateiBulkUpload.STATUS_DUPLICATE]
+        rejected = [result for result in results if result.status == DateiBulkUpload.STATUS_REJECTED]
+
+        if self._wants_json(request):
+            return JsonResponse(
+                {
+                    "uploaded": len(uploaded),
+                    "duplicates": len(duplicates),
+                    "rejected": len(rejected),
+                    "results": [result.as_dict() for result in results],
+                }
+            )
+
+        if len(uploaded) == 1:
+            messages.success(request, "Datei wurde hochgeladen.")
+        elif uploaded:
+            messages.success(request, f"{len(uploaded)} Dateien wurden hochgeladen.")
+        if duplicates:
+            names = ", ".join(result.name for result in duplicates)
+            messages.warning(
+                request,
+                f"Hinweis: Inhaltlich bereits vorhanden und als Duplikat markiert: {names}",
+            )
+        for result in rejected:
+            messages.error(request, f"{result.name}: {result.error}")
+        return redirect(next_url)
+
+
 class DateiDownloadView(View):
     http_method_names = ["get"]
 
@@ -1045,14 +1074,16 @@ class DateiDownloadView(View):
             raise Http404("Datei wurde nicht gefunden.")
 
         download_name = download_target.original_name or os.path.basename(download_target.file.name or "")
-        response = FileResponse(
-            download_target.file.open("rb"),
+        storage, name = DateiStorageTiers.read_source(download_target)
+        return DateiDelivery.serve(
+            request,
+            storage=storage,
+            name=name,
+            content_type="application/octet-stream",
+            etag=DateiDelivery.build_etag(download_target.checksum_sha256),
             as_attachment=True,
             filename=download_name,
         )
-        response["Content-Type"] = "application/octet-stream"
-        response["X-Content-Type-Options"] = "nosniff"
-        return response
 
 
 class DateiOpenView(View):
@@ -1073,14 +1104,15 @@ class DateiOpenView(View):
             raise Http404("Datei wurde nicht gefunden.")
 
         mime_type = DateiService.effective_mime_type(datei=open_target)
-        response = FileResponse(
-            open_target.file.open("rb"),
-            as_attachment=False,
+        storage, name = DateiStorageTiers.read_source(open_target)
+        return DateiDelivery.serve(
+            request,
+            storage=storage,
+            name=name,
+            content_type=mime_type,
+            etag=DateiDelivery.build_etag(open_target.checksum_sha256),
             filename=open_target.original_name or os.path.basename(open_target.file.name or ""),
         )
-        response["Content-Type"] = mime_type
-        response["X-Content-Type-Options"] = "nosniff"
-        return response
 
 
 class DateiPreviewView(View):
@@ -1095,16 +1127,35 @@ class DateiPreviewView(View):
         if not datei.file:
             raise Http404("Datei wurde nicht gefunden.")
 
+        try:
+            requested_size = int(request.GET.get("size") or 0) or None
+        except (TypeError, ValueError):
+            requested_size = None
+        thumbnail_path = DateiThumbnailService.existing_thumbnail(datei, requested_size=requested_size)
+        if thumbnail_path:
+            return DateiDelivery.serve(
+                request,
+                storage=datei.file.storage,
+                name=thumbnail_path,
+                content_type="image/jpeg",
+                etag=DateiDelivery.build_etag(
+                    datei.checksum_sha256,
+                    os.path.basename(os.path.dirname(thumbnail_path)),
+                ),
+            )
+
         if not DateiService.is_image_file(datei=datei):
             raise Http404("Für diese Datei ist keine Vorschau verfügbar.")
         mime_type = DateiService.image_mime_type(datei=datei)
 
-        response = FileResponse(
-            datei.file.open("rb"),
-            as_attachment=False,
+        storage, name = DateiStorageTiers.read_source(datei)
+        return DateiDelivery.serve(
+            request,
+            storage=storage,
+            name=name,
+            content_type=mime_type,
+            etag=DateiDelivery.build_etag(datei.checksum_sha256),
         )
-        response["Content-Type"] = mime_type
-        return response
 
 
 class DateiArchiveView(View):
@@ -1126,6 +1177,11 @@ class PropertyListView(ListView):
     context_object_name = "properties"
     queryset = Property.objects.prefetch_related("ownerships__owner")
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["properties"] = DateiService.attach_attachment_summaries(context["properties"])
+        return context
+
 
 class PropertyDetailView(DetailView):
     model = Property
@@ -1486,6 +1542,9 @@ class PaperlessSearchView(TemplateView):
         ]
         context["source_context"] = filters["source_context"]
         context["upload_form"] = upload_form
+        context["outbox_uploads"] = PaperlessOutboxService.recent_uploads(
+            q_source_ref=str(filters.get("q_source_ref") or ""),
+        )
         return context
 
     def post(self, request, *args, **kwargs):
@@ -1510,7 +1569,7 @@ class PaperlessSearchView(TemplateView):
                 filters.get("document_type_id")
             )
         try:
-            task_id = PaperlessService.upload_document(
+            upload, created = PaperlessOutboxService.enqueue(
                 uploaded_file=cleaned_data["file"],
                 title=cleaned_data.get("title", ""),
                 description=cleaned_data.get("description", ""),
@@ -1526,10 +1585,7 @@ class PaperlessSearchView(TemplateView):
             messages.error(request, str(exc))
             return self.render_to_response(self.get_context_data(upload_form=upload_form))
 
-        messages.success(
-            request,
-            f"Dokument wurde an Paperless übergeben. Task-ID: {task_id}.",
-        )
+        _add_paperless_outbox_message(request, upload=upload, created=created, label="Dokument")
         return redirect(request.get_full_path())
 
 
@@ -1558,6 +1614,10 @@ class PaperlessDocumentPreviewView(View):
 
     def get(self, request, *args, **kwargs):
         document_id = int(kwargs["document_id"])
+        modified = (request.GET.get("v") or "").strip()
+        if modified:
+            return self._cached_preview_response(request, document_id=document_id, modified=modified)
+
         try:
             content, content_type, _filename = PaperlessService.download_document(document_id=document_id)
         except PaperlessSearchError as exc:
@@ -1571,11 +1631,59 @@ class PaperlessDocumentPreviewView(View):
         response["X-Content-Type-Options"] = "nosniff"
         return response
 
+    def _cached_preview_response(self, request, *, document_id: int, modified: str):
+        try:
+            preview = PaperlessThumbnailService.get_or_create(
+                document_id=document_id,
+                modified=modified,
+                accept_header=request.headers.get("Accept", ""),
+            )
+        except PaperlessSearchError as exc:
+            raise Http404(str(exc)) from None
+        if preview is None:
+            raise Http404("Für dieses Paperless-Dokument ist keine Bildvorschau verfügbar.")
+        if preview.is_outdated:
+            query_params = request.GET.copy()
+            query_params["v"] = preview.current_modified
+            return redirect(f"{request.path}?{query_params.urlencode()}")
+
+        if preview.is_cached_file:
+            response = FileResponse(
+                default_storage.open(preview.storage_path, "rb"),
+                as_attachment=False,
+                content_type=preview.content_type,
+            )
+            response["Cache-Control"] = (
+                f"private, max-age={THUMBNAIL_CACHE_MAX_AGE_SECONDS}, immutable"
+            )
+            response["Vary"] = "Accept"
+        else:
+            response = HttpResponse(preview.content, content_type=preview.content_type)
+        response["X-Content-Type-Options"] = "nosniff"
+        return response
+
+
+class PaperlessMetricsView(View):
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            PaperlessMetrics.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
 
-class TenantListView(ListView):
+class TenantListView(KeysetPaginationMixin, ListView):
     model = Tenant
     template_name = "webapp/tenant_list.html"
     context_object_name = "tenants"
+    keyset_fields = ("last_name", "first_name", "id")
+    keyset_rows_template = "webapp/partials/_tenant_rows.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["total_count"] = self.object_list.count()
+        return context
 
 
 class TenantCreateView(CreateView):
@@ -1653,6 +1761,7 @@ class LeaseAgreementListView(ListView):
         )
         for lease in ended_leases:
             lease.reminder_items = []
+        DateiService.attach_attachment_summaries(active_leases + ended_leases)
 
         context["active_leases"] = active_leases
         context["ended_leases"] = ended_leases
@@ -1713,86 +1822,56 @@ class LeaseAgreementDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        buchungen = list(
-            Buchung.objects.filter(mietervertrag=self.object)
-            .select_related("bank_transaktion")
-            .order_by("datum", "id")
-        )
         cent = Decimal("0.01")
-        soll_summe = Decimal("0.00")
-        haben_summe = Decimal("0.00")
-        kontostand = Decimal("0.00")
+        # Monatssalden statt ganzem Konto: Summen aus den Abschlüssen, Buchungen nur für den letzten Monat.
+        salden = MietkontoSaldo.objects.filter(mietervertrag=self.object)
+        totals = salden.aggregate(
+            soll_summe=Coalesce(Sum("soll"), Value(Decimal("0.00"))),
+            haben_summe=Coalesce(Sum("haben"), Value(Decimal("0.00"))),
+        )
+        soll_summe = Decimal(totals["soll_summe"])
+        haben_summe = Decimal(totals["haben_summe"])
+        letzter_saldo = salden.order_by("-monat").first()
+        buchungen = []
         konto_rows = []
-        monat_key = None
-        monat_soll = Decimal("0.00")
-        monat_haben = Decimal("0.00")
-        monat_start_kontostand = Decimal("0.00")
-
-        def append_monatsabschluss(year, month):
-            nonlocal monat_soll, monat_haben, monat_start_kontostand
-            monat_delta = monat_haben - monat_soll
-            monat_ende_kontostand = monat_start_kontostand + monat_delta
-            offen = Decimal("0.00")
-            if monat_ende_kontostand < 0:
-                offen = (-monat_ende_kontostand).quantize(cent)
+        kontostand = Decimal("0.00")
+        if letzter_saldo is not None:
+            month_start, month_end = month_bounds(letzter_saldo.monat)
+            buchungen = list(
+                Buchung.objects.filter(
+                    mietervertrag=self.object,
+                    datum__gte=month_start,
+                    datum__lte=month_end,
+                )
+                .select_related("bank_transaktion")
+                .order_by("datum", "id")
+            )
+            kontostand = Decimal(letzter_saldo.vortrag)
+            for buchung in buchungen:
+                if buchung.typ == Buchung.Typ.IST:
+                    kontobewegung = Decimal(buchung.brutto)
+                else:
+                    kontobewegung = -Decimal(buchung.brutto)
+                kontostand += kontobewegung
+                buchung.kontobewegung = kontobewegung.quantize(cent)
+                buchung.kontostand = kontostand.quantize(cent)
+                konto_rows.append({"kind": "booking", "buchung": buchung})
+
+            month_end_kontostand = Decimal(letzter_saldo.endsaldo)
             konto_rows.append(
                 {
                     "kind": "month_summary",
-                    "month_key": (year, month),
-                    "month_label": f"{month:02d}.{year}",
-                    "month_soll": monat_soll.quantize(cent),
-                    "month_haben": monat_haben.quantize(cent),
-                    "month_delta": monat_delta.quantize(cent),
-                    "month_end_kontostand": monat_ende_kontostand.quantize(cent),
-                    "offen": offen,
+                    "month_key": (month_start.year, month_start.month),
+                    "month_label": f"{month_start.month:02d}.{month_start.year}",
+                    "month_soll": Decimal(letzter_saldo.soll).quantize(cent),
+                    "month_haben": Decimal(letzter_saldo.haben).quantize(cent),
+                    "month_delta": (Decimal(letzter_saldo.haben) - Decimal(letzter_saldo.soll)).quantize(cent),
+                    "month_end_kontostand": month_end_kontostand.quantize(cent),
+                    "offen": max(-month_end_kontostand, Decimal("0.00")).quantize(cent),
                 }
             )
-            monat_soll = Decimal("0.00")
-            monat_haben = Decimal("0.00")
-            monat_start_kontostand = monat_ende_kontostand
-
-        for buchung in buchungen:
-            key = (buchung.datum.year, buchung.datum.month)
-            if monat_key != key:
-                if monat_key is not None:
-                    append_monatsabschluss(monat_key[0], monat_key[1])
-                monat_key = key
-                monat_start_kontostand = kontostand
-
-            if buchung.typ == Buchung.Typ.IST:
-                kontobewegung = Decimal(buchung.brutto)
-                haben_summe += Decimal(buchung.brutto)
-                monat_haben += Decimal(buchung.brutto)
-            else:
-                kontobewegung = -Decimal(buchung.brutto)
-                soll_summe += Decimal(buchung.brutto)
-                monat_soll += Decimal(buchung.brutto)
-            kontostand += kontobewegung
-            buchung.kontobewegung = kontobewegung.quantize(cent)
-            buchung.kontostand = kontostand.quantize(cent)
-            konto_rows.append({"kind": "booking", "buchung": buchung})
-
-        if monat_key is not None:
-            append_monatsabschluss(monat_key[0], monat_key[1])
-
-        konto_rows.reverse()
-        if buchungen:
-            latest_month_key = (buchungen[-1].datum.year, buchungen[-1].datum.month)
-            konto_rows = [
-                row
-                for row in konto_rows
-                if (
-                    row["kind"] == "month_summary" and row.get("month_key") == latest_month_key
-                )
-                or (
-                    row["kind"] == "booking"
-                    and (
-                        row["buchung"].datum.year,
-                        row["buchung"].datum.month,
-                    )
-                    == latest_month_key
-                )
-            ]
+            konto_rows.reverse()
+            kontostand = month_end_kontostand
 
         context["buchungen"] = buchungen
         context["konto_rows"] = konto_rows
@@ -2022,7 +2101,7 @@ class MeterReadingUpdateView(UpdateView):
 
             cleaned_data = upload_form.cleaned_data
             try:
-                task_id = PaperlessService.upload_document(
+                upload, created = PaperlessOutboxService.enqueue(
                     uploaded_file=cleaned_data["file"],
                     title=cleaned_data.get("title", ""),
                     description=cleaned_data.get("description", ""),
@@ -2041,10 +2120,7 @@ class MeterReadingUpdateView(UpdateView):
                     )
                 )
 
-            messages.success(
-                request,
-                f"Zählerfoto wurde an Paperless übergeben. Task-ID: {task_id}.",
-            )
+            _add_paperless_outbox_message(request, upload=upload, created=created, label="Zählerfoto")
             return redirect("meter_reading_update", pk=self.object.pk)
 
         return super().post(request, *args, **kwargs)
@@ -2525,10 +2601,15 @@ class BankImportView(TemplateView):
         if created_buchungen:
             with transaction.atomic():
                 Buchung.objects.bulk_create(created_buchungen)
+                MietkontoSaldoService.refresh_for_bookings(created_buchungen)
+                VolltextIndex.refresh(Buchung, [buchung.pk for buchung in created_buchungen])
+                DashboardStatistik.refresh_for_dates(buchung.datum for buchung in created_buchungen)
             created_buchung_count = len(created_buchungen)
         if created_belege:
             with transaction.atomic():
                 BetriebskostenBeleg.objects.bulk_create(created_belege)
+                VolltextIndex.refresh(BetriebskostenBeleg, [beleg.pk for beleg in created_belege])
+                DashboardStatistik.refresh_for_dates(beleg.datum for beleg in created_belege)
             created_beleg_count = len(created_belege)
 
         if remaining_rows:
@@ -2786,6 +2867,20 @@ def month_bounds(check_date):
     return month_start, month_end
 
 
+def year_range_filter(year, field="datum"):
+    """Jahresfilter als Bereich, damit Indizes auf ``field`` greifen (statt ``__year``)."""
+    year = int(year)
+    return {
+        f"{field}__gte": date(year, 1, 1),
+        f"{field}__lt": date(year + 1, 1, 1),
+    }
+
+
+def year_choices_for_queryset(queryset, field="datum"):
+    """Vorhandene Jahre als ``DISTINCT`` in der Datenbank, statt jedes Datum zu laden."""
+    return [value.year for value in queryset.order_by().dates(field, "year")]
+
+
 def shift_month(month_start, delta):
     month_index = (month_start.year * 12 + (month_start.month - 1)) + delta
     year = month_index // 12
@@ -3023,53 +3118,11 @@ class OffenePostenListView(TemplateView):
             .prefetch_related("tenants")
             .filter(status=LeaseAgreement.Status.AKTIV, entry_date__lte=month_end)
             .filter(Q(exit_date__isnull=True) | Q(exit_date__gte=month_start))
+            # Vortrag, Soll und Haben direkt aus den Monatssalden statt Summen über alle Buchungen.
             .annotate(
-                vortrag_soll=Coalesce(
-                    Sum(
-                        "buchungen__brutto",
-                        filter=Q(
-                            buchungen__typ=Buchung.Typ.SOLL,
-                            buchungen__datum__lt=month_start,
-                        ),
-                        output_field=DecimalField(max_digits=12, decimal_places=2),
-                    ),
-                    Value(Decimal("0.00")),
-                ),
-                vortrag_haben=Coalesce(
-                    Sum(
-                        "buchungen__brutto",
-                        filter=Q(
-                            buchungen__typ=Buchung.Typ.IST,
-                            buchungen__datum__lt=month_start,
-                        ),
-                        output_field=DecimalField(max_digits=12, decimal_places=2),
-                    ),
-                    Value(Decimal("0.00")),
-                ),
-                soll_sum=Coalesce(
-                    Sum(
-                        "buchungen__brutto",
-                        filter=Q(
-                            buchungen__typ=Buchung.Typ.SOLL,
-                            buchungen__datum__gte=month_start,
-                            buchungen__datum__lte=month_end,
-                        ),
-                        output_field=DecimalField(max_digits=12, decimal_places=2),
-                    ),
-                    Value(Decimal("0.00")),
-                ),
-                haben_sum=Coalesce(
-                    Sum(
-                        "buchungen__brutto",
-                        filter=Q(
-                            buchungen__typ=Buchung.Typ.IST,
-                            buchungen__datum__gte=month_start,
-                            buchungen__datum__lte=month_end,
-                        ),
-                        output_field=DecimalField(max_digits=12, decimal_places=2),
-                    ),
-                    Value(Decimal("0.00")),
-                ),
+                vortrag_saldo=MietkontoSaldoService.endsaldo_subquery(before=month_start),
+                soll_sum=MietkontoSaldoService.month_value_subquery("soll", month=month_start),
+                haben_sum=MietkontoSaldoService.month_value_subquery("haben", month=month_start),
             )
             .order_by("unit__property__name", "unit__name")
         )
@@ -3083,40 +3136,19 @@ class OffenePostenListView(TemplateView):
         total_guthaben = Decimal("0.00")
 
         for lease in active_leases:
-            vortrag_soll = Decimal(lease.vortrag_soll or Decimal("0.00")).quantize(Decimal("0.01"))
-            vortrag_haben = Decimal(lease.vortrag_haben or Decimal("0.00")).quantize(Decimal("0.01"))
-            vortrag = (vortrag_haben - vortrag_soll).quantize(Decimal("0.01"))
-            soll = Decimal(lease.soll_sum or Decimal("0.00")).quantize(Decimal("0.01"))
-            haben = Decimal(lease.haben_sum or Decimal("0.00")).quantize(Decimal("0.01"))
-            endsaldo = (vortrag + haben - soll).quantize(Decimal("0.01"))
-            offen = max(-endsaldo, Decimal("0.00")).quantize(Decimal("0.01"))
-            guthaben = max(endsaldo, Decimal("0.00")).quantize(Decimal("0.01"))
-            status_label, status_class = offene_posten_status(
-                vortrag=vortrag,
-                soll=soll,
-                haben=haben,
-                endsaldo=endsaldo,
+            row = offene_posten_row(
+                lease,
+                vortrag=lease.vortrag_saldo,
+                soll=lease.soll_sum,
+                haben=lease.haben_sum,
             )
-
-            rows.append(
-                {
-                    "lease": lease,
-                    "vortrag": vortrag,
-                    "soll": soll,
-                    "haben": haben,
-                    "endsaldo": endsaldo,
-                    "offen": offen,
-                    "guthaben": guthaben,
-                    "status_label": status_label,
-                    "status_class": status_class,
-                }
-            )
-            total_vortrag += vortrag
-            total_soll += soll
-            total_haben += haben
-            total_endsaldo += endsaldo
-            total_offen += offen
-            total_guthaben += guthaben
+            rows.append(row)
+            total_vortrag += row["vortrag"]
+            total_soll += row["soll"]
+            total_haben += row["haben"]
+            total_endsaldo += row["endsaldo"]
+            total_offen += row["offen"]
+            total_guthaben += row["guthaben"]
 
         context["month_label"] = month_label
         context["month_input_value"] = month_start.strftime("%Y-%m")
@@ -3146,6 +3178,120 @@ class OffenePostenListView(TemplateView):
         return date(today.year, today.month, 1)
 
 
+class OffenePostenExcelExportView(View):
+    """Offene Posten je Vertrag und Monat über einen Zeitraum (``von``/``bis`` als YYYY-MM)."""
+
+    MAX_MONTHS = 120
+
+    def get(self, request, *args, **kwargs):
+        current_month = date(timezone.localdate().year, timezone.localdate().month, 1)
+        start = self._month_param("von") or current_month
+        end = self._month_param("bis") or start
+        if end < start:
+            start, end = end, start
+        if (end.year - start.year) * 12 + end.month - start.month >= self.MAX_MONTHS:
+            start = shift_month(end, -(self.MAX_MONTHS - 1))
+
+        leases = (
+            LeaseAgreement.objects.select_related("unit", "unit__property")
+            .prefetch_related("tenants")
+            .filter(status=LeaseAgreement.Status.AKTIV, entry_date__lte=month_bounds(end)[1])
+            .filter(Q(exit_date__isnull=True) | Q(exit_date__gte=start))
+            .order_by("unit__property__name", "unit__name")
+        )
+        lease_list = list(leases)
+        series = MietkontoSaldoService.month_series(leases, start=start, end=end)
+
+        tenant_names = {
+            lease.pk: ", ".join(f"{tenant.first_name} {tenant.last_name}".strip() for tenant in lease.tenants.all())
+            for lease in lease_list
+        }
+        rows = []
+        month_start = start
+        month_index = 0
+        while month_start <= end:
+            month_end = month_bounds(month_start)[1]
+            for lease in lease_list:
+                if lease.entry_date > month_end or (lease.exit_date and lease.exit_date < month_start):
+                    continue
+                month_values = series[lease.pk][month_index]
+                row = offene_posten_row(
+                    lease,
+                    vortrag=month_values["vortrag"],
+                    soll=month_values["soll"],
+                    haben=month_values["haben"],
+                )
+                rows.append(
+                    {
+                        "monat": month_start.strftime("%m.%Y"),
+                        "liegenschaft": lease.unit.property.name if lease.unit and lease.unit.property else "",
+                        "einheit": lease.unit.name if lease.unit else "",
+                        "mieter": tenant_names[lease.pk],
+                        "vortrag": row["vortrag"],
+                        "soll": row["soll"],
+                        "haben": row["haben"],
+                        "endsaldo": row["endsaldo"],
+                        "offen": row["offen"],
+                        "guthaben": row["guthaben"],
+                        "status": row["status_label"],
+                    }
+                )
+            month_start = shift_month(month_start, 1)
+            month_index += 1
+
+        columns = [
+            ExcelColumn(key="monat", label="Monat"),
+            ExcelColumn(key="liegenschaft", label="Liegenschaft"),
+            ExcelColumn(key="einheit", label="Einheit"),
+            ExcelColumn(key="mieter", label="Mieter"),
+            ExcelColumn(key="vortrag", label="Vortrag"),
+            ExcelColumn(key="soll", label="Soll"),
+            ExcelColumn(key="haben", label="Haben"),
+            ExcelColumn(key="endsaldo", label="Endsaldo"),
+            ExcelColumn(key="offen", label="Offen"),
+            ExcelColumn(key="guthaben", label="Guthaben"),
+            ExcelColumn(key="status", label="Status"),
+        ]
+        return ExcelExportService.build_response(
+            filename=f"offene_posten_{start:%Y-%m}_{end:%Y-%m}.xlsx",
+            sheet_name="Offene Posten",
+            columns=columns,
+            rows=rows,
+        )
+
+    def _month_param(self, name: str):
+        raw = (self.request.GET.get(name) or "").strip()
+        try:
+            year_str, month_str = raw.split("-")
+            return date(int(year_str), int(month_str), 1)
+        except (ValueError, TypeError):
+            return None
+
+
+def offene_posten_row(lease, *, vortrag, soll, haben) -> dict[str, object]:
+    vortrag = Decimal(vortrag or Decimal("0.00")).quantize(Decimal("0.01"))
+    soll = Decimal(soll or Decimal("0.00")).quantize(Decimal("0.01"))
+    haben = Decimal(haben or Decimal("0.00")).quantize(Decimal("0.01"))
+    endsaldo = (vortrag + haben - soll).quantize(Decimal("0.01"))
+    status_label, status_class = offene_posten_status(
+        vortrag=vortrag,
+        soll=soll,
+        haben=haben,
+        endsaldo=endsaldo,
+    )
+    return {
+        "lease": lease,
+        "vortrag": vortrag,
+        "soll": soll,
+        "haben": haben,
+        "endsaldo": endsaldo,
+        "offen": max(-endsaldo, Decimal("0.00")).quantize(Decimal("0.01")),
+        "guthaben": max(endsaldo, Decimal("0.00")).quantize(Decimal("0.01")),
+        "status_label": status_label,
+        "status_class": status_class,
+    }
+
+
 def offene_posten_status(vortrag, soll, haben, endsaldo):
     if vortrag == Decimal("0.00") and soll == Decimal("0.00") and haben == Decimal("0.00"):
         return "Keine Soll-Stellung", "secondary"
@@ -3160,7 +3306,7 @@ def offene_posten_status(vortrag, soll, haben, endsaldo):
     return "Guthaben", "info"
 
 
-class BuchungListView(ListView):
+class BuchungListView(KeysetPaginationMixin, ListView):
     model = Buchung
     template_name = "webapp/buchung_list.html"
     context_object_name = "buchungen"
@@ -3169,6 +3315,7 @@ class BuchungListView(ListView):
         "einheit",
         "bank_transaktion",
     ).order_by("-datum", "-id")
+    keyset_rows_template = "webapp/partials/_buchung_rows.html"
 
     def get_queryset(self):
         queryset = super().get_queryset().filter(typ=Buchung.Typ.IST)
@@ -3185,12 +3332,15 @@ class BuchungListView(ListView):
                 | Q(einheit__property=self.selected_property)
             )
 
-        self.year_choices = self._year_choices_for_queryset(queryset)
+        self.year_choices = year_choices_for_queryset(queryset)
         self.selected_year = self._selected_year(self.year_choices)
-        queryset = queryset.filter(datum__year=self.selected_year)
+        queryset = queryset.filter(**year_range_filter(self.selected_year))
 
         self.selected_search_query = (self.request.GET.get("q") or "").strip()
-        if self.selected_search_query:
+        search_filter = VolltextIndex.match_filter(Buchung, self.selected_search_query)
+        if search_filter is not None:
+            queryset = queryset.filter(search_filter)
+        elif self.selected_search_query:
             search_term = self.selected_search_query
             queryset = queryset.filter(
                 Q(buchungstext__icontains=search_term)
@@ -3222,9 +3372,11 @@ class BuchungListView(ListView):
                 Value(Decimal("0.00")),
                 output_field=DecimalField(max_digits=12, decimal_places=2),
             ),
+            total_count=Count("id"),
         )
         context["year_choices"] = getattr(self, "year_choices", [])
         context["selected_year"] = getattr(self, "selected_year", timezone.localdate().year)
+        context["category_choices"] = Buchung.Kategorie.choices
         context["bank_transaktion_id"] = getattr(self, "bank_transaktion_id", "")
         context["properties"] = getattr(self, "properties", [])
         context["selected_property_id"] = getattr(self, "selected_property_id", "")
@@ -3233,6 +3385,7 @@ class BuchungListView(ListView):
         context["selected_category_filter"] = getattr(self, "selected_category_filter", "")
         context["filtered_sum_netto"] = totals["total_netto"]
         context["filtered_sum_brutto"] = totals["total_brutto"]
+        context["total_count"] = totals["total_count"]
         return context
 
     def _selected_property(self, properties):
@@ -3267,16 +3420,6 @@ class BuchungListView(ListView):
             self.selected_property_filter_value = ""
         return preferred_bhg14
 
-    def _year_choices_for_queryset(self, queryset):
-        years = sorted(
-            {
-                int(year_value)
-                for year_value in queryset.values_list("datum__year", flat=True)
-                if year_value is not None
-            }
-        )
-        return years
-
     def _selected_year(self, year_choices):
         current_year = timezone.localdate().year
         raw_year = (self.request.GET.get("jahr") or "").strip()
@@ -3323,8 +3466,13 @@ class BuchungExcelExportView(BuchungListView):
         )
         return queryset.filter(pk__in=selected_ids).order_by(order_expression)
 
+    def get(self, request, *args, **kwargs):
+        # Export über den ganzen gefilterten Queryset, ohne Seitenbildung.
+        self.object_list = self.get_queryset()
+        return self.render_to_response({})
+
     def render_to_response(self, context, **response_kwargs):
-        queryset = self._ordered_queryset(context["buchungen"])
+        queryset = self._ordered_queryset(self.object_list)
         rows = [
             {
                 "datum": buchung.datum.strftime("%d.%m.%Y"),
@@ -3334,7 +3482,7 @@ class BuchungExcelExportView(BuchungListView):
                 "kategorie": buchung.get_kategorie_display(),
                 "buchungstext": buchung.buchungstext or "",
             }
-            for buchung in queryset
+            for buchung in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
         ]
         columns = [
             ExcelColumn(key="datum", label="Datum"),
@@ -3422,20 +3570,24 @@ class BetriebskostenGruppeUpdateView(UpdateView):
     success_url = reverse_lazy("betriebskosten_gruppe_list")
 
 
-class BetriebskostenBelegListView(ListView):
+class BetriebskostenBelegListView(KeysetPaginationMixin, ListView):
     model = BetriebskostenBeleg
     template_name = "webapp/betriebskostenbeleg_list.html"
     context_object_name = "belege"
     queryset = BetriebskostenBeleg.objects.select_related("liegenschaft", "ausgabengruppe").order_by("-datum", "-id")
+    keyset_rows_template = "webapp/partials/_betriebskostenbeleg_rows.html"
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        self.year_choices = self._year_choices_for_queryset(queryset)
+        self.year_choices = year_choices_for_queryset(queryset)
         self.selected_year = self._selected_year(self.year_choices)
-        queryset = queryset.filter(datum__year=self.selected_year)
+        queryset = queryset.filter(**year_range_filter(self.selected_year))
 
         self.selected_search_query = (self.request.GET.get("suche") or "").strip()
-        if self.selected_search_query:
+        search_filter = VolltextIndex.match_filter(BetriebskostenBeleg, self.selected_search_query)
+        if search_filter is not None:
+            queryset = queryset.filter(search_filter)
+        elif self.selected_search_query:
             search_term = self.selected_search_query
             queryset = queryset.filter(
                 Q(buchungstext__icontains=search_term)
@@ -3475,42 +3627,11 @@ class BetriebskostenBelegListView(ListView):
                 Value(Decimal("0.00")),
                 output_field=DecimalField(max_digits=12, decimal_places=2),
             ),
+            total_count=Count("id"),
         )
-        attachment_count_by_beleg_id: dict[int, int] = {}
-        first_attachment_id_by_beleg_id: dict[int, int] = {}
-        belege = list(context["belege"])
-        beleg_ids = [beleg.pk for beleg in belege]
-        if beleg_ids:
-            beleg_content_type = ContentType.objects.get_for_model(BetriebskostenBeleg)
-            count_rows = (
-                DateiZuordnung.objects.filter(
-                    content_type=beleg_content_type,
-                    object_id__in=beleg_ids,
-                    datei__is_archived=False,
-                )
-                .values("object_id")
-                .annotate(total=Count("id"))
-            )
-            attachment_count_by_beleg_id = {
-                int(row["object_id"]): int(row["total"])
-                for row in count_rows
-            }
-            first_attachment_rows = (
-                DateiZuordnung.objects.filter(
-                    content_type=beleg_content_type,
-                    object_id__in=beleg_ids,
-                    datei__is_archived=False,
-                )
-                .order_by("object_id", "-datei__created_at", "-id")
-            )
-            for assignment in first_attachment_rows:
-                object_id = int(assignment.object_id)
-                if object_id in first_attachment_id_by_beleg_id:
-                    continue
-                first_attachment_id_by_beleg_id[object_id] = int(assignment.datei_id)
-        for beleg in belege:
-            beleg.attachment_count = attachment_count_by_beleg_id.get(beleg.pk, 0)
-            beleg.first_attachment_id = first_attachment_id_by_beleg_id.get(beleg.pk)
+        attachment_count_by_beleg_id = {
+            beleg.pk: beleg.attachment_count for beleg in context["belege"] if beleg.attachment_count
+        }
 
         ungrouped_group, _created = BetriebskostenGruppe.get_or_create_ungrouped()
         context["bulk_group_choices"] = (
@@ -3519,6 +3640,9 @@ class BetriebskostenBelegListView(ListView):
         )
         context["bulk_file_category_choices"] = DateiService.category_choices()
         context["bulk_file_prefill_category"] = Datei.Kategorie.RECHNUNG
+        context["property_filter_choices"] = Property.objects.order_by("name").values_list("name", flat=True)
+        context["group_filter_choices"] = BetriebskostenGruppe.objects.order_by("sort_order", "name", "id")
+        context["art_filter_choices"] = BetriebskostenBeleg.BKArt.choices
         context["attachment_count_by_beleg_id"] = attachment_count_by_beleg_id
         context["year_choices"] = getattr(self, "year_choices", [])
         context["selected_year"] = getattr(self, "selected_year", timezone.localdate().year)
@@ -3528,17 +3652,14 @@ class BetriebskostenBelegListView(ListView):
         context["selected_art_filter"] = getattr(self, "selected_art_filter", "")
         context["filtered_sum_netto"] = totals["total_netto"]
         context["filtered_sum_brutto"] = totals["total_brutto"]
+        context["total_count"] = totals["total_count"]
         return context
 
-    def _year_choices_for_queryset(self, queryset):
-        years = sorted(
-            {
-                int(year_value)
-                for year_value in queryset.values_list("datum__year", flat=True)
-                if year_value is not None
-            }
-        )
-        return years
+    def prepare_keyset_rows(self, rows):
+        for beleg in DateiService.attach_attachment_summaries(rows):
+            beleg.attachment_count = beleg.attachment_summary.total
+            beleg.first_attachment_id = beleg.attachment_summary.latest_datei_id
+        return rows
 
     def _selected_year(self, year_choices):
         current_year = timezone.localdate().year
@@ -3586,8 +3707,13 @@ class BetriebskostenBelegExcelExportView(BetriebskostenBelegListView):
         )
         return queryset.filter(pk__in=selected_ids).order_by(order_expression)
 
+    def get(self, request, *args, **kwargs):
+        # Export über den ganzen gefilterten Queryset, ohne Seitenbildung.
+        self.object_list = self.get_queryset()
+        return self.render_to_response({})
+
     def render_to_response(self, context, **response_kwargs):
-        queryset = self._ordered_queryset(context["belege"])
+        queryset = self._ordered_queryset(self.object_list)
         rows = [
             {
                 "datum": beleg.datum.strftime("%d.%m.%Y"),
@@ -3600,7 +3726,7 @@ class BetriebskostenBelegExcelExportView(BetriebskostenBelegListView):
                 "text": beleg.buchungstext or "",
                 "import_referenz": beleg.import_referenz or "",
             }
-            for beleg in queryset
+            for beleg in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
         ]
         columns = [
             ExcelColumn(key="datum", label="Datum"),
@@ -3810,6 +3936,7 @@ class BetriebskostenBelegBulkGroupUpdateView(View):
 
         with transaction.atomic():
             updated_count = queryset.update(ausgabengruppe=selected_group)
+            VolltextIndex.refresh_queryset(queryset)
         messages.success(
             request,
             f"{updated_count} Beleg(e) wurden der Gruppe „{selected_group.name}“ zugewiesen.",
@@ -4331,17 +4458,14 @@ class BetriebskostenAbrechnungView(TemplateView):
         if selected_property is None:
             return []
 
-        belege_years = set(
-            BetriebskostenBeleg.objects.filter(
-                liegenschaft=selected_property
-            ).values_list("datum__year", flat=True)
+        belege_years = year_choices_for_queryset(
+            BetriebskostenBeleg.objects.filter(liegenschaft=selected_property)
         )
-        booking_years = set(
+        booking_years = year_choices_for_queryset(
             Buchung.objects.filter(
                 Q(mietervertrag__unit__property=selected_property)
                 | Q(einheit__property=selected_property)
-            )
-            .filter(
+            ).filter(
                 Q(
                     typ=Buchung.Typ.SOLL,
                     kategorie__in=[Buchung.Kategorie.BK, Buchung.Kategorie.HK],
@@ -4355,16 +4479,8 @@ class BetriebskostenAbrechnungView(TemplateView):
                     ],
                 )
             )
-            .values_list("datum__year", flat=True)
         )
-        years = sorted(
-            {
-                int(year_value)
-                for year_value in belege_years.union(booking_years)
-                if year_value is not None
-            }
-        )
-        return years
+        return sorted(set(belege_years).union(booking_years))
 
     def _selected_year(self, year_choices):
         current_year = timezone.localdate().year
@@ -5049,6 +5165,11 @@ class UnitListView(ListView):
     context_object_name = "units"
     queryset = Unit.objects.select_related("property").order_by("property__name", "door_number", "name")
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["units"] = DateiService.attach_attachment_summaries(context["units"])
+        return context
+
 
 class UnitDetailView(DetailView):
     model = Unit